@@ -230,6 +230,10 @@ rst_prolog = """
 .. |Tree| replace:: :class:`~dendropy.datamodel.treemodel.Tree`
 .. |Node| replace:: :class:`~dendropy.datamodel.treemodel.Node`
 .. |Edge| replace:: :class:`~dendropy.datamodel.treemodel.Edge`
+.. |CompactTree| replace:: :class:`~dendropy.datamodel.treemodel.CompactTree`
+.. |CompactNode| replace:: :class:`~dendropy.datamodel.treemodel.CompactNode`
+.. |CompactEdge| replace:: :class:`~dendropy.datamodel.treemodel.CompactEdge`
+.. |FlatTree| replace:: :class:`~dendropy.datamodel.treemodel.FlatTree`
 .. |Bipartition| replace:: :class:`~dendropy.datamodel.treemodel.Bipartition`
 .. |TreeList| replace:: :class:`~dendropy.datamodel.treecollectionmodel.TreeList`
 .. |TreeArray| replace:: :class:`~dendropy.datamodel.treecollectionmodel.TreeArray`
@@ -248,12 +252,16 @@ rst_prolog = """
 .. |ContinuousCharacterMatrix| replace:: :class:`~dendropy.datamodel.charmatrixmodel.ContinuousCharacterMatrix`
 .. |CharacterDataSequence| replace:: :class:`~dendropy.datamodel.charmatrixmodel.CharacterDataSequence`
 .. |ContinuousCharacterDataSequence| replace:: :class:`~dendropy.datamodel.charmatrixmodel.ContinuousCharacterDataSequence`
+.. |CompactFixedAlphabetCharacterDataSequence| replace:: :class:`~dendropy.datamodel.charmatrixmodel.CompactFixedAlphabetCharacterDataSequence`
 .. |DnaCharacterDataSequence| replace:: :class:`~dendropy.datamodel.charmatrixmodel.DnaCharacterDataSequence`
 .. |CharacterType| replace:: :class:`~dendropy.datamodel.charmatrixmodel.CharacterType`
 .. |Annotation| replace:: :class:`~dendropy.datamodel.basemodel.Annotation`
 .. |AnnotationSet| replace:: :class:`~dendropy.datamodel.basemodel.AnnotationSet`
 .. |Annotable| replace:: :class:`~dendropy.datamodel.basemodel.Annotable`
 .. |PhylogeneticDistanceMatrix| replace:: :class:`~dendropy.calculate.phylogeneticdistance.PhylogeneticDistanceMatrix`
+.. |TreeDistanceOracle| replace:: :class:`~dendropy.calculate.phylogeneticdistance.TreeDistanceOracle`
+.. |PackedStateSets| replace:: :class:`~dendropy.model.parsimony.PackedStateSets`
+.. |SitePatterns| replace:: :class:`~dendropy.datamodel.charmatrixmodel.SitePatterns`
 .. |AsciiTreePlot| replace:: :class:`~dendropy.datamodel.treemodel.AsciiTreePlot`
 
 .. |get| replace::  :py:meth:`get`
@@ -0,0 +1,19 @@
+import dendropy
+
+tree = dendropy.Tree.get(
+    path="pythonidae.mle.nex",
+    schema="nexus")
+lca_index = tree.lca_index()
+taxa = list(tree.taxon_namespace)
+t1 = taxa[0]
+for t2 in taxa[1:]:
+    print("Distance between '%s' and '%s': %s (%s edges)" % (
+        t1.label,
+        t2.label,
+        lca_index.patristic_distance(t1, t2),
+        lca_index.path_edge_count(t1, t2)))
+
+# Many pairs at a time
+taxon_pairs = [(t1, t2) for t2 in taxa[1:]]
+distances = lca_index.patristic_distances(taxon_pairs)
+path_edge_counts = lca_index.path_edge_counts(taxon_pairs)
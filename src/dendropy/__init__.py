@@ -32,12 +32,19 @@ from dendropy.datamodel.taxonmodel import TaxonNamespacePartition
 from dendropy.datamodel.taxonmodel import TaxonNamespaceMapping
 from dendropy.datamodel.taxonmodel import TaxonSet # Legacy
 from dendropy.datamodel.treemodel import Bipartition
+from dendropy.datamodel.treemodel import CompactEdge
+from dendropy.datamodel.treemodel import CompactNode
+from dendropy.datamodel.treemodel import CompactTree
 from dendropy.datamodel.treemodel import Edge
+from dendropy.datamodel.treemodel import FlatTree
 from dendropy.datamodel.treemodel import Node
+from dendropy.datamodel.treemodel import SplitRecord
+from dendropy.datamodel.treemodel import SplitRecordEncoder
 from dendropy.datamodel.treemodel import Tree
 from dendropy.datamodel.treecollectionmodel import TreeList
 from dendropy.datamodel.treecollectionmodel import SplitDistribution
 from dendropy.datamodel.treecollectionmodel import TreeArray
+from dendropy.datamodel.treecollectionmodel import TreeArrayStoreWriter
 from dendropy.datamodel.charstatemodel import StateAlphabet
 from dendropy.datamodel.charstatemodel import DNA_STATE_ALPHABET
 from dendropy.datamodel.charstatemodel import RNA_STATE_ALPHABET
@@ -49,6 +56,7 @@ from dendropy.datamodel.charstatemodel import INFINITE_SITES_STATE_ALPHABET
 from dendropy.datamodel.charstatemodel import new_standard_state_alphabet
 from dendropy.datamodel.charmatrixmodel import CharacterDataSequence
 from dendropy.datamodel.charmatrixmodel import CharacterMatrix
+from dendropy.datamodel.charmatrixmodel import CompactFixedAlphabetCharacterDataSequence
 from dendropy.datamodel.charmatrixmodel import DnaCharacterDataSequence
 from dendropy.datamodel.charmatrixmodel import DnaCharacterMatrix
 from dendropy.datamodel.charmatrixmodel import NucleotideCharacterDataSequence
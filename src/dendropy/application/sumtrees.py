@@ -35,11 +35,13 @@ import socket
 import math
 import csv
 import json
+import shutil
+import tempfile
 
-import queue
 import multiprocessing
 
 import dendropy
+from dendropy.dataio import treesharding
 from dendropy.utility import cli
 from dendropy.utility import constants
 from dendropy.utility import deprecate
@@ -82,6 +84,7 @@ def _read_into_tree_array(
         error_message_func,
         log_frequency,
         debug_mode,
+        source_tree_offset=0,
         ):
     if not log_frequency:
         tree_array.read_from_files(
@@ -138,23 +141,38 @@ def _read_into_tree_array(
                         info_message_func("Analyzing: '{}'".format(source_name), wrap=False)
                 if current_tree_offset >= tree_offset:
                     tree_array.add_tree(tree=tree, is_bipartitions_updated=False)
-                    _log_progress(source_name, current_tree_offset)
-                else:
-                    _log_progress(source_name, current_tree_offset)
+                _log_progress(source_name, source_tree_offset + current_tree_offset)
                 current_tree_offset += 1
         except (Exception, KeyboardInterrupt) as e:
             if debug_mode and not isinstance(e, KeyboardInterrupt):
                 raise
             e.exception_tree_source_name = tree_yielder.current_file_name
-            e.exception_tree_offset = current_tree_offset
+            if current_tree_offset is not None:
+                e.exception_tree_offset = source_tree_offset + current_tree_offset
+            else:
+                e.exception_tree_offset = current_tree_offset
             raise e
 
+class TreeAnalysisResult(object):
+    """
+    Results of a task of a worker process, written in compact form (see
+    ``TreeArray.write_compact()``) to a file instead of being pickled through
+    the results queue. ``task_index`` is the position of the task in the work
+    queue, by which the results of the tasks are merged.
+    """
+
+    def __init__(self, worker_name, task_index, path):
+        self.worker_name = worker_name
+        self.task_index = task_index
+        self.path = path
+
 class TreeAnalysisWorker(multiprocessing.Process):
 
     def __init__(self,
             name,
             work_queue,
             results_queue,
+            results_dir,
             source_schema,
             taxon_labels,
             tree_offset,
@@ -169,10 +187,12 @@ class TreeAnalysisWorker(multiprocessing.Process):
             messenger,
             messenger_lock,
             debug_mode,
+            use_streaming_summaries=False,
             ):
         multiprocessing.Process.__init__(self, name=name)
         self.work_queue = work_queue
         self.results_queue = results_queue
+        self.results_dir = results_dir
         self.source_schema = source_schema
         self.taxon_labels = taxon_labels
         self.taxon_namespace = dendropy.TaxonNamespace(self.taxon_labels)
@@ -186,20 +206,12 @@ class TreeAnalysisWorker(multiprocessing.Process):
         self.use_tree_weights = use_tree_weights
         self.ultrametricity_precision = ultrametricity_precision
         self.taxon_label_age_map = taxon_label_age_map
+        self.use_streaming_summaries = use_streaming_summaries
         self.log_frequency = log_frequency
         self.messenger = messenger
         self.messenger_lock = messenger_lock
         self.kill_received = False
-        self.tree_array = dendropy.TreeArray(
-                taxon_namespace=self.taxon_namespace,
-                is_rooted_trees=self.is_source_trees_rooted,
-                ignore_edge_lengths=self.ignore_edge_lengths,
-                ignore_node_ages=self.ignore_node_ages,
-                use_tree_weights=self.use_tree_weights,
-                ultrametricity_precision=self.ultrametricity_precision,
-                taxon_label_age_map=self.taxon_label_age_map,
-                )
-        self.tree_array.worker_name = self.name
+        self.tree_array = None
         self.num_tasks_received = 0
         self.num_tasks_completed = 0
         self.debug_mode = debug_mode
@@ -225,12 +237,28 @@ class TreeAnalysisWorker(multiprocessing.Process):
     def send_error(self, msg, wrap=True):
         self.send_message(msg, messaging.ConsoleMessenger.ERROR_MESSAGING_LEVEL, wrap=wrap)
 
+    def new_tree_array(self):
+        return dendropy.TreeArray(
+                taxon_namespace=self.taxon_namespace,
+                is_rooted_trees=self.is_source_trees_rooted,
+                ignore_edge_lengths=self.ignore_edge_lengths,
+                ignore_node_ages=self.ignore_node_ages,
+                use_tree_weights=self.use_tree_weights,
+                ultrametricity_precision=self.ultrametricity_precision,
+                taxon_label_age_map=self.taxon_label_age_map,
+                use_compact_storage=True,
+                use_streaming_summaries=self.use_streaming_summaries,
+                )
+
     def run(self):
         while not self.kill_received:
-            try:
-                tree_source = self.work_queue.get_nowait()
-            except queue.Empty:
+            task = self.work_queue.get()
+            if task is None:
                 break
+            task_index, tree_source = task
+            # each task is analyzed into an array of its own, so that the
+            # results can be merged in the order of the tasks
+            self.tree_array = self.new_tree_array()
             self.num_tasks_received += 1
             # self.send_info("Received task {task_count}: '{task_name}'".format(
             self.send_info("Received task: '{task_name}'".format(
@@ -246,26 +274,27 @@ class TreeAnalysisWorker(multiprocessing.Process):
             #     ignore_unrecognized_keyword_arguments=True,
             #     )
             try:
-                _read_into_tree_array(
-                        tree_array=self.tree_array,
-                        tree_sources=[tree_source],
-                        schema=self.source_schema,
-                        taxon_namespace=self.taxon_namespace,
-                        rooting=self.rooting_interpretation,
-                        tree_offset=self.tree_offset,
-                        use_tree_weights=self.use_tree_weights,
-                        preserve_underscores=self.preserve_underscores,
-                        info_message_func=self.send_info,
-                        error_message_func=self.send_error,
-                        log_frequency=self.log_frequency,
-                        debug_mode=self.debug_mode,
-                        )
+                if isinstance(tree_source, treesharding.TreeSourceShard):
+                    # burn-in trees are excluded from the shards
+                    with tree_source.open() as src:
+                        self._read_tree_source(
+                                tree_source=src,
+                                tree_offset=0,
+                                source_tree_offset=tree_source.first_tree_offset)
+                else:
+                    self._read_tree_source(
+                            tree_source=tree_source,
+                            tree_offset=self.tree_offset,
+                            source_tree_offset=0)
+                if self.kill_received:
+                    break
+                result = self._save_results(task_index)
             except (KeyboardInterrupt, Exception) as e:
                 e.worker_name = self.name
                 self.results_queue.put(e)
                 break
-            if self.kill_received:
-                break
+            self.tree_array = None
+            self.results_queue.put(result)
             self.num_tasks_completed += 1
             # self.send_info("Completed task {task_count}: '{task_name}'".format(
             self.send_info("Completed task: '{task_name}'".format(
@@ -273,8 +302,35 @@ class TreeAnalysisWorker(multiprocessing.Process):
                 task_name=tree_source), wrap=False)
         if self.kill_received:
             self.send_warning("Terminating in response to kill request")
-        else:
-            self.results_queue.put(self.tree_array)
+
+    def _save_results(self, task_index):
+        fd, results_path = tempfile.mkstemp(
+                prefix="{}-".format(self.name),
+                suffix=".trees.bin",
+                dir=self.results_dir)
+        with os.fdopen(fd, "wb") as dest:
+            self.tree_array.write_compact(dest)
+        return TreeAnalysisResult(
+                worker_name=self.name,
+                task_index=task_index,
+                path=results_path)
+
+    def _read_tree_source(self, tree_source, tree_offset, source_tree_offset):
+        _read_into_tree_array(
+                tree_array=self.tree_array,
+                tree_sources=[tree_source],
+                schema=self.source_schema,
+                taxon_namespace=self.taxon_namespace,
+                rooting=self.rooting_interpretation,
+                tree_offset=tree_offset,
+                use_tree_weights=self.use_tree_weights,
+                preserve_underscores=self.preserve_underscores,
+                info_message_func=self.send_info,
+                error_message_func=self.send_error,
+                log_frequency=self.log_frequency,
+                debug_mode=self.debug_mode,
+                source_tree_offset=source_tree_offset,
+                )
 
 class TreeProcessor(object):
 
@@ -289,6 +345,7 @@ class TreeProcessor(object):
             log_frequency,
             messenger,
             debug_mode,
+            use_streaming_summaries=False,
             ):
         self.is_source_trees_rooted = is_source_trees_rooted
         self.rooting_interpretation = dendropy.get_rooting_argument(is_rooted=self.is_source_trees_rooted)
@@ -297,6 +354,7 @@ class TreeProcessor(object):
         self.use_tree_weights = use_tree_weights
         self.ultrametricity_precision = ultrametricity_precision
         self.taxon_label_age_map = taxon_label_age_map
+        self.use_streaming_summaries = use_streaming_summaries
         self.num_processes = num_processes
         self.log_frequency = log_frequency
         self.messenger = messenger
@@ -357,6 +415,8 @@ class TreeProcessor(object):
                 use_tree_weights=self.use_tree_weights,
                 ultrametricity_precision=self.ultrametricity_precision,
                 taxon_label_age_map=self.taxon_label_age_map,
+                use_compact_storage=True,
+                use_streaming_summaries=self.use_streaming_summaries,
                 )
         _read_into_tree_array(
                 tree_array=tree_array,
@@ -374,6 +434,29 @@ class TreeProcessor(object):
                 )
         return tree_array
 
+    def shard_tree_sources(self,
+            tree_sources,
+            schema,
+            tree_offset=0):
+        """
+        If there is only a single (NEXUS or NEWICK) file source, returns its
+        trees (excluding the first ``tree_offset`` trees) split into one
+        |TreeSourceShard| for each process, so that the single file can be
+        processed in parallel. Otherwise returns |None|.
+        """
+        if (
+                len(tree_sources) != 1
+                or not isinstance(tree_sources[0], str)
+                or schema.lower() not in ("nexus", "newick", "nexus/newick")
+            ):
+            return None
+        tree_statement_index = treesharding.TreeStatementIndex.build(tree_sources[0])
+        if tree_statement_index is None:
+            return None
+        return tree_statement_index.shards(
+                num_shards=self.num_processes,
+                tree_offset=tree_offset)
+
     def parallel_analyze_trees(self,
             tree_sources,
             schema,
@@ -405,20 +488,64 @@ class TreeProcessor(object):
         # load up queue
         self.info_message("Creating work queue")
         work_queue = multiprocessing.Queue()
-        for f in tree_sources:
-            work_queue.put(f)
+        tree_source_shards = self.shard_tree_sources(
+                tree_sources=tree_sources,
+                schema=schema,
+                tree_offset=tree_offset)
+        if tree_source_shards:
+            self.info_message("Splitting trees in '{}' into {} shards".format(tree_sources[0], len(tree_source_shards)))
+            tasks = tree_source_shards
+        else:
+            tasks = tree_sources
+        for task in enumerate(tasks):
+            work_queue.put(task)
+        # no more workers than tasks, as the others would have nothing to do
+        num_workers = min(self.num_processes, len(tasks))
+        # one end-of-work marker for each worker: items put on a
+        # multiprocessing queue are not immediately visible to other
+        # processes, so workers cannot rely on it being empty to stop
+        for idx in range(num_workers):
+            work_queue.put(None)
 
         # launch processes
-        self.info_message("Launching {} worker processes".format(self.num_processes))
+        self.info_message("Launching {} worker processes".format(num_workers))
         results_queue = multiprocessing.Queue()
+        results_dir = tempfile.mkdtemp(prefix="sumtrees-")
+        try:
+            return self._run_workers(
+                    work_queue=work_queue,
+                    results_queue=results_queue,
+                    results_dir=results_dir,
+                    num_workers=num_workers,
+                    num_tasks=len(tasks),
+                    schema=schema,
+                    taxon_namespace=taxon_namespace,
+                    taxon_labels=taxon_labels,
+                    tree_offset=tree_offset,
+                    preserve_underscores=preserve_underscores)
+        finally:
+            shutil.rmtree(results_dir, ignore_errors=True)
+
+    def _run_workers(self,
+            work_queue,
+            results_queue,
+            results_dir,
+            num_workers,
+            num_tasks,
+            schema,
+            taxon_namespace,
+            taxon_labels,
+            tree_offset,
+            preserve_underscores):
         messenger_lock = multiprocessing.Lock()
         workers = []
-        for idx in range(self.num_processes):
+        for idx in range(num_workers):
             # self.info_message("Launching {} of {} worker processes".format(idx+1, self.num_processes))
             tree_analysis_worker = TreeAnalysisWorker(
                     name="Process-{}".format(idx+1),
                     work_queue=work_queue,
                     results_queue=results_queue,
+                    results_dir=results_dir,
                     source_schema=schema,
                     taxon_labels=taxon_labels,
                     tree_offset=tree_offset,
@@ -432,12 +559,15 @@ class TreeProcessor(object):
                     messenger=self.messenger,
                     messenger_lock=messenger_lock,
                     log_frequency=self.log_frequency,
-                    debug_mode=self.debug_mode)
+                    debug_mode=self.debug_mode,
+                    use_streaming_summaries=self.use_streaming_summaries)
             tree_analysis_worker.start()
             workers.append(tree_analysis_worker)
 
-        # collate results
+        # collate results, in the order of the tasks (and so of the trees)
+        # rather than that in which they are completed
         result_count = 0
+        pending_results = {}
         master_tree_array = dendropy.TreeArray(
                 taxon_namespace=taxon_namespace,
                 is_rooted_trees=self.is_source_trees_rooted,
@@ -445,22 +575,28 @@ class TreeProcessor(object):
                 ignore_node_ages=self.ignore_node_ages,
                 use_tree_weights=self.use_tree_weights,
                 ultrametricity_precision=self.ultrametricity_precision,
+                use_compact_storage=True,
+                use_streaming_summaries=self.use_streaming_summaries,
                 )
         try:
-            while result_count < self.num_processes:
+            while result_count < num_tasks:
                 result = results_queue.get()
                 if isinstance(result, Exception) or isinstance(result, KeyboardInterrupt):
                     self.info_message("Exception raised in worker process '{}'".format(result.worker_name))
                     raise result
-                master_tree_array.update(result)
-                self.info_message("Recovered results from worker process '{}'".format(result.worker_name))
-                result_count += 1
-                # self.info_message("Recovered results from {} of {} worker processes".format(result_count, self.num_processes))
+                pending_results[result.task_index] = result
+                while result_count in pending_results:
+                    result = pending_results.pop(result_count)
+                    with open(result.path, "rb") as src:
+                        master_tree_array.read_compact(src)
+                    os.remove(result.path)
+                    self.info_message("Recovered results of task {} from worker process '{}'".format(result_count+1, result.worker_name))
+                    result_count += 1
         except (Exception, KeyboardInterrupt) as e:
             for worker in workers:
                 worker.terminate()
             raise
-        self.info_message("All {} worker processes terminated".format(self.num_processes))
+        self.info_message("All {} worker processes terminated".format(num_workers))
         return master_tree_array
 
     def discover_taxa(self,
@@ -946,6 +1082,17 @@ def main():
             action="store_true",
             default=False,
             help="(If setting edge lengths) force parent node ages to be at least as old as its oldest child when summarizing node ages.")
+    edge_length_summarization_options.add_argument("--streaming-summaries",
+            action="store_true",
+            default=False,
+            help=(
+                "Summarize the edge lengths and node ages of each split in bounded"
+                " memory, by accumulating these as they are read rather than"
+                " retaining all of them. Means, standard deviations and ranges"
+                " are exact, but medians, HPDs and quantiles are approximated"
+                " for splits found in more than 500 trees. Edge lengths and"
+                " node ages are not written to the extended output."
+                ))
 
     node_summarization_options = parser.add_argument_group("Target Tree Annotation Options")
     node_summarization_options.add_argument(
@@ -1101,7 +1248,9 @@ def main():
             const="max",
             dest="multiprocess",
             help=(
-                 "Run in parallel mode using as many processors as available, up to the number of sources."
+                 "Run in parallel mode using as many processors as available, up to the number of sources"
+                 " (or, if there is only a single NEXUS or NEWICK file source, splitting the trees of the"
+                 " file between as many processors as available)."
                  ))
     multiprocessing_options.add_argument("-m", "--multiprocessing",
             dest="multiprocess",
@@ -1455,13 +1604,19 @@ def main():
     ## Multiprocessing Setup
 
     num_cpus = multiprocessing.cpu_count()
-    if len(tree_sources) > 1 and args.multiprocess is not None:
+    # a single file source can be split between processes
+    is_parallelizable_sources = len(tree_sources) > 1 or (
+            len(tree_sources) == 1 and tree_sources[0] is not sys.stdin)
+    if is_parallelizable_sources and args.multiprocess is not None:
         if (
                 args.multiprocess.lower() == "max"
                 or args.multiprocess == "#"
                 or args.multiprocess == "*"
             ):
-            num_processes = min(num_cpus, len(tree_sources))
+            if len(tree_sources) > 1:
+                num_processes = min(num_cpus, len(tree_sources))
+            else:
+                num_processes = num_cpus
         # elif args.multiprocess == "@":
         #     num_processes = len(tree_sources)
         else:
@@ -1480,10 +1635,10 @@ def main():
             try:
                 mp = int(args.multiprocess)
                 if mp > 1:
-                    messenger.info("Number of valid sources is less than 2: forcing serial processing")
+                    messenger.info("Trees read from standard input: forcing serial processing")
             except ValueError:
                 pass
-        if len(tree_sources) > 1 and num_cpus > 1:
+        if is_parallelizable_sources and num_cpus > 1:
             messenger.info(
                     ("Multiple processors ({num_cpus}) available:"
                     " consider using the '-M' or '-m' options to"
@@ -1516,6 +1671,7 @@ def main():
             log_frequency=args.log_frequency if not args.quiet else 0,
             messenger=messenger,
             debug_mode=args.debug_mode,
+            use_streaming_summaries=args.streaming_summaries,
             )
     analysis_time_start = datetime.datetime.now()
     # messenger.info("Processing of source trees starting at {}".format(
@@ -2186,6 +2342,9 @@ def main():
                 writer.writeheader()
                 writer.writerows(rows)
 
+        if tree_array.split_distribution.use_streaming_summaries:
+            messenger.info("Edge lengths and node ages are not retained when using '--streaming-summaries': not writing edge or node sets")
+
     ###################################################
     #  WRAP UP
 
@@ -22,8 +22,15 @@ Taxon-to-taxon phylogenetic distances.
 """
 
 import math
+import array
 import collections
 import csv
+import random
+import multiprocessing
+try:
+    import numpy
+except ImportError:
+    numpy = None
 from dendropy.calculate import statistics
 from dendropy.utility import GLOBAL_RNG
 from dendropy.utility import container
@@ -238,14 +245,22 @@ class PhylogeneticDistanceMatrix(object):
 
     def clear(self):
         self.taxon_namespace = None
-        self._mapped_taxa = set()
-        self._all_distinct_mapped_taxa_pairs = set()
+        # Mapped taxa are indexed 0, ..., n-1, and the values for each of the
+        # n(n-1)/2 distinct pairs of taxa are stored in flat "condensed"
+        # arrays, row by row: the value for taxa ``i`` < ``j`` is at
+        # ``self._row_offsets[i] + j``.
+        self._mapped_taxa = []
+        self._taxon_indexes = {}
+        self._row_offsets = []
         self._tree_length = None
         self._num_edges = None
-        self._taxon_phylogenetic_distances = {}
-        self._taxon_phylogenetic_path_steps = {}
+        self._phylogenetic_distances = array.array("d")
+        self._phylogenetic_path_steps = array.array("i")
+        # Indexes into ``self._mrca_nodes``, which lists the leaf node of each
+        # mapped taxon (in taxon index order) followed by the internal nodes.
+        self._mrca_node_indexes = array.array("i")
+        self._mrca_nodes = []
         self._taxon_phylogenetic_path_edges = {}
-        self._mrca = {}
 
     def compile_from_tree(self, tree):
         """
@@ -255,112 +270,166 @@ class PhylogeneticDistanceMatrix(object):
         """
         self.clear()
         self.taxon_namespace = tree.taxon_namespace
-        # for i1, t1 in enumerate(self.taxon_namespace):
-        #     self._taxon_phylogenetic_distances[t1] = {}
-        #     self._taxon_phylogenetic_path_steps[t1] = {}
-        #     self._mrca[t1] = {}
+        nodes = list(tree.postorder_node_iter())
+        leaves = [node for node in nodes if not node._child_nodes]
+        for leaf in leaves:
+            assert leaf.taxon is not None
+        self._map_taxa([leaf.taxon for leaf in leaves])
+        num_pairs = len(self._phylogenetic_distances)
+        self._phylogenetic_path_steps = array.array("i", [0]) * num_pairs
+        self._mrca_node_indexes = array.array("i", [0]) * num_pairs
+        self._mrca_nodes = leaves
+        row_offsets = self._row_offsets
+        distances = self._phylogenetic_distances
+        path_steps = self._phylogenetic_path_steps
+        mrca_node_indexes = self._mrca_node_indexes
+        # Leaves are numbered in postorder, so the leaves of each subtree
+        # have consecutive indexes; these hold the path length and number of
+        # steps from each leaf to the node being visited.
+        leaf_path_lengths = array.array("d", [0.0]) * len(leaves)
+        leaf_path_steps = array.array("i", [0]) * len(leaves)
+        leaf_index_ranges = {}
+        num_leaves_visited = 0
         self._tree_length = 0.0
         self._num_edges = 0
-        if self.is_store_path_edges:
-            default_pedges = []
-        else:
-            default_pedges = None
-        for node in tree.postorder_node_iter():
+        for node in nodes:
             try:
                 self._tree_length += node.edge.length
             except TypeError: # None for edge length
                 pass
             self._num_edges += 1
-            children = node.child_nodes()
-            if len(children) == 0:
-                node.desc_paths = {node : (0,0, default_pedges)}
-            else:
-                node.desc_paths = {}
-                for cidx1, c1 in enumerate(children):
-                    for desc1, (desc1_plen, desc1_psteps, desc1_pedges) in c1.desc_paths.items():
-                        if c1.edge_length is None:
-                            c1_edge_length = 0.0
-                        else:
-                            c1_edge_length = c1.edge.length
-                        if self.is_store_path_edges:
-                            pedges = list(desc1_pedges + [c1.edge])
-                        else:
-                            pedges = default_pedges
-                        node.desc_paths[desc1] = (desc1_plen + c1_edge_length, desc1_psteps + 1, pedges)
-                        assert desc1.taxon is not None
-                        if desc1.taxon not in self._taxon_phylogenetic_distances:
-                            self._mapped_taxa.add(desc1.taxon)
-                            self._taxon_phylogenetic_distances[desc1.taxon] = {}
-                            self._taxon_phylogenetic_distances[desc1.taxon][desc1.taxon] = 0.0
-                            self._taxon_phylogenetic_path_steps[desc1.taxon] = {}
-                            self._taxon_phylogenetic_path_steps[desc1.taxon][desc1.taxon] = 0
-                            if self.is_store_path_edges:
-                                self._taxon_phylogenetic_path_edges[desc1.taxon] = {}
-                                self._taxon_phylogenetic_path_edges[desc1.taxon][desc1.taxon] = []
-                            self._mrca[desc1.taxon] = {desc1.taxon: desc1}
-                        for c2 in children[cidx1+1:]:
-                            for desc2, (desc2_plen, desc2_psteps, desc2_pedges) in c2.desc_paths.items():
-                                self._mapped_taxa.add(desc2.taxon)
-                                self._mrca[desc1.taxon][desc2.taxon] = c1.parent_node
-                                # self._all_distinct_mapped_taxa_pairs.add( tuple([desc1.taxon, desc2.taxon]) )
-                                self._all_distinct_mapped_taxa_pairs.add( frozenset([desc1.taxon, desc2.taxon]) )
-                                if c2.edge_length is None:
-                                    c2_edge_length = 0.0
-                                else:
-                                    c2_edge_length = c2.edge.length
-                                pat_dist = node.desc_paths[desc1][0] + desc2_plen + c2_edge_length
-                                self._taxon_phylogenetic_distances[desc1.taxon][desc2.taxon] = pat_dist
-                                path_steps = node.desc_paths[desc1][1] + desc2_psteps + 1
-                                self._taxon_phylogenetic_path_steps[desc1.taxon][desc2.taxon] = path_steps
-                                if self.is_store_path_edges:
-                                    pedges = tuple(node.desc_paths[desc1][2] + [c2.edge] + desc2_pedges[::-1])
-                                    self._taxon_phylogenetic_path_edges[desc1.taxon][desc2.taxon] = pedges
-                    del(c1.desc_paths)
-        self._mirror_lookups()
+            if not node._child_nodes:
+                leaf_index_ranges[node] = (num_leaves_visited, num_leaves_visited + 1)
+                num_leaves_visited += 1
+                continue
+            child_index_ranges = []
+            for child in node._child_nodes:
+                start, stop = leaf_index_ranges.pop(child)
+                if child.edge.length:
+                    edge_length = child.edge.length
+                    leaf_path_lengths[start:stop] = array.array("d",
+                            [d + edge_length for d in leaf_path_lengths[start:stop]])
+                leaf_path_steps[start:stop] = array.array("i",
+                        [s + 1 for s in leaf_path_steps[start:stop]])
+                child_index_ranges.append((start, stop))
+            node_index = array.array("i", [len(self._mrca_nodes)])
+            self._mrca_nodes.append(node)
+            for cidx, (start1, stop1) in enumerate(child_index_ranges[:-1]):
+                for start2, stop2 in child_index_ranges[cidx+1:]:
+                    desc2_path_lengths = leaf_path_lengths[start2:stop2]
+                    desc2_path_steps = leaf_path_steps[start2:stop2]
+                    node_indexes = node_index * (stop2 - start2)
+                    for idx1 in range(start1, stop1):
+                        desc1_path_length = leaf_path_lengths[idx1]
+                        desc1_path_steps = leaf_path_steps[idx1]
+                        k1 = row_offsets[idx1] + start2
+                        k2 = row_offsets[idx1] + stop2
+                        distances[k1:k2] = array.array("d",
+                                [desc1_path_length + d for d in desc2_path_lengths])
+                        path_steps[k1:k2] = array.array("i",
+                                [desc1_path_steps + s for s in desc2_path_steps])
+                        mrca_node_indexes[k1:k2] = node_indexes
+            leaf_index_ranges[node] = (child_index_ranges[0][0], child_index_ranges[-1][1])
+        if self.is_store_path_edges:
+            self._compile_path_edges()
         # assert self._tree_length == tree.length()
 
     def compile_from_dict(self, distances, taxon_namespace):
         self.clear()
         self.taxon_namespace = taxon_namespace
+        taxa = list(distances)
+        seen_taxa = set(taxa)
         for t1 in distances:
-            self._mapped_taxa.add(t1)
-            self._taxon_phylogenetic_distances[t1] = {}
             for t2 in distances[t1]:
-                self._taxon_phylogenetic_distances[t1][t2] = distances[t1][t2]
-        self._mirror_lookups()
-
-    def _mirror_lookups(self):
-        for ddata in (
-                self._taxon_phylogenetic_distances,
-                self._taxon_phylogenetic_path_steps,
-                self._mrca,
-                ):
-            for taxon1 in ddata:
-                for taxon2 in ddata[taxon1]:
-                    # assert taxon1 is not taxon2
-                    if taxon2 not in ddata:
-                        ddata[taxon2] = {}
-                    ddata[taxon2][taxon1] = ddata[taxon1][taxon2]
-        for taxon1 in self._taxon_phylogenetic_path_edges:
-            for taxon2 in self._taxon_phylogenetic_path_edges:
-                if taxon2 not in self._taxon_phylogenetic_path_edges:
-                    self._taxon_phylogenetic_path_edges[taxon2][taxon1] = {}
-                if taxon1 not in self._taxon_phylogenetic_path_edges[taxon2]:
-                    self._taxon_phylogenetic_path_edges[taxon2][taxon1] = tuple(reversed(self._taxon_phylogenetic_path_edges[taxon1][taxon2]))
+                if t2 not in seen_taxa:
+                    seen_taxa.add(t2)
+                    taxa.append(t2)
+        self._map_taxa(taxa)
+        for t1 in distances:
+            for t2 in distances[t1]:
+                if t1 is not t2:
+                    self._phylogenetic_distances[self._taxon_pair_index(t1, t2)] = distances[t1][t2]
+
+    def _map_taxa(self, taxa):
+        n = len(taxa)
+        self._mapped_taxa = taxa
+        self._taxon_indexes = dict((taxon, idx) for idx, taxon in enumerate(taxa))
+        self._row_offsets = [(i * (2 * n - i - 1)) // 2 - i - 1 for i in range(n)]
+        self._phylogenetic_distances = array.array("d", [0.0]) * ((n * (n - 1)) // 2)
+
+    def _taxon_pair_index(self, taxon1, taxon2):
+        # Callers deal with ``taxon1 is taxon2`` themselves.
+        idx1 = self._taxon_indexes[taxon1]
+        idx2 = self._taxon_indexes[taxon2]
+        if idx1 < idx2:
+            return self._row_offsets[idx1] + idx2
+        else:
+            return self._row_offsets[idx2] + idx1
+
+    def _compile_path_edges(self):
+        for t1 in self._mapped_taxa:
+            self._taxon_phylogenetic_path_edges[t1] = {t1: []}
+        for t1, t2 in self.distinct_taxon_pair_iter():
+            mrca = self.mrca(t1, t2)
+            pedges = []
+            node = self._mrca_nodes[self._taxon_indexes[t1]]
+            while node is not mrca:
+                pedges.append(node.edge)
+                node = node._parent_node
+            desc2_pedges = []
+            node = self._mrca_nodes[self._taxon_indexes[t2]]
+            while node is not mrca:
+                desc2_pedges.append(node.edge)
+                node = node._parent_node
+            pedges = tuple(pedges + desc2_pedges[::-1])
+            self._taxon_phylogenetic_path_edges[t1][t2] = pedges
+            self._taxon_phylogenetic_path_edges[t2][t1] = tuple(reversed(pedges))
+
+    def _permuted_taxon_pair_values(self, values, source_indexes):
+        # Returns ``values`` with the values of taxon ``source_indexes[i]``
+        # assigned to taxon ``i``.
+        row_offsets = self._row_offsets
+        permuted = array.array(values.typecode)
+        for idx1, src_idx1 in enumerate(source_indexes):
+            permuted.extend([
+                values[row_offsets[src_idx1] + src_idx2] if src_idx1 < src_idx2 else values[row_offsets[src_idx2] + src_idx1]
+                for src_idx2 in source_indexes[idx1+1:]])
+        return permuted
 
     def __eq__(self, o):
         if self.taxon_namespace is not o.taxon_namespace:
             return False
-        return (True
-                and (self._mapped_taxa == o._mapped_taxa)
-                and (self._all_distinct_mapped_taxa_pairs == o._all_distinct_mapped_taxa_pairs)
-                and (self._taxon_phylogenetic_distances == o._taxon_phylogenetic_distances)
-                and (self._taxon_phylogenetic_path_steps == o._taxon_phylogenetic_path_steps)
+        if not (True
+                and (set(self._mapped_taxa) == set(o._mapped_taxa))
+                and (len(self._phylogenetic_path_steps) == len(o._phylogenetic_path_steps))
+                and (len(self._mrca_node_indexes) == len(o._mrca_node_indexes))
                 and (self._taxon_phylogenetic_path_edges == o._taxon_phylogenetic_path_edges)
-                and (self._mrca == o._mrca)
                 and (self._tree_length == o._tree_length)
                 and (self._num_edges == o._num_edges)
-                )
+                ):
+            return False
+        if self._mapped_taxa == o._mapped_taxa:
+            return (True
+                    and (self._phylogenetic_distances == o._phylogenetic_distances)
+                    and (self._phylogenetic_path_steps == o._phylogenetic_path_steps)
+                    and ([self._mrca_nodes[k] for k in self._mrca_node_indexes]
+                        == [o._mrca_nodes[k] for k in o._mrca_node_indexes])
+                    and (self._mrca_nodes[:len(self._mapped_taxa)] == o._mrca_nodes[:len(o._mapped_taxa)])
+                    )
+        for t1, t2 in self.distinct_taxon_pair_iter():
+            k1 = self._taxon_pair_index(t1, t2)
+            k2 = o._taxon_pair_index(t1, t2)
+            if self._phylogenetic_distances[k1] != o._phylogenetic_distances[k2]:
+                return False
+            if self._phylogenetic_path_steps and self._phylogenetic_path_steps[k1] != o._phylogenetic_path_steps[k2]:
+                return False
+            if self._mrca_node_indexes and self.mrca(t1, t2) != o.mrca(t1, t2):
+                return False
+        if self._mrca_nodes:
+            for t1 in self._mapped_taxa:
+                if self.mrca(t1, t1) != o.mrca(t1, t1):
+                    return False
+        return True
 
     def __hash__(self):
         return id(self)
@@ -372,33 +441,33 @@ class PhylogeneticDistanceMatrix(object):
         return self.clone()
 
     def __iter__(self):
-        for taxon in self._taxon_phylogenetic_distances:
+        for taxon in self._mapped_taxa:
             yield taxon
 
     def clone(self):
         o = self.__class__()
+        o.is_store_path_edges = self.is_store_path_edges
         o.taxon_namespace = self.taxon_namespace
-        o._mapped_taxa = set(self._mapped_taxa)
-        o._all_distinct_mapped_taxa_pairs = set(self._all_distinct_mapped_taxa_pairs)
+        o._mapped_taxa = list(self._mapped_taxa)
+        o._taxon_indexes = dict(self._taxon_indexes)
+        o._row_offsets = list(self._row_offsets)
         o._tree_length = self._tree_length
         o._num_edges = self._num_edges
-        for src, dest in (
-                (self._taxon_phylogenetic_distances, o._taxon_phylogenetic_distances,),
-                (self._taxon_phylogenetic_path_steps, o._taxon_phylogenetic_path_steps,),
-                (self._taxon_phylogenetic_path_edges, o._taxon_phylogenetic_path_edges,),
-                (self._mrca, o._mrca,),
-                ):
-            for t1 in src:
-                dest[t1] = {}
-                for t2 in src[t1]:
-                    dest[t1][t2] = src[t1][t2]
+        o._phylogenetic_distances = array.array("d", self._phylogenetic_distances)
+        o._phylogenetic_path_steps = array.array("i", self._phylogenetic_path_steps)
+        o._mrca_node_indexes = array.array("i", self._mrca_node_indexes)
+        o._mrca_nodes = list(self._mrca_nodes)
+        for t1 in self._taxon_phylogenetic_path_edges:
+            o._taxon_phylogenetic_path_edges[t1] = dict(self._taxon_phylogenetic_path_edges[t1])
         return o
 
     def mrca(self, taxon1, taxon2):
         """
         Returns MRCA of two taxon objects.
         """
-        return self._mrca[taxon1][taxon2]
+        if taxon1 is taxon2:
+            return self._mrca_nodes[self._taxon_indexes[taxon1]]
+        return self._mrca_nodes[self._mrca_node_indexes[self._taxon_pair_index(taxon1, taxon2)]]
 
     def distance(self,
             taxon1,
@@ -419,7 +488,7 @@ class PhylogeneticDistanceMatrix(object):
         """
         if taxon1 is taxon2:
             return 0.0
-        d = self._taxon_phylogenetic_distances[taxon1][taxon2]
+        d = self._phylogenetic_distances[self._taxon_pair_index(taxon1, taxon2)]
         if is_normalize_by_tree_size:
             return d / self._tree_length
         else:
@@ -431,7 +500,7 @@ class PhylogeneticDistanceMatrix(object):
         """
         if taxon1 is taxon2:
             return 0
-        d = self._taxon_phylogenetic_path_steps[taxon1][taxon2]
+        d = self._phylogenetic_path_steps[self._taxon_pair_index(taxon1, taxon2)]
         if is_normalize_by_tree_size:
             return float(d) / self._num_edges
         else:
@@ -454,20 +523,19 @@ class PhylogeneticDistanceMatrix(object):
                 is_normalize_by_tree_size=is_normalize_by_tree_size,
                 )
         results = []
-        for t1, t2 in self._all_distinct_mapped_taxa_pairs:
-            results.append(dmatrix[t1][t2]/normalization_factor)
+        for d in dmatrix:
+            results.append(d/normalization_factor)
         return results
 
     def max_pairwise_distance_taxa(self,
             is_weighted_edge_distances=True):
         if is_weighted_edge_distances:
-            dists = self._taxon_phylogenetic_distances
+            dists = self._phylogenetic_distances
         else:
-            dists = self._taxon_phylogenetic_path_steps
+            dists = self._phylogenetic_path_steps
         max_dist = None
         max_dist_taxa = None
-        for t1, t2 in self._all_distinct_mapped_taxa_pairs:
-            pat_dist = dists[t1][t2]
+        for (t1, t2), pat_dist in zip(self.distinct_taxon_pair_iter(), dists):
             if max_dist is None or pat_dist > max_dist:
                 max_dist = pat_dist
                 max_dist_taxa = (t1, t2)
@@ -494,9 +562,12 @@ class PhylogeneticDistanceMatrix(object):
         """
         Iterates over all distinct pairs of taxa in matrix.
         """
-        for t1, t2 in self._all_distinct_mapped_taxa_pairs:
-            if not filter_fn or (filter_fn(t1) and filter_fn(t2)):
-                yield t1, t2
+        for idx1, t1 in enumerate(self._mapped_taxa):
+            if filter_fn and not filter_fn(t1):
+                continue
+            for t2 in self._mapped_taxa[idx1+1:]:
+                if not filter_fn or filter_fn(t2):
+                    yield t1, t2
 
     def mean_pairwise_distance(self,
             filter_fn=None,
@@ -574,7 +645,10 @@ class PhylogeneticDistanceMatrix(object):
 
 
         """
-        comparison_regime = self.distinct_taxon_pair_iter(filter_fn=filter_fn)
+        if filter_fn is None:
+            comparison_regime = None
+        else:
+            comparison_regime = self.distinct_taxon_pair_iter(filter_fn=filter_fn)
         return self._calculate_mean_pairwise_distance(
                 comparison_regime=comparison_regime,
                 is_weighted_edge_distances=is_weighted_edge_distances,
@@ -669,7 +743,8 @@ class PhylogeneticDistanceMatrix(object):
             is_normalize_by_tree_size=False,
             is_skip_single_taxon_assemblages=False,
             null_model_type="taxa.label",
-            rng=None):
+            rng=None,
+            num_processes=1):
         r"""
         Returns the standardized effect size value for the MPD statistic under
         a null model under various community compositions.
@@ -704,6 +779,14 @@ class PhylogeneticDistanceMatrix(object):
         is_weighted_edge_distances: bool
             If ``True`` then edge lengths will be considered for distances.
             Otherwise, just the number of edges.
+        rng : ``random.Random`` object or |None|
+            Random number generator from which the seeds of the null model
+            replicates are drawn. If |None|, the global one is used. The
+            results only depend on the state of ``rng``, not on the number of
+            processes.
+        num_processes : int
+            Number of processes over which to divide the null model
+            replicates.
 
         Returns
         -------
@@ -737,27 +820,16 @@ class PhylogeneticDistanceMatrix(object):
             print(results)
 
         """
-        if assemblage_memberships is None:
-            assemblage_memberships = [ set(self._mapped_taxa) ]
-        comparison_regimes = []
-        for idx, assemblage_membership in enumerate(assemblage_memberships):
-            if len(assemblage_membership) == 1:
-                if is_skip_single_taxon_assemblages:
-                    continue
-                else:
-                    raise error.SingleTaxonAssemblageException("{}: {}".format(idx, assemblage_membership))
-            filter_fn = lambda taxon: taxon in assemblage_membership
-            comparison_regime = list(self.distinct_taxon_pair_iter(filter_fn=filter_fn))
-            comparison_regimes.append(comparison_regime)
-        results = self._calculate_standardized_effect_size(
-                statisticf_name="_calculate_mean_pairwise_distance",
+        return self._calculate_standardized_effect_size(
+                statistic="mpd",
+                assemblage_memberships=assemblage_memberships,
                 is_weighted_edge_distances=is_weighted_edge_distances,
                 is_normalize_by_tree_size=is_normalize_by_tree_size,
-                comparison_regimes=comparison_regimes,
+                is_skip_single_taxon_assemblages=is_skip_single_taxon_assemblages,
                 null_model_type=null_model_type,
                 num_randomization_replicates=num_randomization_replicates,
-                rng=rng)
-        return results
+                rng=rng,
+                num_processes=num_processes)
 
     def standardized_effect_size_mean_nearest_taxon_distance(self,
             assemblage_memberships,
@@ -766,7 +838,8 @@ class PhylogeneticDistanceMatrix(object):
             is_normalize_by_tree_size=False,
             is_skip_single_taxon_assemblages=False,
             null_model_type="taxa.label",
-            rng=None):
+            rng=None,
+            num_processes=1):
         r"""
         Returns the standardized effect size value for the MNTD statistic under
         a null model under various community compositions.
@@ -801,6 +874,14 @@ class PhylogeneticDistanceMatrix(object):
         is_weighted_edge_distances: bool
             If ``True`` then edge lengths will be considered for distances.
             Otherwise, just the number of edges.
+        rng : ``random.Random`` object or |None|
+            Random number generator from which the seeds of the null model
+            replicates are drawn. If |None|, the global one is used. The
+            results only depend on the state of ``rng``, not on the number of
+            processes.
+        num_processes : int
+            Number of processes over which to divide the null model
+            replicates.
 
         Returns
         -------
@@ -834,27 +915,16 @@ class PhylogeneticDistanceMatrix(object):
             print(results)
 
         """
-        if assemblage_memberships is None:
-            assemblage_memberships = [ set(self._mapped_taxa) ]
-        comparison_regimes = []
-        for idx, assemblage_membership in enumerate(assemblage_memberships):
-            if len(assemblage_membership) == 1:
-                if is_skip_single_taxon_assemblages:
-                    continue
-                else:
-                    raise error.SingleTaxonAssemblageException("{}: {}".format(idx, assemblage_membership))
-            filter_fn = lambda taxon: taxon in assemblage_membership
-            comparison_regime = self._get_taxon_to_all_other_taxa_comparisons(filter_fn=filter_fn)
-            comparison_regimes.append(comparison_regime)
-        results = self._calculate_standardized_effect_size(
-                statisticf_name="_calculate_mean_nearest_taxon_distance",
-                comparison_regimes=comparison_regimes,
+        return self._calculate_standardized_effect_size(
+                statistic="mntd",
+                assemblage_memberships=assemblage_memberships,
                 is_weighted_edge_distances=is_weighted_edge_distances,
                 is_normalize_by_tree_size=is_normalize_by_tree_size,
+                is_skip_single_taxon_assemblages=is_skip_single_taxon_assemblages,
                 null_model_type=null_model_type,
                 num_randomization_replicates=num_randomization_replicates,
-                rng=rng)
-        return results
+                rng=rng,
+                num_processes=num_processes)
 
     def shuffle_taxa(self,
             is_shuffle_phylogenetic_distances=True,
@@ -869,45 +939,21 @@ class PhylogeneticDistanceMatrix(object):
         reordered_taxa = list(self._mapped_taxa)
         rng.shuffle(reordered_taxa)
         current_to_shuffled_taxon_map = dict(zip(self._mapped_taxa, reordered_taxa))
+        source_indexes = [None] * len(self._mapped_taxa)
+        for taxon, shuffled_taxon in current_to_shuffled_taxon_map.items():
+            source_indexes[self._taxon_indexes[shuffled_taxon]] = self._taxon_indexes[taxon]
         to_shuffle = []
         if is_shuffle_phylogenetic_distances:
-            to_shuffle.append("_taxon_phylogenetic_distances")
-        if is_shuffle_phylogenetic_path_steps:
-            to_shuffle.append("_taxon_phylogenetic_path_steps")
-        if is_shuffle_mrca:
-            to_shuffle.append("_mrca")
+            to_shuffle.append("_phylogenetic_distances")
+        if is_shuffle_phylogenetic_path_steps and self._phylogenetic_path_steps:
+            to_shuffle.append("_phylogenetic_path_steps")
+        if is_shuffle_mrca and self._mrca_nodes:
+            to_shuffle.append("_mrca_node_indexes")
+            self._mrca_nodes[:len(source_indexes)] = [self._mrca_nodes[idx] for idx in source_indexes]
         for attr_name in to_shuffle:
-            src = getattr(self, attr_name)
-            dest = {}
-
-            ## 5m8.076s
-            # for t1, t2 in self._all_distinct_mapped_taxa_pairs:
-            #     x1 = current_to_shuffled_taxon_map[t1]
-            #     x2 = current_to_shuffled_taxon_map[t2]
-            #     d = src[t1][t2]
-            #     try:
-            #         dest[x1][x2] = d
-            #     except KeyError:
-            #         dest[x1] = {x2: d}
-            #         if t1 in src[t1]:
-            #             dest[x1][x1] = src[t1][t1]
-            #     try:
-            #         dest[x2][x1] = d
-            #     except KeyError:
-            #         dest[x2] = {x1: d}
-            #         if t2 in src[t2]:
-            #             dest[x2][x2] = src[t2][t2]
-            # setattr(self, attr_name, dest)
-
-            # 4m48.025s
-            for t1 in src:
-                x1 = current_to_shuffled_taxon_map[t1]
-                dest[x1] = {}
-                for t2 in src[t1]:
-                    x2 = current_to_shuffled_taxon_map[t2]
-                    dest[x1][x2] = src[t1][t2]
-            setattr(self, attr_name, dest)
-
+            setattr(self, attr_name, self._permuted_taxon_pair_values(
+                getattr(self, attr_name),
+                source_indexes))
         return current_to_shuffled_taxon_map
 
     def nj_tree(self,
@@ -918,7 +964,10 @@ class PhylogeneticDistanceMatrix(object):
         Returns an Neighbor-Joining (NJ) tree based on the distances in the matrix.
 
         Calculates and returns a tree under the Neighbor-Joining algorithm of
-        Saitou and Nei (1987) for the data in the matrix.
+        Saitou and Nei (1987) for the data in the matrix. The pairs of nodes
+        to join are searched for as in RapidNJ (Simonsen et al. 2008), which
+        skips the pairs that cannot have the smallest Q-value, and with NumPy,
+        if it is installed.
 
         Parameters
         ----------
@@ -963,107 +1012,23 @@ class PhylogeneticDistanceMatrix(object):
         for reconstructing phylogenetic trees. Molecular Biology and Evolution,
         4: 406-425.
 
+        Simonsen, M., Mailund, T. and Pedersen, C. N. S. (2008) Rapid
+        neighbour-joining. Algorithms in Bioinformatics (WABI 2008), Lecture
+        Notes in Computer Science, 5251: 113-122.
+
         """
 
-        if is_weighted_edge_distances:
-            original_dmatrix = self._taxon_phylogenetic_distances
+        if numpy is not None:
+            nj_joins = _nj_joins_numpy
         else:
-            original_dmatrix = self._taxon_phylogenetic_path_steps
-        if tree_factory is None:
-            tree_factory = dendropy.Tree
-        tree = tree_factory(taxon_namespace=self.taxon_namespace)
-        tree.is_rooted = False
-
-        # initialize node pool
-        node_pool = []
-        for t1 in self._mapped_taxa:
-            nd = tree.node_factory()
-            nd.taxon = t1
-            nd._nj_distances = {}
-            node_pool.append(nd)
-
-        # initialize factor
-        n = len(self._mapped_taxa)
-
-        # cache calculations
-        for nd1 in node_pool:
-            nd1._nj_xsub = 0.0
-            for nd2 in node_pool:
-                if nd1 is nd2:
-                    continue
-                d = original_dmatrix[nd1.taxon][nd2.taxon]
-                nd1._nj_distances[nd2] = d
-                nd1._nj_xsub += d
-
-        while n > 1:
-
-            # calculate the Q-matrix
-            min_q = None
-            nodes_to_join = None
-            for idx1, nd1 in enumerate(node_pool[:-1]):
-                for idx2, nd2 in enumerate(node_pool[idx1+1:]):
-                    v1 = (n - 2) * nd1._nj_distances[nd2]
-                    qvalue = v1 - nd1._nj_xsub - nd2._nj_xsub
-                    if min_q is None or qvalue < min_q:
-                        min_q = qvalue
-                        nodes_to_join = (nd1, nd2)
-
-            # create the new node
-            new_node = tree.node_factory()
-
-            # attach it to the tree
-            for node_to_join in nodes_to_join:
-                new_node.add_child(node_to_join)
-                node_pool.remove(node_to_join)
-
-            # calculate the distances for the new node
-            new_node._nj_distances = {}
-            new_node._nj_xsub = 0.0
-            for node in node_pool:
-                # actual node-to-node distances
-                v1 = 0.0
-                for node_to_join in nodes_to_join:
-                    v1 += node._nj_distances[node_to_join]
-                v3 = nodes_to_join[0]._nj_distances[nodes_to_join[1]]
-                dist = 0.5 * (v1 - v3)
-                new_node._nj_distances[node] = dist
-                node._nj_distances[new_node] = dist
-
-                # Adjust/recalculate the values needed for the Q-matrix
-                # calculations
-                new_node._nj_xsub += dist
-                node._nj_xsub += dist
-                for node_to_join in nodes_to_join:
-                    node._nj_xsub -= node_to_join._nj_distances[node]
-
-            # calculate the branch lengths
-            if n > 2:
-                v1 = 0.5 * nodes_to_join[0]._nj_distances[nodes_to_join[1]]
-                v4  = 1.0/(2*(n-2)) * (nodes_to_join[0]._nj_xsub - nodes_to_join[1]._nj_xsub)
-                delta_f = v1 + v4
-                delta_g = nodes_to_join[0]._nj_distances[nodes_to_join[1]] - delta_f
-                nodes_to_join[0].edge.length = delta_f
-                nodes_to_join[1].edge.length = delta_g
-            else:
-                d = nodes_to_join[0]._nj_distances[nodes_to_join[1]]
-                nodes_to_join[0].edge.length = d / 2
-                nodes_to_join[1].edge.length = d / 2
-
-            # clean up
-            for node_to_join in nodes_to_join:
-                del node_to_join._nj_distances
-                del node_to_join._nj_xsub
-
-            # add the new node to the pool of nodes
-            node_pool.append(new_node)
-
-            # adjust count
-            n -= 1
-
-        tree.seed_node = node_pool[0]
-        del tree.seed_node._nj_distances
-        del tree.seed_node._nj_xsub
-        return tree
+            nj_joins = _nj_joins
+        joins = nj_joins(
+                self._edge_distances(is_weighted_edge_distances),
+                len(self._mapped_taxa))
+        return self._tree_from_joins(
+                joins=joins,
+                is_rooted=False,
+                tree_factory=tree_factory)
 
     def upgma_tree(self,
             is_weighted_edge_distances=True,
@@ -1071,7 +1036,8 @@ class PhylogeneticDistanceMatrix(object):
             ):
         """
         Returns an Unweighted Pair Group Method with Arithmetic Mean (UPGMA) tree
-        based on the distances in the matrix.
+        based on the distances in the matrix. The distances are handled with
+        NumPy, if it is installed.
 
         Parameters
         ----------
@@ -1111,66 +1077,45 @@ class PhylogeneticDistanceMatrix(object):
 
         """
 
-        if is_weighted_edge_distances:
-            original_dmatrix = self._taxon_phylogenetic_distances
+        if numpy is not None:
+            upgma_joins = _upgma_joins_numpy
         else:
-            original_dmatrix = self._taxon_phylogenetic_path_steps
+            upgma_joins = _upgma_joins
+        joins = upgma_joins(
+                self._edge_distances(is_weighted_edge_distances),
+                len(self._mapped_taxa))
+        return self._tree_from_joins(
+                joins=joins,
+                is_rooted=True,
+                tree_factory=tree_factory)
+
+    def _edge_distances(self, is_weighted_edge_distances):
+        # Condensed distances between the taxa (as floats, even if they are
+        # numbers of edges) for the tree-building methods.
+        if is_weighted_edge_distances:
+            return self._phylogenetic_distances
+        return array.array("d", self._phylogenetic_path_steps)
+
+    def _tree_from_joins(self, joins, is_rooted, tree_factory=None):
+        # Builds the tree given by ``joins``, as returned by
+        # ``_nj_joins()`` or ``_upgma_joins()``.
         if tree_factory is None:
             tree_factory = dendropy.Tree
         tree = tree_factory(taxon_namespace=self.taxon_namespace)
-        tree.is_rooted = True
-        node_pool = []
-        for t1 in self._mapped_taxa:
+        tree.is_rooted = is_rooted
+        nodes = []
+        for taxon in self._mapped_taxa:
             nd = tree.node_factory()
-            nd.taxon = t1
-            nd._upgma_cluster = set([nd])
-            nd._upgma_distance_from_tip = 0.0
-            nd._upgma_distances = {}
-            node_pool.append(nd)
-        for idx1, nd1 in enumerate(node_pool[:-1]):
-            for idx2, nd2 in enumerate(node_pool[idx1+1:]):
-                d = original_dmatrix[nd1.taxon][nd2.taxon]
-                nd1._upgma_distances[nd2] = d
-                nd2._upgma_distances[nd1] = d
-        while len(node_pool) > 1:
-            min_distance = None
-            nodes_to_join = None
-            for idx1, nd1 in enumerate(node_pool[:-1]):
-                for idx2, nd2 in enumerate(node_pool[idx1+1:]):
-                    d = nd1._upgma_distances[nd2]
-                    if min_distance is None or d < min_distance:
-                        nodes_to_join = (nd1, nd2)
-                        min_distance = d
+            nd.taxon = taxon
+            nodes.append(nd)
+        for idx1, idx2, length1, length2 in joins:
             new_node = tree.node_factory()
-            new_node._upgma_cluster = set()
-            new_node._upgma_distances = {}
-            elen = min_distance / 2.0
-            for node_to_join in nodes_to_join:
-                new_node.add_child(node_to_join)
-                new_node._upgma_cluster.update(node_to_join._upgma_cluster)
-                node_to_join.edge.length = elen - node_to_join._upgma_distance_from_tip
-                node_pool.remove(node_to_join)
-            new_node._upgma_distance_from_tip = nodes_to_join[0].edge.length + nodes_to_join[0]._upgma_distance_from_tip
-            for idx1, nd1 in enumerate(node_pool):
-                d1 = 0.0
-                count = 0.0
-                for node_to_join in nodes_to_join:
-                    d2 = node_to_join._upgma_distances[nd1]
-                    xc = len(node_to_join._upgma_cluster)
-                    d1 += (d2 * xc)
-                    count += xc
-                d = d1 / count
-                nd1._upgma_distances[new_node] = d
-                new_node._upgma_distances[nd1] = d
-            for node_to_join in nodes_to_join:
-                del node_to_join._upgma_cluster
-                del node_to_join._upgma_distance_from_tip
-                del node_to_join._upgma_distances
-            node_pool.append(new_node)
-        tree.seed_node = node_pool[0]
-        del tree.seed_node._upgma_cluster
-        del tree.seed_node._upgma_distance_from_tip
-        del tree.seed_node._upgma_distances
+            new_node.add_child(nodes[idx1])
+            new_node.add_child(nodes[idx2])
+            nodes[idx1].edge.length = length1
+            nodes[idx2].edge.length = length2
+            nodes.append(new_node)
+        tree.seed_node = nodes[-1]
         return tree
 
     def as_data_table(self, is_weighted_edge_distances=True):
@@ -1226,7 +1171,10 @@ class PhylogeneticDistanceMatrix(object):
             if is_first_column_row_names:
                 row.append(label_transform_fn(taxon1.label))
             for taxon2 in self._mapped_taxa:
-                d = dmatrix[taxon1][taxon2] / normalization_factor
+                if taxon1 is taxon2:
+                    d = 0.0
+                else:
+                    d = dmatrix[self._taxon_pair_index(taxon1, taxon2)] / normalization_factor
                 row.append("{}".format(d))
             writer.writerow(row)
             # dest.write(delimiter.join(row))
@@ -1285,13 +1233,13 @@ class PhylogeneticDistanceMatrix(object):
             is_weighted_edge_distances,
             is_normalize_by_tree_size):
         if is_weighted_edge_distances:
-            dmatrix = self._taxon_phylogenetic_distances
+            dmatrix = self._phylogenetic_distances
             if is_normalize_by_tree_size:
                 normalization_factor = self._tree_length
             else:
                 normalization_factor = 1.0
         else:
-            dmatrix = self._taxon_phylogenetic_path_steps
+            dmatrix = self._phylogenetic_path_steps
             if is_normalize_by_tree_size:
                 normalization_factor = float(self._num_edges)
             else:
@@ -1305,9 +1253,12 @@ class PhylogeneticDistanceMatrix(object):
         dmatrix, normalization_factor = self._get_distance_matrix_and_normalization_factor(
                 is_weighted_edge_distances=is_weighted_edge_distances,
                 is_normalize_by_tree_size=is_normalize_by_tree_size,)
-        distances = []
-        for taxon1, taxon2 in comparison_regime:
-            distances.append(dmatrix[taxon1][taxon2])
+        if comparison_regime is None:
+            distances = dmatrix
+        else:
+            distances = []
+            for taxon1, taxon2 in comparison_regime:
+                distances.append(dmatrix[self._taxon_pair_index(taxon1, taxon2)])
         if distances:
             return (sum(distances) / normalization_factor) / (len(distances) * 1.0)
         else:
@@ -1324,9 +1275,9 @@ class PhylogeneticDistanceMatrix(object):
         for taxon1 in comparison_regime:
             # subdistances = [dmatrix[taxon1][taxon2] for taxon2 in comparison_regime[taxon1]]
             # distances.append(min(subdistances))
-            min_distance = dmatrix[taxon1][comparison_regime[taxon1][0]]
+            min_distance = dmatrix[self._taxon_pair_index(taxon1, comparison_regime[taxon1][0])]
             for taxon2 in comparison_regime[taxon1][1:]:
-                d = dmatrix[taxon1][taxon2]
+                d = dmatrix[self._taxon_pair_index(taxon1, taxon2)]
                 if d < min_distance:
                     min_distance = d
             distances.append(min_distance)
@@ -1336,46 +1287,67 @@ class PhylogeneticDistanceMatrix(object):
             raise error.NullAssemblageException("No taxa in assemblage")
 
     def _calculate_standardized_effect_size(self,
-            statisticf_name,
-            comparison_regimes,
+            statistic,
+            assemblage_memberships,
             is_weighted_edge_distances,
             is_normalize_by_tree_size,
+            is_skip_single_taxon_assemblages=False,
             null_model_type="taxa.label",
             num_randomization_replicates=1000,
-            rng=None):
+            rng=None,
+            num_processes=1):
         result_type = collections.namedtuple("PhylogeneticCommunityStandardizedEffectSizeStatisticCalculationResult",
                 ["obs", "null_model_mean", "null_model_sd", "z", "rank", "p",])
-        statisticf_kwargs={
-            "is_weighted_edge_distances": is_weighted_edge_distances,
-            "is_normalize_by_tree_size": is_normalize_by_tree_size
-        }
-        observed_stat_values = {}
-        null_model_stat_values = {}
-        null_model_matrix = self.clone()
-        assert null_model_matrix == self
-        if is_weighted_edge_distances:
-            is_shuffle_phylogenetic_distances = True
-            is_shuffle_phylogenetic_path_steps = False
+        if assemblage_memberships is None:
+            assemblage_memberships = [ set(self._mapped_taxa) ]
+        assemblage_masks = []
+        for idx, assemblage_membership in enumerate(assemblage_memberships):
+            if len(assemblage_membership) == 1:
+                if is_skip_single_taxon_assemblages:
+                    continue
+                else:
+                    raise error.SingleTaxonAssemblageException("{}: {}".format(idx, assemblage_membership))
+            assemblage_membership = set(assemblage_membership)
+            assemblage_masks.append([taxon in assemblage_membership for taxon in self._mapped_taxa])
+        dmatrix, normalization_factor = self._get_distance_matrix_and_normalization_factor(
+                is_weighted_edge_distances=is_weighted_edge_distances,
+                is_normalize_by_tree_size=is_normalize_by_tree_size,)
+        calculator_args = (
+                dmatrix,
+                len(self._mapped_taxa),
+                assemblage_masks,
+                statistic,
+                normalization_factor)
+        calculator = _AssemblageStatisticCalculator(*calculator_args)
+        observed_stat_values = [values[0] for values in calculator.values([list(range(len(self._mapped_taxa)))])]
+        # the replicates are divided into batches of a fixed size, each with
+        # its own random number generator seeded from ``rng``, so that the
+        # results do not depend on the number of processes
+        if rng is None:
+            rng = GLOBAL_RNG
+        batches = []
+        for start in range(0, num_randomization_replicates, _NULL_MODEL_BATCH_SIZE):
+            batches.append((
+                rng.getrandbits(32),
+                min(_NULL_MODEL_BATCH_SIZE, num_randomization_replicates - start)))
+        if num_processes <= 1 or len(batches) < 2:
+            batch_stat_values = [calculator.null_model_values(seed, num_replicates) for seed, num_replicates in batches]
         else:
-            is_shuffle_phylogenetic_distances = False
-            is_shuffle_phylogenetic_path_steps = True
-        for rep_idx in range(num_randomization_replicates):
-            null_model_matrix.shuffle_taxa(
-                    is_shuffle_phylogenetic_distances=is_shuffle_phylogenetic_distances,
-                    is_shuffle_phylogenetic_path_steps=is_shuffle_phylogenetic_distances,
-                    is_shuffle_mrca=False,
-                    rng=rng)
-            for comparison_regime_idx, comparison_regime in enumerate(comparison_regimes):
-                statisticf_kwargs["comparison_regime"] = comparison_regime
-                if rep_idx == 0:
-                    observed_stat_values[comparison_regime_idx] = getattr(self, statisticf_name)(**statisticf_kwargs)
-                    null_model_stat_values[comparison_regime_idx] = []
-                stat_value = getattr(null_model_matrix, statisticf_name)(**statisticf_kwargs)
-                null_model_stat_values[comparison_regime_idx].append(stat_value)
+            pool = multiprocessing.Pool(
+                    processes=num_processes,
+                    initializer=_init_null_model_worker,
+                    initargs=calculator_args)
+            try:
+                batch_stat_values = pool.starmap(_null_model_values_in_worker, batches)
+            finally:
+                pool.close()
+                pool.join()
+        null_model_stat_values = [[] for assemblage_mask in assemblage_masks]
+        for assemblage_stat_values in batch_stat_values:
+            for stat_values, batch_values in zip(null_model_stat_values, assemblage_stat_values):
+                stat_values.extend(batch_values)
         results = []
-        for comparison_regime_idx, comparison_regime in enumerate(comparison_regimes):
-            obs_value = observed_stat_values[comparison_regime_idx]
-            stat_values = null_model_stat_values[comparison_regime_idx]
+        for obs_value, stat_values in zip(observed_stat_values, null_model_stat_values):
             null_model_mean, null_model_var = statistics.mean_and_sample_variance(stat_values)
             rank = statistics.rank(
                     value_to_be_ranked=obs_value,
@@ -1599,3 +1571,828 @@ class NodeDistanceMatrix(object):
                 normalization_factor = 1.0
         return dmatrix, normalization_factor
 
+
+class TreeDistanceOracle(object):
+    """
+    Answers most-recent common ancestor (MRCA), patristic distance and path
+    edge count queries between any two nodes (or taxa) of a tree in
+    constant time, without calculating the distances between all pairs of
+    taxa as |PhylogeneticDistanceMatrix| does.
+
+    The nodes are indexed in preorder, so that the MRCA of two distinct
+    nodes is the parent of the shallowest node in the preorder range from
+    just after the first to the second of them. The shallowest node of any
+    range is found with two look-ups in a sparse table of the shallowest
+    node of every range of a power-of-two length, which takes O(n log n)
+    time and memory to build. Distances are then given by the distances
+    (and numbers of edges) of the nodes and their MRCA from the root.
+
+    As with |PhylogeneticDistanceMatrix|, this is a "snapshot" of the tree
+    when created: subsequent changes to the tree will not be reflected.
+
+    Examples
+    --------
+
+    ::
+
+        import dendropy
+        tree = dendropy.Tree.get(path="tree.nex",
+                schema="nexus")
+        lca_index = tree.lca_index()
+        t1 = tree.taxon_namespace.get_taxon("A")
+        t2 = tree.taxon_namespace.get_taxon("B")
+        print(lca_index.mrca(t1, t2))
+        print(lca_index.patristic_distance(t1, t2))
+
+        # many pairs at a time
+        taxa = list(tree.taxon_namespace)
+        taxon_pairs = [(taxa[0], t) for t in taxa[1:]]
+        distances = lca_index.patristic_distances(taxon_pairs)
+
+    """
+
+    @classmethod
+    def from_tree(cls, tree):
+        """
+        Creates and returns a |TreeDistanceOracle| based on the given tree.
+
+        Note that syntactically you may prefer to use::
+
+            lca_index = tree.lca_index()
+
+        """
+        oracle = cls()
+        oracle.compile_from_tree(tree=tree)
+        return oracle
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._tree_length = None
+        self._num_edges = None
+        # Nodes, in preorder, and the index of each node (and of the taxon
+        # associated with it, if any).
+        self._nodes = []
+        self._node_indexes = {}
+        self._parent_node_indexes = array.array("i")
+        self._root_distances = array.array("d")
+        self._root_path_steps = array.array("i")
+        # ``self._sparse_table[k][i]`` is the key of the shallowest node
+        # of the nodes indexed ``i``, ..., ``i + 2**k - 1``, the key of the
+        # node indexed ``i`` being ``depth * num_nodes + i``.
+        self._sparse_table = []
+
+    def compile_from_tree(self, tree):
+        """
+        Indexes the nodes of ``tree``.
+        """
+        self.clear()
+        self._tree_length = 0.0
+        self._num_edges = 0
+        nodes = self._nodes
+        node_indexes = self._node_indexes
+        parent_node_indexes = self._parent_node_indexes
+        root_distances = self._root_distances
+        root_path_steps = self._root_path_steps
+        for node in tree.preorder_node_iter():
+            try:
+                self._tree_length += node.edge.length
+            except TypeError: # None for edge length
+                pass
+            self._num_edges += 1
+            node_index = len(nodes)
+            nodes.append(node)
+            node_indexes[node] = node_index
+            if node.taxon is not None:
+                node_indexes[node.taxon] = node_index
+            if node is tree.seed_node:
+                parent_node_indexes.append(-1)
+                root_distances.append(0.0)
+                root_path_steps.append(0)
+            else:
+                parent_node_index = node_indexes[node._parent_node]
+                parent_node_indexes.append(parent_node_index)
+                edge_length = node.edge.length
+                if edge_length is None:
+                    edge_length = 0.0
+                root_distances.append(root_distances[parent_node_index] + edge_length)
+                root_path_steps.append(root_path_steps[parent_node_index] + 1)
+        num_nodes = len(nodes)
+        keys = array.array("q", [steps * num_nodes + idx for idx, steps in enumerate(root_path_steps)])
+        self._sparse_table.append(keys)
+        span = 1
+        while 2 * span <= num_nodes:
+            keys = array.array("q", map(min, keys[:len(keys)-span], keys[span:]))
+            self._sparse_table.append(keys)
+            span *= 2
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def _mrca_index(self, idx1, idx2):
+        if idx1 == idx2:
+            return idx1
+        if idx1 > idx2:
+            idx1, idx2 = idx2, idx1
+        # shallowest node in nodes idx1+1, ..., idx2
+        span = idx2 - idx1
+        level = span.bit_length() - 1
+        keys = self._sparse_table[level]
+        key = min(keys[idx1 + 1], keys[idx2 + 1 - (1 << level)])
+        return self._parent_node_indexes[key % len(self._nodes)]
+
+    def mrca(self, node1, node2):
+        """
+        Returns the MRCA of two nodes, or of the nodes associated with two
+        taxa.
+        """
+        return self._nodes[self._mrca_index(self._node_indexes[node1], self._node_indexes[node2])]
+
+    def distance(self,
+            node1,
+            node2,
+            is_weighted_edge_distances=True,
+            is_normalize_by_tree_size=False):
+        """
+        Returns distance between two nodes, or between the nodes associated
+        with two taxa.
+        """
+        if is_weighted_edge_distances:
+            return self.patristic_distance(node1, node2, is_normalize_by_tree_size=is_normalize_by_tree_size)
+        else:
+            return self.path_edge_count(node1, node2, is_normalize_by_tree_size=is_normalize_by_tree_size)
+
+    def patristic_distance(self, node1, node2, is_normalize_by_tree_size=False):
+        """
+        Returns patristic distance between two nodes, or between the nodes
+        associated with two taxa.
+        """
+        idx1 = self._node_indexes[node1]
+        idx2 = self._node_indexes[node2]
+        root_distances = self._root_distances
+        d = root_distances[idx1] + root_distances[idx2] - 2 * root_distances[self._mrca_index(idx1, idx2)]
+        if is_normalize_by_tree_size:
+            return d / self._tree_length
+        else:
+            return d
+
+    def path_edge_count(self, node1, node2, is_normalize_by_tree_size=False):
+        """
+        Returns the number of edges between two nodes, or between the nodes
+        associated with two taxa.
+        """
+        idx1 = self._node_indexes[node1]
+        idx2 = self._node_indexes[node2]
+        root_path_steps = self._root_path_steps
+        d = root_path_steps[idx1] + root_path_steps[idx2] - 2 * root_path_steps[self._mrca_index(idx1, idx2)]
+        if is_normalize_by_tree_size:
+            return float(d) / self._num_edges
+        else:
+            return d
+
+    def mrcas(self, pairs):
+        """
+        Returns a list of the MRCAs of each of the pairs of nodes (or taxa) in
+        ``pairs``.
+        """
+        # As ``mrca()``, with ``_mrca_index()`` inlined.
+        node_indexes = self._node_indexes
+        parent_node_indexes = self._parent_node_indexes
+        sparse_table = self._sparse_table
+        nodes = self._nodes
+        num_nodes = len(nodes)
+        mrcas = []
+        for node1, node2 in pairs:
+            idx1 = node_indexes[node1]
+            idx2 = node_indexes[node2]
+            if idx1 == idx2:
+                mrcas.append(nodes[idx1])
+                continue
+            if idx1 > idx2:
+                idx1, idx2 = idx2, idx1
+            level = (idx2 - idx1).bit_length() - 1
+            keys = sparse_table[level]
+            key = min(keys[idx1 + 1], keys[idx2 + 1 - (1 << level)])
+            mrcas.append(nodes[parent_node_indexes[key % num_nodes]])
+        return mrcas
+
+    def patristic_distances(self, pairs, is_normalize_by_tree_size=False):
+        """
+        Returns an array of the patristic distances between each of the pairs
+        of nodes (or taxa) in ``pairs``.
+        """
+        distances = self._distances(pairs, self._root_distances, "d")
+        if is_normalize_by_tree_size:
+            distances = array.array("d", [d / self._tree_length for d in distances])
+        return distances
+
+    def path_edge_counts(self, pairs, is_normalize_by_tree_size=False):
+        """
+        Returns an array of the number of edges between each of the pairs of
+        nodes (or taxa) in ``pairs``.
+        """
+        distances = self._distances(pairs, self._root_path_steps, "i")
+        if is_normalize_by_tree_size:
+            distances = array.array("d", [float(d) / self._num_edges for d in distances])
+        return distances
+
+    def _distances(self, pairs, root_distances, typecode):
+        # As ``patristic_distance()``, with ``_mrca_index()`` inlined.
+        node_indexes = self._node_indexes
+        parent_node_indexes = self._parent_node_indexes
+        sparse_table = self._sparse_table
+        num_nodes = len(self._nodes)
+        distances = array.array(typecode)
+        for node1, node2 in pairs:
+            idx1 = node_indexes[node1]
+            idx2 = node_indexes[node2]
+            if idx1 == idx2:
+                distances.append(0)
+                continue
+            if idx1 > idx2:
+                idx1, idx2 = idx2, idx1
+            level = (idx2 - idx1).bit_length() - 1
+            keys = sparse_table[level]
+            key = min(keys[idx1 + 1], keys[idx2 + 1 - (1 << level)])
+            distances.append(root_distances[idx1] + root_distances[idx2]
+                    - 2 * root_distances[parent_node_indexes[key % num_nodes]])
+        return distances
+
+##############################################################################
+## Neighbor-Joining and UPGMA
+
+# The functions below return the joins made in building a tree from the
+# condensed (upper triangle, row by row) ``distances`` between ``num_taxa``
+# taxa, as a list of tuples, (idx1, idx2, length1, length2), of the indexes of
+# the two nodes joined and the lengths of their edges to their new parent
+# node, where the taxa are indexed 0 to ``num_taxa-1`` and the new node of
+# the k-th join is indexed ``num_taxa+k``.
+#
+# The distances are held in a matrix of slots, with the node made by a join
+# taking over the slot of the first of the two nodes joined. The "pool" is
+# the list of the slots of the nodes that remain to be joined, with the taxa
+# first, in the order of the matrix, and then the new nodes in the order in
+# which they were made; ties between pairs go to the first pair in the order
+# of the pool, and the sums and Q-values are added up in this order, so that
+# the trees are exactly those of the plain O(n^3) algorithms.
+#
+# Each slot caches the smallest distance to the nodes before it in the pool.
+# For UPGMA, the pair to join is the smallest of these. For NJ, they bound
+# the Q-values of the pairs of each slot from below, and each slot also keeps
+# the nodes before it sorted by their distance to it (which does not change
+# while the two are in the pool), so that the search for the smallest
+# Q-value can skip the slots, and stop going down the list of a slot, once
+# the bound is greater than the best Q-value found (as in RapidNJ; Simonsen,
+# Mailund and Pedersen, 2008).
+
+def _condensed_row_offsets(num_taxa):
+    return [(i * (2 * num_taxa - i - 1)) // 2 - i - 1 for i in range(num_taxa)]
+
+def _nj_joins(distances, num_taxa):
+    d = array.array("d", distances)
+    row_offsets = _condensed_row_offsets(num_taxa)
+    def _index(i, j):
+        if i < j:
+            return row_offsets[i] + j
+        return row_offsets[j] + i
+    pool = list(range(num_taxa))
+    positions = list(range(num_taxa))
+    xsub = [0.0] * num_taxa
+    for i in range(num_taxa):
+        for j in range(num_taxa):
+            if i != j:
+                xsub[i] += d[_index(i, j)]
+    # The lists of the slots hold the nodes (indexed as in the joins) rather
+    # than their slots, as these are taken over by the new nodes.
+    node_indexes = list(range(num_taxa))
+    node_slots = list(range(num_taxa)) + [None] * (num_taxa - 1)
+    is_live_node = [True] * num_taxa + [False] * (num_taxa - 1)
+    sorted_nodes = [sorted(range(i), key=lambda j: d[row_offsets[j] + i]) for i in range(num_taxa)]
+    starts = [0] * num_taxa
+    row_min_distances = [float("inf")] + [d[_index(i, sorted_nodes[i][0])] for i in range(1, num_taxa)]
+    compacted_pool_size = num_taxa
+    def _row_min_q(pos, c, max_xsub, best):
+        # The smallest Q-value of the slot at ``pos`` with the nodes in its
+        # list, and its positions in the pool (the first pair in the order
+        # of the pool, in case of ties), if it is no greater than ``best``.
+        i = pool[pos]
+        xsub_i = xsub[i]
+        nodes = sorted_nodes[i]
+        for k in range(starts[i], len(nodes)):
+            if not is_live_node[nodes[k]]:
+                continue
+            j = node_slots[nodes[k]]
+            dij = d[_index(i, j)]
+            if best is not None and (c * dij - max_xsub) - xsub_i > best[0]:
+                # and so are all the nodes further down the list
+                break
+            q = (c * dij - xsub[j]) - xsub_i
+            if best is None or q <= best[0]:
+                candidate = (q, positions[j], pos)
+                if best is None or candidate < best:
+                    best = candidate
+        return best
+    joins = []
+    while len(pool) > 1:
+        n = len(pool)
+        if n == 2:
+            pos1, pos2 = 0, 1
+        else:
+            c = n - 2
+            for pos, i in enumerate(pool):
+                positions[i] = pos
+            bounds = []
+            max_xsubs = []
+            max_xsub = -float("inf")
+            for i in pool:
+                bounds.append((c * row_min_distances[i] - max_xsub) - xsub[i])
+                max_xsubs.append(max_xsub)
+                max_xsub = max(max_xsub, xsub[i])
+            first = min(range(n), key=bounds.__getitem__)
+            best = _row_min_q(first, c, max_xsubs[first], None)
+            candidates = [pos for pos in range(n) if bounds[pos] <= best[0] and pos != first]
+            for pos in sorted(candidates, key=bounds.__getitem__):
+                if bounds[pos] > best[0]:
+                    break
+                best = _row_min_q(pos, c, max_xsubs[pos], best)
+            pos1, pos2 = best[1], best[2]
+        a = pool[pos1]
+        b = pool[pos2]
+        dab = d[_index(a, b)]
+        if n > 2:
+            length1 = 0.5 * dab + 1.0/(2*(n-2)) * (xsub[a] - xsub[b])
+            length2 = dab - length1
+        else:
+            length1 = dab / 2
+            length2 = dab / 2
+        joins.append((node_indexes[a], node_indexes[b], length1, length2))
+        is_live_node[node_indexes[a]] = False
+        is_live_node[node_indexes[b]] = False
+        del pool[pos2]
+        del pool[pos1]
+        new_xsub = 0.0
+        for s in pool:
+            ksa = _index(s, a)
+            dsa = d[ksa]
+            dsb = d[_index(s, b)]
+            dist = 0.5 * ((0.0 + dsa + dsb) - dab)
+            new_xsub += dist
+            xsub[s] = ((xsub[s] + dist) - dsa) - dsb
+            d[ksa] = dist
+        # the lists of the slots that started with one of the nodes joined
+        for i in pool:
+            nodes = sorted_nodes[i]
+            k = starts[i]
+            if k < len(nodes) and not is_live_node[nodes[k]]:
+                while k < len(nodes) and not is_live_node[nodes[k]]:
+                    k += 1
+                starts[i] = k
+                if k < len(nodes):
+                    row_min_distances[i] = d[_index(i, node_slots[nodes[k]])]
+                else:
+                    row_min_distances[i] = float("inf")
+        # the new node
+        new_node = num_taxa + len(joins) - 1
+        node_indexes[a] = new_node
+        node_slots[new_node] = a
+        is_live_node[new_node] = True
+        xsub[a] = new_xsub
+        slots = sorted(pool, key=lambda s: d[_index(s, a)])
+        sorted_nodes[a] = [node_indexes[s] for s in slots]
+        starts[a] = 0
+        if slots:
+            row_min_distances[a] = d[_index(slots[0], a)]
+        else:
+            row_min_distances[a] = float("inf")
+        pool.append(a)
+        # dropping the nodes joined from the lists every time the pool halves
+        if 2 * len(pool) < compacted_pool_size:
+            for i in pool:
+                sorted_nodes[i] = [node for node in sorted_nodes[i][starts[i]:] if is_live_node[node]]
+                starts[i] = 0
+            compacted_pool_size = len(pool)
+    return joins
+
+def _upgma_joins(distances, num_taxa):
+    d = array.array("d", distances)
+    row_offsets = _condensed_row_offsets(num_taxa)
+    def _index(i, j):
+        if i < j:
+            return row_offsets[i] + j
+        return row_offsets[j] + i
+    pool = list(range(num_taxa))
+    node_indexes = list(range(num_taxa))
+    cluster_sizes = [1] * num_taxa
+    heights = [0.0] * num_taxa
+    row_min_distances = [float("inf")] * num_taxa
+    row_min_slots = [-1] * num_taxa
+    for i in range(num_taxa):
+        for j in range(i):
+            dij = d[_index(i, j)]
+            if dij < row_min_distances[i]:
+                row_min_distances[i] = dij
+                row_min_slots[i] = j
+    joins = []
+    while len(pool) > 1:
+        min_distance = min([row_min_distances[i] for i in pool])
+        positions = dict((i, pos) for pos, i in enumerate(pool))
+        pos1, pos2 = min((positions[row_min_slots[i]], pos)
+                for pos, i in enumerate(pool)
+                if row_min_distances[i] == min_distance)
+        a = pool[pos1]
+        b = pool[pos2]
+        edge_length = min_distance / 2.0
+        length1 = edge_length - heights[a]
+        length2 = edge_length - heights[b]
+        joins.append((node_indexes[a], node_indexes[b], length1, length2))
+        del pool[pos2]
+        del pool[pos1]
+        size_a = cluster_sizes[a]
+        size_b = cluster_sizes[b]
+        new_row_min_distance = float("inf")
+        new_row_min_slot = -1
+        for s in pool:
+            ksa = _index(s, a)
+            dist = (0.0 + d[ksa] * size_a + d[_index(s, b)] * size_b) / (0.0 + size_a + size_b)
+            d[ksa] = dist
+            if dist < new_row_min_distance:
+                new_row_min_distance = dist
+                new_row_min_slot = s
+        for pos, i in enumerate(pool):
+            if row_min_slots[i] == a or row_min_slots[i] == b:
+                row_min_distances[i] = float("inf")
+                row_min_slots[i] = -1
+                for j in pool[:pos]:
+                    dij = d[_index(i, j)]
+                    if dij < row_min_distances[i]:
+                        row_min_distances[i] = dij
+                        row_min_slots[i] = j
+        node_indexes[a] = num_taxa + len(joins) - 1
+        cluster_sizes[a] = size_a + size_b
+        heights[a] = length1 + heights[a]
+        row_min_distances[a] = new_row_min_distance
+        row_min_slots[a] = new_row_min_slot
+        pool.append(a)
+    return joins
+
+def _square_distance_matrix(distances, num_taxa):
+    condensed = numpy.asarray(distances, dtype=numpy.float64)
+    d = numpy.zeros((num_taxa, num_taxa))
+    start = 0
+    for i in range(num_taxa - 1):
+        row = condensed[start:start + num_taxa - i - 1]
+        d[i, i+1:] = row
+        d[i+1:, i] = row
+        start += num_taxa - i - 1
+    return d
+
+def _row_minimums(d, pool, positions):
+    # Smallest distance to, and slot of, the nodes before each of the
+    # ``positions`` in the pool (the first of them, in case of ties).
+    min_distances = numpy.empty(len(positions))
+    min_slots = numpy.empty(len(positions), dtype=numpy.intp)
+    for k, pos in enumerate(positions):
+        if pos == 0:
+            min_distances[k] = numpy.inf
+            min_slots[k] = -1
+        else:
+            row = d[pool[pos], pool[:pos]]
+            min_pos = int(row.argmin())
+            min_distances[k] = row[min_pos]
+            min_slots[k] = pool[min_pos]
+    return min_distances, min_slots
+
+def _update_row_minimums(d, pool, row_min_distances, row_min_slots, a, b):
+    pool_row_min_slots = row_min_slots[pool]
+    positions = numpy.flatnonzero((pool_row_min_slots == a) | (pool_row_min_slots == b))
+    if len(positions):
+        slots = pool[positions]
+        row_min_distances[slots], row_min_slots[slots] = _row_minimums(d, pool, positions)
+
+# Number of entries of the sorted lists of each slot, and number of slots,
+# whose Q-values are calculated at once.
+_NJ_CHUNK_SIZE = 16
+_NJ_BLOCK_SIZE = 64
+
+def _nj_joins_numpy(distances, num_taxa):
+    # As ``_nj_joins()``, over a square matrix, and with the Q-values of
+    # blocks of slots calculated at once.
+    d = _square_distance_matrix(distances, num_taxa)
+    xsub = numpy.zeros(num_taxa)
+    if num_taxa > 1:
+        for i in range(num_taxa):
+            # (summed in order, leaving out the distance to itself)
+            xsub[i] = numpy.add.accumulate(numpy.delete(d[i], i))[-1]
+    pool = numpy.arange(num_taxa)
+    positions = numpy.zeros(num_taxa, dtype=numpy.intp)
+    # Nodes are indexed as in the joins, with the last index standing for no
+    # node, and the lists of the slots padded with it.
+    no_node = 2 * num_taxa - 1
+    node_indexes = numpy.arange(num_taxa)
+    node_slots = numpy.zeros(no_node + 1, dtype=numpy.intp)
+    node_slots[:num_taxa] = numpy.arange(num_taxa)
+    is_live_node = numpy.zeros(no_node + 1, dtype=bool)
+    is_live_node[:num_taxa] = True
+    sorted_nodes = numpy.full((num_taxa, num_taxa + _NJ_CHUNK_SIZE), no_node, dtype=numpy.int32)
+    for i in range(1, num_taxa):
+        sorted_nodes[i, :i] = d[i, :i].argsort()
+    starts = numpy.zeros(num_taxa, dtype=numpy.intp)
+    stops = numpy.arange(num_taxa)
+    row_min_distances = numpy.full(num_taxa, numpy.inf)
+    row_min_distances[1:] = [d[i, sorted_nodes[i, 0]] for i in range(1, num_taxa)]
+    chunk = numpy.arange(_NJ_CHUNK_SIZE)
+    compacted_pool_size = num_taxa
+
+    def _skip_dead_nodes(slots):
+        # Moves the start of the lists of ``slots`` to their first live node.
+        while len(slots):
+            is_live = is_live_node[sorted_nodes[slots[:, None], starts[slots, None] + chunk]]
+            has_live = is_live.any(axis=1)
+            starts[slots] += numpy.where(has_live, is_live.argmax(axis=1), _NJ_CHUNK_SIZE)
+            slots = slots[~has_live & (starts[slots] < stops[slots])]
+
+    def _rows_min_q(row_positions, c, max_xsub, best):
+        # The smallest Q-value of the slots at ``row_positions`` with the
+        # nodes in their lists, and its positions in the pool (the first
+        # pair in the order of the pool, in case of ties), if it is no
+        # greater than ``best``.
+        rows = pool[row_positions]
+        offsets = starts[rows]
+        row_stops = stops[rows]
+        row_xsub = xsub[rows]
+        row_max_xsub = max_xsub[row_positions]
+        while len(rows):
+            nodes = sorted_nodes[rows[:, None], offsets[:, None] + chunk]
+            is_live = is_live_node[nodes]
+            slots = node_slots[nodes]
+            dists = d[rows[:, None], slots]
+            q = (c * dists - xsub[slots]) - row_xsub[:, None]
+            q[~is_live] = numpy.inf
+            min_q = q.min()
+            if min_q <= best[0] and min_q < numpy.inf:
+                ks, ls = numpy.nonzero(q == min_q)
+                pos1s = positions[slots[ks, ls]]
+                pos2s = row_positions[ks]
+                k = numpy.lexsort((pos2s, pos1s))[0]
+                candidate = (min_q, int(pos1s[k]), int(pos2s[k]))
+                if candidate < best:
+                    best = candidate
+            # the nodes further down the lists are at least as far as the
+            # farthest live node of this chunk
+            dists[~is_live] = -numpy.inf
+            bounds = (c * dists.max(axis=1) - row_max_xsub) - row_xsub
+            offsets += _NJ_CHUNK_SIZE
+            keep = (offsets < row_stops) & (bounds <= best[0])
+            rows = rows[keep]
+            row_positions = row_positions[keep]
+            offsets = offsets[keep]
+            row_stops = row_stops[keep]
+            row_xsub = row_xsub[keep]
+            row_max_xsub = row_max_xsub[keep]
+        return best
+
+    joins = []
+    while len(pool) > 1:
+        n = len(pool)
+        if n == 2:
+            pos1, pos2 = 0, 1
+        else:
+            c = n - 2
+            positions[pool] = numpy.arange(n)
+            pool_xsub = xsub[pool]
+            max_xsub = numpy.maximum.accumulate(pool_xsub)
+            max_xsub[1:] = max_xsub[:-1]
+            max_xsub[0] = -numpy.inf
+            bounds = (c * row_min_distances[pool] - max_xsub) - pool_xsub
+            first = bounds.argmin()
+            best = _rows_min_q(numpy.array([first]), c, max_xsub, (numpy.inf, n, n))
+            candidates = numpy.flatnonzero(bounds <= best[0])
+            candidates = candidates[candidates != first]
+            candidates = candidates[bounds[candidates].argsort()]
+            for start in range(0, len(candidates), _NJ_BLOCK_SIZE):
+                block = candidates[start:start + _NJ_BLOCK_SIZE]
+                block = block[bounds[block] <= best[0]]
+                if not len(block):
+                    break
+                best = _rows_min_q(block, c, max_xsub, best)
+            pos1, pos2 = best[1], best[2]
+        a = int(pool[pos1])
+        b = int(pool[pos2])
+        dab = float(d[a, b])
+        if n > 2:
+            length1 = 0.5 * dab + 1.0/(2*(n-2)) * float(xsub[a] - xsub[b])
+            length2 = dab - length1
+        else:
+            length1 = dab / 2
+            length2 = dab / 2
+        joins.append((int(node_indexes[a]), int(node_indexes[b]), length1, length2))
+        is_live_node[node_indexes[a]] = False
+        is_live_node[node_indexes[b]] = False
+        pool = numpy.delete(pool, (pos1, pos2))
+        dsa = d[a, pool]
+        dsb = d[b, pool]
+        dists = 0.5 * ((0.0 + dsa + dsb) - dab)
+        xsub[pool] = ((xsub[pool] + dists) - dsa) - dsb
+        d[a, pool] = dists
+        d[pool, a] = dists
+        # the lists of the slots that started with one of the nodes joined
+        heads = sorted_nodes[pool, starts[pool]]
+        slots = pool[(heads == node_indexes[a]) | (heads == node_indexes[b])]
+        if len(slots):
+            _skip_dead_nodes(slots)
+            heads = sorted_nodes[slots, starts[slots]]
+            row_min_distances[slots] = numpy.where(
+                    starts[slots] < stops[slots],
+                    d[slots, node_slots[heads]],
+                    numpy.inf)
+        # the new node
+        new_node = num_taxa + len(joins) - 1
+        node_indexes[a] = new_node
+        node_slots[new_node] = a
+        is_live_node[new_node] = True
+        xsub[a] = numpy.add.accumulate(dists)[-1] if len(pool) else 0.0
+        order = dists.argsort()
+        sorted_nodes[a, :len(pool)] = node_indexes[pool[order]]
+        sorted_nodes[a, len(pool):] = no_node
+        starts[a] = 0
+        stops[a] = len(pool)
+        row_min_distances[a] = dists[order[0]] if len(pool) else numpy.inf
+        pool = numpy.append(pool, a)
+        # dropping the nodes joined from the lists every time the pool halves
+        if 2 * len(pool) < compacted_pool_size:
+            for i in pool:
+                nodes = sorted_nodes[i, starts[i]:stops[i]]
+                nodes = nodes[is_live_node[nodes]]
+                sorted_nodes[i, :stops[i]] = no_node
+                sorted_nodes[i, :len(nodes)] = nodes
+                starts[i] = 0
+                stops[i] = len(nodes)
+            compacted_pool_size = len(pool)
+    return joins
+
+def _upgma_joins_numpy(distances, num_taxa):
+    # As ``_upgma_joins()``, over a square matrix, and with the distances to
+    # each new node calculated at once.
+    d = _square_distance_matrix(distances, num_taxa)
+    pool = numpy.arange(num_taxa)
+    node_indexes = list(range(num_taxa))
+    cluster_sizes = [1] * num_taxa
+    heights = [0.0] * num_taxa
+    row_min_distances, row_min_slots = _row_minimums(d, pool, range(num_taxa))
+    positions = numpy.empty(num_taxa, dtype=numpy.intp)
+    joins = []
+    while len(pool) > 1:
+        pool_row_min_distances = row_min_distances[pool]
+        min_distance = float(pool_row_min_distances.min())
+        candidates = numpy.flatnonzero(pool_row_min_distances == min_distance)
+        positions[pool] = numpy.arange(len(pool))
+        candidate_pos1s = positions[row_min_slots[pool[candidates]]]
+        k = numpy.lexsort((candidates, candidate_pos1s))[0]
+        pos1 = int(candidate_pos1s[k])
+        pos2 = int(candidates[k])
+        a = int(pool[pos1])
+        b = int(pool[pos2])
+        edge_length = min_distance / 2.0
+        length1 = edge_length - heights[a]
+        length2 = edge_length - heights[b]
+        joins.append((node_indexes[a], node_indexes[b], length1, length2))
+        pool = numpy.delete(pool, (pos1, pos2))
+        size_a = cluster_sizes[a]
+        size_b = cluster_sizes[b]
+        dists = (0.0 + d[a, pool] * size_a + d[b, pool] * size_b) / (0.0 + size_a + size_b)
+        d[a, pool] = dists
+        d[pool, a] = dists
+        _update_row_minimums(d, pool, row_min_distances, row_min_slots, a, b)
+        node_indexes[a] = num_taxa + len(joins) - 1
+        cluster_sizes[a] = size_a + size_b
+        heights[a] = length1 + heights[a]
+        if len(pool):
+            min_pos = int(dists.argmin())
+            row_min_distances[a] = dists[min_pos]
+            row_min_slots[a] = pool[min_pos]
+        else:
+            row_min_distances[a] = numpy.inf
+            row_min_slots[a] = -1
+        pool = numpy.append(pool, a)
+    return joins
+
+##############################################################################
+## Standardized effect sizes
+
+# Number of null model replicates generated from each seed.
+_NULL_MODEL_BATCH_SIZE = 50
+
+# Largest number of distances gathered at once, for each assemblage, by
+# ``_AssemblageStatisticCalculator`` with NumPy.
+_MAX_GATHERED_DISTANCES = 1 << 22
+
+class _AssemblageStatisticCalculator(object):
+    # Calculates the MPD ("mpd") or MNTD ("mntd") of assemblages of taxa,
+    # given as masks over the (condensed) ``distances`` between
+    # ``num_taxa`` taxa, with the labels of the taxa shuffled by
+    # permutations of their indexes (as under the "taxa.label" null model).
+
+    def __init__(self,
+            distances,
+            num_taxa,
+            assemblage_masks,
+            statistic,
+            normalization_factor):
+        self.num_taxa = num_taxa
+        self.statistic = statistic
+        self.normalization_factor = normalization_factor
+        self.assemblage_members = []
+        for assemblage_mask in assemblage_masks:
+            members = [idx for idx, is_member in enumerate(assemblage_mask) if is_member]
+            if len(members) < 2:
+                raise error.NullAssemblageException("No taxa in assemblage")
+            self.assemblage_members.append(members)
+        if numpy is not None:
+            self._matrix = _square_distance_matrix(distances, num_taxa)
+        else:
+            self._distances = distances
+            self._row_offsets = _condensed_row_offsets(num_taxa)
+
+    def null_model_values(self, seed, num_replicates):
+        """
+        Returns the values of the statistic for each assemblage under
+        ``num_replicates`` shufflings of the taxa by a random number generator
+        seeded with ``seed``.
+        """
+        rng = random.Random(seed)
+        taxon_indexes = list(range(self.num_taxa))
+        permutations = []
+        for rep_idx in range(num_replicates):
+            rng.shuffle(taxon_indexes)
+            permutations.append(list(taxon_indexes))
+        return self.values(permutations)
+
+    def values(self, permutations):
+        """
+        Returns the values of the statistic for each assemblage, as lists
+        of the values with the taxa permuted by each of ``permutations``.
+        """
+        if numpy is not None:
+            return self._numpy_values(permutations)
+        d = self._distances
+        row_offsets = self._row_offsets
+        results = []
+        for members in self.assemblage_members:
+            values = []
+            for permutation in permutations:
+                taxon_indexes = [permutation[idx] for idx in members]
+                if self.statistic == "mpd":
+                    total = 0.0
+                    for k, idx1 in enumerate(taxon_indexes):
+                        for idx2 in taxon_indexes[k+1:]:
+                            if idx1 < idx2:
+                                total += d[row_offsets[idx1] + idx2]
+                            else:
+                                total += d[row_offsets[idx2] + idx1]
+                    count = len(taxon_indexes) * (len(taxon_indexes) - 1) // 2
+                else:
+                    total = 0.0
+                    for idx1 in taxon_indexes:
+                        total += min([
+                            d[row_offsets[idx1] + idx2] if idx1 < idx2 else d[row_offsets[idx2] + idx1]
+                            for idx2 in taxon_indexes if idx2 != idx1])
+                    count = len(taxon_indexes)
+                values.append((total / self.normalization_factor) / (count * 1.0))
+            results.append(values)
+        return results
+
+    def _numpy_values(self, permutations):
+        permutations = numpy.array(permutations, dtype=numpy.intp)
+        results = []
+        for members in self.assemblage_members:
+            size = len(members)
+            diagonal = numpy.arange(size)
+            step = max(1, _MAX_GATHERED_DISTANCES // (size * size))
+            values = []
+            for start in range(0, len(permutations), step):
+                taxon_indexes = permutations[start:start + step, members]
+                # the distances between the members, for each permutation
+                d = self._matrix[taxon_indexes[:, :, None], taxon_indexes[:, None, :]]
+                if self.statistic == "mpd":
+                    totals = d.sum(axis=(1, 2)) / 2.0
+                    count = size * (size - 1) // 2
+                else:
+                    d[:, diagonal, diagonal] = numpy.inf
+                    totals = d.min(axis=2).sum(axis=1)
+                    count = size
+                values.extend(((totals / self.normalization_factor) / (count * 1.0)).tolist())
+            results.append(values)
+        return results
+
+# set in each worker process of
+# ``PhylogeneticDistanceMatrix._calculate_standardized_effect_size()``, so that
+# the distances are only sent to each process once
+_null_model_worker_calculator = None
+
+def _init_null_model_worker(*args):
+    global _null_model_worker_calculator
+    _null_model_worker_calculator = _AssemblageStatisticCalculator(*args)
+
+def _null_model_values_in_worker(seed, num_replicates):
+    return _null_model_worker_calculator.null_model_values(seed, num_replicates)
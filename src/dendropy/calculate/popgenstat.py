@@ -22,17 +22,28 @@ Population genetic statistics.
 """
 
 import math
+import itertools
 import dendropy
 from dendropy.calculate import combinatorics
+from dendropy.datamodel.charmatrixmodel import SitePatterns
 
 ###############################################################################
 ## internal functions: generally taking lower-level data, such as sequences etc.
 ###############################################################################
 
-def _count_differences(char_sequences, state_alphabet, ignore_uncertain=True):
+def _site_weights(char_matrix):
+    # the number of characters with each site pattern, if given site patterns
+    if isinstance(char_matrix, SitePatterns):
+        return char_matrix.weights
+    return None
+
+def _count_differences(char_sequences, state_alphabet, ignore_uncertain=True, weights=None):
     """
     Returns pair of values: total number of pairwise differences observed between
     all sequences, and mean number of pairwise differences pair base.
+
+    If ``weights`` is given, each site counts as that many sites, e.g., for
+    the sequences of site patterns.
     """
     sum_diff = 0.0
     mean_diff = 0.0
@@ -56,19 +67,21 @@ def _count_differences(char_sequences, state_alphabet, ignore_uncertain=True):
         seq = [getattr(char, attr) for char in sequence]
         reduced_char_sequences.append(seq)
 
+    if weights is None:
+        weights = itertools.repeat(1)
+    else:
+        weights = list(weights)
     for vidx, i in enumerate(reduced_char_sequences[:-1]):
         for j in reduced_char_sequences[vidx+1:]:
             diff = 0
             counted = 0
             comps += 1
-            for cidx, c in enumerate(i):
-                c1 = c
-                c2 = j[cidx]
+            for c1, c2, weight in zip(i, j, weights):
                 if c1 in states_to_ignore or c2 in states_to_ignore:
                     continue
-                counted += 1
+                counted += weight
                 if c1 is not c2:
-                    diff += 1
+                    diff += weight
             sum_diff += float(diff)
             # If counted < 0, this means that there is sites between these sequences
             # in which both are not ignored: i.e., one or the other has a gap
@@ -81,14 +94,14 @@ def _count_differences(char_sequences, state_alphabet, ignore_uncertain=True):
             sq_diff += (diff ** 2)
     return sum_diff, mean_diff / comps, sq_diff
 
-def _nucleotide_diversity(char_sequences, state_alphabet, ignore_uncertain=True):
+def _nucleotide_diversity(char_sequences, state_alphabet, ignore_uncertain=True, weights=None):
     r"""
     Returns $\pi$, the proportional nucleotide diversity, calculated for a
     list of character sequences.
     """
-    return _count_differences(char_sequences, state_alphabet, ignore_uncertain)[1]
+    return _count_differences(char_sequences, state_alphabet, ignore_uncertain, weights)[1]
 
-def _average_number_of_pairwise_differences(char_sequences, state_alphabet, ignore_uncertain=True):
+def _average_number_of_pairwise_differences(char_sequences, state_alphabet, ignore_uncertain=True, weights=None):
     r"""
     Returns $k$ (Tajima 1983; Wakely 1996), calculated for a set of sequences:
 
@@ -98,12 +111,15 @@ def _average_number_of_pairwise_differences(char_sequences, state_alphabet, igno
     $i$th and $j$th sequence, and $n$ is the number of DNA sequences
     sampled.
     """
-    sum_diff, mean_diff, sq_diff = _count_differences(char_sequences, state_alphabet, ignore_uncertain)
+    sum_diff, mean_diff, sq_diff = _count_differences(char_sequences, state_alphabet, ignore_uncertain, weights)
     return sum_diff / combinatorics.choose(len(char_sequences), 2)
 
-def _num_segregating_sites(char_sequences, state_alphabet, ignore_uncertain=True):
+def _num_segregating_sites(char_sequences, state_alphabet, ignore_uncertain=True, weights=None):
     """
     Returns the raw number of segregating sites (polymorphic sites).
+
+    If ``weights`` is given, each site counts as that many sites, e.g., for
+    the sequences of site patterns.
     """
     s = 0
     if ignore_uncertain:
@@ -121,7 +137,7 @@ def _num_segregating_sites(char_sequences, state_alphabet, ignore_uncertain=True
             if f1 in states_to_ignore or f2 in states_to_ignore:
                 continue
             if f1 is not f2:
-                s += 1
+                s += 1 if weights is None else weights[i]
                 break
     return s
 
@@ -161,6 +177,10 @@ def _tajimas_d(num_sequences, avg_num_pairwise_differences, num_segregating_site
 ## friendlier-functions, generally taking a CharacterMatrix
 ###############################################################################
 
+# The following functions take either a character matrix or its unique site
+# patterns, as given by ``DiscreteCharacterMatrix.compressed_patterns()``, in
+# which case each pattern is calculated over once.
+
 def num_segregating_sites(char_matrix, ignore_uncertain=True):
     """
     Returns the raw number of segregating sites (polymorphic sites).
@@ -168,31 +188,46 @@ def num_segregating_sites(char_matrix, ignore_uncertain=True):
     return _num_segregating_sites(
             char_matrix.sequences(),
             char_matrix.default_state_alphabet,
-            ignore_uncertain)
+            ignore_uncertain,
+            weights=_site_weights(char_matrix))
 
 def average_number_of_pairwise_differences(char_matrix, ignore_uncertain=True):
     """
     Returns $k$, calculated for a character block.
     """
-    return _average_number_of_pairwise_differences(char_matrix.sequences(), char_matrix.default_state_alphabet, ignore_uncertain)
+    return _average_number_of_pairwise_differences(
+            char_matrix.sequences(),
+            char_matrix.default_state_alphabet,
+            ignore_uncertain,
+            weights=_site_weights(char_matrix))
 
 def nucleotide_diversity(char_matrix, ignore_uncertain=True):
     r"""
     Returns $\pi$, calculated for a character block.
     """
-    return _nucleotide_diversity(char_matrix.sequences(), char_matrix.default_state_alphabet, ignore_uncertain)
+    return _nucleotide_diversity(
+            char_matrix.sequences(),
+            char_matrix.default_state_alphabet,
+            ignore_uncertain,
+            weights=_site_weights(char_matrix))
 
 def tajimas_d(char_matrix, ignore_uncertain=True):
     """
     Returns Tajima's D.
     """
     sequences = char_matrix.sequences()
+    weights = _site_weights(char_matrix)
     num_sequences = len(sequences)
-    avg_num_pairwise_differences = _average_number_of_pairwise_differences(sequences, char_matrix.default_state_alphabet, ignore_uncertain=ignore_uncertain)
+    avg_num_pairwise_differences = _average_number_of_pairwise_differences(
+            sequences,
+            char_matrix.default_state_alphabet,
+            ignore_uncertain=ignore_uncertain,
+            weights=weights)
     num_segregating_sites = _num_segregating_sites(
             sequences,
             char_matrix.default_state_alphabet,
-            ignore_uncertain=ignore_uncertain)
+            ignore_uncertain=ignore_uncertain,
+            weights=weights)
     return _tajimas_d(num_sequences, avg_num_pairwise_differences, num_segregating_sites)
 
 def wattersons_theta(char_matrix, ignore_uncertain=True):
@@ -203,7 +238,8 @@ def wattersons_theta(char_matrix, ignore_uncertain=True):
     num_segregating_sites = _num_segregating_sites(
             sequences,
             char_matrix.default_state_alphabet,
-            ignore_uncertain=ignore_uncertain)
+            ignore_uncertain=ignore_uncertain,
+            weights=_site_weights(char_matrix))
     a1 = sum([1.0/i for i in range(1, len(sequences))])
     return float(num_segregating_sites) / a1
 
@@ -406,7 +442,15 @@ def unfolded_site_frequency_spectrum(
     with reference to the ancestral sequence given by ancestral_seq. If ancestral_seq
     is None, then the first sequence in char_sequences is taken to be the ancestral
     sequence.
+
+    If ``char_matrix`` is the unique site patterns of a character matrix, then
+    ``ancestral_sequence``, if given, must be the ancestral states of each
+    pattern.
     """
+    weights = _site_weights(char_matrix)
+    if weights is not None and ancestral_sequence is not None and len(ancestral_sequence) != len(weights):
+        raise ValueError("Ancestral sequence has {} states, but there are {} site patterns".format(
+            len(ancestral_sequence), len(weights)))
     dsm = derived_state_matrix(
             char_matrix=char_matrix,
             ancestral_sequence=ancestral_sequence,
@@ -418,10 +462,12 @@ def unfolded_site_frequency_spectrum(
     if pad:
         for i in range(len(char_matrix)+1):
             freqs[i] = 0
-    for s in sites:
+    if weights is None:
+        weights = itertools.repeat(1)
+    for s, weight in zip(sites, weights):
         p = sum(1 for i in s if i.symbol == "1")
         if p not in freqs:
-            freqs[p] = 1
+            freqs[p] = weight
         else:
-            freqs[p] += 1
+            freqs[p] += weight
     return freqs
@@ -21,6 +21,8 @@
 Functions to calculate some general statistics.
 """
 
+import bisect
+import math
 from dendropy.calculate import probability
 from operator import itemgetter
 
@@ -510,3 +512,244 @@ def summarize(values):
     except (ValueError, OverflowError):
         summary['quant_5_95'] = None
     return summary
+
+class StreamingSummary(object):
+    """
+    Accumulates the values of a sample one at a time, in bounded memory, to
+    summarize them as does :func:`summarize()`.
+
+    The count, mean and variance (using Welford's algorithm) and range of the
+    values are tracked exactly. The values themselves are retained until more
+    than ``max_exact_values`` have been added, after which they are merged
+    into a "t-digest" (Dunning and Ertl, 2019): a sorted list of weighted
+    centroids, whose number is bounded by ``compression``, and which is
+    densest at the tails. Until then, summaries are exactly those given by
+    :func:`summarize()`; thereafter, the median, 95% HPD and 5%/95%
+    quantiles are approximated by interpolating between the centroids.
+
+    Accumulators can be merged using :meth:`StreamingSummary.update()`
+    (e.g., to combine the results of different processes).
+    """
+
+    def __init__(self, compression=200, max_exact_values=500):
+        self.compression = compression
+        self.max_exact_values = max_exact_values
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.minimum = float("inf")
+        self.maximum = float("-inf")
+        self.num_missing_values = 0
+        self._values = []
+        self._centroid_means = None
+        self._centroid_weights = None
+
+    def __len__(self):
+        return self.count + self.num_missing_values
+
+    def _is_exact(self):
+        return self._centroid_means is None
+    is_exact = property(_is_exact)
+
+    def add(self, value):
+        """
+        Adds ``value`` to the sample. Values of |None| are counted as missing,
+        and the sample cannot then be summarized.
+        """
+        if value is None:
+            self.num_missing_values += 1
+            return
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        if value < self.minimum:
+            self.minimum = value
+        if value > self.maximum:
+            self.maximum = value
+        self._values.append(value)
+        if len(self._values) > self.max_exact_values:
+            self._compress()
+
+    # as for a list of values
+    append = add
+
+    def extend(self, values):
+        for value in values:
+            self.add(value)
+
+    def update(self, other):
+        """
+        Merges the sample accumulated by ``other`` into this one.
+        """
+        self.num_missing_values += other.num_missing_values
+        if not other.count:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self._m2 += other._m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+        self._values.extend(other._values)
+        if not other.is_exact:
+            if self.is_exact:
+                self._centroid_means = []
+                self._centroid_weights = []
+            self._centroid_means.extend(other._centroid_means)
+            self._centroid_weights.extend(other._centroid_weights)
+        if not self.is_exact or len(self._values) > self.max_exact_values:
+            self._compress()
+
+    def _compress(self):
+        centroids = list(zip(self._values, [1.0] * len(self._values)))
+        if not self.is_exact:
+            centroids.extend(zip(self._centroid_means, self._centroid_weights))
+        centroids.sort()
+        total_weight = float(self.count)
+        # scale function k1: centroids covering quantiles near 0 and 1 are
+        # kept smaller than those covering quantiles near the median
+        scale = self.compression / (2.0 * math.pi)
+        def _weight_limit(cumulative_weight):
+            q = min(cumulative_weight / total_weight, 1.0)
+            k = scale * math.asin(2.0 * q - 1.0) + 1.0
+            return total_weight * (math.sin(min(k / scale, math.pi / 2.0)) + 1.0) / 2.0
+        means = []
+        weights = []
+        cumulative_weight = 0.0
+        current_mean, current_weight = centroids[0]
+        weight_limit = _weight_limit(cumulative_weight)
+        for mean, weight in centroids[1:]:
+            if cumulative_weight + current_weight + weight <= weight_limit:
+                current_weight += weight
+                current_mean += (mean - current_mean) * weight / current_weight
+            else:
+                means.append(current_mean)
+                weights.append(current_weight)
+                cumulative_weight += current_weight
+                weight_limit = _weight_limit(cumulative_weight)
+                current_mean, current_weight = mean, weight
+        means.append(current_mean)
+        weights.append(current_weight)
+        self._centroid_means = means
+        self._centroid_weights = weights
+        self._values = []
+
+    def quantile(self, q):
+        """
+        Returns the (approximate, unless :attr:`is_exact`) ``q``-th quantile
+        of the sample.
+        """
+        if not self.count:
+            raise ValueError("No values in data")
+        if self.is_exact:
+            return quantile(self._values, q)
+        if self._values:
+            self._compress()
+        means = self._centroid_means
+        weights = self._centroid_weights
+        # each centroid is taken to be centered at the middle of its weight,
+        # with the minimum and maximum at the extremes
+        centers = []
+        cumulative_weight = 0.0
+        for weight in weights:
+            centers.append(cumulative_weight + weight / 2.0)
+            cumulative_weight += weight
+        rank = q * cumulative_weight
+        if rank <= centers[0]:
+            x0, x1, r0, r1 = self.minimum, means[0], 0.0, centers[0]
+        elif rank >= centers[-1]:
+            x0, x1, r0, r1 = means[-1], self.maximum, centers[-1], cumulative_weight
+        else:
+            idx = bisect.bisect_right(centers, rank)
+            x0, x1, r0, r1 = means[idx-1], means[idx], centers[idx-1], centers[idx]
+        if r1 <= r0:
+            return x0
+        return x0 + (x1 - x0) * (rank - r0) / (r1 - r0)
+
+    def hpd(self, conf=0.95, resolution=100):
+        """
+        Returns an approximation of the ``conf`` highest posterior density
+        (HPD) interval of the sample, as the shortest of the intervals between
+        the quantiles at ``p`` and ``p + conf``, for ``resolution`` + 1 values
+        of ``p`` between 0 and ``1 - conf``.
+        """
+        conf = max([conf, 1.0 - conf])
+        intervals = []
+        for i in range(resolution + 1):
+            p = (1.0 - conf) * i / resolution
+            lower = self.quantile(p)
+            upper = self.quantile(p + conf)
+            intervals.append((upper - lower, lower, upper))
+        return min(intervals)[1:]
+
+    def summarize(self):
+        """
+        Returns a summary of the sample, as given by :func:`summarize()`.
+        """
+        if self.num_missing_values:
+            raise TypeError("Sample has {} missing values".format(self.num_missing_values))
+        if self.is_exact:
+            return summarize(self._values)
+        summary = {}
+        summary['range'] = (self.minimum, self.maximum)
+        summary['mean'] = self.mean
+        if self.count == 1:
+            summary['var'] = float('inf')
+        else:
+            summary['var'] = self._m2 / (self.count - 1)
+        summary['sd'] = summary['var'] ** 0.5
+        summary['median'] = self.quantile(0.5)
+        summary['hpd95'] = self.hpd(conf=0.95)
+        summary['quant_5_95'] = (self.quantile(0.05), self.quantile(0.95))
+        return summary
+
+    def get_state(self):
+        """
+        Returns the state of this accumulator as a list of floats, from
+        which it can be recreated using :meth:`StreamingSummary.from_state()`.
+        """
+        if self.is_exact:
+            centroid_means, centroid_weights = [], []
+        else:
+            centroid_means, centroid_weights = self._centroid_means, self._centroid_weights
+        state = [
+                float(self.compression),
+                float(self.max_exact_values),
+                float(self.count),
+                self.mean,
+                self._m2,
+                self.minimum,
+                self.maximum,
+                float(self.num_missing_values),
+                float(not self.is_exact),
+                float(len(self._values)),
+                ]
+        state.extend(self._values)
+        state.extend(centroid_means)
+        state.extend(centroid_weights)
+        return state
+
+    @classmethod
+    def from_state(cls, state):
+        """
+        Returns an accumulator recreated from the ``state`` returned by
+        :meth:`StreamingSummary.get_state()`.
+        """
+        state = list(state)
+        summary = cls(compression=state[0], max_exact_values=int(state[1]))
+        summary.count = int(state[2])
+        summary.mean = state[3]
+        summary._m2 = state[4]
+        summary.minimum = state[5]
+        summary.maximum = state[6]
+        summary.num_missing_values = int(state[7])
+        num_values = int(state[9])
+        summary._values = state[10:10+num_values]
+        if state[8]:
+            centroids = state[10+num_values:]
+            num_centroids = len(centroids) // 2
+            summary._centroid_means = centroids[:num_centroids]
+            summary._centroid_weights = centroids[num_centroids:]
+        return summary
@@ -22,9 +22,17 @@ Statistics, metrics, measurements, and values calculated *between* *two* trees.
 """
 
 import math
+import array
 import collections
+import csv
 import itertools
+import multiprocessing
+from dendropy.utility import bitprocessing
 from dendropy.utility import error
+from dendropy.datamodel import taxonmodel
+from dendropy.datamodel import treemodel
+from dendropy.datamodel import treecollectionmodel
+from dendropy.calculate import phylogeneticdistance
 
 ###############################################################################
 ## Public Functions
@@ -355,6 +363,482 @@ def find_missing_bipartitions(reference_tree, comparison_tree, is_bipartitions_u
             missing.append(bipartition)
     return missing
 
+##############################################################################
+### Distances Between All Pairs of Trees
+
+class TreeDistanceMatrix(object):
+    """
+    Distances between all pairs of a collection of trees, as calculated by
+    :func:`pairwise_distance_matrix()`.
+
+    The distances are stored in "condensed" form, i.e., as a flat array of the
+    upper triangle of the matrix (without the diagonal), in row order, so
+    that the distance between trees ``i`` and ``j`` (with ``i < j``) of ``n``
+    trees is at index ``n*i - i*(i+1)/2 + (j - i - 1)``.
+    """
+
+    def __init__(self, distances, labels, metric):
+        """
+        Parameters
+        ----------
+        distances : :class:`array.array`
+            The condensed distances.
+        labels : list[str]
+            Labels of the trees, in order.
+        metric : str
+            Name of the distance metric.
+        """
+        self.distances = distances
+        self.labels = labels
+        self.metric = metric
+        num_trees = len(labels)
+        if len(distances) != num_trees * (num_trees - 1) // 2:
+            raise ValueError("Expecting {} distances for {} trees, but found {}".format(
+                num_trees * (num_trees - 1) // 2,
+                num_trees,
+                len(distances)))
+
+    def __len__(self):
+        return len(self.labels)
+
+    def __call__(self, i, j):
+        return self.distance(i, j)
+
+    def __iter__(self):
+        """
+        Yields the rows of the (square) matrix of distances.
+        """
+        for i in range(len(self.labels)):
+            yield self.row(i)
+
+    def distance(self, i, j):
+        """
+        Returns the distance between the trees at indexes ``i`` and ``j``.
+        """
+        num_trees = len(self.labels)
+        if i < 0:
+            i += num_trees
+        if j < 0:
+            j += num_trees
+        if not (0 <= i < num_trees and 0 <= j < num_trees):
+            raise IndexError("Tree index out of range")
+        if i == j:
+            return 0.0 if self.distances.typecode == "d" else 0
+        if i > j:
+            i, j = j, i
+        return self.distances[num_trees * i - (i * (i + 1)) // 2 + (j - i - 1)]
+
+    def row(self, i):
+        """
+        Returns a list of the distances between the tree at index ``i`` and
+        all trees (including itself).
+        """
+        return [self.distance(i, j) for j in range(len(self.labels))]
+
+    def as_phylogenetic_distance_matrix(self, taxon_namespace=None):
+        """
+        Returns the distances as a |PhylogeneticDistanceMatrix|, with a
+        |Taxon| for each tree (labeled by the label of the tree), e.g., to
+        cluster the trees using :meth:`PhylogeneticDistanceMatrix.nj_tree()`
+        or :meth:`PhylogeneticDistanceMatrix.upgma_tree()`.
+
+        Parameters
+        ----------
+        taxon_namespace : |TaxonNamespace|
+            Namespace in which to create the taxa corresponding to the trees.
+            If not given, a new one will be created.
+
+        Returns
+        -------
+        pdm : |PhylogeneticDistanceMatrix|
+        """
+        if taxon_namespace is None:
+            taxon_namespace = taxonmodel.TaxonNamespace()
+        taxa = [taxon_namespace.new_taxon(label=label) for label in self.labels]
+        distances = {}
+        for i, taxon1 in enumerate(taxa):
+            distances[taxon1] = {}
+            for j, taxon2 in enumerate(taxa):
+                distances[taxon1][taxon2] = self.distance(i, j)
+        pdm = phylogeneticdistance.PhylogeneticDistanceMatrix()
+        pdm.compile_from_dict(
+                distances=distances,
+                taxon_namespace=taxon_namespace)
+        return pdm
+
+    def write_csv(self,
+            out,
+            is_first_row_column_names=True,
+            is_first_column_row_names=True,
+            label_transform_fn=None,
+            **csv_writer_kwargs
+            ):
+        """
+        Writes the (square) matrix of distances as a table, in the same format
+        as :meth:`PhylogeneticDistanceMatrix.write_csv()`, with the trees
+        labeled by their labels.
+        """
+        if isinstance(out, str):
+            dest = open(out, "w")
+        else:
+            dest = out
+        if label_transform_fn is None:
+            label_transform_fn = lambda x: x
+        if "delimiter" not in csv_writer_kwargs:
+            csv_writer_kwargs["delimiter"] = ","
+        writer = csv.writer(dest, **csv_writer_kwargs)
+        if is_first_row_column_names:
+            row = []
+            if is_first_column_row_names:
+                row.append("")
+            for label in self.labels:
+                row.append(label_transform_fn(label))
+            writer.writerow(row)
+        for i, label in enumerate(self.labels):
+            row = []
+            if is_first_column_row_names:
+                row.append(label_transform_fn(label))
+            for d in self.row(i):
+                row.append("{}".format(d))
+            writer.writerow(row)
+        if dest is not out:
+            dest.close()
+
+def pairwise_distance_matrix(
+        trees,
+        metric="symmetric_difference",
+        edge_weight_attr="length",
+        is_bipartitions_updated=False,
+        num_processes=1):
+    """
+    Returns the distances between all pairs of trees in ``trees``.
+
+    This gives the same distances as calling :func:`symmetric_difference()`,
+    :func:`weighted_robinson_foulds_distance()` or
+    :func:`euclidean_distance()` on each pair of trees, but each tree is
+    encoded only once, as a set of (interned) split identities and their edge
+    weights. Splits found in only one tree cannot be shared by any pair of
+    trees, and so contribute a constant to the distances from the tree, while
+    the remaining splits are represented as an integer bitset for the
+    symmetric difference (so that the difference between two trees is the
+    number of set bits in an exclusive-or) or as a dictionary of edge weights
+    for the weighted distances.
+
+    Parameters
+    ----------
+    trees : iterable of |Tree| objects or |TreeArray|
+        The trees to compare. These must all share the same |TaxonNamespace|
+        reference. If a |TreeArray|, then the splits and edge lengths stored
+        in it are used.
+    metric : str
+        One of "symmetric_difference" (the unweighted Robinson-Foulds
+        distance), "weighted_robinson_foulds", or "euclidean".
+    edge_weight_attr : string
+        Name of attribute on edges of trees to be used as the weight (ignored
+        if ``trees`` is a |TreeArray|). Edges without a weight are taken to
+        have a weight of 0.
+    is_bipartitions_updated : bool
+        If |False| (default), then the bipartitions of the trees will be
+        updated before comparison. If |True|, then the bipartitions will only
+        be calculated for a |Tree| object if they have not been calculated
+        before.
+    num_processes : int
+        Number of processes over which to divide the calculation of the
+        distances.
+
+    Returns
+    -------
+    m : |TreeDistanceMatrix|
+        The distances. Trees are labeled by their labels or, if they do not
+        have one (or if ``trees`` is a |TreeArray|), by their (1-based)
+        position in ``trees``.
+
+    Examples
+    --------
+
+    ::
+
+        import dendropy
+        from dendropy.calculate import treecompare
+        trees = dendropy.TreeList.get(path="boot.tre", schema="newick")
+        dm = treecompare.pairwise_distance_matrix(trees, num_processes=4)
+        print(dm(0, 1))
+        dm.write_csv("rf.csv")
+
+    """
+    if metric not in _PAIRWISE_DISTANCE_METRICS:
+        raise ValueError("Unrecognized distance metric: '{}' (expecting one of: {})".format(
+            metric,
+            ", ".join("'{}'".format(m) for m in _PAIRWISE_DISTANCE_METRICS)))
+    if isinstance(trees, treecollectionmodel.TreeArray):
+        tree_splits = []
+        for split_bitmasks, edge_lengths in trees:
+            tree_splits.append(list(zip(split_bitmasks, edge_lengths)))
+        labels = [str(i + 1) for i in range(len(tree_splits))]
+    else:
+        tree_splits = []
+        labels = []
+        taxon_namespace_tree = None
+        for tree in trees:
+            if taxon_namespace_tree is None:
+                taxon_namespace_tree = tree
+            elif tree.taxon_namespace is not taxon_namespace_tree.taxon_namespace:
+                raise error.TaxonNamespaceIdentityError(taxon_namespace_tree, tree)
+            if not is_bipartitions_updated or tree.bipartition_encoding is None:
+                tree.encode_bipartitions()
+            if metric == "symmetric_difference":
+                splits = [(bipartition.split_bitmask, None) for bipartition in tree.bipartition_encoding]
+            else:
+                splits = [(bipartition.split_bitmask, getattr(edge, edge_weight_attr))
+                        for bipartition, edge in tree.bipartition_edge_map.items()]
+            tree_splits.append(splits)
+            if tree.label is None:
+                labels.append(str(len(labels) + 1))
+            else:
+                labels.append(tree.label)
+    encoded_trees = _encode_trees_for_pairwise_distances(tree_splits, metric)
+    num_trees = len(encoded_trees)
+    if num_processes <= 1 or num_trees < 3:
+        distances = _calculate_pairwise_distance_rows(encoded_trees, metric, 0, num_trees)
+    else:
+        # rows get shorter down the matrix, so the rows are divided into
+        # ranges of roughly equal numbers of pairs, more than one per process
+        # to balance the load
+        num_chunks = min(num_trees - 1, num_processes * 4)
+        pairs_per_chunk = (num_trees * (num_trees - 1) // 2) / num_chunks
+        row_ranges = []
+        start = 0
+        num_pairs = 0
+        for i in range(num_trees - 1):
+            num_pairs += num_trees - i - 1
+            if num_pairs >= pairs_per_chunk * (len(row_ranges) + 1):
+                row_ranges.append((start, i + 1))
+                start = i + 1
+        if start < num_trees - 1:
+            row_ranges.append((start, num_trees - 1))
+        pool = multiprocessing.Pool(
+                processes=num_processes,
+                initializer=_init_pairwise_distance_worker,
+                initargs=(encoded_trees, metric))
+        try:
+            chunks = pool.starmap(_calculate_pairwise_distance_rows_in_worker, row_ranges)
+        finally:
+            pool.close()
+            pool.join()
+        distances = _new_pairwise_distance_array(metric)
+        for chunk in chunks:
+            distances.extend(chunk)
+    return TreeDistanceMatrix(
+            distances=distances,
+            labels=labels,
+            metric=metric)
+
+##############################################################################
+### Comparisons Against a Reference Tree
+
+TreeComparison = collections.namedtuple("TreeComparison", [
+        "false_positives",
+        "false_negatives",
+        "symmetric_difference",
+        "weighted_robinson_foulds_distance",
+        "euclidean_distance",
+        ])
+TreeComparison.__doc__ = """\
+The results of comparing a tree against a reference tree with
+|ReferenceTreeComparator|: the numbers of false positive and false negative
+bipartitions (as given by :func:`false_positives_and_negatives()`), and the
+symmetric difference, weighted Robinson-Foulds distance and Euclidean distance
+between the trees.
+"""
+
+class ReferenceTreeComparator(object):
+    """
+    Compares many trees against a single reference tree.
+
+    The splits and edge weights of the reference tree are encoded once, and
+    each tree compared against it is encoded directly from its nodes (or given
+    as a |SplitRecord|), without encoding its bipartitions (and so without
+    modifying it), so that each comparison takes a single pass over the
+    splits of the tree. Comparisons give the same results as calling
+    :func:`false_positives_and_negatives()`, :func:`symmetric_difference()`,
+    :func:`weighted_robinson_foulds_distance()` and
+    :func:`euclidean_distance()` on the reference tree and each tree, except
+    that edges without a weight are taken to have a weight of 0. The legacy
+    :func:`mason_gamer_kellogg_score()` has no counterpart here, as it does
+    not calculate a score.
+
+    Examples
+    --------
+
+    ::
+
+        import dendropy
+        from dendropy.calculate import treecompare
+        true_tree = dendropy.Tree.get(path="true.tre", schema="newick")
+        comparator = treecompare.ReferenceTreeComparator(true_tree)
+        for result in comparator.compare_files(
+                files=["estimated.tre"],
+                schema="newick"):
+            print(result.symmetric_difference, result.euclidean_distance)
+
+    """
+
+    def __init__(self,
+            reference_tree,
+            edge_weight_attr="length",
+            is_bipartitions_updated=False):
+        """
+        Parameters
+        ----------
+        reference_tree : |Tree|
+            The tree against which other trees are compared. Trees compared
+            against this must share the same |TaxonNamespace| reference.
+        edge_weight_attr : string
+            Name of attribute on edges of trees to be used as the weight.
+        is_bipartitions_updated : bool
+            If |False| (default), then the bipartitions of the reference tree
+            will be updated. If |True|, then they will only be calculated if
+            they have not been calculated before.
+        """
+        self.reference_tree = reference_tree
+        self.taxon_namespace = reference_tree.taxon_namespace
+        self.edge_weight_attr = edge_weight_attr
+        if not is_bipartitions_updated or reference_tree.bipartition_encoding is None:
+            reference_tree.encode_bipartitions()
+        self._reference_split_weights = {}
+        for bipartition, edge in reference_tree.bipartition_edge_map.items():
+            weight = getattr(edge, edge_weight_attr)
+            if weight is None:
+                weight = 0.0
+            self._reference_split_weights[bipartition.split_bitmask] = float(weight)
+        self._split_record_encoder = treemodel.SplitRecordEncoder(
+                taxon_namespace=self.taxon_namespace)
+
+    def compare(self, tree):
+        """
+        Compares a tree against the reference tree.
+
+        Parameters
+        ----------
+        tree : |Tree| or |SplitRecord|
+            The tree to compare, or a record of its splits (e.g., as yielded
+            by :meth:`Tree.yield_split_records_from_files()`, in which case
+            the edge lengths of the record are used as the edge weights).
+
+        Returns
+        -------
+        c : |TreeComparison|
+            The results of the comparison.
+        """
+        split_weights = self._tree_split_weights(tree)
+        reference_split_weights = self._reference_split_weights
+        num_shared_splits = 0
+        weighted_robinson_foulds_distance = 0.0
+        sum_of_squares = 0.0
+        for split, weight in split_weights.items():
+            if weight is None:
+                weight = 0.0
+            else:
+                weight = float(weight)
+            reference_weight = reference_split_weights.get(split)
+            if reference_weight is None:
+                diff = weight
+            else:
+                num_shared_splits += 1
+                diff = weight - reference_weight
+            weighted_robinson_foulds_distance += abs(diff)
+            sum_of_squares += diff * diff
+        if num_shared_splits < len(reference_split_weights):
+            for split in reference_split_weights.keys() - split_weights.keys():
+                reference_weight = reference_split_weights[split]
+                weighted_robinson_foulds_distance += abs(reference_weight)
+                sum_of_squares += reference_weight * reference_weight
+        false_positives = len(split_weights) - num_shared_splits
+        false_negatives = len(reference_split_weights) - num_shared_splits
+        return TreeComparison(
+                false_positives=false_positives,
+                false_negatives=false_negatives,
+                symmetric_difference=false_positives + false_negatives,
+                weighted_robinson_foulds_distance=weighted_robinson_foulds_distance,
+                euclidean_distance=math.sqrt(sum_of_squares))
+
+    def compare_stream(self, trees):
+        """
+        Compares each tree (or |SplitRecord|) of ``trees`` against the
+        reference tree, yielding a |TreeComparison| for each in turn.
+        """
+        for tree in trees:
+            yield self.compare(tree)
+
+    def compare_files(self, files, schema, tree_offset=0, **kwargs):
+        r"""
+        Compares each tree read from ``files`` against the reference tree,
+        yielding a |TreeComparison| for each in turn.
+
+        If the edge weights are edge lengths, then the trees are read as
+        |SplitRecord| instances with
+        :meth:`Tree.yield_split_records_from_files()`, without constructing
+        |Tree| instances. Otherwise, the trees are read with
+        :meth:`Tree.yield_from_files()`.
+
+        Parameters
+        ----------
+        files : iterable of file paths or file-like objects.
+            The sources of the trees.
+        schema : string
+            The name of the data format (e.g., "newick" or "nexus").
+        tree_offset : integer
+            Trees before this offset in each source are skipped.
+        \*\*kwargs : keyword arguments
+            These will be passed directly to the schema-parser implementation.
+        """
+        if self.edge_weight_attr == "length":
+            trees = treemodel.Tree.yield_split_records_from_files(
+                    files=files,
+                    schema=schema,
+                    taxon_namespace=self.taxon_namespace,
+                    tree_offset=tree_offset,
+                    split_record_encoder=self._split_record_encoder,
+                    **kwargs)
+            for result in self.compare_stream(trees):
+                yield result
+        else:
+            for file in files:
+                trees = treemodel.Tree.yield_from_files(
+                        files=[file],
+                        schema=schema,
+                        taxon_namespace=self.taxon_namespace,
+                        **kwargs)
+                for result in self.compare_stream(itertools.islice(trees, tree_offset, None)):
+                    yield result
+
+    def find_missing_bipartitions(self, tree):
+        """
+        Returns a list of the bipartitions of the reference tree that are not
+        in ``tree`` (a |Tree| or |SplitRecord|), as given by
+        :func:`find_missing_bipartitions()`.
+        """
+        split_weights = self._tree_split_weights(tree)
+        return [bipartition for bipartition in self.reference_tree.bipartition_encoding
+                if bipartition.split_bitmask not in split_weights]
+
+    def _tree_split_weights(self, tree):
+        if tree.taxon_namespace is not self.taxon_namespace:
+            raise error.TaxonNamespaceIdentityError(self.reference_tree, tree)
+        if isinstance(tree, treemodel.SplitRecord):
+            split_record = tree
+        else:
+            # as ``SplitRecordEncoder.encode_postorder_nodes()`` does for
+            # parsed tree statements, so that the tree itself is not modified
+            edge_weight_attr = self.edge_weight_attr
+            nodes = [[len(nd._child_nodes), nd.taxon, getattr(nd.edge, edge_weight_attr)]
+                    for nd in tree.postorder_node_iter()]
+            split_record = self._split_record_encoder.encode_postorder_nodes(
+                    nodes,
+                    is_rooted=tree.is_rooted,
+                    weight=None)
+        return dict(zip(split_record.split_bitmasks, split_record.edge_lengths))
+
 ##############################################################################
 ### TreeshapeKernel
 
@@ -849,3 +1333,113 @@ def _bipartition_difference(
             is_bipartitions_updated=is_bipartitions_updated)
     return dist_fn(length_diffs)
 
+_PAIRWISE_DISTANCE_METRICS = (
+        "symmetric_difference",
+        "weighted_robinson_foulds",
+        "euclidean",
+        )
+
+def _new_pairwise_distance_array(metric):
+    if metric == "symmetric_difference":
+        return array.array("q")
+    else:
+        return array.array("d")
+
+def _encode_trees_for_pairwise_distances(tree_splits, metric):
+    """
+    Encodes each tree, given as a list of (split bitmask, edge weight) pairs,
+    for ``_calculate_pairwise_distance_rows()``. Splits found in more than one
+    tree are given (interned) integer identities. For the symmetric
+    difference, each tree is encoded as a pair (bitset of the identities of
+    its splits, number of splits not found in any other tree); otherwise, as a
+    pair (dictionary mapping identities of its splits to edge weights,
+    contribution to distance of splits not found in any other tree).
+    """
+    tree_split_weights = [dict(splits) for splits in tree_splits]
+    split_counts = collections.Counter()
+    for split_weights in tree_split_weights:
+        split_counts.update(split_weights.keys())
+    split_ids = {}
+    for split_weights in tree_split_weights:
+        for split in split_weights:
+            if split_counts[split] > 1 and split not in split_ids:
+                split_ids[split] = len(split_ids)
+    encoded_trees = []
+    if metric == "symmetric_difference":
+        num_bytes = (len(split_ids) + 7) // 8
+        for split_weights in tree_split_weights:
+            bits = bytearray(num_bytes)
+            num_unique_splits = 0
+            for split in split_weights:
+                split_id = split_ids.get(split)
+                if split_id is None:
+                    num_unique_splits += 1
+                else:
+                    bits[split_id >> 3] |= 1 << (split_id & 7)
+            encoded_trees.append((int.from_bytes(bits, "little"), num_unique_splits))
+    else:
+        for split_weights in tree_split_weights:
+            weights = {}
+            unique_splits_distance = 0.0
+            for split, weight in split_weights.items():
+                if weight is None:
+                    weight = 0.0
+                else:
+                    weight = float(weight)
+                split_id = split_ids.get(split)
+                if split_id is not None:
+                    weights[split_id] = weight
+                elif metric == "euclidean":
+                    unique_splits_distance += weight * weight
+                else:
+                    unique_splits_distance += abs(weight)
+            encoded_trees.append((weights, unique_splits_distance))
+    return encoded_trees
+
+def _calculate_pairwise_distance_rows(encoded_trees, metric, start, stop):
+    """
+    Returns the condensed distances of rows ``start`` to ``stop`` of the
+    matrix of distances between trees encoded by
+    ``_encode_trees_for_pairwise_distances()``.
+    """
+    distances = _new_pairwise_distance_array(metric)
+    if metric == "symmetric_difference":
+        num_set_bits = bitprocessing.num_set_bits
+        for i in range(start, stop):
+            bits1, num_unique_splits1 = encoded_trees[i]
+            distances.extend(
+                    num_set_bits(bits1 ^ bits2) + num_unique_splits1 + num_unique_splits2
+                    for bits2, num_unique_splits2 in itertools.islice(encoded_trees, i + 1, None))
+    elif metric == "weighted_robinson_foulds":
+        for i in range(start, stop):
+            weights1, unique_splits_distance1 = encoded_trees[i]
+            for weights2, unique_splits_distance2 in itertools.islice(encoded_trees, i + 1, None):
+                d = unique_splits_distance1 + unique_splits_distance2
+                for split_id, weight1 in weights1.items():
+                    d += abs(weight1 - weights2.get(split_id, 0.0))
+                for split_id in weights2.keys() - weights1.keys():
+                    d += abs(weights2[split_id])
+                distances.append(d)
+    else:
+        for i in range(start, stop):
+            weights1, unique_splits_distance1 = encoded_trees[i]
+            for weights2, unique_splits_distance2 in itertools.islice(encoded_trees, i + 1, None):
+                d = unique_splits_distance1 + unique_splits_distance2
+                for split_id, weight1 in weights1.items():
+                    d += pow(weight1 - weights2.get(split_id, 0.0), 2)
+                for split_id in weights2.keys() - weights1.keys():
+                    d += pow(weights2[split_id], 2)
+                distances.append(math.sqrt(d))
+    return distances
+
+# set in each worker process of ``pairwise_distance_matrix()``, so that the
+# encoded trees are only sent to each process once
+_pairwise_distance_worker_data = None
+
+def _init_pairwise_distance_worker(encoded_trees, metric):
+    global _pairwise_distance_worker_data
+    _pairwise_distance_worker_data = (encoded_trees, metric)
+
+def _calculate_pairwise_distance_rows_in_worker(start, stop):
+    encoded_trees, metric = _pairwise_distance_worker_data
+    return _calculate_pairwise_distance_rows(encoded_trees, metric, start, stop)
@@ -23,6 +23,7 @@ Statistics, metrics, measurements, and values calculated on (single) trees.
 
 import math
 from dendropy.calculate import phylogeneticdistance
+from dendropy.datamodel import treemodel
 from dendropy.utility import deprecate
 
 EULERS_CONSTANT = 0.5772156649015328606065120900824024310421
@@ -67,6 +68,8 @@ def B1(tree):
     number of nodes between each interior node and tip over all internal
     nodes excluding root.
     """
+    if isinstance(tree, treemodel.FlatTree):
+        return _flat_tree_B1(tree)
     b1 = 0.0
     nd_mi = {}
     for nd in tree.postorder_node_iter():
@@ -100,21 +103,24 @@ def colless_tree_imbalance(tree, normalize="max"):
             no normalization
 
     """
-    colless = 0.0
-    num_leaves = 0
-    subtree_leaves = {}
-    for nd in tree.postorder_node_iter():
-        if nd.is_leaf():
-            subtree_leaves[nd] = 1
-            num_leaves += 1
-        else:
-            total_leaves = 0
-            if len(nd._child_nodes) > 2:
-                raise TypeError("Colless' tree imbalance statistic requires strictly bifurcating trees")
-            left = subtree_leaves[nd._child_nodes[0]]
-            right = subtree_leaves[nd._child_nodes[1]]
-            colless += abs(right-left)
-            subtree_leaves[nd] = right + left
+    if isinstance(tree, treemodel.FlatTree):
+        colless, num_leaves = _flat_tree_colless(tree)
+    else:
+        colless = 0.0
+        num_leaves = 0
+        subtree_leaves = {}
+        for nd in tree.postorder_node_iter():
+            if nd.is_leaf():
+                subtree_leaves[nd] = 1
+                num_leaves += 1
+            else:
+                total_leaves = 0
+                if len(nd._child_nodes) > 2:
+                    raise TypeError("Colless' tree imbalance statistic requires strictly bifurcating trees")
+                left = subtree_leaves[nd._child_nodes[0]]
+                right = subtree_leaves[nd._child_nodes[1]]
+                colless += abs(right-left)
+                subtree_leaves[nd] = right + left
     if normalize == "yule":
         colless = float(colless - (num_leaves * math.log(num_leaves)) - (num_leaves * (EULERS_CONSTANT - 1.0 - math.log(2))))/num_leaves
     elif normalize == "pda":
@@ -155,15 +161,25 @@ def pybus_harvey_gamma(tree, prec=0.00001):
     node = None
     speciation_ages = []
     n = 0
-    if tree.seed_node.age is None:
-        tree.calc_node_ages(ultrametricity_precision=prec)
-    for node in tree.postorder_node_iter():
-        if len(node.child_nodes()) == 2:
-            speciation_ages.append(node.age)
-        else:
-            n += 1
-    if node is None:
-        raise ValueError("Empty tree encountered")
+    if isinstance(tree, treemodel.FlatTree):
+        if not len(tree):
+            raise ValueError("Empty tree encountered")
+        ages = tree.calc_node_ages(ultrametricity_precision=prec)
+        for idx in tree.preorder_index_iter():
+            if tree.num_child_nodes(idx) == 2:
+                speciation_ages.append(ages[idx])
+            else:
+                n += 1
+    else:
+        if tree.seed_node.age is None:
+            tree.calc_node_ages(ultrametricity_precision=prec)
+        for node in tree.postorder_node_iter():
+            if len(node.child_nodes()) == 2:
+                speciation_ages.append(node.age)
+            else:
+                n += 1
+        if node is None:
+            raise ValueError("Empty tree encountered")
     speciation_ages.sort(reverse=True)
     g = []
     older = speciation_ages[0]
@@ -218,12 +234,15 @@ def sackin_index(tree, normalize=True):
             no normalization
 
     """
-    leaf_count = 0
-    num_anc = 0
-    for leaf_node in tree.leaf_node_iter():
-        leaf_count += 1
-        for parent in leaf_node.ancestor_iter(inclusive=False):
-            num_anc += 1
+    if isinstance(tree, treemodel.FlatTree):
+        leaf_count, num_anc = _flat_tree_sackin(tree)
+    else:
+        leaf_count = 0
+        num_anc = 0
+        for leaf_node in tree.leaf_node_iter():
+            leaf_count += 1
+            for parent in leaf_node.ancestor_iter(inclusive=False):
+                num_anc += 1
     if normalize == "yule":
         x = sum(1.0/j for j in range(2, leaf_count+1))
         s = float(num_anc - (2 * leaf_count * x))/leaf_count
@@ -244,6 +263,20 @@ def treeness(tree):
     """
     internal = 0.0
     external = 0.0
+    if isinstance(tree, treemodel.FlatTree):
+        edge_lengths = tree.edge_lengths
+        for idx in tree.preorder_index_iter():
+            if not idx:
+                continue
+            edge_length = edge_lengths[idx]
+            if edge_length != edge_length:
+                # as for a |Tree|, on which the length is |None|
+                raise TypeError("Edge of node {} has no length".format(idx))
+            if tree.is_leaf(idx):
+                external += edge_length
+            else:
+                internal += edge_length
+        return internal/(external + internal)
     for nd in tree.postorder_node_iter():
         if not nd._parent_node:
             continue
@@ -276,3 +309,52 @@ def divergence_times(tree):
     Returns vector of splits indexed in forward time.
     """
     return divergence_times(tree, is_internal_only=True)
+
+###########################################################################
+### Metrics on FlatTree instances, without node objects
+
+def _flat_tree_B1(tree):
+    parent_indexes = tree.parent_indexes
+    first_child_indexes = tree.first_child_indexes
+    # maximum number of nodes between the children of each node and a tip
+    child_mi = [0] * len(tree)
+    b1 = 0.0
+    # children come after their parents in preorder
+    for idx in range(len(tree) - 1, 0, -1):
+        if first_child_indexes[idx] < 0:
+            continue
+        mi = child_mi[idx] + 1
+        b1 += 1.0/mi
+        parent_idx = parent_indexes[idx]
+        if mi > child_mi[parent_idx]:
+            child_mi[parent_idx] = mi
+    return b1
+
+def _flat_tree_colless(tree):
+    first_child_indexes = tree.first_child_indexes
+    next_sibling_indexes = tree.next_sibling_indexes
+    colless = 0.0
+    for idx in tree.preorder_index_iter():
+        left_idx = first_child_indexes[idx]
+        if left_idx < 0:
+            continue
+        right_idx = next_sibling_indexes[left_idx]
+        if right_idx < 0:
+            # as for a |Tree|, on which the missing child is looked up
+            raise IndexError("Node {} has only one child".format(idx))
+        if next_sibling_indexes[right_idx] >= 0:
+            raise TypeError("Colless' tree imbalance statistic requires strictly bifurcating trees")
+        colless += abs(tree.num_leaves_of(right_idx) - tree.num_leaves_of(left_idx))
+    return colless, tree.num_leaves
+
+def _flat_tree_sackin(tree):
+    parent_indexes = tree.parent_indexes
+    first_child_indexes = tree.first_child_indexes
+    depths = [0] * len(tree)
+    num_anc = 0
+    for idx in range(1, len(tree)):
+        depth = depths[parent_indexes[idx]] + 1
+        depths[idx] = depth
+        if first_child_indexes[idx] < 0:
+            num_anc += depth
+    return tree.num_leaves, num_anc
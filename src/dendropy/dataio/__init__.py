@@ -23,6 +23,7 @@ from dendropy.dataio import newickwriter
 from dendropy.dataio import newickyielder
 from dendropy.dataio import fastareader
 from dendropy.dataio import fastawriter
+from dendropy.dataio import fastayielder
 from dendropy.dataio import nexusreader
 from dendropy.dataio import nexuswriter
 from dendropy.dataio import nexusyielder
@@ -31,25 +32,26 @@ from dendropy.dataio import nexmlwriter
 from dendropy.dataio import nexmlyielder
 from dendropy.dataio import phylipreader
 from dendropy.dataio import phylipwriter
+from dendropy.dataio import phylipyielder
 from dendropy.dataio import multiphylipreader
 from dendropy.utility import container
 
 _IOServices = collections.namedtuple(
         "_IOServices",
-        ["reader", "writer", "tree_yielder"]
+        ["reader", "writer", "tree_yielder", "char_yielder"]
         )
 
 _IO_SERVICE_REGISTRY = container.CaseInsensitiveDict()
-_IO_SERVICE_REGISTRY["newick"] = _IOServices(newickreader.NewickReader, newickwriter.NewickWriter, newickyielder.NewickTreeDataYielder)
-_IO_SERVICE_REGISTRY["nexus"] = _IOServices(nexusreader.NexusReader, nexuswriter.NexusWriter, nexusyielder.NexusTreeDataYielder)
-_IO_SERVICE_REGISTRY["nexus/newick"] = _IOServices(None, None, nexusyielder.NexusNewickTreeDataYielder)
-_IO_SERVICE_REGISTRY["nexml"] = _IOServices(nexmlreader.NexmlReader, nexmlwriter.NexmlWriter, nexmlyielder.NexmlTreeDataYielder)
-_IO_SERVICE_REGISTRY["fasta"] = _IOServices(fastareader.FastaReader, fastawriter.FastaWriter, None)
-_IO_SERVICE_REGISTRY["dnafasta"] = _IOServices(fastareader.DnaFastaReader, fastawriter.FastaWriter, None)
-_IO_SERVICE_REGISTRY["rnafasta"] = _IOServices(fastareader.RnaFastaReader, fastawriter.FastaWriter, None)
-_IO_SERVICE_REGISTRY["proteinfasta"] = _IOServices(fastareader.ProteinFastaReader, fastawriter.FastaWriter, None)
-_IO_SERVICE_REGISTRY["phylip"] = _IOServices(phylipreader.PhylipReader, phylipwriter.PhylipWriter, None)
-_IO_SERVICE_REGISTRY["multiphylip"] = _IOServices(multiphylipreader.MultiPhylipReader, None, None)
+_IO_SERVICE_REGISTRY["newick"] = _IOServices(newickreader.NewickReader, newickwriter.NewickWriter, newickyielder.NewickTreeDataYielder, None)
+_IO_SERVICE_REGISTRY["nexus"] = _IOServices(nexusreader.NexusReader, nexuswriter.NexusWriter, nexusyielder.NexusTreeDataYielder, nexusyielder.NexusCharacterDataYielder)
+_IO_SERVICE_REGISTRY["nexus/newick"] = _IOServices(None, None, nexusyielder.NexusNewickTreeDataYielder, None)
+_IO_SERVICE_REGISTRY["nexml"] = _IOServices(nexmlreader.NexmlReader, nexmlwriter.NexmlWriter, nexmlyielder.NexmlTreeDataYielder, None)
+_IO_SERVICE_REGISTRY["fasta"] = _IOServices(fastareader.FastaReader, fastawriter.FastaWriter, None, fastayielder.FastaCharacterDataYielder)
+_IO_SERVICE_REGISTRY["dnafasta"] = _IOServices(fastareader.DnaFastaReader, fastawriter.FastaWriter, None, None)
+_IO_SERVICE_REGISTRY["rnafasta"] = _IOServices(fastareader.RnaFastaReader, fastawriter.FastaWriter, None, None)
+_IO_SERVICE_REGISTRY["proteinfasta"] = _IOServices(fastareader.ProteinFastaReader, fastawriter.FastaWriter, None, None)
+_IO_SERVICE_REGISTRY["phylip"] = _IOServices(phylipreader.PhylipReader, phylipwriter.PhylipWriter, None, phylipyielder.PhylipCharacterDataYielder)
+_IO_SERVICE_REGISTRY["multiphylip"] = _IOServices(multiphylipreader.MultiPhylipReader, None, None, None)
 
 def get_reader(schema, **kwargs):
     try:
@@ -92,9 +94,28 @@ def get_tree_yielder(
     except KeyError:
         raise NotImplementedError("'{}' is not a supported data yielding schema".format(schema))
 
-def register_service(schema, reader=None, writer=None, tree_yielder=None):
+def get_char_yielder(
+        files,
+        schema,
+        taxon_namespace,
+        char_matrix_factory,
+        **kwargs):
+    try:
+        yielder_type =_IO_SERVICE_REGISTRY[schema].char_yielder
+        if yielder_type is None:
+            raise KeyError
+        yielder = yielder_type(
+                files=files,
+                taxon_namespace=taxon_namespace,
+                char_matrix_factory=char_matrix_factory,
+                **kwargs)
+        return yielder
+    except KeyError:
+        raise NotImplementedError("'{}' is not a supported data yielding schema".format(schema))
+
+def register_service(schema, reader=None, writer=None, tree_yielder=None, char_yielder=None):
     global _IO_SERVICE_REGISTRY
-    _IO_SERVICE_REGISTRY[schema] = _IOServices(reader, writer, tree_yielder)
+    _IO_SERVICE_REGISTRY[schema] = _IOServices(reader, writer, tree_yielder, char_yielder)
 
 def register_reader(schema, reader):
     global _IO_SERVICE_REGISTRY
@@ -103,7 +124,8 @@ def register_reader(schema, reader):
         register_service(schema=schema,
                 reader=reader,
                 writer=current.writer,
-                tree_yielder=current.tree_yielder)
+                tree_yielder=current.tree_yielder,
+                char_yielder=current.char_yielder)
     except KeyError:
         register_service(schema=schema, reader=reader)
 
@@ -72,24 +72,75 @@ class FastaReader(ioservice.DataReader):
                     self.data_type,
                     label=None,
                     taxon_namespace=taxon_namespace)
-        symbol_state_map = char_matrix.default_state_alphabet.full_symbol_state_map
+        for taxon, sequence in self._parse_sequences(stream, char_matrix):
+            char_matrix[taxon] = sequence
+        product = self.Product(
+                taxon_namespaces=None,
+                tree_lists=None,
+                char_matrices=[char_matrix])
+        return product
+
+    def _parse_sequences(self, stream, char_matrix, column_start=0, column_stop=None):
+        """
+        Yields each taxon in ``stream`` with its sequence, created by but not
+        added to ``char_matrix``. If ``column_start`` or ``column_stop`` are
+        given, then only the symbols in columns ``column_start`` (inclusive) to
+        ``column_stop`` (exclusive) are decoded and kept.
+        """
+        taxon_namespace = char_matrix.taxon_namespace
+        state_alphabet = char_matrix.default_state_alphabet
+        symbol_state_map = state_alphabet.full_symbol_state_map
+        is_windowed = column_start > 0 or column_stop is not None
+        taxa_read = set()
         curr_vec = None
         curr_taxon = None
+        column_index = 0
         for line_index, line in enumerate(stream):
             s = line.strip()
             if not s:
                 continue
             if s.startswith('>'):
                 name = s[1:].strip()
-                curr_taxon = taxon_namespace.require_taxon(label=name)
-                if curr_taxon in char_matrix:
+                taxon = taxon_namespace.require_taxon(label=name)
+                if taxon in taxa_read:
                     raise DataParseError(message="FASTA error: Repeated sequence name ('{}') found".format(name), line_num=line_index + 1, stream=stream)
-                if curr_vec is not None and len(curr_vec) == 0:
+                if curr_vec is not None and column_index == 0:
                     raise DataParseError(message="FASTA error: Expected sequence, but found another sequence name ('{}')".format(name), line_num=line_index + 1, stream=stream)
-                curr_vec = char_matrix[curr_taxon]
+                if curr_vec is not None:
+                    yield curr_taxon, curr_vec
+                taxa_read.add(taxon)
+                curr_taxon = taxon
+                curr_vec = char_matrix._new_character_sequence()
+                column_index = 0
             elif curr_vec is None:
                 raise DataParseError(message="FASTA error: Expecting a lines starting with > before sequences", line_num=line_index + 1, stream=stream)
             else:
+                col_offset = 0
+                if is_windowed:
+                    # skip (without decoding) the symbols outside the window
+                    if " " in s or "\t" in s:
+                        s = "".join(s.split())
+                    start = max(column_start - column_index, 0)
+                    stop = len(s)
+                    if column_stop is not None:
+                        stop = min(column_stop - column_index, stop)
+                    column_index += len(s)
+                    if start >= stop:
+                        continue
+                    s = s[start:stop]
+                    col_offset = start
+                else:
+                    column_index += len(s)
+                # decode the whole line at once, falling through to report
+                # any unrecognized symbol below
+                try:
+                    if char_matrix.is_compact:
+                        curr_vec.extend_symbols(s)
+                    else:
+                        curr_vec.extend(state_alphabet.get_states_for_symbol_string(s))
+                    continue
+                except KeyError:
+                    pass
                 states = []
                 for col_ind, c in enumerate(s):
                     c = c.strip()
@@ -98,14 +149,11 @@ class FastaReader(ioservice.DataReader):
                     try:
                         state = symbol_state_map[c]
                     except KeyError:
-                        raise DataParseError(message="Unrecognized sequence symbol '{}'".format(c), line_num=line_index + 1, col_num=col_ind + 1, stream=stream)
+                        raise DataParseError(message="Unrecognized sequence symbol '{}'".format(c), line_num=line_index + 1, col_num=col_offset + col_ind + 1, stream=stream)
                     states.append(state)
                 curr_vec.extend(states)
-        product = self.Product(
-                taxon_namespaces=None,
-                tree_lists=None,
-                char_matrices=[char_matrix])
-        return product
+        if curr_vec is not None:
+            yield curr_taxon, curr_vec
 
 
 class DnaFastaReader(FastaReader):
@@ -58,15 +58,14 @@ class FastaWriter(ioservice.DataWriter):
             stream.write(">{}\n".format(taxon.label))
             seq = char_matrix[taxon]
             if self.wrap:
-                col_count = 0
-                for c in seq:
-                    if col_count == self.wrap_width:
-                        stream.write("\n")
-                        col_count = 0
-                    stream.write(str(c))
-                    col_count += 1
+                symbols = seq.symbols_as_string(sep="")
+                if len(symbols) != len(seq):
+                    # wrap by states, some of which have multi-character symbols
+                    symbols = seq.symbols_as_list()
+                stream.write("\n".join("".join(symbols[idx:idx+self.wrap_width])
+                    for idx in range(0, len(symbols), self.wrap_width)))
             else:
-                s = "".join("{}".format(c) for c in seq)
+                s = seq.symbols_as_string(sep="")
                 stream.write("{}\n".format(s))
             stream.write("\n\n")
 
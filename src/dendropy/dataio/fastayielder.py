@@ -0,0 +1,81 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+##############################################################################
+##  DendroPy Phylogenetic Computing Library.
+##
+##  Copyright 2010-2015 Jeet Sukumaran and Mark T. Holder.
+##  All rights reserved.
+##
+##  See "LICENSE.rst" for terms and conditions of usage.
+##
+##  If you use this work or any portion thereof in published work,
+##  please cite it as:
+##
+##     Sukumaran, J. and M. T. Holder. 2010. DendroPy: a Python library
+##     for phylogenetic computing. Bioinformatics 26: 1569-1571.
+##
+##############################################################################
+
+"""
+Implementation of FASTA-schema sequence iterator.
+"""
+
+from dendropy.dataio import ioservice
+from dendropy.dataio import fastareader
+
+class FastaCharacterDataYielder(
+        ioservice.CharacterDataYielder,
+        fastareader.FastaReader):
+
+    def __init__(self,
+            files=None,
+            taxon_namespace=None,
+            char_matrix_factory=None,
+            column_window=None,
+            **kwargs):
+        r"""
+
+        Parameters
+        ----------
+        files : iterable of sources
+            Iterable of sources, which can either be strings specifying file
+            paths or file-like objects open for reading. If a source element is
+            a string (``isinstance(i,str) == True``), then it is assumed to be
+            a path to a file. Otherwise, the source is assumed to be a file-like
+            object.
+        taxon_namespace : |TaxonNamespace| instance
+            The operational taxonomic unit concept namespace to use to manage
+            taxon definitions.
+        char_matrix_factory : function
+            Returns a new character matrix when called with a
+            ``taxon_namespace`` keyword argument.
+        column_window : tuple of two integers
+            If given, then only the columns from the first (inclusive) to the
+            second (exclusive) are decoded and yielded.
+        \*\*kwargs : keyword arguments
+            These will be passed directly to the base `fastareader.FastaReader`
+            class. See `fastareader.FastaReader` for details.
+        """
+        ioservice.CharacterDataYielder.__init__(self,
+                files=files,
+                taxon_namespace=taxon_namespace,
+                char_matrix_factory=char_matrix_factory,
+                column_window=column_window)
+        fastareader.FastaReader.__init__(self, **kwargs)
+        self.attached_taxon_namespace = self.taxon_namespace
+
+    ###########################################################################
+    ## Implementation of DataYielder interface
+
+    def _yield_items_from_stream(self, stream):
+        if self.default_state_alphabet is not None:
+            char_matrix = self.new_char_matrix(default_state_alphabet=self.default_state_alphabet)
+        else:
+            char_matrix = self.new_char_matrix()
+        for taxon, sequence in self._parse_sequences(
+                stream,
+                char_matrix,
+                column_start=self.column_start,
+                column_stop=self.column_stop):
+            yield taxon, sequence
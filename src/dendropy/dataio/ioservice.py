@@ -18,6 +18,7 @@
 ##############################################################################
 
 import collections
+import itertools
 from dendropy.datamodel import taxonmodel
 from dendropy.utility import deprecate
 from dendropy.utility import textprocessing
@@ -585,6 +586,11 @@ class DataYielder(IOService):
 
 class TreeDataYielder(DataYielder):
 
+    # If |True|, then ``_yield_items_from_stream()`` yields |SplitRecord|
+    # instances (encoded by the encoders of ``new_split_record_encoder_iter()``)
+    # if a split record encoder is set, instead of Tree objects.
+    is_split_record_yielder = False
+
     def __init__(self,
             files=None,
             taxon_namespace=None,
@@ -594,8 +600,95 @@ class TreeDataYielder(DataYielder):
         assert self.taxon_namespace is not None
         self.attached_taxon_namespace = self.taxon_namespace
         self.tree_type = tree_type
+        self.split_record_encoder = None
+        self.split_record_tree_offset = 0
 
     def tree_factory(self):
         return self.tree_type(taxon_namespace=self.taxon_namespace)
 
+    def set_split_record_encoder(self, split_record_encoder, tree_offset=0):
+        """
+        Sets this yielder to yield |SplitRecord| instances, as encoded by
+        ``split_record_encoder``, instead of Tree objects, skipping the trees
+        before ``tree_offset`` in each source.
+        """
+        self.split_record_encoder = split_record_encoder
+        self.split_record_tree_offset = tree_offset
+
+    def new_split_record_encoder_iter(self):
+        """
+        Returns an iterator over the encoders of successive trees of a source:
+        trees that will be skipped are encoded without node ages.
+        """
+        return itertools.chain(
+                itertools.repeat(self.split_record_encoder.without_node_ages(),
+                    self.split_record_tree_offset),
+                itertools.repeat(self.split_record_encoder))
+
+    def __iter__(self):
+        if self.split_record_encoder is None:
+            for tree in DataYielder.__iter__(self):
+                yield tree
+            return
+        current_file_index = None
+        tree_offset = None
+        for item in DataYielder.__iter__(self):
+            if current_file_index != self._current_file_index:
+                current_file_index = self._current_file_index
+                tree_offset = 0
+            if tree_offset >= self.split_record_tree_offset:
+                if not self.is_split_record_yielder:
+                    item = self.split_record_encoder.encode_tree(item)
+                yield item
+            tree_offset += 1
+
+
+###############################################################################
+## CharacterDataYielder
+
+class CharacterDataYielder(DataYielder):
+    """
+    Base class for iterators over the sequences of character data sources,
+    yielding ``(taxon, sequence)`` pairs one at a time instead of accumulating
+    them in a character matrix.
+    """
+
+    def __init__(self,
+            files=None,
+            taxon_namespace=None,
+            char_matrix_factory=None,
+            column_window=None):
+        DataYielder.__init__(self, files=files)
+        self.taxon_namespace = taxon_namespace
+        assert self.taxon_namespace is not None
+        self.attached_taxon_namespace = self.taxon_namespace
+        self.char_matrix_factory = char_matrix_factory
+        if column_window is None:
+            column_window = (None, None)
+        self.column_start, self.column_stop = column_window
+        if self.column_start is None:
+            self.column_start = 0
+        if self.column_start < 0 or (self.column_stop is not None and self.column_stop < 0):
+            raise ValueError("Column window must be given by non-negative indexes: {}".format(column_window))
+        if self.column_stop is not None and self.column_stop < self.column_start:
+            raise ValueError("Column window must not end before it starts: {}".format(column_window))
+
+    def new_char_matrix(self, **kwargs):
+        """
+        Returns a new (empty) character matrix, on ``self.taxon_namespace``
+        unless otherwise specified, used to create the sequences yielded.
+        """
+        kwargs["taxon_namespace"] = kwargs.get("taxon_namespace", self.taxon_namespace)
+        return self.char_matrix_factory(**kwargs)
+
+    def apply_column_window(self, sequence):
+        """
+        Removes the values of ``sequence`` outside the column window, if any,
+        and returns it.
+        """
+        if self.column_stop is not None:
+            del sequence[self.column_stop:]
+        if self.column_start > 0:
+            del sequence[:self.column_start]
+        return sequence
 
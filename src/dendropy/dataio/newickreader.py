@@ -22,6 +22,7 @@ Parsing of NEWICK-format tree from a stream.
 """
 
 from io import StringIO
+import re
 import itertools as it
 from dendropy.utility import error
 from dendropy.utility import deprecate
@@ -29,6 +30,21 @@ from dendropy.dataio import tokenizer
 from dendropy.dataio import nexusprocessing
 from dendropy.dataio import ioservice
 
+##############################################################################
+## Fast-path tokenizing
+
+# A single token of a NEWICK tree statement, as one of the groups:
+# (punctuation, quoted label, comment, unquoted label or value, other)
+_FAST_PATH_TOKEN_PATTERN = re.compile(
+        r"""[ \t\n\r]*(?:([(),:;])|('(?:[^']|'')*')|(\[[^\[\]]*\])|([^ \t\n\r(){},:;="\['][^ \t\n\r(){},:;="\[]*)|(.))""",
+        re.DOTALL)
+
+# A comment immediately followed by a quote: the quote is taken literally, as
+# part of an unquoted label, which is left to the general parser. (Comments
+# embedded in unquoted labels otherwise split the label into two tokens,
+# which fail validation.)
+_FAST_PATH_UNSUPPORTED_PATTERN = re.compile(r"""\]'""")
+
 ##############################################################################
 ## NewickReader
 
@@ -186,6 +202,17 @@ class NewickReader(ioservice.DataReader):
         terminating_semicolon_required : boolean, default: |True|
             If |True| [default], then a tree statement that does not end in a
             semi-colon is an error. If |False|, then no error will be raised.
+        buffered_tokenizer : boolean, default: |True|
+            If |True| [default], the source is read and tokenized in large
+            blocks. If |False|, the source is read one character at a time,
+            which is much slower, but never reads beyond the current token.
+        fast_tree_parsing : boolean, default: |True|
+            If |True| [default], tree statements in the common form (labels,
+            edge lengths and comments, with every leaf labeled) are parsed
+            in a single pass over the statement text; other statements are
+            parsed by the general parser. Requires ``buffered_tokenizer``. If
+            |False|, all statements are parsed by the general parser. The
+            resulting trees are identical either way.
         ignore_unrecognized_keyword_arguments : boolean, default: |False|
             If |True|, then unsupported or unrecognized keyword arguments will
             not result in an error. Default is |False|: unsupported keyword
@@ -261,6 +288,8 @@ class NewickReader(ioservice.DataReader):
         if self.is_assign_internal_labels_to_edges and not self.suppress_internal_node_taxa:
             raise ValueError("Conflicting options: cannot simultaneously assign internal labels to edges and to internal taxa")
         self.terminating_semicolon_required = kwargs.pop("terminating_semicolon_required", True)
+        self.buffered_tokenizer = kwargs.pop("buffered_tokenizer", True)
+        self.fast_tree_parsing = kwargs.pop("fast_tree_parsing", True)
         self.check_for_unused_keyword_arguments(kwargs)
 
         # per-tree book-keeping
@@ -291,8 +320,7 @@ class NewickReader(ioservice.DataReader):
             An iterator yielding |Tree| objects constructed based on
             data in ``stream``.
         """
-        nexus_tokenizer = nexusprocessing.NexusTokenizer(stream,
-                preserve_unquoted_underscores=self.preserve_unquoted_underscores)
+        nexus_tokenizer = self.create_tokenizer(stream)
         while True:
             tree = self._parse_tree_statement(
                     nexus_tokenizer=nexus_tokenizer,
@@ -303,6 +331,14 @@ class NewickReader(ioservice.DataReader):
                 # raise StopIteration
                 return
 
+    def create_tokenizer(self, stream):
+        """
+        Returns a NEXUS/NEWICK tokenizer configured for this reader.
+        """
+        return nexusprocessing.new_nexus_tokenizer(stream,
+                preserve_unquoted_underscores=self.preserve_unquoted_underscores,
+                is_buffered=self.buffered_tokenizer)
+
     def _read(self,
             stream,
             taxon_namespace_factory=None,
@@ -353,13 +389,79 @@ class NewickReader(ioservice.DataReader):
         current token will be the token immediately following the semi-colon,
         if any.
         """
+        tree_comments = self._seek_tree_statement(nexus_tokenizer)
+        if nexus_tokenizer.is_eof():
+            return None
+        if nexus_tokenizer.current_token == "(" and self.fast_tree_parsing:
+            tree = self._parse_tree_statement_fast(
+                    nexus_tokenizer=nexus_tokenizer,
+                    tree_factory=tree_factory,
+                    taxon_symbol_map_fn=taxon_symbol_map_fn,
+                    tree_comments=tree_comments)
+            if tree is not None:
+                return tree
+        return self._parse_tree_statement_general(
+                nexus_tokenizer=nexus_tokenizer,
+                tree_factory=tree_factory,
+                taxon_symbol_map_fn=taxon_symbol_map_fn,
+                tree_comments=tree_comments)
+
+    def _parse_split_record_statement(self,
+            nexus_tokenizer,
+            tree_factory,
+            taxon_symbol_map_fn,
+            split_record_encoder):
+        """
+        Parses a single tree statement as ``_parse_tree_statement()``, but
+        returns a |SplitRecord| of the tree, as encoded by
+        ``split_record_encoder``, instead of a Tree object. If the statement
+        is supported by the fast path (and ``finish_node_fn`` is not set),
+        then the record is encoded directly from the tokens of the statement,
+        without constructing a Tree object.
+        """
+        tree_comments = self._seek_tree_statement(nexus_tokenizer)
+        if nexus_tokenizer.is_eof():
+            return None
+        if (nexus_tokenizer.current_token == "("
+                and self.fast_tree_parsing
+                and self.finish_node_fn is None):
+            split_record = self._parse_split_record_statement_fast(
+                    nexus_tokenizer=nexus_tokenizer,
+                    taxon_symbol_map_fn=taxon_symbol_map_fn,
+                    tree_comments=tree_comments,
+                    split_record_encoder=split_record_encoder)
+            if split_record is not None:
+                return split_record
+        tree = self._parse_tree_statement_general(
+                nexus_tokenizer=nexus_tokenizer,
+                tree_factory=tree_factory,
+                taxon_symbol_map_fn=taxon_symbol_map_fn,
+                tree_comments=tree_comments)
+        return split_record_encoder.encode_tree(tree)
+
+    def _seek_tree_statement(self, nexus_tokenizer):
+        """
+        Skips over any semi-colons preceding the next tree statement, and
+        returns the comments preceding it.
+        """
         current_token = nexus_tokenizer.current_token
         tree_comments = nexus_tokenizer.pull_captured_comments()
         while (current_token == ";" or current_token is None) and not nexus_tokenizer.is_eof():
             current_token = nexus_tokenizer.require_next_token()
             tree_comments = nexus_tokenizer.pull_captured_comments()
-        if nexus_tokenizer.is_eof():
-            return None
+        return tree_comments
+
+    def _parse_tree_statement_general(self,
+            nexus_tokenizer,
+            tree_factory,
+            taxon_symbol_map_fn,
+            tree_comments):
+        """
+        Parses a single tree statement token by token. Expects the current
+        token to be the first token of the statement, with the tree comments
+        already pulled.
+        """
+        current_token = nexus_tokenizer.current_token
         if current_token != "(":
             # allow for possibility of single node tree, e.g.: T0:10;
             self._parenthesis_nesting_level = 0
@@ -395,6 +497,313 @@ class NewickReader(ioservice.DataReader):
             current_token = nexus_tokenizer.next_token()
         return tree
 
+    def _parse_tree_statement_fast(self,
+            nexus_tokenizer,
+            tree_factory,
+            taxon_symbol_map_fn,
+            tree_comments):
+        """
+        Parses a single tree statement in a single pass over the text of the
+        statement, if the statement is in the subset supported by the fast
+        path (see ``_validate_fast_path_tokens()``), and constructs a
+        corresponding Tree object identical to that which would be constructed
+        by the general parser. Expects the current token to be the parenthesis
+        that opens the tree statement, with the tree comments already pulled.
+        If the statement is not supported, returns |None| without consuming
+        any of the statement.
+        """
+        statement = nexus_tokenizer.peek_statement()
+        if statement is None or _FAST_PATH_UNSUPPORTED_PATTERN.search(statement):
+            return None
+        tokens = _FAST_PATH_TOKEN_PATTERN.findall(statement)
+        edge_lengths = self._validate_fast_path_tokens(tokens)
+        if edge_lengths is None:
+            return None
+        tree = tree_factory()
+        self._process_tree_comments(tree, tree_comments, nexus_tokenizer)
+        self._build_tree_from_fast_path_tokens(
+                tree=tree,
+                tokens=tokens,
+                edge_lengths=edge_lengths,
+                taxon_symbol_map_fn=taxon_symbol_map_fn,
+                nexus_tokenizer=nexus_tokenizer,
+                statement=statement)
+        self._complete_fast_path_statement(nexus_tokenizer, statement)
+        return tree
+
+    def _parse_split_record_statement_fast(self,
+            nexus_tokenizer,
+            taxon_symbol_map_fn,
+            tree_comments,
+            split_record_encoder):
+        """
+        Parses a single tree statement as ``_parse_tree_statement_fast()``,
+        but returns a |SplitRecord| of the tree, encoded directly from the
+        post-order sequence of nodes of the statement, instead of a Tree
+        object. Node comments are discarded.
+        """
+        statement = nexus_tokenizer.peek_statement()
+        if statement is None or _FAST_PATH_UNSUPPORTED_PATTERN.search(statement):
+            return None
+        tokens = _FAST_PATH_TOKEN_PATTERN.findall(statement)
+        edge_lengths = self._validate_fast_path_tokens(tokens)
+        if edge_lengths is None:
+            return None
+        is_rooted, weight = self._parse_tree_rooting_and_weight(tree_comments, nexus_tokenizer)
+        nodes = self._build_postorder_nodes_from_fast_path_tokens(
+                tokens=tokens,
+                edge_lengths=edge_lengths,
+                taxon_symbol_map_fn=taxon_symbol_map_fn,
+                nexus_tokenizer=nexus_tokenizer,
+                statement=statement)
+        self._complete_fast_path_statement(nexus_tokenizer, statement)
+        return split_record_encoder.encode_postorder_nodes(
+                nodes=nodes,
+                is_rooted=is_rooted,
+                weight=weight)
+
+    def _complete_fast_path_statement(self, nexus_tokenizer, statement):
+        # consume the (peeked) statement, leaving the token following the
+        # terminating semi-colon(s) as the current token
+        nexus_tokenizer.skip_chars(len(statement) - 1)
+        nexus_tokenizer.require_next_token() # terminating ';'
+        current_token = nexus_tokenizer.next_token()
+        while current_token == ";" and not nexus_tokenizer.is_eof():
+            nexus_tokenizer.clear_captured_comments()
+            current_token = nexus_tokenizer.next_token()
+
+    def _validate_fast_path_tokens(self, tokens):
+        """
+        Checks that the tokens of a tree statement (following the opening
+        parenthesis) are in the subset supported by the fast path: a
+        well-formed statement in which every leaf node has a label, every
+        node has at most one label and edge length, in that order, and every
+        edge length is valid. Returns the list of edge lengths (empty if
+        ``suppress_edge_lengths`` is |True|) if so, or |None| if not.
+        """
+        # states: 0 = expecting a node; 1 = following a closing parenthesis;
+        # 2 = following a label; 3 = expecting an edge length; 4 = following
+        # an edge length
+        edge_lengths = []
+        state = 0
+        nesting_level = 1
+        last_idx = len(tokens) - 1
+        for idx, (punctuation, quoted, comment, word, other) in enumerate(tokens):
+            if comment:
+                continue
+            elif other:
+                return None
+            elif state == 3:
+                if not word:
+                    return None
+                if not self.suppress_edge_lengths:
+                    if not self.preserve_unquoted_underscores:
+                        word = word.replace("_", " ")
+                    try:
+                        edge_lengths.append(self.edge_length_type(word))
+                    except ValueError:
+                        return None
+                state = 4
+            elif word or quoted:
+                if state > 1:
+                    return None
+                state = 2
+            elif punctuation == "(":
+                if state != 0:
+                    return None
+                nesting_level += 1
+            elif punctuation == ":":
+                if state != 1 and state != 2:
+                    return None
+                state = 3
+            elif state == 0:
+                return None
+            elif punctuation == ",":
+                if nesting_level < 1:
+                    return None
+                state = 0
+            elif punctuation == ")":
+                nesting_level -= 1
+                if nesting_level < 0:
+                    return None
+                state = 1
+            else:
+                # ';'
+                if nesting_level != 0 or idx != last_idx:
+                    return None
+                return edge_lengths
+        return None
+
+    def _build_tree_from_fast_path_tokens(self,
+            tree,
+            tokens,
+            edge_lengths,
+            taxon_symbol_map_fn,
+            nexus_tokenizer,
+            statement):
+        """
+        Populates ``tree`` from the (validated) tokens of a tree statement,
+        using an explicit stack of open internal nodes. Comments are assigned,
+        and ``finish_node_fn`` called, exactly as by the general parser.
+        """
+        node_factory = tree.node_factory
+        process_comments_for_item = nexusprocessing.process_comments_for_item
+        extract_comment_metadata = self.extract_comment_metadata
+        finish_node_fn = self.finish_node_fn
+        edge_lengths = iter(edge_lengths)
+        seen_taxa = set()
+        # open internal nodes, with their comments
+        stack = [(tree.seed_node, [])]
+        # current node (|None| if expecting a new node), and its comments (or
+        # those of the node to be created)
+        node = None
+        node_comments = []
+        is_internal_node = False
+        is_expecting_edge_length = False
+        for idx, (punctuation, quoted, comment, word, other) in enumerate(tokens):
+            if comment:
+                node_comments.append(comment[1:-1])
+            elif punctuation:
+                if punctuation == "(":
+                    stack.append((node_factory(), node_comments))
+                    node_comments = []
+                elif punctuation == ":":
+                    is_expecting_edge_length = True
+                else:
+                    if node_comments:
+                        process_comments_for_item(item=node,
+                                item_comments=node_comments,
+                                extract_comment_metadata=extract_comment_metadata)
+                    if finish_node_fn is not None:
+                        finish_node_fn(node)
+                    if punctuation == ";":
+                        break
+                    stack[-1][0].add_child(node)
+                    if punctuation == ",":
+                        node = None
+                        node_comments = []
+                    else:
+                        node, node_comments = stack.pop()
+                        is_internal_node = True
+            elif is_expecting_edge_length:
+                if not self.suppress_edge_lengths:
+                    node.edge_length = next(edge_lengths)
+                is_expecting_edge_length = False
+            else:
+                if node is None:
+                    node = node_factory()
+                    is_internal_node = False
+                label = self._fast_path_token_label(quoted, word)
+                if ( (is_internal_node and self.suppress_internal_node_taxa)
+                        or ((not is_internal_node) and self.suppress_leaf_node_taxa) ):
+                    if self.is_assign_internal_labels_to_edges:
+                        node.edge.label = label
+                    else:
+                        node.label = label
+                else:
+                    node.taxon = self._fast_path_token_taxon(
+                            label=label,
+                            token_idx=idx,
+                            seen_taxa=seen_taxa,
+                            taxon_symbol_map_fn=taxon_symbol_map_fn,
+                            nexus_tokenizer=nexus_tokenizer,
+                            statement=statement)
+
+    def _build_postorder_nodes_from_fast_path_tokens(self,
+            tokens,
+            edge_lengths,
+            taxon_symbol_map_fn,
+            nexus_tokenizer,
+            statement):
+        """
+        Returns the nodes of the tree of the (validated) tokens of a tree
+        statement in post-order, each as a list of: the number of child nodes,
+        the |Taxon| (or |None|), and the edge length (or |None|), as required
+        by ``SplitRecordEncoder.encode_postorder_nodes()``. Taxa are
+        resolved, and duplicate taxa reported, as by
+        ``_build_tree_from_fast_path_tokens()``.
+        """
+        nodes = []
+        edge_lengths = iter(edge_lengths)
+        seen_taxa = set()
+        # open internal nodes
+        stack = [[0, None, None]]
+        # current node (|None| if expecting a new node)
+        node = None
+        is_internal_node = False
+        is_expecting_edge_length = False
+        for idx, (punctuation, quoted, comment, word, other) in enumerate(tokens):
+            if comment:
+                continue
+            elif punctuation:
+                if punctuation == "(":
+                    stack.append([0, None, None])
+                elif punctuation == ":":
+                    is_expecting_edge_length = True
+                else:
+                    nodes.append(node)
+                    if punctuation == ";":
+                        break
+                    stack[-1][0] += 1
+                    if punctuation == ",":
+                        node = None
+                    else:
+                        node = stack.pop()
+                        is_internal_node = True
+            elif is_expecting_edge_length:
+                if not self.suppress_edge_lengths:
+                    node[2] = next(edge_lengths)
+                is_expecting_edge_length = False
+            else:
+                if node is None:
+                    node = [0, None, None]
+                    is_internal_node = False
+                if ( (is_internal_node and self.suppress_internal_node_taxa)
+                        or ((not is_internal_node) and self.suppress_leaf_node_taxa) ):
+                    continue
+                node[1] = self._fast_path_token_taxon(
+                        label=self._fast_path_token_label(quoted, word),
+                        token_idx=idx,
+                        seen_taxa=seen_taxa,
+                        taxon_symbol_map_fn=taxon_symbol_map_fn,
+                        nexus_tokenizer=nexus_tokenizer,
+                        statement=statement)
+        return nodes
+
+    def _fast_path_token_label(self, quoted, word):
+        if word:
+            if not self.preserve_unquoted_underscores and "_" in word:
+                return word.replace("_", " ")
+            return word
+        else:
+            return quoted[1:-1].replace("''", "'")
+
+    def _fast_path_token_taxon(self,
+            label,
+            token_idx,
+            seen_taxa,
+            taxon_symbol_map_fn,
+            nexus_tokenizer,
+            statement):
+        node_taxon = taxon_symbol_map_fn(label)
+        if node_taxon in seen_taxa:
+            line_num, col_num = self._fast_path_token_line_col(
+                    nexus_tokenizer=nexus_tokenizer,
+                    statement=statement,
+                    token_idx=token_idx)
+            raise NewickReader.NewickReaderDuplicateTaxonError(
+                    message=node_taxon.label,
+                    line_num=line_num,
+                    col_num=col_num,
+                    stream=nexus_tokenizer.src)
+        seen_taxa.add(node_taxon)
+        return node_taxon
+
+    def _fast_path_token_line_col(self, nexus_tokenizer, statement, token_idx):
+        for m in it.islice(_FAST_PATH_TOKEN_PATTERN.finditer(statement), token_idx + 1):
+            pass
+        return nexus_tokenizer.line_col_at(m.start(m.lastindex))
+
     def _process_tree_comments(self, tree, tree_comments, nexus_tokenizer):
         # NOTE: this also unconditionally sets the tree rootedness and
         # weighting if no comment indicating these are found; for this to work
@@ -415,34 +824,8 @@ class NewickReader(ioservice.DataReader):
             elif (self.store_tree_weights
                     and (stripped_comment.startswith("&W ") or stripped_comment.startswith("&w "))
                     ):
-                try:
-                    weight_expression = stripped_comment[2:]
-                    if not weight_expression:
-                        raise ValueError
-                    we_parts = weight_expression.split("/")
-                    if len(we_parts) > 2:
-                        raise ValueError
-                        # raise NewickReader.NewickReaderInvalidValueError(
-                        #         message="Invalid tree weight expression: '{}'".format(weight_expression),
-                        #         line_num=nexus_tokenizer.token_line_num,
-                        #         col_num=nexus_tokenizer.token_column_num,
-                        #         stream=nexus_tokenizer.src)
-                    elif len(we_parts) == 2:
-                        x = float(we_parts[0])
-                        y = float(we_parts[1])
-                        tree.weight = x/y
-                    else:
-                        tree.weight = float(we_parts[0])
-                    weighting_token_found = True
-                except ValueError:
-                    exc = NewickReader.NewickReaderInvalidValueError(
-                            message="Invalid tree weight expression: '{}'".format(stripped_comment),
-                            line_num=nexus_tokenizer.token_line_num,
-                            col_num=nexus_tokenizer.token_column_num,
-                            stream=nexus_tokenizer.src)
-                    exc.__context__ = None # Python 3.0, 3.1, 3.2
-                    exc.__cause__ = None # Python 3.3, 3.4
-                    raise exc
+                tree.weight = self._parse_tree_weight(stripped_comment, nexus_tokenizer)
+                weighting_token_found = True
             elif self.extract_comment_metadata and comment.startswith("&"):
                 annotations = nexusprocessing.parse_comment_metadata_to_annotations(
                     comment=comment)
@@ -457,6 +840,57 @@ class NewickReader(ioservice.DataReader):
         if self.store_tree_weights and not weighting_token_found:
             tree.weight = self.default_tree_weight
 
+    def _parse_tree_rooting_and_weight(self, tree_comments, nexus_tokenizer):
+        """
+        Returns the rooting state and weight of a tree with the given
+        comments, as set by ``_process_tree_comments()``, without processing
+        any other comments.
+        """
+        rooting_comment = ""
+        if self.store_tree_weights:
+            weight = self.default_tree_weight
+        else:
+            weight = None
+        if tree_comments:
+            for comment in tree_comments:
+                stripped_comment = comment.strip()
+                if stripped_comment in ["&u", "&U", "&r", "&R"]:
+                    rooting_comment = stripped_comment
+                elif (self.store_tree_weights
+                        and (stripped_comment.startswith("&W ") or stripped_comment.startswith("&w "))
+                        ):
+                    weight = self._parse_tree_weight(stripped_comment, nexus_tokenizer)
+        return self._parse_tree_rooting_state(rooting_comment), weight
+
+    def _parse_tree_weight(self, weight_comment, nexus_tokenizer):
+        try:
+            weight_expression = weight_comment[2:]
+            if not weight_expression:
+                raise ValueError
+            we_parts = weight_expression.split("/")
+            if len(we_parts) > 2:
+                raise ValueError
+                # raise NewickReader.NewickReaderInvalidValueError(
+                #         message="Invalid tree weight expression: '{}'".format(weight_expression),
+                #         line_num=nexus_tokenizer.token_line_num,
+                #         col_num=nexus_tokenizer.token_column_num,
+                #         stream=nexus_tokenizer.src)
+            elif len(we_parts) == 2:
+                x = float(we_parts[0])
+                y = float(we_parts[1])
+                return x/y
+            else:
+                return float(we_parts[0])
+        except ValueError:
+            exc = NewickReader.NewickReaderInvalidValueError(
+                    message="Invalid tree weight expression: '{}'".format(weight_comment),
+                    line_num=nexus_tokenizer.token_line_num,
+                    col_num=nexus_tokenizer.token_column_num,
+                    stream=nexus_tokenizer.src)
+            exc.__context__ = None # Python 3.0, 3.1, 3.2
+            exc.__cause__ = None # Python 3.3, 3.4
+            raise exc
+
     def _parse_tree_rooting_state(self, rooting_comment=None):
         """
         Returns rooting state for tree with given rooting comment token, taking
@@ -593,7 +1027,7 @@ class NewickReader(ioservice.DataReader):
                                 line_num=nexus_tokenizer.token_line_num,
                                 col_num=nexus_tokenizer.token_column_num,
                                 stream=nexus_tokenizer.src)
-                    current_node.edge.length = edge_length
+                    current_node.edge_length = edge_length
                 try:
                     nexus_tokenizer.require_next_token()
                 except tokenizer.Tokenizer.UnexpectedEndOfStreamError as e:
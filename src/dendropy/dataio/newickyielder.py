@@ -27,6 +27,8 @@ from dendropy.dataio import nexusprocessing
 
 class NewickTreeDataYielder(ioservice.TreeDataYielder):
 
+    is_split_record_yielder = True
+
     def __init__(self,
             files=None,
             taxon_namespace=None,
@@ -58,17 +60,25 @@ class NewickTreeDataYielder(ioservice.TreeDataYielder):
     ## Implementation of DataYielder interface
 
     def _yield_items_from_stream(self, stream):
-        nexus_tokenizer = nexusprocessing.NexusTokenizer(stream,
-                preserve_unquoted_underscores=self.newick_reader.preserve_unquoted_underscores)
+        nexus_tokenizer = self.newick_reader.create_tokenizer(stream)
         taxon_symbol_mapper = nexusprocessing.NexusTaxonSymbolMapper(
                 taxon_namespace=self.attached_taxon_namespace,
                 enable_lookup_by_taxon_number=False,
                 case_sensitive=self.newick_reader.case_sensitive_taxon_labels)
+        if self.split_record_encoder is not None:
+            split_record_encoders = self.new_split_record_encoder_iter()
         while True:
-            tree = self.newick_reader._parse_tree_statement(
-                    nexus_tokenizer=nexus_tokenizer,
-                    tree_factory=self.tree_factory,
-                    taxon_symbol_map_fn=taxon_symbol_mapper.require_taxon_for_symbol)
+            if self.split_record_encoder is None:
+                tree = self.newick_reader._parse_tree_statement(
+                        nexus_tokenizer=nexus_tokenizer,
+                        tree_factory=self.tree_factory,
+                        taxon_symbol_map_fn=taxon_symbol_mapper.require_taxon_for_symbol)
+            else:
+                tree = self.newick_reader._parse_split_record_statement(
+                        nexus_tokenizer=nexus_tokenizer,
+                        tree_factory=self.tree_factory,
+                        taxon_symbol_map_fn=taxon_symbol_mapper.require_taxon_for_symbol,
+                        split_record_encoder=next(split_record_encoders))
             if tree is None:
                 break
             yield tree
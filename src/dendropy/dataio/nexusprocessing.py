@@ -25,6 +25,7 @@ import re
 import itertools
 import decimal
 from dendropy.dataio.tokenizer import Tokenizer
+from dendropy.dataio.tokenizer import BufferedTokenizer
 from dendropy.utility import textprocessing
 from dendropy.utility import container
 from dendropy.datamodel import basemodel
@@ -32,12 +33,15 @@ from dendropy.datamodel import basemodel
 ##############################################################################
 ## NexusTokenizer
 
-class NexusTokenizer(Tokenizer):
+class NexusTokenizerMixin(object):
+    """
+    Mixin class providing the NEXUS/NEWICK tokenizing configuration and
+    convenience methods; combined with one of the tokenizing engines
+    (|BufferedTokenizer| or |Tokenizer|) below.
+    """
 
-    def __init__(self, src,
-            preserve_unquoted_underscores=False):
-        Tokenizer.__init__(self,
-            src=src,
+    def _nexus_tokenizer_configuration(self, preserve_unquoted_underscores):
+        return dict(
             uncaptured_delimiters=set(" \t\n\r"),
             captured_delimiters=set(r'{}(),;:=\"'),
             quote_chars=set("'"),
@@ -47,14 +51,6 @@ class NexusTokenizer(Tokenizer):
             comment_end=set("]"),
             capture_comments=True,
             preserve_unquoted_underscores=preserve_unquoted_underscores)
-        # self.preserve_unquoted_underscores = preserve_unquoted_underscores
-
-    # def __next__(self):
-        # Tokenizer.__next__(self)
-        # if (not self.preserve_unquoted_underscores
-        #         and not self.is_token_quoted):
-        #     self.current_token = self.current_token.replace("_", " ")
-        # return self.current_token
 
     def set_capture_eol(self, capture_eol):
         if capture_eol:
@@ -83,6 +79,7 @@ class NexusTokenizer(Tokenizer):
                 self.uncaptured_delimiters.add("\n")
             if "\r" not in self.uncaptured_delimiters:
                 self.uncaptured_delimiters.add("\r")
+        self.reset_scanners()
 
     def set_hyphens_as_captured_delimiters(self, hyphens_as_captured_delimiters):
         if hyphens_as_captured_delimiters:
@@ -93,6 +90,7 @@ class NexusTokenizer(Tokenizer):
                 self.captured_delimiters.discard("-")
             except ValueError:
                 pass
+        self.reset_scanners()
 
     def require_next_token_ucase(self):
         t = self.require_next_token()
@@ -125,9 +123,63 @@ class NexusTokenizer(Tokenizer):
 
     def skip_to_semicolon(self):
         token = self.next_token()
-        while token != ';' and not self._cur_char == "" and token != None:
+        while token != ';' and not self.is_eof() and token != None:
             token = self.next_token()
 
+    def peek_statement(self):
+        """
+        Returns the source text from the current position up to and including
+        the semi-colon terminating the current statement, without consuming
+        it, or |None| if this cannot be determined (e.g., the tokenizer engine
+        does not support look-ahead, the source is exhausted, or the default
+        delimiters have been modified).
+        """
+        if "\n" in self.captured_delimiters or "-" in self.captured_delimiters:
+            return None
+        return self.peek_to(";")
+
+class NexusTokenizer(NexusTokenizerMixin, BufferedTokenizer):
+    """
+    NEXUS/NEWICK tokenizer that reads the source in blocks of
+    ``buffer_size`` characters (see |BufferedTokenizer|). This is the
+    default tokenizer used by the NEXUS and NEWICK readers.
+    """
+
+    def __init__(self, src,
+            preserve_unquoted_underscores=False,
+            buffer_size=None):
+        BufferedTokenizer.__init__(self,
+            src=src,
+            buffer_size=buffer_size,
+            **self._nexus_tokenizer_configuration(preserve_unquoted_underscores))
+
+class UnbufferedNexusTokenizer(NexusTokenizerMixin, Tokenizer):
+    """
+    NEXUS/NEWICK tokenizer that reads the source one character at a time.
+    Produces exactly the same tokens as |NexusTokenizer|; retained as a
+    fallback for sources that must not be read ahead of the current token.
+    """
+
+    def __init__(self, src,
+            preserve_unquoted_underscores=False):
+        Tokenizer.__init__(self,
+            src=src,
+            **self._nexus_tokenizer_configuration(preserve_unquoted_underscores))
+
+def new_nexus_tokenizer(src,
+        preserve_unquoted_underscores=False,
+        is_buffered=True):
+    """
+    Returns a |NexusTokenizer| if ``is_buffered`` is |True| (default) or an
+    |UnbufferedNexusTokenizer| otherwise.
+    """
+    if is_buffered:
+        return NexusTokenizer(src,
+                preserve_unquoted_underscores=preserve_unquoted_underscores)
+    else:
+        return UnbufferedNexusTokenizer(src,
+                preserve_unquoted_underscores=preserve_unquoted_underscores)
+
 ###############################################################################
 ## Taxon Handling
 
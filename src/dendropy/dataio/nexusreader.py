@@ -385,7 +385,8 @@ class NexusReader(ioservice.DataReader):
     ## Tokenizer Control
 
     def create_tokenizer(self, stream, **kwargs):
-        self._nexus_tokenizer = nexusprocessing.NexusTokenizer(
+        kwargs["is_buffered"] = kwargs.get("is_buffered", self.newick_reader.buffered_tokenizer)
+        self._nexus_tokenizer = nexusprocessing.new_nexus_tokenizer(
                 stream, **kwargs)
         return self._nexus_tokenizer
 
@@ -976,7 +977,7 @@ class NexusReader(ioservice.DataReader):
             try:
                 while token != ";" and not self._nexus_tokenizer.is_eof():
                     taxon = self._get_taxon(taxon_namespace=taxon_namespace, label=token)
-                    self._read_character_states(char_block[taxon], state_alphabet, first_sequence_defined)
+                    self._read_character_states(char_block[taxon], state_alphabet, first_sequence_defined, char_block.is_compact)
                     if first_sequence_defined is None:
                         first_sequence_defined = char_block[taxon]
                     token = self._nexus_tokenizer.next_token()
@@ -985,7 +986,7 @@ class NexusReader(ioservice.DataReader):
         else:
             while token != ';' and not self._nexus_tokenizer.is_eof():
                 taxon = self._get_taxon(taxon_namespace=taxon_namespace, label=token)
-                self._read_character_states(char_block[taxon], state_alphabet, first_sequence_defined)
+                self._read_character_states(char_block[taxon], state_alphabet, first_sequence_defined, char_block.is_compact)
                 if first_sequence_defined is None:
                     first_sequence_defined = char_block[taxon]
                 if len(char_block[taxon]) < self._file_specified_nchar:
@@ -1026,17 +1027,7 @@ class NexusReader(ioservice.DataReader):
         positioned right after the "TREE" token in a TREE command.
         Calls on the NewickStatementParser of the trees module.
         """
-        token = self._nexus_tokenizer.next_token()
-        if token == '*':
-            token = self._nexus_tokenizer.next_token()
-        tree_name = token
-        token = self._nexus_tokenizer.next_token()
-        pre_tree_comments = self._nexus_tokenizer.pull_captured_comments()
-        if token != '=':
-            raise self._nexus_error("Expecting '=' in definition of Tree '%s' but found '%s'" % (tree_name, token))
-        tree_comments = self._nexus_tokenizer.pull_captured_comments()
-        # advance to '('; comments will be processed by newick reader
-        self._nexus_tokenizer.next_token()
+        tree_name, pre_tree_comments, tree_comments = self._parse_tree_statement_name()
         tree = self._build_tree_from_newick_tree_string(tree_factory, taxon_symbol_mapper)
         tree.label = tree_name
         nexusprocessing.process_comments_for_item(tree, pre_tree_comments, self.extract_comment_metadata)
@@ -1055,6 +1046,41 @@ class NexusReader(ioservice.DataReader):
         #     self._nexus_tokenizer.skip_to_semicolon()
         return tree
 
+    def _parse_split_record_statement(self,
+            tree_factory,
+            taxon_symbol_mapper,
+            split_record_encoder):
+        """
+        Processes a TREE command as ``_parse_tree_statement()``, but returns a
+        |SplitRecord| of the tree instead of a Tree object (the name and
+        comments of the tree are discarded).
+        """
+        self._parse_tree_statement_name()
+        return self._build_split_record_from_newick_tree_string(
+                tree_factory=tree_factory,
+                taxon_symbol_mapper=taxon_symbol_mapper,
+                split_record_encoder=split_record_encoder)
+
+    def _parse_tree_statement_name(self):
+        """
+        Processes the name of a TREE command, up to and including the '='
+        token, and returns the name of the tree, and the comments preceding
+        and following the '=' token. Leaves the reader positioned at the
+        first token of the tree statement proper.
+        """
+        token = self._nexus_tokenizer.next_token()
+        if token == '*':
+            token = self._nexus_tokenizer.next_token()
+        tree_name = token
+        token = self._nexus_tokenizer.next_token()
+        pre_tree_comments = self._nexus_tokenizer.pull_captured_comments()
+        if token != '=':
+            raise self._nexus_error("Expecting '=' in definition of Tree '%s' but found '%s'" % (tree_name, token))
+        tree_comments = self._nexus_tokenizer.pull_captured_comments()
+        # advance to '('; comments will be processed by newick reader
+        self._nexus_tokenizer.next_token()
+        return tree_name, pre_tree_comments, tree_comments
+
     def _build_tree_from_newick_tree_string(self, tree_factory, taxon_symbol_mapper):
         tree = self.newick_reader._parse_tree_statement(
                 nexus_tokenizer=self._nexus_tokenizer,
@@ -1062,6 +1088,16 @@ class NexusReader(ioservice.DataReader):
                 taxon_symbol_map_fn=taxon_symbol_mapper.require_taxon_for_symbol)
         return tree
 
+    def _build_split_record_from_newick_tree_string(self,
+            tree_factory,
+            taxon_symbol_mapper,
+            split_record_encoder):
+        return self.newick_reader._parse_split_record_statement(
+                nexus_tokenizer=self._nexus_tokenizer,
+                tree_factory=tree_factory,
+                taxon_symbol_map_fn=taxon_symbol_mapper.require_taxon_for_symbol,
+                split_record_encoder=split_record_encoder)
+
     def _parse_translate_statement(self, taxon_namespace, taxon_symbol_mapper=None):
         """
         Processes a TRANSLATE command. Assumes that the file reader is
@@ -1286,12 +1322,7 @@ class NexusReader(ioservice.DataReader):
         if token:
             token = token.upper()
         block = ["BEGIN", token]
-        old_uncaptured_delimiters = self._nexus_tokenizer.uncaptured_delimiters
-        old_captured_delimiters = self._nexus_tokenizer.captured_delimiters
-        to_switch = "\n\r"
-        for ch in to_switch:
-            self._nexus_tokenizer.uncaptured_delimiters.discard(ch)
-            self._nexus_tokenizer.captured_delimiters.add(ch)
+        self._nexus_tokenizer.set_capture_eol(True)
         while not (token == 'END' or token == 'ENDBLOCK') \
                 and not self._nexus_tokenizer.is_eof() \
                 and not token==None:
@@ -1300,8 +1331,7 @@ class NexusReader(ioservice.DataReader):
             if uctoken == "END" or uctoken == "ENDBLOCK":
                 token = uctoken
             block.append(token)
-        self._nexus_tokenizer.uncaptured_delimiters = old_uncaptured_delimiters
-        self._nexus_tokenizer.captured_delimiters = old_captured_delimiters
+        self._nexus_tokenizer.set_capture_eol(False)
         self._nexus_tokenizer.skip_to_semicolon() # move past end
         block.append(";")
         return " ".join(block)
@@ -1310,6 +1340,7 @@ class NexusReader(ioservice.DataReader):
             character_data_vector,
             state_alphabet,
             first_sequence_defined,
+            is_compact=False,
             ):
         """
         Reads character sequence data substatement until the number of
@@ -1364,6 +1395,20 @@ class NexusReader(ioservice.DataReader):
             elif token == ";":
                 raise NexusReader.BlockTerminatedException
             else:
+                if (self._match_char.isdisjoint(token)
+                        and len(character_data_vector) + len(states_to_add) + len(token) <= self._file_specified_nchar):
+                    # decode the whole token at once, falling through to
+                    # report any unrecognized symbol below
+                    try:
+                        if is_compact:
+                            character_data_vector.extend(states_to_add)
+                            states_to_add = []
+                            character_data_vector.extend_symbols(token)
+                        else:
+                            states_to_add.extend(state_alphabet.get_states_for_symbol_string(token))
+                        continue
+                    except KeyError:
+                        pass
                 for c in token:
                     if c in self._match_char:
                         try:
@@ -388,8 +388,12 @@ class NexusWriter(ioservice.DataWriter):
         for taxon in char_matrix:
             stream.write("        {taxon_label:{field_len}}    ".format(taxon_label=taxon_label_map[taxon],
                 field_len=max_label_len))
-            for state in char_matrix[taxon]:
-                state_value_writer(state)
+            if (char_matrix.data_type != "continuous"
+                    and self.discrete_character_state_value_format_fn == self._format_discrete_character_value):
+                stream.write(char_matrix[taxon].symbols_as_string(sep=""))
+            else:
+                for state in char_matrix[taxon]:
+                    state_value_writer(state)
             stream.write("\n")
         stream.write("    ;\n")
         stream.write("END;\n\n\n")
@@ -18,16 +18,19 @@
 ##############################################################################
 
 """
-Implementation of NEXUS-schema tree iterator.
+Implementation of NEXUS-schema tree and sequence iterators.
 """
 
 from dendropy.dataio import ioservice
 from dendropy.dataio import nexusreader
+from dendropy.datamodel import charstatemodel
 
 class NexusTreeDataYielder(
         ioservice.TreeDataYielder,
         nexusreader.NexusReader):
 
+    is_split_record_yielder = True
+
     def __init__(self,
             files=None,
             taxon_namespace=None,
@@ -59,6 +62,7 @@ class NexusTreeDataYielder(
         nexusreader.NexusReader.__init__(self, **kwargs)
         self.exclude_chars = True
         self.exclude_trees = False
+        self._split_record_encoders = None
 
     ###########################################################################
     ## Implementation of DataYielder interface
@@ -69,6 +73,8 @@ class NexusTreeDataYielder(
                 preserve_unquoted_underscores=self.preserve_underscores)
         else:
             self._nexus_tokenizer.set_stream(stream)
+        if self.split_record_encoder is not None:
+            self._split_record_encoders = self.new_split_record_encoder_iter()
         token = self._nexus_tokenizer.next_token()
         if token.upper() != "#NEXUS":
             if self.assume_newick_if_not_nexus:
@@ -77,9 +83,15 @@ class NexusTreeDataYielder(
                         enable_lookup_by_taxon_number=False,
                         )
                 while True:
-                    tree = self._build_tree_from_newick_tree_string(
-                            tree_factory=self.tree_factory,
-                            taxon_symbol_mapper=taxon_symbol_mapper)
+                    if self.split_record_encoder is None:
+                        tree = self._build_tree_from_newick_tree_string(
+                                tree_factory=self.tree_factory,
+                                taxon_symbol_mapper=taxon_symbol_mapper)
+                    else:
+                        tree = self._build_split_record_from_newick_tree_string(
+                                tree_factory=self.tree_factory,
+                                taxon_symbol_mapper=taxon_symbol_mapper,
+                                split_record_encoder=next(self._split_record_encoders))
                     if tree is None:
                         break
                     yield tree
@@ -155,9 +167,15 @@ class NexusTreeDataYielder(
                     ## statement. Typically, this will be
                     ## 'TREE' if there is another tree, or
                     ## 'END'/'ENDBLOCK'.
-                    tree = self._parse_tree_statement(
-                            tree_factory=tree_factory,
-                            taxon_symbol_mapper=taxon_symbol_mapper)
+                    if self.split_record_encoder is None:
+                        tree = self._parse_tree_statement(
+                                tree_factory=tree_factory,
+                                taxon_symbol_mapper=taxon_symbol_mapper)
+                    else:
+                        tree = self._parse_split_record_statement(
+                                tree_factory=tree_factory,
+                                taxon_symbol_mapper=taxon_symbol_mapper,
+                                split_record_encoder=next(self._split_record_encoders))
                     yield tree
                     if self._nexus_tokenizer.is_eof() or not self._nexus_tokenizer.current_token:
                         break
@@ -183,3 +201,175 @@ class NexusNewickTreeDataYielder(NexusTreeDataYielder):
                 taxon_namespace=taxon_namespace,
                 tree_type=tree_type,
                 **kwargs)
+
+class NexusCharacterDataYielder(
+        ioservice.CharacterDataYielder,
+        nexusreader.NexusReader):
+
+    def __init__(self,
+            files=None,
+            taxon_namespace=None,
+            char_matrix_factory=None,
+            column_window=None,
+            **kwargs):
+        r"""
+
+        Parameters
+        ----------
+        files : iterable of sources
+            Iterable of sources, which can either be strings specifying file
+            paths or file-like objects open for reading. If a source element is
+            a string (``isinstance(i,str) == True``), then it is assumed to be
+            a path to a file. Otherwise, the source is assumed to be a file-like
+            object.
+        taxon_namespace : |TaxonNamespace| instance
+            The operational taxonomic unit concept namespace to use to manage
+            taxon definitions.
+        char_matrix_factory : function
+            Returns a new character matrix when called with a
+            ``taxon_namespace`` keyword argument.
+        column_window : tuple of two integers
+            If given, then only the columns from the first (inclusive) to the
+            second (exclusive) are yielded.
+        \*\*kwargs : keyword arguments
+            These will be passed directly to the base `nexusreader.NexusReader`
+            class. See `nexusreader.NexusReader` for details.
+
+        Sequences are yielded from all the CHARACTERS or DATA blocks of the
+        same data type as the matrices returned by ``char_matrix_factory``;
+        other blocks are skipped. Non-interleaved matrices are read one
+        sequence at a time. Interleaved matrices cannot be: each is read in
+        full before its sequences are yielded.
+        """
+        ioservice.CharacterDataYielder.__init__(self,
+                files=files,
+                taxon_namespace=taxon_namespace,
+                char_matrix_factory=char_matrix_factory,
+                column_window=column_window)
+        kwargs["attached_taxon_namespace"] = self.attached_taxon_namespace
+        nexusreader.NexusReader.__init__(self, **kwargs)
+        self.exclude_chars = False
+        self.exclude_trees = True
+        self._state_alphabet_factory = charstatemodel.StateAlphabet
+
+    ###########################################################################
+    ## Implementation of DataYielder interface
+
+    def _yield_items_from_stream(self, stream):
+        if self._nexus_tokenizer is None:
+            self.create_tokenizer(stream,
+                preserve_unquoted_underscores=self.preserve_underscores)
+        else:
+            self._nexus_tokenizer.set_stream(stream)
+        token = self._nexus_tokenizer.next_token()
+        if token.upper() != "#NEXUS":
+            raise self._nexus_error("Expecting '#NEXUS', but found '{}'".format(token),
+                    nexusreader.NexusReader.NotNexusFileError)
+        while not self._nexus_tokenizer.is_eof():
+            token = self._nexus_tokenizer.next_token_ucase()
+            while token != None and token != 'BEGIN' and not self._nexus_tokenizer.is_eof():
+                token = self._nexus_tokenizer.next_token_ucase()
+            self._nexus_tokenizer.process_and_clear_comments_for_item(
+                    self._global_annotations_target,
+                    self.extract_comment_metadata)
+            token = self._nexus_tokenizer.next_token_ucase()
+            if token == 'TAXA':
+                self._parse_taxa_block()
+            elif token == 'CHARACTERS' or token == 'DATA':
+                for item in self._yield_from_characters_data_block():
+                    yield item
+            elif token == 'BEGIN':
+                raise self._nexus_error("'BEGIN' found without completion of previous block",
+                        nexusreader.NexusReader.IncompleteBlockError)
+            else:
+                # unknown block
+                token = self._consume_to_end_of_block(token)
+
+    ###########################################################################
+    ## Supporting Functions
+
+    def _yield_from_characters_data_block(self):
+        """
+        Expectations:
+            - current token: "CHARACTERS" or "DATA" [part of "BEGIN CHARACTERS"]
+        """
+        token = self._nexus_tokenizer.cast_current_token_to_ucase()
+        if token != "CHARACTERS" and token != "DATA":
+            raise self._nexus_error("Expecting 'CHARACTERS' or 'DATA' token, but instead found '{}'".format(token))
+        self._nexus_tokenizer.skip_to_semicolon() # move past BEGIN command
+        block_title = None
+        link_title = None
+        self._data_type = "standard" # set as default
+        while (token != 'END'
+                and token != 'ENDBLOCK'
+                and not self._nexus_tokenizer.is_eof()
+                and not token==None):
+            token = self._nexus_tokenizer.next_token_ucase()
+            if token == 'TITLE':
+                block_title = self._parse_title_statement()
+            elif token == "LINK":
+                link_title = self._parse_link_statement().get('taxa')
+            elif token == 'DIMENSIONS':
+                self._parse_dimensions_statement()
+            elif token == 'FORMAT':
+                self._parse_format_statement()
+            elif token == 'MATRIX':
+                for item in self._yield_from_matrix_statement(block_title=block_title, link_title=link_title):
+                    yield item
+            elif token == 'BEGIN':
+                raise self._nexus_error("'BEGIN' found without completion of previous block",
+                        nexusreader.NexusReader.IncompleteBlockError)
+        self._nexus_tokenizer.skip_to_semicolon() # move past END command
+
+    def _yield_from_matrix_statement(self, block_title=None, link_title=None):
+        """
+        Expectations:
+            - current token: "MATRIX"
+        """
+        if not self._file_specified_ntax:
+            raise self._nexus_error('NTAX must be defined by DIMENSIONS command to non-zero value before MATRIX command')
+        elif not self._file_specified_nchar:
+            raise self._nexus_error('NCHAR must be defined by DIMENSIONS command to non-zero value before MATRIX command')
+        taxon_namespace = self._get_taxon_namespace(link_title)
+        char_block = self.new_char_matrix(taxon_namespace=taxon_namespace, label=block_title)
+        if char_block.data_type != self._data_type:
+            self._nexus_tokenizer.skip_to_semicolon() # move past MATRIX command
+            return
+        if self._interleave:
+            if self._data_type == "continuous":
+                self._process_continuous_matrix_data(char_block)
+            else:
+                self._process_discrete_matrix_data(char_block)
+            for taxon in list(char_block):
+                sequence = char_block[taxon]
+                del char_block[taxon]
+                yield taxon, self.apply_column_window(sequence)
+            return
+        if self._data_type == "continuous":
+            read_sequence = self._read_continuous_character_values
+        else:
+            if self._data_type == "standard":
+                self._build_state_alphabet(char_block, self._symbols)
+            state_alphabet = char_block.default_state_alphabet
+            read_sequence = lambda sequence: self._read_character_states(
+                    sequence,
+                    state_alphabet,
+                    first_sequence_defined,
+                    char_block.is_compact)
+        is_windowed = self.column_start > 0 or self.column_stop is not None
+        first_sequence_defined = None
+        token = self._nexus_tokenizer.next_token()
+        while token != ';' and not self._nexus_tokenizer.is_eof():
+            taxon = self._get_taxon(taxon_namespace=taxon_namespace, label=token)
+            sequence = char_block._new_character_sequence()
+            read_sequence(sequence)
+            if len(sequence) < self._file_specified_nchar:
+                raise self._nexus_error("Insufficient characters given for taxon '%s': expecting %d but only found %d ('%s')" \
+                    % (taxon.label, self._file_specified_nchar, len(sequence), sequence.symbols_as_string()))
+            if first_sequence_defined is None:
+                first_sequence_defined = sequence
+                if is_windowed:
+                    # keep all of the first sequence to dereference MATCHCHAR
+                    sequence = char_block._new_character_sequence(sequence)
+            yield taxon, self.apply_column_window(sequence)
+            token = self._nexus_tokenizer.next_token()
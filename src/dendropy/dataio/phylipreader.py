@@ -184,13 +184,7 @@ class PhylipReader(ioservice.DataReader):
             raise error.DataParseError("Expecting at least 2 lines in PHYLIP format data source", stream=self.stream)
         desc_line = lines[0]
         lines = lines[1:]
-        m = re.match(r'\s*(\d+)\s+(\d+)\s*$', desc_line)
-        if m is None:
-            raise self._data_parse_error("Invalid data description line: '%s'" % desc_line)
-        self.ntax = int(m.groups()[0])
-        self.nchar = int(m.groups()[1])
-        if self.ntax == 0 or self.nchar == 0:
-            raise error.DataParseError("No data in source", stream=self.stream)
+        self._parse_description_line(desc_line)
         if self.interleaved:
             self._parse_interleaved(lines)
         else:
@@ -203,6 +197,15 @@ class PhylipReader(ioservice.DataReader):
                 char_matrices=[self.char_matrix])
         return product
 
+    def _parse_description_line(self, desc_line):
+        m = re.match(r'\s*(\d+)\s+(\d+)\s*$', desc_line)
+        if m is None:
+            raise self._data_parse_error("Invalid data description line: '%s'" % desc_line)
+        self.ntax = int(m.groups()[0])
+        self.nchar = int(m.groups()[1])
+        if self.ntax == 0 or self.nchar == 0:
+            raise error.DataParseError("No data in source", stream=self.stream)
+
     def _parse_taxon_from_line(self, line, line_index):
         if self.strict:
             seq_label = line[:10].strip()
@@ -248,6 +251,17 @@ class PhylipReader(ioservice.DataReader):
                 else:
                     self.char_matrix[current_taxon].append(state)
         else:
+            # decode the whole line at once, falling through to report or
+            # skip any invalid symbol below
+            try:
+                if self.char_matrix.is_compact:
+                    self.char_matrix[current_taxon].extend_symbols(line)
+                else:
+                    self.char_matrix[current_taxon].extend(
+                            self.char_matrix.default_state_alphabet.get_states_for_symbol_string(line))
+                return
+            except KeyError:
+                pass
             for c in line:
                 if c in [' ', '\t']:
                     continue
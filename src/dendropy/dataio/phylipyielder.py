@@ -0,0 +1,129 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+##############################################################################
+##  DendroPy Phylogenetic Computing Library.
+##
+##  Copyright 2010-2015 Jeet Sukumaran and Mark T. Holder.
+##  All rights reserved.
+##
+##  See "LICENSE.rst" for terms and conditions of usage.
+##
+##  If you use this work or any portion thereof in published work,
+##  please cite it as:
+##
+##     Sukumaran, J. and M. T. Holder. 2010. DendroPy: a Python library
+##     for phylogenetic computing. Bioinformatics 26: 1569-1571.
+##
+##############################################################################
+
+"""
+Implementation of PHYLIP-schema sequence iterator.
+"""
+
+from dendropy.dataio import ioservice
+from dendropy.dataio import phylipreader
+from dendropy.datamodel import taxonmodel
+from dendropy.utility import error
+
+class PhylipCharacterDataYielder(ioservice.CharacterDataYielder):
+
+    def __init__(self,
+            files=None,
+            taxon_namespace=None,
+            char_matrix_factory=None,
+            column_window=None,
+            **kwargs):
+        r"""
+
+        Parameters
+        ----------
+        files : iterable of sources
+            Iterable of sources, which can either be strings specifying file
+            paths or file-like objects open for reading. If a source element is
+            a string (``isinstance(i,str) == True``), then it is assumed to be
+            a path to a file. Otherwise, the source is assumed to be a file-like
+            object.
+        taxon_namespace : |TaxonNamespace| instance
+            The operational taxonomic unit concept namespace to use to manage
+            taxon definitions.
+        char_matrix_factory : function
+            Returns a new character matrix when called with a
+            ``taxon_namespace`` keyword argument.
+        column_window : tuple of two integers
+            If given, then only the columns from the first (inclusive) to the
+            second (exclusive) are yielded.
+        \*\*kwargs : keyword arguments
+            These will be passed directly to the base
+            `phylipreader.PhylipReader` class. See `phylipreader.PhylipReader`
+            for details.
+
+        Sequential data are read one sequence at a time. Interleaved data
+        cannot be: each source is then read in full before its sequences are
+        yielded.
+        """
+        ioservice.CharacterDataYielder.__init__(self,
+                files=files,
+                taxon_namespace=taxon_namespace,
+                char_matrix_factory=char_matrix_factory,
+                column_window=column_window)
+        self.phylip_reader = phylipreader.PhylipReader(**kwargs)
+
+    ###########################################################################
+    ## Implementation of DataYielder interface
+
+    def _yield_items_from_stream(self, stream):
+        reader = self.phylip_reader
+        reader.reset()
+        reader.stream = stream
+        if reader.interleaved:
+            # rows are matched to taxa by their position in the namespace, so
+            # the sequences are read on a namespace of their own
+            reader.taxon_namespace = taxonmodel.TaxonNamespace(
+                    is_case_sensitive=self.taxon_namespace.is_case_sensitive)
+        else:
+            reader.taxon_namespace = self.taxon_namespace
+        if reader.default_state_alphabet is not None:
+            reader.char_matrix = self.new_char_matrix(
+                    taxon_namespace=reader.taxon_namespace,
+                    default_state_alphabet=reader.default_state_alphabet)
+        else:
+            reader.char_matrix = self.new_char_matrix(taxon_namespace=reader.taxon_namespace)
+        reader.data_type = reader.char_matrix.data_type
+        lines = iter(stream)
+        desc_line = next(lines, None)
+        if desc_line is None:
+            raise error.DataParseError("No data in source", stream=stream)
+        reader._parse_description_line(desc_line)
+        if reader.interleaved:
+            reader._parse_interleaved([line.rstrip("\r\n") for line in lines])
+            for taxon in list(reader.char_matrix):
+                sequence = reader.char_matrix[taxon]
+                del reader.char_matrix[taxon]
+                taxon = self.taxon_namespace.require_taxon(label=taxon.label)
+                yield taxon, self.apply_column_window(sequence)
+        else:
+            current_taxon = None
+            for line_index, line in enumerate(lines):
+                line = line.rstrip()
+                if line == '':
+                    continue
+                if current_taxon is None:
+                    num_taxa_processed = len(reader.taxa_processed)
+                    current_taxon, line = reader._parse_taxon_from_line(line, line_index)
+                    if len(reader.taxa_processed) == num_taxa_processed:
+                        # sequence already yielded (and removed)
+                        raise reader._data_parse_error("Cannot add characters to sequence for taxon '%s': already has declared number of characters (%d)" \
+                                % (current_taxon.label, reader.nchar), line_index=line_index)
+                reader._parse_sequence_from_line(current_taxon, line, line_index)
+                if len(reader.char_matrix[current_taxon]) >= reader.nchar:
+                    sequence = reader.char_matrix[current_taxon]
+                    del reader.char_matrix[current_taxon]
+                    yield current_taxon, self.apply_column_window(sequence)
+                    current_taxon = None
+            if current_taxon is not None:
+                sequence = reader.char_matrix[current_taxon]
+                del reader.char_matrix[current_taxon]
+                yield current_taxon, self.apply_column_window(sequence)
+        if len(reader.taxa_processed) != reader.ntax:
+            reader._taxon_error(num_expected=reader.ntax, found=reader.taxa_processed)
@@ -17,6 +17,7 @@
 ##
 ##############################################################################
 
+import re
 from dendropy.utility import error
 
 ##############################################################################
@@ -89,18 +90,8 @@ class Tokenizer(object):
         self.capture_comments = capture_comments
         self.preserve_unquoted_underscores = preserve_unquoted_underscores
 
-        # State (internals)
-        self.src = src
-        self._cur_char = None
-        self.current_token = None
-        self.is_token_quoted = False
-
-        # Meta-information
-        self.captured_comments = []
-        self.current_line_num = 1
-        self.current_column_num = 0
-        self.token_line_num = 0
-        self.token_column_num = 0
+        # State (internals) and meta-information
+        self.set_stream(src=src)
 
     def reset(self):
         self.set_stream(src=None)
@@ -116,6 +107,25 @@ class Tokenizer(object):
         self.token_line_num = 0
         self.token_column_num = 0
 
+    def reset_scanners(self):
+        """
+        Notifies the tokenizer that the delimiter, quote or comment character
+        sets have been modified. Not needed by this (per-character) engine,
+        which consults the sets directly for every character.
+        """
+        pass
+
+    def peek_to(self, terminator):
+        """
+        Returns the source text from the current position up to and including
+        the first occurrence of ``terminator`` that is not quoted or in a
+        comment, without consuming it. This (per-character) engine cannot look
+        ahead, and always returns |None|; engines that can (see
+        |BufferedTokenizer|) also provide ``skip_chars()`` and
+        ``line_col_at()`` to consume and locate the text returned.
+        """
+        return None
+
     def is_eof(self):
         return self._cur_char == ""
 
@@ -273,3 +283,469 @@ class Tokenizer(object):
             # self.captured_comments.append(dest.getvalue())
             self.captured_comments.append("".join(dest))
 
+
+##############################################################################
+## BufferedTokenizer
+
+class BufferedTokenizer(Tokenizer):
+    """
+    Stream tokenizer that reads the source in large blocks and slices tokens
+    out of the buffer using regular expression and ``str.find`` scans, instead
+    of reading and dispatching on the source one character at a time.
+
+    Tokens, comment capture, quoting and underscore handling are identical to
+    those of |Tokenizer|. Line and column numbers (``current_line_num``,
+    ``current_column_num``, ``token_line_num``, ``token_column_num``) are
+    computed on demand from the buffer position, and report the same values.
+
+    The delimiter, quote and comment character sets are compiled into
+    scanning expressions when the tokenizer is created. If these sets are
+    subsequently modified, ``reset_scanners()`` must be called for the
+    modifications to take effect.
+    """
+
+    default_buffer_size = 65536
+
+    def __init__(self,
+            src,
+            uncaptured_delimiters,
+            captured_delimiters,
+            quote_chars,
+            escape_quote_by_doubling,
+            escape_chars,
+            comment_begin,
+            comment_end,
+            capture_comments,
+            preserve_unquoted_underscores,
+            buffer_size=None,
+            ):
+        if buffer_size is None:
+            buffer_size = self.__class__.default_buffer_size
+        if buffer_size < 1:
+            raise ValueError("Invalid buffer size: {}".format(buffer_size))
+        self.buffer_size = buffer_size
+        Tokenizer.__init__(self,
+                src=src,
+                uncaptured_delimiters=uncaptured_delimiters,
+                captured_delimiters=captured_delimiters,
+                quote_chars=quote_chars,
+                escape_quote_by_doubling=escape_quote_by_doubling,
+                escape_chars=escape_chars,
+                comment_begin=comment_begin,
+                comment_end=comment_end,
+                capture_comments=capture_comments,
+                preserve_unquoted_underscores=preserve_unquoted_underscores)
+        self.reset_scanners()
+
+    def set_stream(self, src=None):
+        self.src = src
+        self.current_token = None
+        self.is_token_quoted = False
+        self.captured_comments = []
+        # buffer and position within buffer of the current character
+        self._buffer = ""
+        self._pos = 0
+        self._is_src_exhausted = False
+        self._is_started = False
+        # position tracking: stream offset of the start of the buffer, line
+        # number at the start of the buffer, and stream offset of the last
+        # newline before the start of the buffer (0 if there is none)
+        self._buffer_offset = 0
+        self._buffer_line_num = 1
+        self._buffer_prior_newline_offset = 0
+        # stream offset of the start of the current token, and its line and
+        # column numbers if these had to be resolved before the buffer
+        # region was discarded
+        self._token_offset = None
+        self._token_line_col = (0, 0)
+
+    def reset_scanners(self):
+        """
+        Recompiles the scanning expressions from the current delimiter, quote
+        and comment character sets.
+        """
+        word_stops = (set(self.uncaptured_delimiters)
+                | set(self.captured_delimiters)
+                | set(self.comment_begin))
+        self._skip_pattern = re.compile("[{}]*".format(
+            self._char_class(self.uncaptured_delimiters)))
+        self._word_pattern = re.compile("[^{}]*".format(
+            self._char_class(word_stops)))
+        self._comment_pattern = re.compile("[{}]".format(
+            self._char_class(set(self.comment_begin) | set(self.comment_end))))
+        self._peek_patterns = {}
+        # a captured delimiter, or an unquoted word with no comments that is
+        # terminated by a delimiter, optionally preceded by uncaptured
+        # delimiters (and consuming a terminating uncaptured delimiter)
+        self._token_pattern = re.compile("[{u}]*(?:([{c}])|([^{sq}][^{s}]*)(?:([{u}])|(?=[{c}])))".format(
+            u=self._char_class(self.uncaptured_delimiters),
+            c=self._char_class(self.captured_delimiters),
+            s=self._char_class(word_stops),
+            sq=self._char_class(word_stops | set(self.quote_chars))))
+
+    def _char_class(self, chars):
+        return "".join(re.escape(c) for c in sorted(chars))
+
+    ###########################################################################
+    ## Position tracking
+
+    def _line_col_at_offset(self, offset):
+        # Reproduces the numbering of the per-character engine: a newline
+        # character is reported as column 1 of the line it begins, and
+        # characters on the first line are numbered from 1.
+        rel = offset - self._buffer_offset
+        buf = self._buffer
+        line_num = self._buffer_line_num + buf.count("\n", 0, rel + 1)
+        nl = buf.rfind("\n", 0, rel + 1)
+        if nl >= 0:
+            col_num = rel - nl + 1
+        else:
+            col_num = offset - self._buffer_prior_newline_offset + 1
+        return line_num, col_num
+
+    def _current_offset(self):
+        if not self._is_started:
+            return None
+        # the per-character engine always holds the character following
+        # the current token, so make sure that it is loaded
+        self.is_eof()
+        buffer_end = self._buffer_offset + len(self._buffer)
+        offset = self._buffer_offset + self._pos
+        if offset >= buffer_end:
+            offset = buffer_end - 1
+        if offset < 0:
+            return None
+        return offset
+
+    def _get_current_line_num(self):
+        offset = self._current_offset()
+        if offset is None:
+            return 1
+        return self._line_col_at_offset(offset)[0]
+    current_line_num = property(_get_current_line_num)
+
+    def _get_current_column_num(self):
+        offset = self._current_offset()
+        if offset is None:
+            return 0
+        return self._line_col_at_offset(offset)[1]
+    current_column_num = property(_get_current_column_num)
+
+    def _get_token_line_col(self):
+        if self._token_offset is not None:
+            self._token_line_col = self._line_col_at_offset(self._token_offset)
+            self._token_offset = None
+        return self._token_line_col
+
+    def _get_token_line_num(self):
+        return self._get_token_line_col()[0]
+    token_line_num = property(_get_token_line_num)
+
+    def _get_token_column_num(self):
+        return self._get_token_line_col()[1]
+    token_column_num = property(_get_token_column_num)
+
+    ###########################################################################
+    ## Buffer management
+
+    def _fill(self):
+        """
+        Discards the consumed portion of the buffer and appends the next
+        block from the source. Returns |False| if the source is exhausted.
+        """
+        self._is_started = True
+        if self._is_src_exhausted:
+            return False
+        chunk = self.src.read(self.buffer_size)
+        if not chunk:
+            self._is_src_exhausted = True
+            return False
+        pos = self._pos
+        if pos:
+            if self._token_offset is not None and self._token_offset < self._buffer_offset + pos:
+                self._get_token_line_col()
+            buf = self._buffer
+            nl_count = buf.count("\n", 0, pos)
+            if nl_count:
+                self._buffer_line_num += nl_count
+                self._buffer_prior_newline_offset = self._buffer_offset + buf.rfind("\n", 0, pos)
+            self._buffer_offset += pos
+            self._buffer = buf[pos:] + chunk
+            self._pos = 0
+        else:
+            self._buffer += chunk
+        return True
+
+    def is_eof(self):
+        if not self._is_started:
+            return False
+        while self._pos >= len(self._buffer):
+            if not self._fill():
+                return True
+        return False
+
+    ###########################################################################
+    ## Look-ahead
+
+    def peek_to(self, terminator):
+        """
+        Returns the source text from the current position up to and including
+        the first occurrence of ``terminator`` that is not quoted or in a
+        comment, without consuming it, or |None| if the source is exhausted
+        before ``terminator`` is found. The text is retained in the buffer
+        until consumed, so may be arbitrarily long.
+
+        Quote characters are assumed to open a quoted token wherever they
+        occur, which is not the case for quote characters embedded in an
+        unquoted token: callers must be prepared to validate the text returned.
+        """
+        stop_pattern = self._peek_patterns.get(terminator)
+        if stop_pattern is None:
+            stop_pattern = re.compile("[{}]".format(self._char_class(
+                set(terminator) | set(self.quote_chars) | set(self.comment_begin))))
+            self._peek_patterns[terminator] = stop_pattern
+        self._is_started = True
+        offset = 0
+        quote_char = None
+        nesting = 0
+        while True:
+            buf = self._buffer
+            base = self._pos
+            idx = base + offset
+            if quote_char is not None:
+                end = buf.find(quote_char, idx)
+                if end >= 0:
+                    quote_char = None
+                    offset = end + 1 - base
+                    continue
+            elif nesting:
+                m = self._comment_pattern.search(buf, idx)
+                if m is not None:
+                    if m.group() in self.comment_end:
+                        nesting -= 1
+                    else:
+                        nesting += 1
+                    offset = m.end() - base
+                    continue
+            else:
+                m = stop_pattern.search(buf, idx)
+                if m is not None:
+                    c = m.group()
+                    end = m.start()
+                    if c == terminator:
+                        return buf[base:end+1]
+                    elif c in self.quote_chars:
+                        quote_char = c
+                    else:
+                        nesting = 1
+                    offset = end + 1 - base
+                    continue
+            offset = len(buf) - base
+            if not self._fill():
+                return None
+
+    def skip_chars(self, count):
+        """
+        Consumes ``count`` characters of text previously returned by
+        ``peek_to()``, without tokenizing them.
+        """
+        self._pos += count
+
+    def line_col_at(self, count):
+        """
+        Returns the line and column numbers of the character ``count``
+        characters ahead of the current position, in text previously returned
+        by ``peek_to()``.
+        """
+        return self._line_col_at_offset(self._buffer_offset + self._pos + count)
+
+    ###########################################################################
+    ## Tokenizing
+
+    def __next__(self):
+        self.is_token_quoted = False
+        captured_delimiters = self.captured_delimiters
+        uncaptured_delimiters = self.uncaptured_delimiters
+        m = self._token_pattern.match(self._buffer, self._pos)
+        if m is not None:
+            if m.lastindex == 1:
+                self._token_offset = self._buffer_offset + m.start(1)
+                token = m.group(1)
+            else:
+                self._token_offset = self._buffer_offset + m.start(2)
+                token = m.group(2)
+                if not self.preserve_unquoted_underscores and "_" in token:
+                    token = token.replace("_", " ")
+            self._pos = m.end()
+            self.current_token = token
+            return token
+        while True:
+            buf = self._buffer
+            pos = self._skip_pattern.match(buf, self._pos).end()
+            if pos >= len(buf):
+                self._pos = pos
+                if self._fill():
+                    continue
+                raise StopIteration
+            c = buf[pos]
+            self._token_offset = self._buffer_offset + pos
+            if c in captured_delimiters:
+                self._pos = pos + 1
+                self.current_token = c
+                return c
+            elif c in self.quote_chars:
+                self._pos = pos
+                self.is_token_quoted = True
+                self.current_token = self._scan_quoted_token(c)
+                return self.current_token
+            elif c in self.comment_begin:
+                self._pos = pos
+                self._handle_comment()
+                if self.is_eof():
+                    self.current_token = ""
+                    raise StopIteration
+                c = self._buffer[self._pos]
+                if c in uncaptured_delimiters:
+                    # comment-only token
+                    self._pos += 1
+                    continue
+                elif c in captured_delimiters:
+                    continue
+                # otherwise, the comment is the start of an unquoted token,
+                # in which quote characters are taken literally
+                buf = self._buffer
+                pos = self._pos
+            end = self._word_pattern.match(buf, pos).end()
+            if end < len(buf):
+                c = buf[end]
+                if c in uncaptured_delimiters:
+                    self._pos = end + 1
+                elif c in captured_delimiters:
+                    self._pos = end
+                else:
+                    c = None
+                if c is not None:
+                    token = buf[pos:end]
+                    if not self.preserve_unquoted_underscores and "_" in token:
+                        token = token.replace("_", " ")
+                    self.current_token = token
+                    return token
+            self._pos = pos
+            token = self._scan_unquoted_token()
+            if token:
+                self.current_token = token
+                return token
+            # token consisted only of comments: if the stream is not
+            # exhausted, move on to the next token
+            if self.is_eof():
+                self.current_token = token
+                raise StopIteration
+
+    def _scan_quoted_token(self, quote_char):
+        dest = []
+        self._pos += 1
+        while True:
+            buf = self._buffer
+            pos = self._pos
+            idx = buf.find(quote_char, pos)
+            if idx < 0:
+                dest.append(buf[pos:])
+                self._pos = len(buf)
+                if self._fill():
+                    continue
+                raise Tokenizer.UnterminatedQuoteError(
+                        quote_char=quote_char,
+                        line_num=self.current_line_num,
+                        col_num=self.current_column_num,
+                        stream=self.src)
+            dest.append(buf[pos:idx])
+            self._pos = idx + 1
+            if self._pos >= len(self._buffer):
+                self._fill()
+            buf = self._buffer
+            pos = self._pos
+            if self.escape_quote_by_doubling:
+                if pos < len(buf) and buf[pos] == quote_char:
+                    dest.append(quote_char)
+                    self._pos = pos + 1
+                else:
+                    break
+            else:
+                if pos < len(buf):
+                    self._pos = pos + 1
+                break
+        return "".join(dest)
+
+    def _scan_unquoted_token(self):
+        dest = []
+        word_match = self._word_pattern.match
+        while True:
+            buf = self._buffer
+            pos = self._pos
+            end = word_match(buf, pos).end()
+            if end > pos:
+                dest.append(buf[pos:end])
+                self._pos = end
+            if end >= len(buf):
+                if self._fill():
+                    continue
+                break
+            c = buf[end]
+            if c in self.uncaptured_delimiters:
+                self._pos = end + 1
+                break
+            elif c in self.captured_delimiters:
+                break
+            elif c in self.comment_begin:
+                self._handle_comment()
+            else:
+                # character no longer a delimiter
+                dest.append(c)
+                self._pos = end + 1
+        token = "".join(dest)
+        if not self.preserve_unquoted_underscores and "_" in token:
+            token = token.replace("_", " ")
+        return token
+
+    def _handle_comment(self):
+        # common case: a non-nested comment that lies entirely within the
+        # buffer
+        buf = self._buffer
+        pos = self._pos
+        m = self._comment_pattern.search(buf, pos + 1)
+        if m is not None and buf[m.start()] in self.comment_end:
+            end = m.start()
+            if self.capture_comments:
+                self.captured_comments.append(buf[pos+1:end])
+            self._pos = end + 1
+            return
+        dest = []
+        nesting = 0
+        while True:
+            buf = self._buffer
+            pos = self._pos
+            if pos >= len(buf):
+                if self._fill():
+                    continue
+                break
+            c = buf[pos]
+            if c in self.comment_end:
+                nesting -= 1
+                self._pos = pos + 1
+                if nesting <= 0:
+                    break
+                continue
+            elif c in self.comment_begin:
+                nesting += 1
+                self._pos = pos + 1
+                continue
+            m = self._comment_pattern.search(buf, pos)
+            if m is None:
+                end = len(buf)
+            else:
+                end = m.start()
+            if self.capture_comments:
+                dest.append(buf[pos:end])
+            self._pos = end
+        if self.capture_comments:
+            self.captured_comments.append("".join(dest))
@@ -0,0 +1,273 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+##############################################################################
+##  DendroPy Phylogenetic Computing Library.
+##
+##  Copyright 2010-2015 Jeet Sukumaran and Mark T. Holder.
+##  All rights reserved.
+##
+##  See "LICENSE.rst" for terms and conditions of usage.
+##
+##  If you use this work or any portion thereof in published work,
+##  please cite it as:
+##
+##     Sukumaran, J. and M. T. Holder. 2010. DendroPy: a Python library
+##     for phylogenetic computing. Bioinformatics 26: 1569-1571.
+##
+##############################################################################
+
+"""
+Splitting of a NEXUS- or NEWICK-formatted tree file into shards: independent
+tree sources, each consisting of a contiguous range of the tree statements of
+the file, that can be read separately (e.g., by different processes).
+"""
+
+import io
+import os
+import re
+import mmap
+from array import array
+
+# A single command (or NEWICK tree statement), up to and including the
+# terminating semi-colon, skipping over quoted labels and comments (which may
+# be nested one level deep).
+_COMMAND_PATTERN = re.compile(
+        rb"""[^;'\[]*(?:(?:'[^']*'|\[[^\[\]]*(?:\[[^\]]*\][^\[\]]*)*\])[^;'\[]*)*;""")
+
+# A word of a command, skipping over whitespace and comments.
+_COMMAND_WORD_PATTERN = re.compile(
+        rb"""(?:\s|\[[^\[\]]*(?:\[[^\]]*\][^\[\]]*)*\])*([^\s;\['=]+)""")
+
+_NEXUS_HEADER_PATTERN = re.compile(rb"""\s*#NEXUS""", re.IGNORECASE)
+
+_TRAILING_TEXT_PATTERN = re.compile(rb"""(?:\s|\[[^\]]*\])*$""")
+
+##############################################################################
+## TreeStatementIndex
+
+class TreeStatementIndex(object):
+    """
+    The byte offsets of the tree statements of a NEXUS- or NEWICK-formatted
+    tree file.
+    """
+
+    @classmethod
+    def build(cls, path):
+        """
+        Scans the file at ``path``, and returns the index of its tree
+        statements, or |None| if the file cannot be split into shards: i.e.,
+        if it is neither a NEXUS file with a single TREES block in which the
+        tree statements are contiguous, nor a NEWICK file (or if it cannot be
+        scanned, e.g., because it has unbalanced quotes or comments).
+        """
+        with open(path, "rb") as src:
+            if os.fstat(src.fileno()).st_size == 0:
+                return None
+            buf = mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                m = _NEXUS_HEADER_PATTERN.match(buf)
+                if m:
+                    return cls._build_nexus(path, buf, m.end())
+                else:
+                    return cls._build_newick(path, buf)
+            finally:
+                buf.close()
+
+    @classmethod
+    def _build_nexus(cls, path, buf, pos):
+        tree_offsets = array("q")
+        prefix_end = None
+        is_in_trees_block = False
+        is_trees_block_found = False
+        is_last_command_tree = False
+        while True:
+            m = _COMMAND_PATTERN.match(buf, pos)
+            if m is None:
+                break
+            words = cls._command_words(m.group(0), 2)
+            if not words:
+                pass
+            elif words[0] == b"BEGIN":
+                if len(words) > 1 and words[1] == b"TREES":
+                    if is_trees_block_found:
+                        return None
+                    is_in_trees_block = True
+                    is_trees_block_found = True
+            elif is_in_trees_block:
+                if words[0] == b"TREE":
+                    if prefix_end is None:
+                        prefix_end = m.start()
+                    elif not is_last_command_tree:
+                        return None
+                    tree_offsets.append(m.start())
+                    is_last_command_tree = True
+                elif words[0] == b"END" or words[0] == b"ENDBLOCK":
+                    is_in_trees_block = False
+                    is_last_command_tree = False
+                    if prefix_end is not None:
+                        tree_offsets.append(m.start())
+                elif prefix_end is not None:
+                    return None
+            pos = m.end()
+        if not _TRAILING_TEXT_PATTERN.match(buf, pos):
+            return None
+        if prefix_end is None:
+            return cls(path=path, prefix_end=0, tree_offsets=array("q", [0]), suffix=b"")
+        if is_in_trees_block:
+            tree_offsets.append(pos)
+        return cls(path=path, prefix_end=prefix_end, tree_offsets=tree_offsets, suffix=b"\nEND;\n")
+
+    @classmethod
+    def _build_newick(cls, path, buf):
+        tree_offsets = array("q")
+        pos = 0
+        while True:
+            m = _COMMAND_PATTERN.match(buf, pos)
+            if m is None:
+                break
+            if cls._command_words(m.group(0), 1):
+                tree_offsets.append(m.start())
+            pos = m.end()
+        if not _TRAILING_TEXT_PATTERN.match(buf, pos):
+            return None
+        tree_offsets.append(pos)
+        return cls(path=path, prefix_end=0, tree_offsets=tree_offsets, suffix=b"")
+
+    @staticmethod
+    def _command_words(command, num_words):
+        words = []
+        pos = 0
+        while len(words) < num_words:
+            m = _COMMAND_WORD_PATTERN.match(command, pos)
+            if m is None:
+                break
+            words.append(m.group(1).upper())
+            pos = m.end()
+        return words
+
+    def __init__(self, path, prefix_end, tree_offsets, suffix):
+        """
+        Parameters
+        ----------
+        path : str
+            Path to the file.
+        prefix_end : int
+            Offset of the end of the text preceding the first tree statement
+            (e.g., the TAXA block and the TRANSLATE statement of a NEXUS file)
+            that is required to read each shard.
+        tree_offsets : array
+            Offsets of the start of each tree statement, followed by the
+            offset of the end of the last tree statement.
+        suffix : bytes
+            Text following the tree statements in each shard (e.g., to close
+            the TREES block of a NEXUS file).
+        """
+        self.path = path
+        self.prefix_end = prefix_end
+        self.tree_offsets = tree_offsets
+        self.suffix = suffix
+
+    def __len__(self):
+        return len(self.tree_offsets) - 1
+
+    def shards(self, num_shards, tree_offset=0):
+        """
+        Returns a list of up to ``num_shards`` |TreeSourceShard| objects,
+        each with a contiguous range of (approximately) equal numbers of
+        the tree statements after the first ``tree_offset`` trees.
+        """
+        num_trees = max(len(self) - tree_offset, 0)
+        num_shards = min(num_shards, num_trees)
+        shards = []
+        start = tree_offset
+        for shard_idx in range(num_shards):
+            end = start + (num_trees // num_shards) + (1 if shard_idx < (num_trees % num_shards) else 0)
+            shards.append(TreeSourceShard(
+                    path=self.path,
+                    prefix_end=self.prefix_end,
+                    start=self.tree_offsets[start],
+                    end=self.tree_offsets[end],
+                    suffix=self.suffix,
+                    first_tree_offset=start,
+                    num_trees=end - start))
+            start = end
+        return shards
+
+##############################################################################
+## TreeSourceShard
+
+class TreeSourceShard(object):
+    """
+    A contiguous range of the tree statements of a file, as a tree source
+    that can be read independently of the rest of the file.
+    """
+
+    def __init__(self,
+            path,
+            prefix_end,
+            start,
+            end,
+            suffix,
+            first_tree_offset,
+            num_trees):
+        self.path = path
+        self.prefix_end = prefix_end
+        self.start = start
+        self.end = end
+        self.suffix = suffix
+        self.first_tree_offset = first_tree_offset
+        self.num_trees = num_trees
+
+    def _get_name(self):
+        return "{} (trees {}-{})".format(
+                self.path,
+                self.first_tree_offset,
+                self.first_tree_offset + self.num_trees - 1)
+    name = property(_get_name)
+
+    def __str__(self):
+        return self.name
+
+    def open(self):
+        """
+        Returns a file-like object opened for reading the text of this shard.
+        """
+        raw = _ByteRangeStream(
+                path=self.path,
+                segments=[(0, self.prefix_end), (self.start, self.end), self.suffix])
+        raw.name = self.name
+        return io.TextIOWrapper(io.BufferedReader(raw))
+
+class _ByteRangeStream(io.RawIOBase):
+
+    def __init__(self, path, segments):
+        io.RawIOBase.__init__(self)
+        self._src = open(path, "rb")
+        # (start, end) byte ranges of the file, or literal bytes
+        self._segments = list(segments)
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        while self._segments:
+            segment = self._segments[0]
+            if isinstance(segment, bytes):
+                data = segment[:len(b)]
+                self._segments[0] = segment[len(data):]
+            else:
+                start, end = segment
+                self._src.seek(start)
+                data = self._src.read(min(len(b), end - start))
+                self._segments[0] = (start + len(data), end)
+            if data:
+                b[:len(data)] = data
+                return len(data)
+            self._segments.pop(0)
+        return 0
+
+    def close(self):
+        if not self.closed:
+            self._src.close()
+        io.RawIOBase.close(self)
@@ -623,6 +623,25 @@ class Serializable(object):
 ##############################################################################
 ## Annotable
 
+_SLOT_NAMES = {}
+
+def _slot_names(cls):
+    # names of the attributes that instances of ``cls`` store in slots
+    # rather than in their ``__dict__``
+    try:
+        return _SLOT_NAMES[cls]
+    except KeyError:
+        names = []
+        for c in cls.__mro__:
+            slots = c.__dict__.get("__slots__", ())
+            if isinstance(slots, str):
+                slots = (slots,)
+            for name in slots:
+                if name not in ("__dict__", "__weakref__") and name not in names:
+                    names.append(name)
+        _SLOT_NAMES[cls] = tuple(names)
+        return _SLOT_NAMES[cls]
+
 class Annotable(object):
     """
     Mixin class which all classes that need to persist object attributes
@@ -785,6 +804,18 @@ class Annotable(object):
             other.__dict__[k] = copy.deepcopy(self.__dict__[k], memo)
             memo[id(self.__dict__[k])] = other.__dict__[k]
             # assert id(self.__dict__[k]) in memo
+        # and attributes stored in slots
+        for k in _slot_names(self.__class__):
+            if k == "_annotations":
+                continue
+            try:
+                v = getattr(self, k)
+            except AttributeError:
+                continue
+            if hasattr(other, k):
+                continue
+            setattr(other, k, copy.deepcopy(v, memo))
+            memo[id(v)] = getattr(other, k)
         # create annotations
         other.deep_copy_annotations_from(self, memo)
         # return
@@ -26,6 +26,8 @@ import copy
 from io import StringIO
 import math
 import collections
+import itertools
+import operator
 from dendropy.utility import textprocessing
 from dendropy.utility import error
 from dendropy.utility import deprecate
@@ -498,6 +500,7 @@ class CharacterMatrix(
 
     data_type = None
     character_sequence_type = CharacterDataSequence
+    is_compact = False
 
     ###########################################################################
     ### Factory (Class) Methods
@@ -516,12 +519,17 @@ class CharacterMatrix(
                 taxon_namespace.label = label
             return taxon_namespace
         label = kwargs.pop("label", None)
+        compact = kwargs.pop("compact", None)
+        def char_matrix_factory(data_type, **matrix_kwargs):
+            if compact is not None and data_type == cls.data_type:
+                matrix_kwargs["compact"] = compact
+            return new_char_matrix(data_type, **matrix_kwargs)
         kwargs["data_type"] = cls.data_type
         reader = dataio.get_reader(schema, **kwargs)
         char_matrices = reader.read_char_matrices(
                 stream=stream,
                 taxon_namespace_factory=tns_factory,
-                char_matrix_factory=new_char_matrix,
+                char_matrix_factory=char_matrix_factory,
                 state_alphabet_factory=charstatemodel.StateAlphabet,
                 global_annotations_target=None)
         if len(char_matrices) == 0:
@@ -568,6 +576,10 @@ class CharacterMatrix(
             - **matrix_offset** (*int*) -- 0-based index of character block or
               matrix in source to be parsed. If not specified then the
               first matrix (offset = 0) is assumed.
+            - **compact** (*bool*) -- If |True|, then sequences of a
+              fixed-alphabet matrix (e.g., |DnaCharacterMatrix|) are stored as
+              one byte per character. See
+              |CompactFixedAlphabetCharacterDataSequence|.
             - **ignore_unrecognized_keyword_arguments** (*bool*) -- If |True|,
               then unsupported or unrecognized keyword arguments will not
               result in an error. Default is |False|: unsupported keyword
@@ -603,6 +615,108 @@ class CharacterMatrix(
         """
         return cls._get_from(**kwargs)
 
+    @classmethod
+    def yield_sequences_from_files(cls,
+            files,
+            schema,
+            taxon_namespace=None,
+            data_type=None,
+            column_window=None,
+            **kwargs):
+        r"""
+        Iterates over the sequences of files, returning them one-by-one (as
+        ``(taxon, sequence)`` pairs) instead of instantiating a character
+        matrix of all of them in memory at once.
+
+        For operations where it is sufficient to process each sequence
+        individually (e.g., filtering or converting sequences, or calculating
+        per-sequence statistics), this allows for processing alignments that
+        are far too large to fit in memory, as only the current sequence is
+        held in memory. Sequences in PHYLIP or NEXUS files are only streamed
+        this way if they are not interleaved: interleaved data are read in
+        full (a matrix at a time) before the sequences are yielded.
+
+        Parameters
+        ----------
+        files : iterable of file paths or file-like objects.
+            Iterable of sources, which can either be strings specifying file
+            paths or file-like objects open for reading. If a source element is
+            a string (``isinstance(i,str) == True``), then it is assumed to be
+            a path to a file. Otherwise, the source is assumed to be a file-like
+            object.
+        schema : string
+            The name of the data format: "fasta", "phylip" or "nexus".
+        taxon_namespace : |TaxonNamespace| instance
+            The operational taxonomic unit concept namespace to use to manage
+            taxon definitions. The same |Taxon| instances are yielded for
+            the sequences of the same taxa across files.
+        data_type : string
+            The type of data (e.g., "dna" or "protein"), if not given by the
+            class this method is called on (e.g., |DnaCharacterMatrix|).
+        column_window : tuple of two integers
+            If given, then only the values of the columns from the first
+            (inclusive) to the second (exclusive) index of the tuple are
+            yielded, e.g. ``(0, 1000)`` for the first 1000 columns. Either
+            index may be |None|, to start from the first or end at the last
+            column. In FASTA files, the symbols outside the window are not
+            decoded (or validated). A ValueError is raised if either index is
+            negative or the window ends before it starts.
+        \*\*kwargs : keyword arguments
+            These will be passed directly to the schema-parser implementation.
+            ``compact=True`` stores the sequences of fixed-alphabet data as
+            |CompactFixedAlphabetCharacterDataSequence| instances.
+
+        Yields
+        ------
+        t : |Taxon|
+            The taxon of the sequence.
+        s : `CharacterDataSequence`
+            The sequence as read from the file.
+
+        Examples
+        --------
+
+        ::
+
+            taxon_namespace = dendropy.TaxonNamespace()
+            sequence_yielder = dendropy.DnaCharacterMatrix.yield_sequences_from_files(
+                    files=["path/to/locus1.fasta", "path/to/locus2.fasta"],
+                    schema="fasta",
+                    taxon_namespace=taxon_namespace,
+                    column_window=(0, 1000),
+                    compact=True,
+                    )
+            gc_contents = {}
+            for taxon, sequence in sequence_yielder:
+                symbols = sequence.symbols_as_string(sep="")
+                gc_contents[taxon] = (symbols.count("G") + symbols.count("C")) / len(symbols)
+
+        """
+        if data_type is None:
+            data_type = cls.data_type
+        char_matrix_type = get_char_matrix_type(data_type=data_type)
+        if not issubclass(char_matrix_type, cls):
+            raise ValueError("Data type '{}' is not supported by '{}'".format(data_type, cls.__name__))
+        if taxon_namespace is None:
+            taxon_namespace = taxonmodel.process_kwargs_dict_for_taxon_namespace(kwargs, None)
+            if taxon_namespace is None:
+                taxon_namespace = taxonmodel.TaxonNamespace(is_case_sensitive=kwargs.get("case_sensitive_taxon_labels", False))
+        else:
+            assert "taxon_set" not in kwargs
+        compact = kwargs.pop("compact", None)
+        def char_matrix_factory(**matrix_kwargs):
+            if compact is not None:
+                matrix_kwargs["compact"] = compact
+            return char_matrix_type(**matrix_kwargs)
+        sequence_yielder = dataio.get_char_yielder(
+                files,
+                schema,
+                taxon_namespace=taxon_namespace,
+                char_matrix_factory=char_matrix_factory,
+                column_window=column_window,
+                **kwargs)
+        return sequence_yielder
+
     @classmethod
     def concatenate(cls, char_matrices):
         """
@@ -971,6 +1085,12 @@ class CharacterMatrix(
             taxon = key
         return taxon
 
+    def _new_character_sequence(self, values=None):
+        return self.__class__.character_sequence_type(values)
+
+    def _is_character_sequence(self, values):
+        return isinstance(values, self.__class__.character_sequence_type)
+
     def new_sequence(self, taxon, values=None):
         """
         Creates a new `CharacterDataSequence` associated with |Taxon|
@@ -994,7 +1114,7 @@ class CharacterMatrix(
             raise ValueError("Character values vector for taxon {} already exists".format(repr(taxon)))
         if taxon not in self.taxon_namespace:
             raise ValueError("Taxon {} is not in object taxon namespace".format(repr(taxon)))
-        cv = self.__class__.character_sequence_type(values)
+        cv = self._new_character_sequence(values)
         self._taxon_sequence_map[taxon] = cv
         return cv
 
@@ -1056,8 +1176,8 @@ class CharacterMatrix(
         taxon = self._resolve_key(key)
         if taxon not in self.taxon_namespace:
             raise ValueError(repr(key))
-        if not isinstance(values, self.__class__.character_sequence_type):
-            values = self.__class__.character_sequence_type(values)
+        if not self._is_character_sequence(values):
+            values = self._new_character_sequence(values)
         self._taxon_sequence_map[taxon] = values
 
     def __contains__(self, key):
@@ -1351,7 +1471,7 @@ class CharacterMatrix(
             raise error.TaxonNamespaceIdentityError(self, other_matrix)
         for taxon in other_matrix._taxon_sequence_map:
             if taxon not in self._taxon_sequence_map:
-                self._taxon_sequence_map[taxon] = self.__class__.character_sequence_type(other_matrix._taxon_sequence_map[taxon])
+                self._taxon_sequence_map[taxon] = self._new_character_sequence(other_matrix._taxon_sequence_map[taxon])
 
     def replace_sequences(self, other_matrix):
         """
@@ -1376,7 +1496,7 @@ class CharacterMatrix(
             raise error.TaxonNamespaceIdentityError(self, other_matrix)
         for taxon in other_matrix._taxon_sequence_map:
             if taxon in self._taxon_sequence_map:
-                self._taxon_sequence_map[taxon] = self.__class__.character_sequence_type(other_matrix._taxon_sequence_map[taxon])
+                self._taxon_sequence_map[taxon] = self._new_character_sequence(other_matrix._taxon_sequence_map[taxon])
 
     def update_sequences(self, other_matrix):
         """
@@ -1402,7 +1522,7 @@ class CharacterMatrix(
         if other_matrix.taxon_namespace is not self.taxon_namespace:
             raise error.TaxonNamespaceIdentityError(self, other_matrix)
         for taxon in other_matrix._taxon_sequence_map:
-            self._taxon_sequence_map[taxon] = self.__class__.character_sequence_type(other_matrix._taxon_sequence_map[taxon])
+            self._taxon_sequence_map[taxon] = self._new_character_sequence(other_matrix._taxon_sequence_map[taxon])
 
     def extend_sequences(self, other_matrix, is_add_new_sequences=False):
         """
@@ -1430,7 +1550,7 @@ class CharacterMatrix(
             if taxon not in self._taxon_sequence_map:
                 if not is_add_new_sequences:
                     continue
-                self._taxon_sequence_map[taxon] = self.__class__.character_sequence_type(other_matrix._taxon_sequence_map[taxon])
+                self._taxon_sequence_map[taxon] = self._new_character_sequence(other_matrix._taxon_sequence_map[taxon])
             else:
                 self._taxon_sequence_map[taxon].extend(other_matrix._taxon_sequence_map[taxon])
 
@@ -1464,7 +1584,7 @@ class CharacterMatrix(
             if taxon in self._taxon_sequence_map:
                 self._taxon_sequence_map[taxon].extend(other_matrix._taxon_sequence_map[taxon])
             else:
-                self._taxon_sequence_map[taxon]= self.__class__.character_sequence_type(other_matrix._taxon_sequence_map[taxon])
+                self._taxon_sequence_map[taxon]= self._new_character_sequence(other_matrix._taxon_sequence_map[taxon])
 
     def remove_sequences(self, taxa):
         """
@@ -1898,20 +2018,227 @@ class DiscreteCharacterMatrix(CharacterMatrix):
             A vector of integers representing the folded site frequency
             spectrum.
         """
-        site_columns = zip(*self.sequences())
+        return self.compressed_patterns().folded_site_frequency_spectrum(
+                is_pad_vector_to_unfolded_length=is_pad_vector_to_unfolded_length)
+
+    def compressed_patterns(self, gaps_as_missing=True):
+        """
+        Returns the unique site patterns (i.e., columns) of the characters,
+        with the number of characters with each pattern.
+
+        Functions that calculate over the characters, e.g., parsimony scoring
+        or population genetic statistics, accept the |SitePatterns| returned
+        in place of the character matrix, and calculate over each unique
+        pattern once, weighting its result by the number of characters with
+        the pattern.
+
+        Parameters
+        ----------
+        gaps_as_missing : boolean
+            If |True| [default] then gap characters will be treated as missing
+            data values by calculations over the state sets of the patterns
+            (see :meth:`SitePatterns.taxon_state_sets_map()`). If |False|,
+            then they will be treated as an additional (fundamental) state.
+
+        Returns
+        -------
+        p : |SitePatterns|
+            The unique site patterns.
+        """
+        taxa = list(self)
+        sequences = [self[taxon].values() for taxon in taxa]
+        if len(set(len(sequence) for sequence in sequences)) > 1:
+            raise ValueError("Sequences are of different lengths")
+        # states are identified by ``id()``, as it is much faster than their
+        # hash
+        pattern_indexes = []
+        pattern_weights = []
+        pattern_columns = []
+        pattern_index_map = {}
+        for column_index, column in enumerate(zip(*[map(id, sequence) for sequence in sequences])):
+            pattern_index = pattern_index_map.get(column)
+            if pattern_index is None:
+                pattern_index = len(pattern_columns)
+                pattern_index_map[column] = pattern_index
+                pattern_columns.append(column_index)
+                pattern_weights.append(1)
+            else:
+                pattern_weights[pattern_index] += 1
+            pattern_indexes.append(pattern_index)
+        return SitePatterns(
+                char_matrix=self,
+                taxon_pattern_sequence_map=dict(
+                    (taxon, [sequence[column_index] for column_index in pattern_columns])
+                    for taxon, sequence in zip(taxa, sequences)),
+                weights=pattern_weights,
+                pattern_indexes=pattern_indexes,
+                gaps_as_missing=gaps_as_missing)
+
+### Site Patterns ##################################################
+
+class SitePatterns(object):
+    """
+    The unique site patterns (i.e., columns) of a |DiscreteCharacterMatrix|,
+    as returned by :meth:`DiscreteCharacterMatrix.compressed_patterns()`.
+
+    Like the character matrix, this maps each taxon to a sequence of states,
+    but with one state for each unique pattern rather than for each
+    character. The number of characters with each pattern is given by
+    ``weights``, and the pattern of each character by ``pattern_indexes``.
+    """
+
+    def __init__(self,
+            char_matrix,
+            taxon_pattern_sequence_map,
+            weights,
+            pattern_indexes,
+            gaps_as_missing=True):
+        """
+        Parameters
+        ----------
+        char_matrix : |DiscreteCharacterMatrix|
+            The character matrix of which these are the patterns.
+        taxon_pattern_sequence_map : dict
+            A dictionary mapping each taxon to a list of its states in each
+            pattern.
+        weights : list[int]
+            The number of characters with each pattern.
+        pattern_indexes : list[int]
+            The index of the pattern of each character.
+        gaps_as_missing : boolean
+            Whether gaps are treated as missing data by
+            :meth:`SitePatterns.taxon_state_sets_map()`.
+        """
+        self.char_matrix = char_matrix
+        self._taxon_sequence_map = taxon_pattern_sequence_map
+        self.weights = weights
+        self.pattern_indexes = pattern_indexes
+        self.gaps_as_missing = gaps_as_missing
+
+    def _get_taxon_namespace(self):
+        return self.char_matrix.taxon_namespace
+    taxon_namespace = property(_get_taxon_namespace)
+
+    def _get_default_state_alphabet(self):
+        return self.char_matrix.default_state_alphabet
+    default_state_alphabet = property(_get_default_state_alphabet)
+
+    def __len__(self):
+        """
+        Number of taxa (as for a character matrix); the number of patterns is
+        given by ``num_patterns``.
+        """
+        return len(self._taxon_sequence_map)
+
+    def __iter__(self):
+        """
+        Returns an iterator over the taxa.
+        """
+        return iter(self._taxon_sequence_map)
+
+    def __contains__(self, key):
+        return key in self._taxon_sequence_map
+
+    def __getitem__(self, key):
+        """
+        Returns the list of states in each pattern of the taxon given by
+        ``key``, which can be an index or a label of a |Taxon| instance in the
+        taxon namespace, or a |Taxon| instance directly.
+        """
+        return self._taxon_sequence_map[self.char_matrix._resolve_key(key)]
+
+    def _get_num_patterns(self):
+        return len(self.weights)
+    num_patterns = property(_get_num_patterns)
+
+    def _get_num_characters(self):
+        return len(self.pattern_indexes)
+    num_characters = property(_get_num_characters)
+
+    def sequences(self):
+        """
+        List of the pattern sequences of all the taxa.
+        """
+        return [self._taxon_sequence_map[taxon] for taxon in self._taxon_sequence_map]
+
+    def patterns(self):
+        """
+        List of the patterns, each a tuple of the states of the taxa, in the
+        order of ``sequences()``.
+        """
+        return list(zip(*self.sequences()))
+
+    def pattern_weights(self, weights=None):
+        """
+        Returns the weight of each pattern: if ``weights``, a list of the
+        weight of each character, is given, the sum of the weights of the
+        characters with the pattern, and otherwise the number of characters
+        with the pattern.
+        """
+        if weights is None:
+            return list(self.weights)
+        pattern_weights = [0] * len(self.weights)
+        for weight, pattern_index in zip(weights, self.pattern_indexes):
+            pattern_weights[pattern_index] += weight
+        return pattern_weights
+
+    def expand(self, pattern_values):
+        """
+        Returns a list of the value of the pattern of each character, given a
+        list of values for each pattern.
+        """
+        return [pattern_values[pattern_index] for pattern_index in self.pattern_indexes]
+
+    def taxon_state_sets_map(self, gaps_as_missing=None):
+        """
+        Returns a dictionary that maps taxon objects to lists of sets of
+        fundamental state indices in each pattern, as
+        :meth:`DiscreteCharacterMatrix.taxon_state_sets_map()`.
+
+        Parameters
+        ----------
+        gaps_as_missing : boolean
+            If |True| then gap characters will be treated as missing data
+            values. If |False|, then they will be treated as an additional
+            (fundamental) state. If |None| [default], then as given when the
+            patterns were compressed.
+        """
+        if gaps_as_missing is None:
+            gaps_as_missing = self.gaps_as_missing
+        taxon_to_state_indices = {}
+        state_sets = {}
+        for taxon in self._taxon_sequence_map:
+            v = []
+            for state in self._taxon_sequence_map[taxon]:
+                try:
+                    v.append(set(state_sets[id(state)]))
+                except KeyError:
+                    if gaps_as_missing:
+                        state_sets[id(state)] = state.fundamental_indexes_with_gaps_as_missing
+                    else:
+                        state_sets[id(state)] = state.fundamental_indexes
+                    v.append(set(state_sets[id(state)]))
+            taxon_to_state_indices[taxon] = v
+        return taxon_to_state_indices
+
+    def folded_site_frequency_spectrum(self, is_pad_vector_to_unfolded_length=False):
+        """
+        Returns the folded or minor site/allele frequency spectrum, as
+        :meth:`DiscreteCharacterMatrix.folded_site_frequency_spectrum()`.
+        """
         nsites = 0
         if is_pad_vector_to_unfolded_length:
             sfs = [0 for idx in range(len(self._taxon_sequence_map)+1)]
         else:
             sfs = [0 for idx in range(int(math.ceil(len(self._taxon_sequence_map)/2.0))+1)]
-        for site in site_columns:
-            counter = collections.Counter(site)
-            nsites += 1
+        for site, weight in zip(self.patterns(), self.weights):
+            counter = collections.Counter(map(id, site))
+            nsites += weight
             if len(counter) == 1:
-                sfs[0] += 1
+                sfs[0] += weight
                 continue
             del counter[counter.most_common(1)[0][0]]
-            sfs[sum(counter.values())] += 1
+            sfs[sum(counter.values())] += weight
         assert sum(sfs) == nsites
         return sfs
 
@@ -1920,6 +2247,242 @@ class DiscreteCharacterMatrix(CharacterMatrix):
 class FixedAlphabetCharacterDataSequence(CharacterDataSequence):
     pass
 
+class CompactFixedAlphabetCharacterDataSequence(FixedAlphabetCharacterDataSequence):
+    """
+    A |CharacterDataSequence| of the states of a fixed state alphabet, stored
+    as a ``bytearray`` of the indexes of the states in the alphabet rather
+    than as a list of references to |StateIdentity| instances.
+
+    Values are |StateIdentity| instances of ``state_alphabet``, which are
+    looked up on access, so ``values()`` returns a new list rather than the
+    underlying storage. The lists of character types and metadata annotations
+    are only created when a character type or annotation is first set.
+
+    Sequences are created by matrices with compact storage, e.g.,
+    ``DnaCharacterMatrix(compact=True)``, and are not usually instantiated
+    directly.
+    """
+
+    def __init__(self,
+            state_alphabet,
+            character_values=None,
+            character_types=None,
+            character_annotations=None):
+        """
+        Parameters
+        ----------
+        state_alphabet : |StateAlphabet|
+            The alphabet of the values of this sequence, with no more than 255
+            states.
+        character_values : iterable of |StateIdentity| objects
+            A set of values for this sequence.
+        """
+        if len(state_alphabet.states) > 254:
+            raise ValueError("Compact sequences support state alphabets of at most 254 states, but '{}' has {}".format(
+                state_alphabet.label, len(state_alphabet.states)))
+        self.state_alphabet = state_alphabet
+        self._state_indexes = bytearray()
+        self._character_types = None
+        self._character_annotations = None
+        if character_values:
+            self.extend(
+                    character_values=character_values,
+                    character_types=character_types,
+                    character_annotations=character_annotations)
+
+    def _state_index(self, state):
+        try:
+            if self.state_alphabet.states[state.index] is state:
+                return state.index
+        except (AttributeError, IndexError, TypeError):
+            pass
+        raise ValueError("{} is not a state of alphabet '{}'".format(repr(state), self.state_alphabet.label))
+
+    def _state_indexes_of(self, states):
+        if not isinstance(states, (list, tuple)):
+            states = list(states)
+        try:
+            state_indexes = bytes(state.index for state in states)
+            if all(map(operator.is_, map(self.state_alphabet.states.__getitem__, state_indexes), states)):
+                return state_indexes
+        except (AttributeError, IndexError, TypeError, ValueError):
+            pass
+        for state in states:
+            self._state_index(state)
+        raise ValueError("Invalid states for alphabet '{}'".format(self.state_alphabet.label))
+
+    def _require_character_types(self):
+        if self._character_types is None:
+            self._character_types = [None] * len(self._state_indexes)
+        return self._character_types
+
+    def _require_character_annotations(self):
+        if self._character_annotations is None:
+            self._character_annotations = [None] * len(self._state_indexes)
+        return self._character_annotations
+
+    def state_indexes(self):
+        """
+        Returns the indexes of the states of this sequence in
+        ``state_alphabet``.
+
+        Returns
+        -------
+        b : bytes
+            Index of the state of each character.
+        """
+        return bytes(self._state_indexes)
+
+    def values(self):
+        """
+        Returns list of values of this vector.
+
+        Returns
+        -------
+        v : list
+            List of values making up this vector. Unlike other sequences, this
+            is a new list, so changes to it do not change ``self``.
+        """
+        return list(map(self.state_alphabet.states.__getitem__, self._state_indexes))
+
+    def symbols_as_list(self):
+        return list(map(str, self))
+
+    def symbols_as_string(self, sep=""):
+        return self.state_alphabet.get_symbol_string_for_state_indexes(self._state_indexes, sep=sep)
+
+    def extend_symbols(self, symbols):
+        """
+        Extends ``self`` with the states of the single-character symbols of
+        ``symbols``, ignoring whitespace, as given by
+        :meth:`StateAlphabet.get_state_indexes_for_symbol_string()`.
+
+        Parameters
+        ----------
+        symbols : str
+            Symbols of states of ``state_alphabet``, including synonyms.
+
+        Raises
+        ------
+        KeyError
+            If any symbol is not recognized, in which case ``self`` is not
+            changed.
+        """
+        state_indexes = self.state_alphabet.get_state_indexes_for_symbol_string(symbols)
+        if self._character_types is not None:
+            self._character_types.extend([None] * len(state_indexes))
+        if self._character_annotations is not None:
+            self._character_annotations.extend([None] * len(state_indexes))
+        self._state_indexes.extend(state_indexes)
+
+    def append(self, character_value, character_type=None, character_annotations=None):
+        state_index = self._state_index(character_value)
+        if character_type is not None or self._character_types is not None:
+            self._require_character_types().append(character_type)
+        if character_annotations is not None or self._character_annotations is not None:
+            self._require_character_annotations().append(character_annotations)
+        self._state_indexes.append(state_index)
+
+    def extend(self, character_values, character_types=None, character_annotations=None):
+        state_indexes = self._state_indexes_of(character_values)
+        if character_types is not None:
+            assert len(character_types) == len(state_indexes)
+            self._require_character_types().extend(character_types)
+        elif self._character_types is not None:
+            self._character_types.extend([None] * len(state_indexes))
+        if character_annotations is not None:
+            assert len(character_annotations) == len(state_indexes)
+            self._require_character_annotations().extend(character_annotations)
+        elif self._character_annotations is not None:
+            self._character_annotations.extend([None] * len(state_indexes))
+        self._state_indexes.extend(state_indexes)
+
+    def __len__(self):
+        return len(self._state_indexes)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return list(map(self.state_alphabet.states.__getitem__, self._state_indexes[idx]))
+        return self.state_alphabet.states[self._state_indexes[idx]]
+
+    def __setitem__(self, idx, value):
+        if isinstance(idx, slice):
+            self._state_indexes[idx] = self._state_indexes_of(value)
+        else:
+            self._state_indexes[idx] = self._state_index(value)
+
+    def __iter__(self):
+        return map(self.state_alphabet.states.__getitem__, self._state_indexes)
+
+    def cell_iter(self):
+        return zip(self,
+                self._character_types or itertools.repeat(None),
+                self._character_annotations or itertools.repeat(None))
+
+    def __delitem__(self, idx):
+        del self._state_indexes[idx]
+        if self._character_types is not None:
+            del self._character_types[idx]
+        if self._character_annotations is not None:
+            del self._character_annotations[idx]
+
+    def set_at(self, idx, character_value, character_type=None, character_annotations=None):
+        """
+        Set value and associated character type and metadata annotations for
+        element at ``idx``. As ``None`` cannot be stored, if ``idx`` is beyond
+        the end of ``self``, then the elements in between are set to the
+        missing data state of ``state_alphabet``.
+        """
+        to_add = (idx+1) - len(self._state_indexes)
+        if to_add > 0:
+            if self.state_alphabet.no_data_state is None:
+                raise IndexError(idx)
+            self.extend([self.state_alphabet.no_data_state] * to_add)
+        self._state_indexes[idx] = self._state_index(character_value)
+        self.set_character_type_at(idx, character_type)
+        self.set_annotations_at(idx, character_annotations)
+
+    def insert(self, idx, character_value, character_type=None, character_annotations=None):
+        state_index = self._state_index(character_value)
+        if character_type is not None or self._character_types is not None:
+            self._require_character_types().insert(idx, character_type)
+        if character_annotations is not None or self._character_annotations is not None:
+            self._require_character_annotations().insert(idx, character_annotations)
+        self._state_indexes.insert(idx, state_index)
+
+    def value_at(self, idx):
+        return self.state_alphabet.states[self._state_indexes[idx]]
+
+    def character_type_at(self, idx):
+        if self._character_types is None:
+            self._state_indexes[idx] # raise IndexError if out of range
+            return None
+        return self._character_types[idx]
+
+    def annotations_at(self, idx):
+        character_annotations = self._require_character_annotations()
+        if character_annotations[idx] is None:
+            character_annotations[idx] = basemodel.AnnotationSet(self.character_type_at(idx))
+        return character_annotations[idx]
+
+    def has_annotations_at(self, idx):
+        if self._character_annotations is None:
+            self._state_indexes[idx] # raise IndexError if out of range
+            return False
+        return not self._character_annotations[idx] is None
+
+    def set_character_type_at(self, idx, character_type):
+        if character_type is None and self._character_types is None:
+            self._state_indexes[idx] # raise IndexError if out of range
+        else:
+            self._require_character_types()[idx] = character_type
+
+    def set_annotations_at(self, idx, annotations):
+        if annotations is None and self._character_annotations is None:
+            self._state_indexes[idx] # raise IndexError if out of range
+        else:
+            self._require_character_annotations()[idx] = annotations
+
 class FixedAlphabetCharacterMatrix(DiscreteCharacterMatrix):
 
     character_sequence_type = FixedAlphabetCharacterDataSequence
@@ -1927,9 +2490,41 @@ class FixedAlphabetCharacterMatrix(DiscreteCharacterMatrix):
     datatype_alphabet = None
 
     def __init__(self, *args, **kwargs):
+        """
+        If ``compact=True`` is passed in, then sequences will be stored as
+        |CompactFixedAlphabetCharacterDataSequence| instances, i.e., as one
+        byte per character instead of lists of references to state
+        identities. This reduces memory use by over an order of magnitude for
+        large alignments, at the cost of looking up each state on access. If
+        not given, then a matrix cloned from another matrix is stored as the
+        other matrix.
+        """
+        compact = kwargs.pop("compact", None)
+        self.is_compact = bool(compact)
         DiscreteCharacterMatrix.__init__(self, *args, **kwargs)
         self.state_alphabets.append(self.__class__.datatype_alphabet)
         self._default_state_alphabet = self.__class__.datatype_alphabet
+        if compact is not None and bool(compact) != self.is_compact:
+            # cloned from a matrix stored otherwise
+            self.is_compact = bool(compact)
+            for taxon in self._taxon_sequence_map:
+                self._taxon_sequence_map[taxon] = self._new_character_sequence(self._taxon_sequence_map[taxon])
+
+    def __copy__(self):
+        other = DiscreteCharacterMatrix.__copy__(self)
+        other.is_compact = self.is_compact
+        return other
+
+    def _new_character_sequence(self, values=None):
+        if self.is_compact:
+            return CompactFixedAlphabetCharacterDataSequence(self.datatype_alphabet, values)
+        return DiscreteCharacterMatrix._new_character_sequence(self, values)
+
+    def _is_character_sequence(self, values):
+        if self.is_compact:
+            return (isinstance(values, CompactFixedAlphabetCharacterDataSequence)
+                    and values.state_alphabet is self.datatype_alphabet)
+        return DiscreteCharacterMatrix._is_character_sequence(self, values)
 
     def coerce_values(self, values):
         if self.datatype_alphabet is None:
@@ -28,10 +28,17 @@ of the state alphabet and state alphabet elements).
 
 import collections
 import itertools
+import operator
 from dendropy.datamodel import basemodel
 from dendropy.utility import textprocessing
 from dendropy.utility import container
 
+# index of symbols not in a state alphabet in strings of state indexes, which
+# are therefore only available for alphabets of fewer than 255 states
+_UNRECOGNIZED_SYMBOL_INDEX = 255
+# ignored in strings of symbols
+_WHITESPACE_SYMBOLS = " \t\n\r\x0b\x0c"
+
 ###############################################################################
 ## StateAlphabet
 
@@ -173,6 +180,8 @@ class StateAlphabet(
         self._index_state_map = None
         self._fundamental_states_to_ambiguous_state_map = None
         self._fundamental_states_to_polymorphic_state_map = None
+        self._symbol_state_index_table = None
+        self._state_index_symbol_table = None
 
         # Suppress for initialization
         self.autocompile_lookup_tables = False
@@ -566,6 +575,26 @@ class StateAlphabet(
         self._canonical_symbol_state_map = container.FrozenOrderedDict(temp_canonical_symbol_state_map)
         self._full_symbol_state_map = container.FrozenOrderedDict(temp_full_symbol_state_map)
         self._index_state_map = container.FrozenOrderedDict(temp_index_state_map)
+        self.compile_symbol_translation_tables()
+
+    def compile_symbol_translation_tables(self):
+        """
+        Builds the ``bytes.translate()`` tables used to map whole strings of
+        single-character symbols to state indexes and back, if there are
+        fewer than 255 states.
+        """
+        self._symbol_state_index_table = None
+        self._state_index_symbol_table = None
+        if len(self._state_identities) >= _UNRECOGNIZED_SYMBOL_INDEX:
+            return
+        table = bytearray([_UNRECOGNIZED_SYMBOL_INDEX]) * 256
+        for symbol, state in self._full_symbol_state_map.items():
+            if symbol is not None and len(symbol) == 1 and ord(symbol) < 256:
+                table[ord(symbol)] = state._index
+        self._symbol_state_index_table = bytes(table)
+        symbols = [str(state) for state in self._state_identities]
+        if all(len(symbol) == 1 and ord(symbol) < 256 for symbol in symbols):
+            self._state_index_symbol_table = bytes(ord(symbol) for symbol in symbols) + bytes(256 - len(symbols))
 
     def set_state_as_attribute(self, state, attr_name=None):
         """
@@ -808,6 +837,94 @@ class StateAlphabet(
         states = [self.full_symbol_state_map[s] for s in symbols]
         return states
 
+    def get_state_indexes_for_symbol_string(self, symbols):
+        """
+        Returns the indexes of the states corresponding to the
+        single-character symbols of a string, ignoring whitespace.
+
+        The string is translated in a single call, so this is much faster
+        than looking up each symbol for long strings.
+
+        Parameters
+        ----------
+        symbols : str
+            String of symbols, e.g., a line of sequence data.
+
+        Returns
+        -------
+        s : bytes
+            The index of the state of each symbol in ``self.states``.
+
+        Raises
+        ------
+        KeyError if any symbol is not recognized.
+        ValueError if there are 255 or more states in this alphabet.
+
+        """
+        if self._symbol_state_index_table is None:
+            raise ValueError("State alphabet '{}' has too many states to index with bytes: {}".format(
+                self.label, len(self._state_identities)))
+        try:
+            state_indexes = symbols.encode("latin-1").translate(
+                    self._symbol_state_index_table,
+                    _WHITESPACE_SYMBOLS.encode("latin-1"))
+        except UnicodeEncodeError:
+            state_indexes = None
+        if state_indexes is None or _UNRECOGNIZED_SYMBOL_INDEX in state_indexes:
+            for symbol in symbols:
+                if symbol not in _WHITESPACE_SYMBOLS and (ord(symbol) > 255
+                        or self._symbol_state_index_table[ord(symbol)] == _UNRECOGNIZED_SYMBOL_INDEX):
+                    raise KeyError(symbol)
+        return state_indexes
+
+    def get_states_for_symbol_string(self, symbols):
+        """
+        Returns list of states corresponding to the single-character symbols
+        of a string, ignoring whitespace.
+
+        Parameters
+        ----------
+        symbols : str
+            String of symbols, e.g., a line of sequence data.
+
+        Returns
+        -------
+        s : list of |StateIdentity|
+            A list of |StateIdentity| instances corresponding to symbols
+            given in ``symbols``.
+
+        Raises
+        ------
+        KeyError if any symbol is not recognized.
+
+        """
+        if self._symbol_state_index_table is None:
+            return [self._full_symbol_state_map[s] for s in symbols if s not in _WHITESPACE_SYMBOLS]
+        state_indexes = self.get_state_indexes_for_symbol_string(symbols)
+        if len(state_indexes) < 2:
+            return [self._state_identities[i] for i in state_indexes]
+        return list(operator.itemgetter(*state_indexes)(self._state_identities))
+
+    def get_symbol_string_for_state_indexes(self, state_indexes, sep=""):
+        """
+        Returns string of the symbols of the states with the given indexes.
+
+        Parameters
+        ----------
+        state_indexes : bytes or iterable of integers
+            Indexes of states in ``self.states``.
+        sep : str
+            Separator of symbols.
+
+        Returns
+        -------
+        s : str
+            Symbols of the states, separated by ``sep``.
+        """
+        if not sep and self._state_index_symbol_table is not None and isinstance(state_indexes, (bytes, bytearray)):
+            return state_indexes.translate(self._state_index_symbol_table).decode("latin-1")
+        return sep.join(str(self._state_identities[idx]) for idx in state_indexes)
+
     def get_fundamental_states_for_symbols(self, symbols):
         """
         Returns list of *fundamental* states corresponding to symbols.
@@ -77,6 +77,7 @@ be related through correct interpretation of their taxon labels.
 
 
 import copy
+import weakref
 from io import StringIO
 from dendropy.datamodel import basemodel
 from dendropy.utility import bitprocessing
@@ -463,6 +464,14 @@ class TaxonNamespace(
             is_case_sensitive : boolean, optional (default = |False|)
                 Whether or not taxon names are considered case sensitive or
                 insensitive.
+            bitmask_type : type, optional (default = ``int``)
+                The type of the split bitmasks of the taxa (and so of the
+                split and leafset bitmasks of trees that reference this
+                namespace). For namespaces of thousands of taxa, this may be
+                :class:`~dendropy.utility.bitprocessing.Bitmask`, the hash of
+                which, unlike that of an ``int``, remains well-distributed for
+                wide bitmasks, so that splits are more efficiently counted,
+                compared, and looked up (at some cost in building them).
 
         Notes
         -----
@@ -536,12 +545,14 @@ class TaxonNamespace(
         self.comments = []
         self.is_mutable = kwargs.pop('is_mutable', True)
         self.is_case_sensitive = kwargs.pop('is_case_sensitive', False)
+        self.bitmask_type = kwargs.pop('bitmask_type', int)
         self._accession_index_taxon_map = {}
         self._taxa = []
         self._taxon_accession_index_map = {}
         self._taxon_bitmask_map = {}
         # self._split_bitmask_taxon_map = {}
         self._current_accession_count = 0
+        self._reindex_labels()
         if len(args) > 1:
             raise TypeError("TaxonNamespace() takes at most 1 non-keyword argument ({} given)".format(len(args)))
         elif len(args) == 1:
@@ -558,7 +569,9 @@ class TaxonNamespace(
                 for t1, t2 in zip(self._taxa, other._taxa):
                     memo[id(t2)] = t1
                 for k in other.__dict__:
-                    if k == "_annotations" or k == "_taxa":
+                    # (the label indexes of ``self`` have been built as the
+                    # |Taxon| objects were added)
+                    if k in ("_annotations", "_taxa", "_label_taxa_map", "_lower_cased_label_taxa_map"):
                         continue
                     self.__dict__[k] = copy.deepcopy(other.__dict__[k], memo)
                 self.deep_copy_annotations_from(other, memo=memo)
@@ -588,13 +601,24 @@ class TaxonNamespace(
         for t in self._taxa:
             o._taxa.append(copy.deepcopy(t, memo))
         for k in self.__dict__:
-            if k == "_annotations" or k == "_taxa":
+            if k in ("_annotations", "_taxa", "_label_taxa_map", "_lower_cased_label_taxa_map"):
                 continue
             o.__dict__[k] = copy.deepcopy(self.__dict__[k], memo)
+        # rebuilt on the next look-up, so that the copies of the |Taxon|
+        # objects are registered as indexed by the copy
+        o._label_taxa_map = None
+        o._lower_cased_label_taxa_map = None
         o.deep_copy_annotations_from(self, memo=memo)
         # o.copy_annotations_from(self, attribute_object_mapper=memo)
         return o
 
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        # rebuilt on the next look-up, as for a deep-copy
+        state["_label_taxa_map"] = None
+        state["_lower_cased_label_taxa_map"] = None
+        return state
+
     def populate_memo_for_taxon_namespace_scoped_copy(self, memo):
         if memo is not None:
             memo[id(self)] = self
@@ -706,28 +730,80 @@ class TaxonNamespace(
             `first_match_only==False`, a list of one or more |Taxon|
             instances with a ``label`` attribute matching the ``label`` argument.
         """
-        taxa = []
+        if self._label_taxa_map is None:
+            self._reindex_labels()
         if is_case_sensitive is True or (is_case_sensitive is None and self.is_case_sensitive):
-            for taxon in self._taxa:
-                if label == taxon.label:
-                    if first_match_only:
-                        return taxon
-                    else:
-                        taxa.append(taxon)
+            taxa = self._label_taxa_map.get(label)
         else:
             label = str(label).lower()
-            for taxon in self._taxa:
-                if label == taxon.lower_cased_label:
-                    if first_match_only:
-                        return taxon
-                    else:
-                        taxa.append(taxon)
-        if len(taxa) == 0:
+            taxa = self._lower_cased_label_taxa_map.get(label)
+        if not taxa:
             if error_if_not_found:
                 raise LookupError(label)
             else:
                 return None
-        return taxa
+        if first_match_only:
+            return taxa[0]
+        return list(taxa)
+
+    def _reindex_labels(self):
+        """
+        Rebuilds the indexes of |Taxon| objects by label and by lower-cased
+        label used by ``_lookup_label()``.
+
+        The indexes are maintained as |Taxon| objects are added and removed,
+        and as their labels are changed (see ``_relabel_taxon()``). If this
+        cannot be done in place, they are set to |None|, to be rebuilt on the
+        next look-up.
+        """
+        self._label_taxa_map = {}
+        self._lower_cased_label_taxa_map = {}
+        for taxon in self._taxa:
+            self._index_label(taxon)
+
+    def _index_label(self, taxon):
+        # (``getattr()``, as ``add_taxon()`` does not check that it is given
+        # a |Taxon| object)
+        if isinstance(taxon, Taxon):
+            try:
+                Taxon._label_indexing_namespaces[taxon].add(self)
+            except KeyError:
+                Taxon._label_indexing_namespaces[taxon] = weakref.WeakSet([self])
+        label = getattr(taxon, "label", None)
+        try:
+            self._label_taxa_map[label].append(taxon)
+        except KeyError:
+            self._label_taxa_map[label] = [taxon]
+        lower_cased_label = getattr(taxon, "lower_cased_label", None)
+        try:
+            self._lower_cased_label_taxa_map[lower_cased_label].append(taxon)
+        except KeyError:
+            self._lower_cased_label_taxa_map[lower_cased_label] = [taxon]
+
+    def _unindex_label(self, taxon):
+        for label_taxa_map, label in (
+                (self._label_taxa_map, getattr(taxon, "label", None)),
+                (self._lower_cased_label_taxa_map, getattr(taxon, "lower_cased_label", None)),
+                ):
+            taxa = [t for t in label_taxa_map.get(label, []) if t is not taxon]
+            if taxa:
+                label_taxa_map[label] = taxa
+            else:
+                label_taxa_map.pop(label, None)
+
+    def _index_relabeled_taxon(self, taxon):
+        """
+        Indexes ``taxon``, a member of this namespace, under its new label,
+        after it was unindexed (under its old label) by ``_unindex_label()``.
+        """
+        if (taxon.label in self._label_taxa_map
+                or taxon.lower_cased_label in self._lower_cased_label_taxa_map):
+            # the indexed |Taxon| objects must be kept in the order of the
+            # namespace
+            self._label_taxa_map = None
+            self._lower_cased_label_taxa_map = None
+        else:
+            self._index_label(taxon)
 
     ### Adding Taxa
 
@@ -769,6 +845,8 @@ class TaxonNamespace(
         self._accession_index_taxon_map[self._current_accession_count] = taxon
         self._taxon_accession_index_map[taxon] = self._current_accession_count
         self._current_accession_count += 1
+        if self._label_taxa_map is not None:
+            self._index_label(taxon)
 
     def append(self, taxon):
         """
@@ -875,6 +953,8 @@ class TaxonNamespace(
         # assert taxon not in self._taxa
         while taxon in self._taxa:
             self._taxa.remove(taxon)
+        if self._label_taxa_map is not None:
+            self._unindex_label(taxon)
         idx = self._taxon_accession_index_map.pop(taxon, None)
         if idx is not None:
             self._accession_index_taxon_map.pop(idx, None)
@@ -991,6 +1071,7 @@ class TaxonNamespace(
         self._taxon_accession_index_map.clear()
         self._taxon_bitmask_map.clear()
         # self._split_bitmask_taxon_map.clear()
+        self._reindex_labels()
 
     ### Look-up and Retrieval of Taxa
 
@@ -1164,6 +1245,7 @@ class TaxonNamespace(
             matching ``label``.
         """
         taxa = []
+        found_taxa = set()
         for label in labels:
             tt = self._lookup_label(label=label,
                     is_case_sensitive=is_case_sensitive,
@@ -1176,7 +1258,8 @@ class TaxonNamespace(
                 taxa.append(tt)
             else:
                 for t in tt:
-                    if t not in taxa:
+                    if t not in found_taxa:
+                        found_taxa.add(t)
                         taxa.append(t)
         return taxa
 
@@ -1252,12 +1335,14 @@ class TaxonNamespace(
         if key is None:
             key = lambda x: x.label
         self._taxa.sort(key=key, reverse=reverse)
+        self._reindex_labels()
 
     def reverse(self):
         """
         Reverses order of |Taxon| objects in collection.
         """
         self._taxa.reverse()
+        self._reindex_labels()
 
     ### Summarization of Collection
 
@@ -1345,7 +1430,7 @@ class TaxonNamespace(
             Bitmask spanning all |Taxon| objects in self.
         """
         #return pow(2, len(self)) - 1
-        b = 1 << self._current_accession_count
+        b = self.bitmask_type(1) << self._current_accession_count
         return b - 1
 
     def taxon_bitmask(self, taxon):
@@ -1371,7 +1456,7 @@ class TaxonNamespace(
         except KeyError:
             i = self._taxon_accession_index_map[taxon]
             # i = self._taxa.index(taxon)
-            m = 1 << i
+            m = self.bitmask_type(1) << i
             self._taxon_bitmask_map[taxon] = m
             # self._split_bitmask_taxon_map[m] = taxon
             return m
@@ -1651,6 +1736,10 @@ class Taxon(
     A taxon associated with a sequence or a node on a tree.
     """
 
+    # The namespaces whose label indexes include each |Taxon| object, so that
+    # these (and only these) can be updated when its label is changed.
+    _label_indexing_namespaces = weakref.WeakKeyDictionary()
+
     def __init__(self, label=None):
         """
         Parameters
@@ -1672,15 +1761,31 @@ class Taxon(
             self.deep_copy_annotations_from(other_taxon, memo=memo)
             # self.copy_annotations_from(other_taxon, attribute_object_mapper=memo)
         else:
-            basemodel.DataObject.__init__(self, label=label)
+            basemodel.DataObject.__init__(self)
+            # set directly, as a new taxon is not in any namespace, and so
+            # cannot invalidate any label indexes
+            self._label = label
             self._lower_cased_label = None
         self.comments = []
 
     def _get_label(self):
         return self._label
     def _set_label(self, v):
+        taxon_namespaces = []
+        label_indexing_namespaces = Taxon._label_indexing_namespaces.get(self)
+        if label_indexing_namespaces:
+            for taxon_namespace in list(label_indexing_namespaces):
+                if (taxon_namespace._label_taxa_map is None
+                        or self not in taxon_namespace._taxon_accession_index_map):
+                    # index to be rebuilt anyway, or no longer a member
+                    label_indexing_namespaces.discard(taxon_namespace)
+                else:
+                    taxon_namespace._unindex_label(self)
+                    taxon_namespaces.append(taxon_namespace)
         self._label = v
         self._lower_cased_label = None
+        for taxon_namespace in taxon_namespaces:
+            taxon_namespace._index_relabeled_taxon(self)
     label = property(_get_label, _set_label)
 
     def _get_lower_cased_label(self):
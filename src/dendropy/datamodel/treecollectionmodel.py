@@ -23,8 +23,21 @@ trees.
 """
 
 import collections
+import collections.abc
 import math
 import copy
+import itertools
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+try:
+    import numpy
+except ImportError:
+    numpy = None
 from dendropy.utility import error
 from dendropy.utility import bitprocessing
 from dendropy.utility import deprecate
@@ -126,6 +139,9 @@ class TreeList(
                 * ``tree_list`` : **SPECIAL** If passed a |TreeList| using
                   this keyword, then this instance is populated and returned
                   (instead of a new instance being created).
+                * ``tree_type`` specifies the type of the |Tree| objects
+                  created (e.g., |CompactTree|), if a new |TreeList| is
+                  created.
 
             All other keyword arguments are passed directly to |TreeList|.read()`.
             Other keyword arguments may be available, depending on the implementation
@@ -152,13 +168,14 @@ class TreeList(
         tree_list = kwargs.pop("tree_list", None)
         taxon_namespace = taxonmodel.process_kwargs_dict_for_taxon_namespace(kwargs, None)
         label = kwargs.pop("label", None)
+        tree_type = kwargs.pop("tree_type", cls.DEFAULT_TREE_TYPE)
 
         # get the reader
         reader = dataio.get_reader(schema, **kwargs)
 
         # Accommodate an existing TreeList object being passed
         if tree_list is None:
-            tree_list = cls(label=label, taxon_namespace=taxon_namespace)
+            tree_list = cls(label=label, taxon_namespace=taxon_namespace, tree_type=tree_type)
 
         if collection_offset is None and tree_offset is not None:
             collection_offset = 0
@@ -172,10 +189,14 @@ class TreeList(
                         tree_list_factory=tree_list._tree_list_pseudofactory,
                         global_annotations_target=None)
         else:
+            tree_list_factory = lambda label, taxon_namespace: tree_list.__class__(
+                    label=label,
+                    taxon_namespace=taxon_namespace,
+                    tree_type=tree_list.tree_type)
             tree_lists = reader.read_tree_lists(
                         stream=stream,
                         taxon_namespace_factory=tree_list._taxon_namespace_pseudofactory,
-                        tree_list_factory=tree_list.__class__,
+                        tree_list_factory=tree_list_factory,
                         global_annotations_target=None)
             # if collection_offset < 0:
             #     raise IndexError("Collection offset out of range: {} (minimum valid tree offset = 0)".format(collection_offset))
@@ -1233,7 +1254,24 @@ class SplitDistribution(taxonmodel.TaxonNamespaceAssociated):
             use_tree_weights=True,
             ultrametricity_precision=constants.DEFAULT_ULTRAMETRICITY_PRECISION,
             is_force_max_age=False,
-            taxon_label_age_map=None):
+            taxon_label_age_map=None,
+            use_streaming_summaries=False):
+        """
+        Parameters
+        ----------
+        use_streaming_summaries : bool
+            If |True|, then instead of retaining all the edge lengths and node
+            ages of each split (in ``split_edge_lengths`` and
+            ``split_node_ages``), these are accumulated by a
+            |StreamingSummary| for each split (in
+            ``split_edge_length_accumulators`` and
+            ``split_node_age_accumulators``), so that the memory required
+            does not grow with the number of trees counted. Summaries of the
+            edge lengths and node ages of each split then have exact means,
+            standard deviations and ranges, but approximate medians, HPDs and
+            quantiles (for splits counted in many trees). If |False|
+            [default], then all values are retained, and summaries are exact.
+        """
 
         # Taxon Namespace
         taxonmodel.TaxonNamespaceAssociated.__init__(self,
@@ -1244,6 +1282,7 @@ class SplitDistribution(taxonmodel.TaxonNamespaceAssociated):
         self.ignore_node_ages = ignore_node_ages
         self.use_tree_weights = use_tree_weights
         self.ultrametricity_precision = ultrametricity_precision
+        self.use_streaming_summaries = use_streaming_summaries
 
         # storage/function
         self.total_trees_counted = 0
@@ -1252,6 +1291,8 @@ class SplitDistribution(taxonmodel.TaxonNamespaceAssociated):
         self.split_counts = collections.defaultdict(float)
         self.split_edge_lengths = collections.defaultdict(list)
         self.split_node_ages = collections.defaultdict(list)
+        self.split_edge_length_accumulators = collections.defaultdict(statistics.StreamingSummary)
+        self.split_node_age_accumulators = collections.defaultdict(statistics.StreamingSummary)
         self.is_force_max_age = is_force_max_age
         self.is_force_min_age = False
         self.taxon_label_age_map = taxon_label_age_map
@@ -1330,8 +1371,10 @@ class SplitDistribution(taxonmodel.TaxonNamespaceAssociated):
 
         Parameters
         ----------
-        tree : a |Tree| object.
-            The tree on which to count the splits.
+        tree : a |Tree| or |SplitRecord| object.
+            The tree on which to count the splits, or a record of its splits
+            (see ``Tree.yield_split_records_from_files()``). A record must
+            have node ages if these are not ignored.
         is_bipartitions_updated : bool
             If |False| [default], then the tree will have its splits encoded or
             updated. Otherwise, if |True|, then the tree is assumed to have its
@@ -1348,66 +1391,61 @@ class SplitDistribution(taxonmodel.TaxonNamespaceAssociated):
         """
         assert tree.taxon_namespace is self.taxon_namespace
         self.total_trees_counted += 1
-        if not self.ignore_node_ages:
-            if self.taxon_label_age_map:
-                set_node_age_fn = self._set_node_age
-            else:
-                set_node_age_fn = None
-            tree.calc_node_ages(
-                    ultrametricity_precision=self.ultrametricity_precision,
-                    is_force_max_age=self.is_force_max_age,
-                    is_force_min_age=self.is_force_min_age,
-                    set_node_age_fn=set_node_age_fn,
-                    )
-        if tree.weight is not None and self.use_tree_weights:
-            weight_to_use = float(tree.weight)
+        if isinstance(tree, treemodel.SplitRecord):
+            split_record = tree
+            if not self.ignore_node_ages and split_record.node_ages is None:
+                raise ValueError("Node ages are required, but split record does not have node ages")
+        else:
+            split_record = self.new_split_record_encoder().encode_tree(
+                    tree,
+                    is_bipartitions_updated=is_bipartitions_updated)
+        if split_record.weight is not None and self.use_tree_weights:
+            weight_to_use = float(split_record.weight)
         else:
             weight_to_use = 1.0
         self.sum_of_tree_weights += weight_to_use
-        if tree.is_rooted:
+        if split_record.is_rooted:
             self.tree_rooting_types_counted.add(True)
         else:
             self.tree_rooting_types_counted.add(False)
-        if not is_bipartitions_updated:
-            tree.encode_bipartitions()
-        splits = []
+        splits = split_record.split_bitmasks
         edge_lengths = []
         node_ages = []
-        for bipartition in tree.bipartition_encoding:
-            split = bipartition.split_bitmask
-
-            if hasattr(bipartition, "edge"):
-                edge = bipartition.edge
-            else:
-                # @MAM we're just doing a lookup of bipartition, not storing it
-                # so it's ok to override is_mutable here
-                was_mutable, bipartition.is_mutable = bipartition.is_mutable, False
-                edge = tree.bipartition_edge_map.get(bipartition)
-                bipartition.is_mutable = was_mutable
-
-            splits.append(split)
+        if self.use_streaming_summaries:
+            split_edge_lengths = self.split_edge_length_accumulators
+            split_node_ages = self.split_node_age_accumulators
+        else:
+            split_edge_lengths = self.split_edge_lengths
+            split_node_ages = self.split_node_ages
+        for split_idx, split in enumerate(splits):
             self.split_counts[split] += weight_to_use
             if not self.ignore_edge_lengths:
-                sel = self.split_edge_lengths.setdefault(split,[])
-                if edge.length is None:
+                sel = split_edge_lengths[split]
+                elen = split_record.edge_lengths[split_idx]
+                if elen is None:
                     elen = default_edge_length_value
-                else:
-                    elen = edge.length
                 sel.append(elen)
                 edge_lengths.append(elen)
-            else:
-                sel = None
             if not self.ignore_node_ages:
-                sna = self.split_node_ages.setdefault(split, [])
-                if edge.head_node is not None:
-                    nage = edge.head_node.age
-                else:
-                    nage = None
+                sna = split_node_ages[split]
+                nage = split_record.node_ages[split_idx]
                 sna.append(nage)
                 node_ages.append(nage)
-            else:
-                sna = None
-        return splits, edge_lengths, node_ages
+        return list(splits), edge_lengths, node_ages
+
+    def new_split_record_encoder(self):
+        """
+        Returns a |SplitRecordEncoder| that encodes trees as required for
+        counting splits (e.g., with node ages, unless these are ignored) under
+        the current configuration of this distribution.
+        """
+        return treemodel.SplitRecordEncoder(
+                taxon_namespace=self.taxon_namespace,
+                is_calc_node_ages=not self.ignore_node_ages,
+                ultrametricity_precision=self.ultrametricity_precision,
+                is_force_max_age=self.is_force_max_age,
+                is_force_min_age=self.is_force_min_age,
+                taxon_label_age_map=self.taxon_label_age_map)
 
     def splits_considered(self):
         """
@@ -1455,6 +1493,10 @@ class SplitDistribution(taxonmodel.TaxonNamespaceAssociated):
             return float(self.sum_of_tree_weights)
 
     def update(self, split_dist):
+        if self.use_streaming_summaries != split_dist.use_streaming_summaries:
+            raise ValueError("Cannot update SplitDistribution {} streaming summaries from one {} streaming summaries".format(
+                "using" if self.use_streaming_summaries else "not using",
+                "using" if split_dist.use_streaming_summaries else "not using"))
         self.total_trees_counted += split_dist.total_trees_counted
         self.sum_of_tree_weights += split_dist.sum_of_tree_weights
         self._split_edge_length_summaries = None
@@ -1463,8 +1505,14 @@ class SplitDistribution(taxonmodel.TaxonNamespaceAssociated):
         self.tree_rooting_types_counted.update(split_dist.tree_rooting_types_counted)
         for split in split_dist.split_counts:
             self.split_counts[split] += split_dist.split_counts[split]
-            self.split_edge_lengths[split] += split_dist.split_edge_lengths[split]
-            self.split_node_ages[split] += split_dist.split_node_ages[split]
+            if self.use_streaming_summaries:
+                if split in split_dist.split_edge_length_accumulators:
+                    self.split_edge_length_accumulators[split].update(split_dist.split_edge_length_accumulators[split])
+                if split in split_dist.split_node_age_accumulators:
+                    self.split_node_age_accumulators[split].update(split_dist.split_node_age_accumulators[split])
+            else:
+                self.split_edge_lengths[split] += split_dist.split_edge_lengths[split]
+                self.split_node_ages[split] += split_dist.split_node_ages[split]
 
     ###########################################################################
     ### Basic Information Access
@@ -1562,32 +1610,37 @@ class SplitDistribution(taxonmodel.TaxonNamespaceAssociated):
             yield support
 
     def calc_split_edge_length_summaries(self):
-        self._split_edge_length_summaries = {}
-        for split, elens in self.split_edge_lengths.items():
-            if not elens:
-                continue
-            try:
-                self._split_edge_length_summaries[split] = statistics.summarize(elens)
-            except (ValueError, TypeError):
-                pass
+        if self.use_streaming_summaries:
+            self._split_edge_length_summaries = self._calc_split_value_summaries(
+                    self.split_edge_length_accumulators,
+                    lambda accumulator: accumulator.summarize())
+        else:
+            self._split_edge_length_summaries = self._calc_split_value_summaries(
+                    self.split_edge_lengths,
+                    statistics.summarize)
         return self._split_edge_length_summaries
 
     def calc_split_node_age_summaries(self):
-        self._split_node_age_summaries = {}
-        for split, ages in self.split_node_ages.items():
-            if not ages:
+        if self.use_streaming_summaries:
+            self._split_node_age_summaries = self._calc_split_value_summaries(
+                    self.split_node_age_accumulators,
+                    lambda accumulator: accumulator.summarize())
+        else:
+            self._split_node_age_summaries = self._calc_split_value_summaries(
+                    self.split_node_ages,
+                    statistics.summarize)
+        return self._split_node_age_summaries
+
+    def _calc_split_value_summaries(self, split_values, summarize_fn):
+        summaries = {}
+        for split, values in split_values.items():
+            if not len(values):
                 continue
             try:
-                self._split_node_age_summaries[split] = statistics.summarize(ages)
+                summaries[split] = summarize_fn(values)
             except (ValueError, TypeError):
                 pass
-        return self._split_node_age_summaries
-
-    def _set_node_age(self, nd):
-        if nd.taxon is None or nd._child_nodes:
-            return None
-        else:
-            return self.taxon_label_age_map.get(nd.taxon.label, 0.0)
+        return summaries
 
     def _get_split_edge_length_summaries(self):
         if self._split_edge_length_summaries is None \
@@ -2102,6 +2155,429 @@ class SplitDistributionSummarizer(object):
 ###############################################################################
 ### TreeArray
 
+def _compact_float_array(values):
+    values = list(values)
+    try:
+        return array("d", values)
+    except TypeError:
+        return array("d", (float("nan") if v is None else v for v in values))
+
+def _compact_float_array_columns(value_lists):
+    value_lists = list(value_lists)
+    offsets = array("q", [0])
+    offsets.extend(itertools.accumulate(map(len, value_lists)))
+    return offsets, _compact_float_array(itertools.chain.from_iterable(value_lists))
+
+def _expand_float_array(values):
+    # NaN values in compact columns represent |None|
+    values = values.tolist()
+    if any(map(math.isnan, values)):
+        values = [None if math.isnan(v) else v for v in values]
+    return values
+
+def _streaming_summary_states(accumulators, splits):
+    for split in splits:
+        if split in accumulators:
+            yield accumulators[split].get_state()
+        else:
+            yield ()
+
+class _SplitTable(object):
+    """
+    Interns split bitmasks, identifying each distinct bitmask by the index at
+    which it is stored.
+    """
+
+    def __init__(self):
+        self.bitmasks = []
+        self.ids = {}
+
+    def __len__(self):
+        return len(self.bitmasks)
+
+    def intern(self, bitmask):
+        try:
+            return self.ids[bitmask]
+        except KeyError:
+            split_id = len(self.bitmasks)
+            self.ids[bitmask] = split_id
+            self.bitmasks.append(bitmask)
+            return split_id
+
+class _RaggedArray(collections.abc.Sequence):
+    """
+    A sequence of tuples of numbers, stored as a single flat array of all the
+    values and an array of the offsets of the first value of each tuple.
+    """
+
+    def __init__(self, typecode):
+        self.values = array(typecode)
+        self.offsets = array("q", [0])
+
+    def _encode(self, items):
+        return items
+
+    def _decode(self, values):
+        return tuple(values)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[idx] for idx in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if index < 0 or index >= len(self):
+            raise IndexError("{} index out of range".format(self.__class__.__name__))
+        return self._decode(self.values[self.offsets[index]:self.offsets[index+1]])
+
+    def __iter__(self):
+        values = self.values
+        for start, end in zip(self.offsets, self.offsets[1:]):
+            yield self._decode(values[start:end])
+
+    def append(self, items):
+        self.values.extend(self._encode(items))
+        self.offsets.append(len(self.values))
+
+    def insert(self, index, items):
+        index = min(max(index + len(self), 0) if index < 0 else index, len(self))
+        values = array(self.values.typecode, self._encode(items))
+        start = self.offsets[index]
+        self.values[start:start] = values
+        self.offsets[index+1:] = array("q", (offset + len(values) for offset in self.offsets[index:]))
+
+    def extend(self, items_iterable):
+        if isinstance(items_iterable, self.__class__):
+            self.extend_columns(items_iterable.offsets, items_iterable.values)
+        else:
+            for items in items_iterable:
+                self.append(items)
+
+    def extend_columns(self, offsets, values):
+        """
+        Appends the tuples given by the (encoded) ``values`` and their
+        ``offsets``, as stored by another instance.
+        """
+        base_offset = self.offsets[-1] - offsets[0]
+        self.values.extend(values[offsets[0]:offsets[-1]])
+        self.offsets.extend(map(base_offset.__add__, offsets[1:]))
+
+class _RaggedFloatArray(_RaggedArray):
+    """
+    A sequence of tuples of floats (or |None|, stored as NaN).
+    """
+
+    def __init__(self):
+        _RaggedArray.__init__(self, "d")
+
+    def _encode(self, items):
+        return (float("nan") if v is None else v for v in items)
+
+    def _decode(self, values):
+        values = tuple(values)
+        if any(map(math.isnan, values)):
+            values = tuple(None if math.isnan(v) else v for v in values)
+        return values
+
+class _RaggedSplitBitmaskArray(_RaggedArray):
+    """
+    A sequence of tuples of split bitmasks, stored as the ids of the bitmasks
+    in a split table.
+    """
+
+    def __init__(self, split_table):
+        _RaggedArray.__init__(self, "I")
+        self.split_table = split_table
+
+    def _encode(self, items):
+        return map(self.split_table.intern, items)
+
+    def _decode(self, values):
+        return tuple(map(self.split_table.bitmasks.__getitem__, values))
+
+    def extend(self, items_iterable):
+        if isinstance(items_iterable, self.__class__):
+            self.extend_columns(
+                    items_iterable.offsets,
+                    items_iterable.values,
+                    items_iterable.split_table.bitmasks)
+        else:
+            _RaggedArray.extend(self, items_iterable)
+
+    def extend_columns(self, offsets, values, bitmasks):
+        """
+        Appends the tuples given by the ``values`` and their ``offsets``, as
+        stored by another instance, where the values are ids of the split
+        bitmasks ``bitmasks``.
+        """
+        split_ids = array("I", map(self.split_table.intern, bitmasks))
+        _RaggedArray.extend_columns(self,
+                offsets,
+                array("I", map(split_ids.__getitem__, values)))
+
+class _SplitBitmaskArray(collections.abc.Sequence):
+    """
+    A sequence of split bitmasks, stored as the ids of the bitmasks in a split
+    table.
+    """
+
+    def __init__(self, split_table):
+        self.values = array("I")
+        self.split_table = split_table
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(map(self.split_table.bitmasks.__getitem__, self.values[index]))
+        return self.split_table.bitmasks[self.values[index]]
+
+    def __iter__(self):
+        return map(self.split_table.bitmasks.__getitem__, self.values)
+
+    def append(self, bitmask):
+        self.values.append(self.split_table.intern(bitmask))
+
+    def insert(self, index, bitmask):
+        self.values.insert(index, self.split_table.intern(bitmask))
+
+    def extend(self, bitmasks):
+        if isinstance(bitmasks, self.__class__):
+            self.extend_columns(bitmasks.values, bitmasks.split_table.bitmasks)
+        else:
+            self.values.extend(map(self.split_table.intern, bitmasks))
+
+    def extend_columns(self, values, bitmasks):
+        """
+        Appends the bitmasks given by the ``values``, which are ids of the
+        split bitmasks ``bitmasks``.
+        """
+        split_ids = array("I", map(self.split_table.intern, bitmasks))
+        self.values.extend(map(split_ids.__getitem__, values))
+
+# The typed columns of the compact form of a |TreeArray|, in order, following
+# the (untyped) split table.
+_COMPACT_COLUMN_TYPECODES = (
+        ("split_table", None),
+        ("tree_split_offsets", "q"),
+        ("tree_split_ids", "I"),
+        ("tree_leafset_ids", "I"),
+        ("tree_edge_lengths", "d"),
+        ("tree_weights", "d"),
+        ("sd_split_ids", "I"),
+        ("sd_split_counts", "d"),
+        ("sd_edge_length_offsets", "q"),
+        ("sd_edge_lengths", "d"),
+        ("sd_node_age_offsets", "q"),
+        ("sd_node_ages", "d"),
+        )
+
+def _split_table_bitmask_width(splits):
+    if splits:
+        return max(1, (max(splits).bit_length() + 7) // 8)
+    return 1
+
+def _split_table_bitmasks(split_table, bitmask_width, bitmask_type=int):
+    split_table = bytes(split_table)
+    return [bitmask_type.from_bytes(split_table[i:i+bitmask_width], "little")
+            for i in range(0, len(split_table), bitmask_width)]
+
+class _StoredSplitValues(collections.abc.Mapping):
+    """
+    A read-only mapping of split bitmasks to lists of the values (edge lengths
+    or node ages) of each split, read on demand from columns of a store.
+    """
+
+    def __init__(self, splits, offsets, values):
+        self._offsets = offsets
+        self._values = values
+        self._index = {}
+        for idx, split in enumerate(splits):
+            if offsets[idx+1] > offsets[idx]:
+                self._index[split] = idx
+
+    def __len__(self):
+        return len(self._index)
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __contains__(self, split):
+        return split in self._index
+
+    def __getitem__(self, split):
+        # as with the ``defaultdict`` of a |SplitDistribution|, splits without
+        # values have an empty list of values
+        try:
+            idx = self._index[split]
+        except KeyError:
+            return []
+        return _expand_float_array(self._values[self._offsets[idx]:self._offsets[idx+1]])
+
+    def get(self, split, default=None):
+        if split in self._index:
+            return self[split]
+        return default
+
+class _TreeArrayStore(object):
+    """
+    A memory-mapped store of the compact form of a |TreeArray|.
+
+    The store consists of a signature, followed by the offset and size of a
+    JSON header (which comes at the end of the store), followed by each of the
+    columns of the compact form, aligned to 8 bytes, in native byte order. The
+    header gives the configuration and totals of the compact form, the labels
+    of the taxa, and the offset, size and type of each column.
+    """
+
+    SIGNATURE = b"DendroPy.TreeArray.store.1\n"
+
+    @classmethod
+    def write(cls, path, header, columns, taxon_namespace):
+        header = dict(header)
+        header["byteorder"] = sys.byteorder
+        header["taxa"] = [[taxon_namespace.accession_index(taxon), taxon.label] for taxon in taxon_namespace]
+        header["columns"] = {}
+        with open(path, "wb") as dest:
+            dest.write(cls.SIGNATURE)
+            dest.write(struct.pack("<QQ", 0, 0))
+            for name, data in columns.items():
+                dest.write(bytes(-dest.tell() % 8))
+                if isinstance(data, (array, memoryview)):
+                    typecode = data.typecode if isinstance(data, array) else data.format
+                    # released at once, so as not to hold any memory-mapping
+                    # of ``data`` open
+                    with memoryview(data) as view, view.cast("B") as data_bytes:
+                        header["columns"][name] = [dest.tell(), len(data_bytes), typecode]
+                        dest.write(data_bytes)
+                else:
+                    header["columns"][name] = [dest.tell(), len(data), None]
+                    dest.write(data)
+            header_data = json.dumps(header).encode("utf-8")
+            header_offset = dest.tell()
+            dest.write(header_data)
+            dest.seek(len(cls.SIGNATURE))
+            dest.write(struct.pack("<QQ", header_offset, len(header_data)))
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as src:
+            if src.read(len(self.SIGNATURE)) != self.SIGNATURE:
+                raise ValueError("Not a TreeArray store: '{}'".format(path))
+            self._buffer = mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ)
+        data = memoryview(self._buffer)
+        header_offset, header_size = struct.unpack_from("<QQ", data, len(self.SIGNATURE))
+        if header_offset + header_size > len(data):
+            raise ValueError("Incomplete TreeArray store: '{}'".format(path))
+        self.header = json.loads(bytes(data[header_offset:header_offset+header_size]).decode("utf-8"))
+        if self.header["byteorder"] != sys.byteorder:
+            raise ValueError("TreeArray store '{}' was written on a platform with a different byte order".format(path))
+        self.columns = {}
+        for name, (offset, size, typecode) in self.header["columns"].items():
+            column = data[offset:offset+size]
+            if typecode is not None:
+                column = column.cast(typecode)
+            self.columns[name] = column
+
+    def require_taxa(self, taxon_namespace):
+        """
+        Ensures that the taxa of the store are accessioned into
+        ``taxon_namespace`` in the same order as in the store, adding them if
+        needed, so that split bitmasks of the store refer to the same taxa.
+        """
+        for accession_index, label in self.header["taxa"]:
+            taxon = taxon_namespace.get_taxon(label, is_case_sensitive=True)
+            if taxon is None:
+                taxon = taxon_namespace.new_taxon(label)
+            if taxon_namespace.accession_index(taxon) != accession_index:
+                raise ValueError("Taxon '{}' is accessioned at a different index in the TreeArray store '{}' than in the taxon namespace".format(label, self.path))
+
+class _FileMapping(object):
+    """
+    A memory-mapping of ``file``, viewed (as ``view``) as an array of numbers
+    of type ``typecode``, from item ``start`` to item ``stop``. The mapping is
+    closed by :meth:`close()` (or on leaving a ``with`` block) rather than
+    when it is garbage-collected, so that the file is not held open (or, on
+    Windows, locked) after use. Any views derived from ``view`` must be
+    released before it is closed.
+    """
+
+    def __init__(self, file, typecode, access=mmap.ACCESS_READ, start=0, stop=None):
+        self._mmap = mmap.mmap(file.fileno(), 0, access=access)
+        self._views = [memoryview(self._mmap)]
+        self._views.append(self._views[-1].cast(typecode))
+        if start or stop is not None:
+            self._views.append(self._views[-1][start:stop])
+        self.view = self._views[-1]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._mmap.close()
+
+class _SpooledArray(object):
+    """
+    An array of numbers that is appended to a temporary file (in directory
+    ``dir``) in chunks, so that only the most recently appended values are
+    held in memory.
+    """
+
+    CHUNK_SIZE = 1 << 16
+
+    def __init__(self, typecode, dir=None):
+        self.typecode = typecode
+        self._buffer = array(typecode)
+        self._file = tempfile.TemporaryFile(dir=dir)
+        self._num_spooled = 0
+        self._file_mappings = []
+
+    def __len__(self):
+        return self._num_spooled + len(self._buffer)
+
+    def append(self, value):
+        self._buffer.append(value)
+        if len(self._buffer) >= self.CHUNK_SIZE:
+            self.flush()
+
+    def extend(self, values):
+        self._buffer.extend(values)
+        if len(self._buffer) >= self.CHUNK_SIZE:
+            self.flush()
+
+    def flush(self):
+        self._buffer.tofile(self._file)
+        self._num_spooled += len(self._buffer)
+        self._buffer = array(self.typecode)
+        self._file.flush()
+
+    def view(self):
+        """
+        Returns a memory-mapped view of all the values appended, valid until
+        :meth:`close()` is called.
+        """
+        self.flush()
+        if not self._num_spooled:
+            return array(self.typecode)
+        file_mapping = _FileMapping(self._file, self.typecode)
+        self._file_mappings.append(file_mapping)
+        return file_mapping.view
+
+    def close(self):
+        for file_mapping in self._file_mappings:
+            file_mapping.close()
+        self._file_mappings = []
+        self._file.close()
+
 class TreeArray(
         taxonmodel.TaxonNamespaceAssociated,
         basemodel.MultiReadable,
@@ -2128,6 +2604,8 @@ class TreeArray(
         pass
     class IncompatibleTreeWeightsTreeArrayUpdate(IncompatibleTreeArrayUpdate):
         pass
+    class IncompatibleStreamingSummariesTreeArrayUpdate(IncompatibleTreeArrayUpdate):
+        pass
 
     ##############################################################################
     ## Factory Function
@@ -2143,6 +2621,8 @@ class TreeArray(
             is_force_max_age=None,
             taxon_label_age_map=None,
             is_bipartitions_updated=False,
+            use_compact_storage=False,
+            use_streaming_summaries=False,
             ):
         taxon_namespace = trees.taxon_namespace
         ta = cls(
@@ -2154,6 +2634,8 @@ class TreeArray(
             ultrametricity_precision=ultrametricity_precision,
             is_force_max_age=is_force_max_age,
             taxon_label_age_map=taxon_label_age_map,
+            use_compact_storage=use_compact_storage,
+            use_streaming_summaries=use_streaming_summaries,
             )
         ta.add_trees(
                 trees=trees,
@@ -2172,6 +2654,8 @@ class TreeArray(
             ultrametricity_precision=constants.DEFAULT_ULTRAMETRICITY_PRECISION,
             is_force_max_age=None,
             taxon_label_age_map=None,
+            use_compact_storage=False,
+            use_streaming_summaries=False,
             ):
         """
         Parameters
@@ -2192,6 +2676,22 @@ class TreeArray(
             |False|, then node ages will be stored.
         use_tree_weights : bool
             If |False|, then tree weights will not be used to weight splits.
+        use_compact_storage : bool
+            If |True|, then trees will be stored in a compact, columnar form:
+            each distinct split bitmask is stored only once, each tree is
+            stored as an array of the ids of its splits, and edge lengths
+            (with |None| stored as NaN) and tree weights are stored in flat
+            arrays of floats. This greatly reduces the memory required to
+            store large numbers of trees of many taxa, at some cost in the
+            time taken to access individual trees. If |False| [default],
+            then trees are stored as tuples of split bitmasks and edge
+            lengths.
+        use_streaming_summaries : bool
+            If |True|, then the edge lengths and node ages of each split are
+            accumulated by the split distribution of the collection in
+            bounded memory, rather than retained (see
+            :meth:`SplitDistribution.__init__()`). Note that the edge lengths
+            of each tree are still stored in the collection itself.
         """
         taxonmodel.TaxonNamespaceAssociated.__init__(self,
                 taxon_namespace=taxon_namespace)
@@ -2206,10 +2706,9 @@ class TreeArray(
         self.taxon_label_age_map = taxon_label_age_map
 
         # Storage
-        self._tree_split_bitmasks = []
-        self._tree_edge_lengths = []
-        self._tree_leafset_bitmasks = []
-        self._tree_weights = []
+        self.use_compact_storage = use_compact_storage
+        self._init_tree_storage()
+        self._store = None
         self._split_distribution = SplitDistribution(
                 taxon_namespace=self.taxon_namespace,
                 ignore_edge_lengths=self.ignore_edge_lengths,
@@ -2217,8 +2716,23 @@ class TreeArray(
                 ultrametricity_precision=ultrametricity_precision,
                 is_force_max_age=is_force_max_age,
                 taxon_label_age_map=self.taxon_label_age_map,
+                use_streaming_summaries=use_streaming_summaries,
                 )
 
+    def _init_tree_storage(self):
+        if self.use_compact_storage:
+            self._split_table = _SplitTable()
+            self._tree_split_bitmasks = _RaggedSplitBitmaskArray(self._split_table)
+            self._tree_edge_lengths = _RaggedFloatArray()
+            self._tree_leafset_bitmasks = _SplitBitmaskArray(self._split_table)
+            self._tree_weights = array("d")
+        else:
+            self._split_table = None
+            self._tree_split_bitmasks = []
+            self._tree_edge_lengths = []
+            self._tree_leafset_bitmasks = []
+            self._tree_weights = []
+
     ##############################################################################
     ## Book-Keeping
 
@@ -2248,27 +2762,361 @@ class TreeArray(
     ## Updating from Another TreeArray
 
     def update(self, other):
-        if len(self) > 0:
-            # self.validate_rooting(other._is_rooted_trees)
-            if self._is_rooted_trees is not other._is_rooted_trees:
-                raise TreeArray.IncompatibleRootingTreeArrayUpdate("Updating from incompatible TreeArray: 'is_rooted_trees' should be '{}', but is instead '{}'".format(other._is_rooted_trees, self._is_rooted_trees, ))
-            if self.ignore_edge_lengths is not other.ignore_edge_lengths:
-                raise TreeArray.IncompatibleEdgeLengthsTreeArrayUpdate("Updating from incompatible TreeArray: 'ignore_edge_lengths' is not: {} ".format(other.ignore_edge_lengths, self.ignore_edge_lengths, ))
-            if self.ignore_node_ages is not other.ignore_node_ages:
-                raise TreeArray.IncompatibleNodeAgesTreeArrayUpdate("Updating from incompatible TreeArray: 'ignore_node_ages' should be '{}', but is instead '{}'".format(other.ignore_node_ages, self.ignore_node_ages))
-            if self.use_tree_weights is not other.use_tree_weights:
-                raise TreeArray.IncompatibleTreeWeightsTreeArrayUpdate("Updating from incompatible TreeArray: 'use_tree_weights' should be '{}', but is instead '{}'".format(other.use_tree_weights, self.use_tree_weights))
-        else:
-            self._is_rooted_trees = other._is_rooted_trees
-            self.ignore_edge_lengths = other.ignore_edge_lengths
-            self.ignore_node_ages = other.ignore_node_ages
-            self.use_tree_weights = other.use_tree_weights
+        self._check_is_mutable()
+        self._update_configuration(
+                is_rooted_trees=other._is_rooted_trees,
+                ignore_edge_lengths=other.ignore_edge_lengths,
+                ignore_node_ages=other.ignore_node_ages,
+                use_tree_weights=other.use_tree_weights,
+                use_streaming_summaries=other._split_distribution.use_streaming_summaries)
         self._tree_split_bitmasks.extend(other._tree_split_bitmasks)
         self._tree_edge_lengths.extend(other._tree_edge_lengths)
         self._tree_leafset_bitmasks.extend(other._tree_leafset_bitmasks)
         self._tree_weights.extend(other._tree_weights)
         self._split_distribution.update(other._split_distribution)
 
+    def _update_configuration(self,
+            is_rooted_trees,
+            ignore_edge_lengths,
+            ignore_node_ages,
+            use_tree_weights,
+            use_streaming_summaries=False):
+        if len(self) > 0:
+            # self.validate_rooting(is_rooted_trees)
+            if self._is_rooted_trees is not is_rooted_trees:
+                raise TreeArray.IncompatibleRootingTreeArrayUpdate("Updating from incompatible TreeArray: 'is_rooted_trees' should be '{}', but is instead '{}'".format(is_rooted_trees, self._is_rooted_trees, ))
+            if self.ignore_edge_lengths is not ignore_edge_lengths:
+                raise TreeArray.IncompatibleEdgeLengthsTreeArrayUpdate("Updating from incompatible TreeArray: 'ignore_edge_lengths' is not: {} ".format(ignore_edge_lengths, self.ignore_edge_lengths, ))
+            if self.ignore_node_ages is not ignore_node_ages:
+                raise TreeArray.IncompatibleNodeAgesTreeArrayUpdate("Updating from incompatible TreeArray: 'ignore_node_ages' should be '{}', but is instead '{}'".format(ignore_node_ages, self.ignore_node_ages))
+            if self.use_tree_weights is not use_tree_weights:
+                raise TreeArray.IncompatibleTreeWeightsTreeArrayUpdate("Updating from incompatible TreeArray: 'use_tree_weights' should be '{}', but is instead '{}'".format(use_tree_weights, self.use_tree_weights))
+            if self._split_distribution.use_streaming_summaries is not use_streaming_summaries:
+                raise TreeArray.IncompatibleStreamingSummariesTreeArrayUpdate("Updating from incompatible TreeArray: 'use_streaming_summaries' should be '{}', but is instead '{}'".format(use_streaming_summaries, self._split_distribution.use_streaming_summaries))
+        else:
+            self._is_rooted_trees = is_rooted_trees
+            self.ignore_edge_lengths = ignore_edge_lengths
+            self.ignore_node_ages = ignore_node_ages
+            self.use_tree_weights = use_tree_weights
+            self._split_distribution.use_streaming_summaries = use_streaming_summaries
+
+    ##############################################################################
+    ## Compact Serialization
+
+    _COMPACT_FORMAT_SIGNATURE = b"DendroPy.TreeArray.compact.1\n"
+
+    def write_compact(self, dest):
+        """
+        Writes the trees and split distribution of this collection to the
+        binary stream ``dest`` in a compact form, to be merged into another
+        collection using :meth:`TreeArray.read_compact()`.
+
+        This is intended for transferring results between processes on the
+        same machine (e.g., from worker processes to a master process), as an
+        alternative to pickling: each distinct split bitmask is stored only
+        once, as a fixed-width byte string, and all other values are stored as
+        (native byte order) columns of numbers rather than as sequences of
+        Python objects. Edge length and node age values of |None| are stored
+        as NaN.
+
+        Parameters
+        ----------
+        dest : binary stream
+            Destination for the data.
+        """
+        header, columns = self._get_compact_columns()
+        dest.write(self._COMPACT_FORMAT_SIGNATURE)
+        for data in itertools.chain([json.dumps(header).encode("utf-8")], columns.values()):
+            if isinstance(data, (array, memoryview)):
+                data = data.tobytes()
+            dest.write(struct.pack("<Q", len(data)))
+            dest.write(data)
+
+    def _get_compact_columns(self):
+        # Returns the header and the (ordered) columns of the compact form of
+        # this collection.
+        sd = self._split_distribution
+        if self.use_compact_storage:
+            # split table: the split table of the trees, followed by any other
+            # splits of the distribution
+            split_ids = collections.defaultdict(
+                    itertools.count(len(self._split_table)).__next__,
+                    self._split_table.ids)
+            tree_split_offsets = self._tree_split_bitmasks.offsets
+            tree_split_ids = self._tree_split_bitmasks.values
+            tree_leafset_ids = self._tree_leafset_bitmasks.values
+            tree_edge_lengths = self._tree_edge_lengths.values
+        else:
+            # split table: the splits of the distribution, followed by any
+            # other split or leafset bitmasks of the trees
+            split_ids = dict(zip(sd.split_counts, itertools.count()))
+            split_ids = collections.defaultdict(itertools.count(len(split_ids)).__next__, split_ids)
+            tree_split_offsets = array("q", [0])
+            tree_split_offsets.extend(itertools.accumulate(map(len, self._tree_split_bitmasks)))
+            tree_split_ids = array("I", map(split_ids.__getitem__,
+                    itertools.chain.from_iterable(self._tree_split_bitmasks)))
+            tree_leafset_ids = array("I", map(split_ids.__getitem__, self._tree_leafset_bitmasks))
+            tree_edge_lengths = _compact_float_array(
+                    itertools.chain.from_iterable(self._tree_edge_lengths))
+        tree_weights = array("d", self._tree_weights)
+        sd_split_ids = array("I", map(split_ids.__getitem__, sd.split_counts))
+        sd_split_counts = array("d", sd.split_counts.values())
+        if sd.use_streaming_summaries:
+            # the states of the accumulators of the values of each split
+            sd_edge_length_offsets, sd_edge_lengths = _compact_float_array_columns(
+                    _streaming_summary_states(sd.split_edge_length_accumulators, sd.split_counts))
+            sd_node_age_offsets, sd_node_ages = _compact_float_array_columns(
+                    _streaming_summary_states(sd.split_node_age_accumulators, sd.split_counts))
+        else:
+            sd_edge_length_offsets, sd_edge_lengths = _compact_float_array_columns(
+                    map(sd.split_edge_lengths.get, sd.split_counts, itertools.repeat(())))
+            sd_node_age_offsets, sd_node_ages = _compact_float_array_columns(
+                    map(sd.split_node_ages.get, sd.split_counts, itertools.repeat(())))
+        bitmask_width = _split_table_bitmask_width(split_ids)
+        header = {
+            "is_rooted_trees": self._is_rooted_trees,
+            "ignore_edge_lengths": self.ignore_edge_lengths,
+            "ignore_node_ages": self.ignore_node_ages,
+            "use_tree_weights": self.use_tree_weights,
+            "use_streaming_summaries": sd.use_streaming_summaries,
+            "total_trees_counted": sd.total_trees_counted,
+            "sum_of_tree_weights": sd.sum_of_tree_weights,
+            "tree_rooting_types_counted": list(sd.tree_rooting_types_counted),
+            "bitmask_width": bitmask_width,
+            }
+        columns = collections.OrderedDict([
+                ("split_table", b"".join(split.to_bytes(bitmask_width, "little") for split in split_ids)),
+                ("tree_split_offsets", tree_split_offsets),
+                ("tree_split_ids", tree_split_ids),
+                ("tree_leafset_ids", tree_leafset_ids),
+                ("tree_edge_lengths", tree_edge_lengths),
+                ("tree_weights", tree_weights),
+                ("sd_split_ids", sd_split_ids),
+                ("sd_split_counts", sd_split_counts),
+                ("sd_edge_length_offsets", sd_edge_length_offsets),
+                ("sd_edge_lengths", sd_edge_lengths),
+                ("sd_node_age_offsets", sd_node_age_offsets),
+                ("sd_node_ages", sd_node_ages),
+                ])
+        return header, columns
+
+    def read_compact(self, src):
+        """
+        Adds the trees and split distribution written by
+        :meth:`TreeArray.write_compact()` to the binary stream ``src`` to this
+        collection. As with :meth:`TreeArray.update()`, the source collection
+        must have the same configuration as this one, and use the same taxon
+        namespace (or an identical copy of it).
+
+        Parameters
+        ----------
+        src : binary stream
+            Source of the data.
+        """
+        self._check_is_mutable()
+        if src.read(len(self._COMPACT_FORMAT_SIGNATURE)) != self._COMPACT_FORMAT_SIGNATURE:
+            raise ValueError("Not a compact TreeArray data source")
+        def _read_block(typecode=None):
+            size = struct.unpack("<Q", src.read(8))[0]
+            data = src.read(size)
+            if len(data) != size:
+                raise ValueError("Incomplete compact TreeArray data source")
+            if typecode is None:
+                return data
+            a = array(typecode)
+            a.frombytes(data)
+            return a
+        header = json.loads(_read_block().decode("utf-8"))
+        columns = {}
+        for name, typecode in _COMPACT_COLUMN_TYPECODES:
+            columns[name] = _read_block(typecode)
+        self._add_compact_columns(header, columns)
+
+    def _add_compact_columns(self, header, columns):
+        # Adds the trees and split distribution given by the header and
+        # columns of a compact form to this collection.
+        self._update_configuration(
+                is_rooted_trees=header["is_rooted_trees"],
+                ignore_edge_lengths=header["ignore_edge_lengths"],
+                ignore_node_ages=header["ignore_node_ages"],
+                use_tree_weights=header["use_tree_weights"],
+                use_streaming_summaries=header.get("use_streaming_summaries", False))
+        splits = _split_table_bitmasks(
+                columns["split_table"],
+                header["bitmask_width"],
+                self.taxon_namespace.bitmask_type)
+        tree_split_offsets = columns["tree_split_offsets"]
+        tree_split_ids = columns["tree_split_ids"]
+        tree_leafset_ids = columns["tree_leafset_ids"]
+        tree_edge_lengths = columns["tree_edge_lengths"]
+        sd_split_ids = columns["sd_split_ids"]
+        sd_split_counts = columns["sd_split_counts"]
+        sd_edge_length_offsets = columns["sd_edge_length_offsets"]
+        sd_edge_lengths = _expand_float_array(columns["sd_edge_lengths"])
+        sd_node_age_offsets = columns["sd_node_age_offsets"]
+        sd_node_ages = _expand_float_array(columns["sd_node_ages"])
+        if self.use_compact_storage:
+            self._tree_split_bitmasks.extend_columns(tree_split_offsets, tree_split_ids, splits)
+            self._tree_edge_lengths.extend_columns(tree_split_offsets, tree_edge_lengths)
+            self._tree_leafset_bitmasks.extend_columns(tree_leafset_ids, splits)
+        else:
+            tree_edge_lengths = _expand_float_array(tree_edge_lengths)
+            tree_slices = list(map(slice, tree_split_offsets, tree_split_offsets[1:]))
+            tree_splits = list(map(splits.__getitem__, tree_split_ids))
+            self._tree_split_bitmasks.extend(map(tuple, map(tree_splits.__getitem__, tree_slices)))
+            self._tree_edge_lengths.extend(map(tuple, map(tree_edge_lengths.__getitem__, tree_slices)))
+            self._tree_leafset_bitmasks.extend(map(splits.__getitem__, tree_leafset_ids))
+        self._tree_weights.extend(columns["tree_weights"])
+        sd = self._split_distribution
+        self._add_compact_split_distribution_totals(header)
+        split_counts = sd.split_counts
+        split_edge_lengths = sd.split_edge_lengths
+        split_node_ages = sd.split_node_ages
+        for split, count, edge_lengths, node_ages in zip(
+                map(splits.__getitem__, sd_split_ids),
+                sd_split_counts,
+                map(sd_edge_lengths.__getitem__, map(slice, sd_edge_length_offsets, sd_edge_length_offsets[1:])),
+                map(sd_node_ages.__getitem__, map(slice, sd_node_age_offsets, sd_node_age_offsets[1:])),
+                ):
+            split_counts[split] += count
+            if sd.use_streaming_summaries:
+                # values are the states of the accumulators of the split
+                if edge_lengths:
+                    sd.split_edge_length_accumulators[split].update(
+                            statistics.StreamingSummary.from_state(edge_lengths))
+                if node_ages:
+                    sd.split_node_age_accumulators[split].update(
+                            statistics.StreamingSummary.from_state(node_ages))
+            else:
+                split_edge_lengths[split].extend(edge_lengths)
+                split_node_ages[split].extend(node_ages)
+
+    def _add_compact_split_distribution_totals(self, header):
+        sd = self._split_distribution
+        sd.total_trees_counted += header["total_trees_counted"]
+        sd.sum_of_tree_weights += header["sum_of_tree_weights"]
+        sd._split_edge_length_summaries = None
+        sd._split_node_age_summaries = None
+        sd._trees_counted_for_summaries = 0
+        sd.tree_rooting_types_counted.update(header["tree_rooting_types_counted"])
+
+    ##############################################################################
+    ## On-Disk Storage
+
+    def save(self, path):
+        """
+        Saves the trees and split distribution of this collection to a store
+        at ``path``, to be opened using :meth:`TreeArray.open()`.
+
+        The store holds the same columns as the compact form written by
+        :meth:`TreeArray.write_compact()` (i.e., the split table, the runs of
+        split ids of each tree and the edge lengths and node ages of each
+        split), as well as the taxa of the collection, in a form that can be
+        memory-mapped. See also |TreeArrayStoreWriter|, which writes a store
+        incrementally, without holding the trees in memory.
+
+        Parameters
+        ----------
+        path : str
+            Path of the file to which to write the store.
+        """
+        header, columns = self._get_compact_columns()
+        _TreeArrayStore.write(
+                path=path,
+                header=header,
+                columns=columns,
+                taxon_namespace=self.taxon_namespace)
+
+    @classmethod
+    def open(cls, path, use_mmap=True, taxon_namespace=None):
+        """
+        Returns a collection of the trees and split distribution of the store
+        at ``path``, as written by :meth:`TreeArray.save()` or by a
+        |TreeArrayStoreWriter|.
+
+        Parameters
+        ----------
+        path : str
+            Path of the store.
+        use_mmap : bool
+            If |True| [default], then the store is memory-mapped rather than
+            loaded: the trees, and the edge lengths and node ages of each split,
+            are only read (by the operating system) as they are accessed, and
+            only the split table and split counts are held in memory. This
+            allows posteriors that do not fit into memory to be summarized
+            (e.g., using :meth:`TreeArray.consensus_tree()`,
+            :meth:`TreeArray.maximum_product_of_split_support_tree()` or
+            :meth:`TreeArray.summarize_splits_on_tree()`). The collection
+            returned is read-only. If |False|, then the store is loaded into a
+            collection that uses compact storage (see :meth:`TreeArray.__init__()`).
+        taxon_namespace : |TaxonNamespace|
+            The taxon namespace of the collection. If given, then the taxa of
+            the store must be accessioned (or will be added) in the same
+            order. If not given, then a new one will be created.
+
+        Returns
+        -------
+        tree_array : |TreeArray|
+            The collection of trees of the store.
+        """
+        store = _TreeArrayStore(path)
+        header = store.header
+        if taxon_namespace is None:
+            taxon_namespace = taxonmodel.TaxonNamespace()
+        store.require_taxa(taxon_namespace)
+        tree_array = cls(
+                taxon_namespace=taxon_namespace,
+                is_rooted_trees=header["is_rooted_trees"],
+                ignore_edge_lengths=header["ignore_edge_lengths"],
+                ignore_node_ages=header["ignore_node_ages"],
+                use_tree_weights=header["use_tree_weights"],
+                use_compact_storage=True,
+                use_streaming_summaries=header.get("use_streaming_summaries", False))
+        if not use_mmap:
+            tree_array._add_compact_columns(header, store.columns)
+            return tree_array
+        columns = store.columns
+        splits = _split_table_bitmasks(
+                columns["split_table"],
+                header["bitmask_width"],
+                taxon_namespace.bitmask_type)
+        split_table = tree_array._split_table
+        split_table.bitmasks.extend(splits)
+        split_table.ids.update(zip(splits, itertools.count()))
+        tree_array._tree_split_bitmasks.offsets = columns["tree_split_offsets"]
+        tree_array._tree_split_bitmasks.values = columns["tree_split_ids"]
+        tree_array._tree_edge_lengths.offsets = columns["tree_split_offsets"]
+        tree_array._tree_edge_lengths.values = columns["tree_edge_lengths"]
+        tree_array._tree_leafset_bitmasks.values = columns["tree_leafset_ids"]
+        tree_array._tree_weights = columns["tree_weights"]
+        tree_array._store = store
+        sd = tree_array._split_distribution
+        tree_array._add_compact_split_distribution_totals(header)
+        sd_splits = list(map(splits.__getitem__, columns["sd_split_ids"]))
+        sd.split_counts.update(zip(sd_splits, columns["sd_split_counts"]))
+        split_edge_lengths = _StoredSplitValues(
+                sd_splits,
+                columns["sd_edge_length_offsets"],
+                columns["sd_edge_lengths"])
+        split_node_ages = _StoredSplitValues(
+                sd_splits,
+                columns["sd_node_age_offsets"],
+                columns["sd_node_ages"])
+        if sd.use_streaming_summaries:
+            # the (bounded) states of the accumulators are loaded
+            for split, state in split_edge_lengths.items():
+                sd.split_edge_length_accumulators[split] = statistics.StreamingSummary.from_state(state)
+            for split, state in split_node_ages.items():
+                sd.split_node_age_accumulators[split] = statistics.StreamingSummary.from_state(state)
+        else:
+            sd.split_edge_lengths = split_edge_lengths
+            sd.split_node_ages = split_node_ages
+        return tree_array
+
+    def _check_is_mutable(self):
+        if self._store is not None:
+            raise TypeError("TreeArray opened from memory-mapped store '{}' cannot be modified".format(self._store.path))
+
     ##############################################################################
     ## Fundamental Tree Accession
 
@@ -2282,10 +3130,11 @@ class TreeArray(
 
         Parameters
         ----------
-        tree : |Tree|
-            A |Tree| instance. This must have the same rooting state as
-            all the other trees accessioned into this collection as well as
-            that of ``self.is_rooted_trees``.
+        tree : |Tree| or |SplitRecord|
+            A |Tree| instance, or a record of the splits of a tree (see
+            ``Tree.yield_split_records_from_files()``). This must have the
+            same rooting state as all the other trees accessioned into this
+            collection as well as that of ``self.is_rooted_trees``.
         is_bipartitions_updated : bool
             If |False| [default], then the tree will have its splits encoded or
             updated. Otherwise, if |True|, then the tree is assumed to have its
@@ -2302,12 +3151,18 @@ class TreeArray(
         e :
             A list of edge length values from ``tree``.
         """
+        self._check_is_mutable()
         if self.taxon_namespace is not tree.taxon_namespace:
             raise error.TaxonNamespaceIdentityError(self, tree)
         self.validate_rooting(tree.is_rooted)
+        if isinstance(tree, treemodel.SplitRecord):
+            split_record = tree
+        else:
+            split_record = self._split_distribution.new_split_record_encoder().encode_tree(
+                    tree,
+                    is_bipartitions_updated=is_bipartitions_updated)
         splits, edge_lengths, node_ages = self._split_distribution.count_splits_on_tree(
-                tree=tree,
-                is_bipartitions_updated=is_bipartitions_updated,
+                tree=split_record,
                 default_edge_length_value=self.default_edge_length_value)
 
         # pre-process splits
@@ -2322,8 +3177,8 @@ class TreeArray(
             edge_lengths = tuple(edge_lengths)
 
         # pre-process weights
-        if tree.weight is not None and self.use_tree_weights:
-            weight_to_use = float(tree.weight)
+        if split_record.weight is not None and self.use_tree_weights:
+            weight_to_use = float(split_record.weight)
         else:
             weight_to_use = 1.0
 
@@ -2331,13 +3186,13 @@ class TreeArray(
         if index is None:
             index = len(self._tree_split_bitmasks)
             self._tree_split_bitmasks.append(splits)
-            self._tree_leafset_bitmasks.append(tree.seed_node.edge.bipartition.leafset_bitmask)
+            self._tree_leafset_bitmasks.append(split_record.leafset_bitmask)
             self._tree_edge_lengths.append(edge_lengths)
             self._tree_weights.append(weight_to_use)
         else:
             self._tree_split_bitmasks.insert(index, splits)
             self._tree_leafset_bitmasks.insert(index,
-                    tree.seed_node.edge.bipartition.leafset_bitmask)
+                    split_record.leafset_bitmask)
             self._tree_edge_lengths.insert(index, edge_lengths)
             self._tree_weights.insert(index, weight_to_use)
         return index, splits, edge_lengths, weight_to_use
@@ -2393,21 +3248,18 @@ class TreeArray(
                 raise ValueError("TaxonNamespace object passed as keyword argument is not the same as self's TaxonNamespace reference")
             kwargs.pop("taxon_namespace")
         target_tree_offset = kwargs.pop("tree_offset", 0)
-        tree_yielder = self.tree_type.yield_from_files(
+        split_record_encoder = self._split_distribution.new_split_record_encoder()
+        # checked before, rather than only after, node ages are calculated
+        split_record_encoder.validate_rooting_fn = self.validate_rooting
+        split_record_yielder = self.tree_type.yield_split_records_from_files(
                 files=files,
                 schema=schema,
                 taxon_namespace=self.taxon_namespace,
+                tree_offset=target_tree_offset,
+                split_record_encoder=split_record_encoder,
                 **kwargs)
-        current_source_index = None
-        current_tree_offset = None
-        for tree_idx, tree in enumerate(tree_yielder):
-            current_yielder_index = tree_yielder.current_file_index
-            if current_source_index != current_yielder_index:
-                current_source_index = current_yielder_index
-                current_tree_offset = 0
-            if current_tree_offset >= target_tree_offset:
-                self.add_tree(tree=tree, is_bipartitions_updated=False)
-            current_tree_offset += 1
+        for split_record in split_record_yielder:
+            self.add_tree(tree=split_record)
 
     def _parse_and_add_from_stream(self,
             stream,
@@ -2549,6 +3401,7 @@ class TreeArray(
             A |TreeArray| instance from which to add data.
 
         """
+        self._check_is_mutable()
         assert self.taxon_namespace is tree_array.taxon_namespace
         assert self._is_rooted_trees is tree_array._is_rooted_trees
         assert self.ignore_edge_lengths is tree_array.ignore_edge_lengths
@@ -2556,6 +3409,7 @@ class TreeArray(
         assert self.use_tree_weights is tree_array.use_tree_weights
         self._tree_split_bitmasks.extend(tree_array._tree_split_bitmasks)
         self._tree_edge_lengths.extend(tree_array._tree_edge_lengths)
+        self._tree_leafset_bitmasks.extend(tree_array._tree_leafset_bitmasks)
         self._tree_weights.extend(tree_array._tree_weights)
         self._split_distribution.update(tree_array._split_distribution)
         return self
@@ -2593,6 +3447,8 @@ class TreeArray(
                 ignore_node_ages=self.ignore_node_ages,
                 use_tree_weights=self.use_tree_weights,
                 ultrametricity_precision=self._split_distribution.ultrametricity_precision,
+                use_compact_storage=self.use_compact_storage,
+                use_streaming_summaries=self._split_distribution.use_streaming_summaries,
                 )
         ta.default_edge_length_value = self.default_edge_length_value
         ta.tree_type = self.tree_type
@@ -2643,9 +3499,7 @@ class TreeArray(
 
     def clear(self):
         raise NotImplementedError
-        self._tree_split_bitmasks = []
-        self._tree_edge_lengths = []
-        self._tree_leafset_bitmasks = []
+        self._init_tree_storage()
         self._split_distribution.clear()
 
     def index(self, splits):
@@ -2684,6 +3538,9 @@ class TreeArray(
         Calculates the log product of split support for each of the trees in
         the collection.
 
+        If NumPy is available, then all the trees are scored together using
+        vectorized operations (with identical results).
+
         Parameters
         ----------
         include_external_splits : bool
@@ -2699,26 +3556,13 @@ class TreeArray(
             and the second being the index of the highest score. The element order
             corresponds to the trees accessioned in the collection.
         """
-        assert len(self._tree_leafset_bitmasks) == len(self._tree_split_bitmasks)
-        scores = []
-        max_score = None
-        max_score_tree_idx = None
-        split_frequencies = self._split_distribution.split_frequencies
-        for tree_idx, (tree_leafset_bitmask, split_bitmasks) in enumerate(zip(self._tree_leafset_bitmasks, self._tree_split_bitmasks)):
-            log_product_of_split_support = 0.0
-            for split_bitmask in split_bitmasks:
-                if (include_external_splits
-                        or split_bitmask == tree_leafset_bitmask # count root edge (following BEAST)
-                        or not treemodel.Bipartition.is_trivial_bitmask(split_bitmask, tree_leafset_bitmask)
-                        ):
-                    split_support = split_frequencies.get(split_bitmask, 0.0)
-                    if split_support:
-                        log_product_of_split_support += math.log(split_support)
-            if max_score is None or max_score < log_product_of_split_support:
-                max_score = log_product_of_split_support
-                max_score_tree_idx = tree_idx
-            scores.append(log_product_of_split_support)
-        return scores, max_score_tree_idx
+        split_scores = {}
+        for split_bitmask, split_support in self._split_distribution.split_frequencies.items():
+            if split_support:
+                split_scores[split_bitmask] = math.log(split_support)
+        return self._calculate_split_support_scores(
+                split_scores=split_scores,
+                include_external_splits=include_external_splits)
 
     def maximum_product_of_split_support_tree(self,
             include_external_splits=False,
@@ -2764,6 +3608,9 @@ class TreeArray(
         Calculates the *sum* of split support for all trees in the
         collection.
 
+        If NumPy is available, then all the trees are scored together using
+        vectorized operations (with identical results).
+
         Parameters
         ----------
         include_external_splits : bool
@@ -2779,26 +3626,93 @@ class TreeArray(
             and the second being the index of the highest score. The element order
             corresponds to the trees accessioned in the collection.
         """
+        return self._calculate_split_support_scores(
+                split_scores=self._split_distribution.split_frequencies,
+                include_external_splits=include_external_splits)
+
+    def _calculate_split_support_scores(self,
+            split_scores,
+            include_external_splits):
+        # Returns the sum of the scores of the splits of each tree, given by
+        # ``split_scores`` (missing splits scoring 0.0), and the index of the
+        # (first) highest scoring tree.
         assert len(self._tree_leafset_bitmasks) == len(self._tree_split_bitmasks)
+        if numpy is not None and len(self) > 0:
+            return self._calculate_split_support_scores_vectorized(
+                    split_scores=split_scores,
+                    include_external_splits=include_external_splits)
         scores = []
         max_score = None
         max_score_tree_idx = None
-        split_frequencies = self._split_distribution.split_frequencies
         for tree_idx, (tree_leafset_bitmask, split_bitmasks) in enumerate(zip(self._tree_leafset_bitmasks, self._tree_split_bitmasks)):
-            sum_of_support = 0.0
+            score = 0.0
             for split_bitmask in split_bitmasks:
                 if (include_external_splits
                         or split_bitmask == tree_leafset_bitmask # count root edge (following BEAST)
                         or not treemodel.Bipartition.is_trivial_bitmask(split_bitmask, tree_leafset_bitmask)
                         ):
-                    split_support = split_frequencies.get(split_bitmask, 0.0)
-                    sum_of_support += split_support
-            if max_score is None or max_score < sum_of_support:
-                max_score = sum_of_support
+                    score += split_scores.get(split_bitmask, 0.0)
+            if max_score is None or max_score < score:
+                max_score = score
                 max_score_tree_idx = tree_idx
-            scores.append(sum_of_support)
+            scores.append(score)
         return scores, max_score_tree_idx
 
+    def _calculate_split_support_scores_vectorized(self,
+            split_scores,
+            include_external_splits):
+        # As :meth:`TreeArray._calculate_split_support_scores()`, but using
+        # NumPy: the splits of the trees are mapped to integer ids, each
+        # distinct split is scored (and tested for being trivial) once, and
+        # the scores of the splits of all the trees are then gathered and
+        # summed together. The scores of the splits of each tree are summed
+        # in order, so that the results are identical to those of the
+        # pure-Python calculation.
+        if self.use_compact_storage:
+            splits = self._split_table.bitmasks
+            tree_split_offsets = numpy.asarray(self._tree_split_bitmasks.offsets, dtype=numpy.intp)
+            tree_split_ids = numpy.asarray(self._tree_split_bitmasks.values, dtype=numpy.intp)
+            tree_leafset_ids = numpy.asarray(self._tree_leafset_bitmasks.values, dtype=numpy.intp)
+        else:
+            split_ids = collections.defaultdict(itertools.count().__next__)
+            tree_split_offsets = numpy.zeros(len(self) + 1, dtype=numpy.intp)
+            numpy.cumsum(list(map(len, self._tree_split_bitmasks)), out=tree_split_offsets[1:])
+            tree_split_ids = numpy.fromiter(
+                    map(split_ids.__getitem__, itertools.chain.from_iterable(self._tree_split_bitmasks)),
+                    dtype=numpy.intp,
+                    count=tree_split_offsets[-1])
+            tree_leafset_ids = numpy.fromiter(
+                    map(split_ids.__getitem__, self._tree_leafset_bitmasks),
+                    dtype=numpy.intp,
+                    count=len(self))
+            splits = list(split_ids)
+        split_score_values = numpy.fromiter(
+                (split_scores.get(split_bitmask, 0.0) for split_bitmask in splits),
+                dtype=numpy.float64,
+                count=len(splits))
+        tree_split_scores = split_score_values[tree_split_ids]
+        num_tree_splits = numpy.diff(tree_split_offsets)
+        if not include_external_splits:
+            # whether each split is scored, for each distinct leafset
+            leafset_ids, tree_leafset_idxs = numpy.unique(tree_leafset_ids, return_inverse=True)
+            is_scored = numpy.empty((len(leafset_ids), len(splits)), dtype=bool)
+            for leafset_idx, leafset_id in enumerate(leafset_ids.tolist()):
+                leafset_bitmask = splits[leafset_id]
+                is_scored[leafset_idx] = [
+                        split_bitmask == leafset_bitmask # count root edge (following BEAST)
+                        or not treemodel.Bipartition.is_trivial_bitmask(split_bitmask, leafset_bitmask)
+                        for split_bitmask in splits]
+            is_tree_split_scored = is_scored[
+                    numpy.repeat(tree_leafset_idxs.ravel(), num_tree_splits),
+                    tree_split_ids]
+            tree_split_scores[~is_tree_split_scored] = 0.0
+        scores = numpy.zeros(len(self), dtype=numpy.float64)
+        tree_split_starts = tree_split_offsets[:-1]
+        for split_idx in range(int(num_tree_splits.max())):
+            tree_idxs = numpy.flatnonzero(num_tree_splits > split_idx)
+            scores[tree_idxs] += tree_split_scores[tree_split_starts[tree_idxs] + split_idx]
+        return scores.tolist(), int(numpy.argmax(scores))
+
     def maximum_sum_of_split_support_tree(self,
             include_external_splits=False,
             summarize_splits=True,
@@ -3033,5 +3947,291 @@ class TreeArray(
             topologies.sort(key=lambda t: getattr(t, frequency_attr_name), reverse=sort_descending)
         return topologies
 
+###############################################################################
+### TreeArrayStoreWriter
 
+class TreeArrayStoreWriter(taxonmodel.TaxonNamespaceAssociated):
+    """
+    Writes a store of trees, as opened by :meth:`TreeArray.open()`,
+    incrementally as trees are added: the split ids, edge lengths and node
+    ages of the trees are spooled to temporary files as they are added, and
+    only the split table and split counts are held in memory. When the writer
+    is closed, the edge lengths and node ages of the trees are regrouped by
+    split, and the store is written to ``path``.
+
+    This allows a store to be written for more trees than would fit into
+    memory as a |TreeArray|, e.g.::
+
+        with dendropy.TreeArrayStoreWriter(path="posterior.store", ignore_node_ages=False) as writer:
+            writer.read_from_files(files=["run1.trees", "run2.trees"], schema="nexus", tree_offset=200)
+        tree_array = dendropy.TreeArray.open("posterior.store")
+        mcct = tree_array.maximum_product_of_split_support_tree()
+    """
+
+    def __init__(self,
+            path,
+            taxon_namespace=None,
+            is_rooted_trees=None,
+            ignore_edge_lengths=False,
+            ignore_node_ages=True,
+            use_tree_weights=True,
+            ultrametricity_precision=constants.DEFAULT_ULTRAMETRICITY_PRECISION,
+            is_force_max_age=None,
+            taxon_label_age_map=None,
+            ):
+        """
+        Parameters
+        ----------
+        path : str
+            Path of the file to which to write the store. Temporary files are
+            written to the same directory.
+
+        All other parameters are as for :meth:`TreeArray.__init__()`.
+        """
+        taxonmodel.TaxonNamespaceAssociated.__init__(self,
+                taxon_namespace=taxon_namespace)
+        self.path = path
+        self.is_rooted_trees = is_rooted_trees
+        self.ignore_edge_lengths = ignore_edge_lengths
+        self.ignore_node_ages = ignore_node_ages
+        self.use_tree_weights = use_tree_weights
+        self.default_edge_length_value = 0 # edge.length of |None| gets this value
+        self.tree_type = treemodel.Tree
+        self.split_record_encoder = treemodel.SplitRecordEncoder(
+                taxon_namespace=self.taxon_namespace,
+                is_calc_node_ages=not self.ignore_node_ages,
+                ultrametricity_precision=ultrametricity_precision,
+                is_force_max_age=is_force_max_age,
+                taxon_label_age_map=taxon_label_age_map)
+        self.total_trees_counted = 0
+        self.sum_of_tree_weights = 0.0
+        self.tree_rooting_types_counted = set()
+        self._split_table = _SplitTable()
+        self._split_counts = array("d")
+        self._split_occurrences = array("q")
+        spool_dir = os.path.dirname(os.path.abspath(path))
+        self._tree_split_offsets = _SpooledArray("q", dir=spool_dir)
+        self._tree_split_offsets.append(0)
+        self._tree_split_ids = _SpooledArray("I", dir=spool_dir)
+        self._tree_leafset_ids = _SpooledArray("I", dir=spool_dir)
+        self._tree_edge_lengths = _SpooledArray("d", dir=spool_dir)
+        self._tree_node_ages = _SpooledArray("d", dir=spool_dir)
+        self._tree_weights = _SpooledArray("d", dir=spool_dir)
+        self._spooled_arrays = [
+                self._tree_split_offsets,
+                self._tree_split_ids,
+                self._tree_leafset_ids,
+                self._tree_edge_lengths,
+                self._tree_node_ages,
+                self._tree_weights,
+                ]
+        self.is_closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self._close_spooled_arrays()
+
+    def __len__(self):
+        return self.total_trees_counted
+
+    def _intern_split(self, split):
+        split_id = self._split_table.intern(split)
+        if split_id == len(self._split_counts):
+            self._split_counts.append(0.0)
+            self._split_occurrences.append(0)
+        return split_id
+
+    def validate_rooting(self, rooting_of_other):
+        if self.is_rooted_trees is None:
+            self.is_rooted_trees = rooting_of_other
+        elif self.is_rooted_trees != rooting_of_other:
+            raise error.MixedRootingError("Cannot add {} tree to TreeArrayStoreWriter with {} trees".format(
+                "rooted" if rooting_of_other else "unrooted",
+                "rooted" if self.is_rooted_trees else "unrooted"))
+
+    def add_tree(self, tree, is_bipartitions_updated=False):
+        """
+        Adds the structure represented by a |Tree| instance (or a
+        |SplitRecord|) to the store. See :meth:`TreeArray.add_tree()`.
+        """
+        if self.is_closed:
+            raise ValueError("TreeArrayStoreWriter is closed")
+        if self.taxon_namespace is not tree.taxon_namespace:
+            raise error.TaxonNamespaceIdentityError(self, tree)
+        self.validate_rooting(tree.is_rooted)
+        if isinstance(tree, treemodel.SplitRecord):
+            split_record = tree
+            if not self.ignore_node_ages and split_record.node_ages is None:
+                raise ValueError("Node ages are required, but split record does not have node ages")
+        else:
+            split_record = self.split_record_encoder.encode_tree(
+                    tree,
+                    is_bipartitions_updated=is_bipartitions_updated)
+        if split_record.weight is not None and self.use_tree_weights:
+            weight_to_use = float(split_record.weight)
+        else:
+            weight_to_use = 1.0
+        self.total_trees_counted += 1
+        self.sum_of_tree_weights += weight_to_use
+        self.tree_rooting_types_counted.add(bool(split_record.is_rooted))
+        split_ids = list(map(self._intern_split, split_record.split_bitmasks))
+        split_counts = self._split_counts
+        split_occurrences = self._split_occurrences
+        for split_id in split_ids:
+            split_counts[split_id] += weight_to_use
+            split_occurrences[split_id] += 1
+        self._tree_split_ids.extend(split_ids)
+        self._tree_split_offsets.append(len(self._tree_split_ids))
+        self._tree_leafset_ids.append(self._intern_split(split_record.leafset_bitmask))
+        if self.ignore_edge_lengths:
+            self._tree_edge_lengths.extend(itertools.repeat(float("nan"), len(split_ids)))
+        else:
+            self._tree_edge_lengths.extend(_compact_float_array(
+                    self.default_edge_length_value if elen is None else elen
+                    for elen in split_record.edge_lengths))
+        if not self.ignore_node_ages:
+            self._tree_node_ages.extend(_compact_float_array(split_record.node_ages))
+        self._tree_weights.append(weight_to_use)
+
+    def add_trees(self, trees, is_bipartitions_updated=False):
+        """
+        Adds multiple structures represented by an iterator over or iterable
+        of |Tree| instances to the store.
+        """
+        for tree in trees:
+            self.add_tree(tree,
+                    is_bipartitions_updated=is_bipartitions_updated)
+
+    def read_from_files(self,
+            files,
+            schema,
+            **kwargs):
+        r"""
+        Adds multiple structures from one or more external file sources to the
+        store. See :meth:`TreeArray.read_from_files()`.
+        """
+        if "taxon_namespace" in kwargs:
+            if kwargs["taxon_namespace"] is not self.taxon_namespace:
+                raise ValueError("TaxonNamespace object passed as keyword argument is not the same as self's TaxonNamespace reference")
+            kwargs.pop("taxon_namespace")
+        split_record_encoder = copy.copy(self.split_record_encoder)
+        # checked before, rather than only after, node ages are calculated
+        split_record_encoder.validate_rooting_fn = self.validate_rooting
+        split_record_yielder = self.tree_type.yield_split_records_from_files(
+                files=files,
+                schema=schema,
+                taxon_namespace=self.taxon_namespace,
+                tree_offset=kwargs.pop("tree_offset", 0),
+                split_record_encoder=split_record_encoder,
+                **kwargs)
+        for split_record in split_record_yielder:
+            self.add_tree(tree=split_record)
+
+    def close(self):
+        """
+        Writes the store, and removes the temporary files.
+        """
+        if self.is_closed:
+            return
+        try:
+            self._write()
+        finally:
+            self._close_spooled_arrays()
+
+    def _close_spooled_arrays(self):
+        self.is_closed = True
+        for spooled_array in self._spooled_arrays:
+            spooled_array.close()
+
+    def _write(self):
+        split_occurrences = self._split_occurrences
+        # splits of the distribution, in the order in which they were first
+        # counted, as with a |SplitDistribution|
+        is_sd_split = list(map(bool, split_occurrences))
+        sd_split_ids = array("I", itertools.compress(itertools.count(), is_sd_split))
+        sd_split_counts = array("d", itertools.compress(self._split_counts, is_sd_split))
+        tree_split_ids = self._tree_split_ids.view()
+        tree_edge_lengths = self._tree_edge_lengths.view()
+        scratch_mappings = []
+        with tempfile.TemporaryFile(dir=os.path.dirname(os.path.abspath(self.path))) as scratch:
+            try:
+                if self.ignore_edge_lengths:
+                    sd_edge_length_offsets = array("q", [0] * (len(sd_split_ids) + 1))
+                    sd_edge_lengths = array("d")
+                else:
+                    sd_edge_length_offsets, sd_edge_lengths = self._group_split_values(
+                            tree_split_ids, tree_edge_lengths, scratch, 0, scratch_mappings)
+                if self.ignore_node_ages:
+                    sd_node_age_offsets = array("q", [0] * (len(sd_split_ids) + 1))
+                    sd_node_ages = array("d")
+                else:
+                    sd_node_age_offsets, sd_node_ages = self._group_split_values(
+                            tree_split_ids, self._tree_node_ages.view(), scratch, len(tree_split_ids), scratch_mappings)
+                splits = self._split_table.bitmasks
+                bitmask_width = _split_table_bitmask_width(splits)
+                header = {
+                    "is_rooted_trees": self.is_rooted_trees,
+                    "ignore_edge_lengths": self.ignore_edge_lengths,
+                    "ignore_node_ages": self.ignore_node_ages,
+                    "use_tree_weights": self.use_tree_weights,
+                    "total_trees_counted": self.total_trees_counted,
+                    "sum_of_tree_weights": self.sum_of_tree_weights,
+                    "tree_rooting_types_counted": list(self.tree_rooting_types_counted),
+                    "bitmask_width": bitmask_width,
+                    }
+                columns = collections.OrderedDict([
+                        ("split_table", b"".join(split.to_bytes(bitmask_width, "little") for split in splits)),
+                        ("tree_split_offsets", self._tree_split_offsets.view()),
+                        ("tree_split_ids", tree_split_ids),
+                        ("tree_leafset_ids", self._tree_leafset_ids.view()),
+                        ("tree_edge_lengths", tree_edge_lengths),
+                        ("tree_weights", self._tree_weights.view()),
+                        ("sd_split_ids", sd_split_ids),
+                        ("sd_split_counts", sd_split_counts),
+                        ("sd_edge_length_offsets", sd_edge_length_offsets),
+                        ("sd_edge_lengths", sd_edge_lengths),
+                        ("sd_node_age_offsets", sd_node_age_offsets),
+                        ("sd_node_ages", sd_node_ages),
+                        ])
+                _TreeArrayStore.write(
+                        path=self.path,
+                        header=header,
+                        columns=columns,
+                        taxon_namespace=self.taxon_namespace)
+            finally:
+                for scratch_mapping in scratch_mappings:
+                    scratch_mapping.close()
+
+    def _group_split_values(self, tree_split_ids, tree_values, scratch, scratch_offset, scratch_mappings):
+        # Regroups the values of the splits of the trees by split (in the order
+        # of the trees), using a counting sort into a memory-mapped region of
+        # ``scratch`` (starting at item ``scratch_offset``), and returns the
+        # offsets and values of the splits of the distribution. The mapping is
+        # added to ``scratch_mappings``, to be closed by the caller.
+        split_occurrences = self._split_occurrences
+        split_value_offsets = array("q", [0])
+        split_value_offsets.extend(itertools.accumulate(split_occurrences))
+        sd_value_offsets = array("q", [0])
+        sd_value_offsets.extend(itertools.accumulate(filter(None, split_occurrences)))
+        num_values = len(tree_values)
+        if not num_values:
+            return sd_value_offsets, array("d")
+        scratch.truncate((scratch_offset + num_values) * 8)
+        scratch_mapping = _FileMapping(scratch, "d",
+                access=mmap.ACCESS_WRITE,
+                start=scratch_offset,
+                stop=scratch_offset+num_values)
+        scratch_mappings.append(scratch_mapping)
+        values = scratch_mapping.view
+        positions = split_value_offsets
+        for split_id, value in zip(tree_split_ids, tree_values):
+            position = positions[split_id]
+            values[position] = value
+            positions[split_id] = position + 1
+        return sd_value_offsets, values
 
@@ -23,6 +23,12 @@ as well as all the structural classes that make up a tree.
 """
 
 from dendropy.datamodel.treemodel._bipartition import Bipartition
+from dendropy.datamodel.treemodel._edge import CompactEdge
 from dendropy.datamodel.treemodel._edge import Edge
+from dendropy.datamodel.treemodel._flat_tree import FlatTree
+from dendropy.datamodel.treemodel._node import CompactNode
 from dendropy.datamodel.treemodel._node import Node
+from dendropy.datamodel.treemodel._split_record import SplitRecord
+from dendropy.datamodel.treemodel._split_record import SplitRecordEncoder
+from dendropy.datamodel.treemodel._tree import CompactTree
 from dendropy.datamodel.treemodel._tree import Tree
@@ -103,6 +103,17 @@ class Bipartition(object):
 
     """
 
+    # a tree has a bipartition for each of its edges, so instances do not
+    # carry a ``__dict__``
+    __slots__ = (
+        "_split_bitmask",
+        "_leafset_bitmask",
+        "_tree_leafset_bitmask",
+        "_lowest_relevant_bit",
+        "_is_rooted",
+        "is_mutable",
+    )
+
     @staticmethod
     def normalize_bitmask(bitmask, fill_bitmask, lowest_relevant_bit=1):
         if bitmask & lowest_relevant_bit:
@@ -221,7 +232,13 @@ class Bipartition(object):
 
     def __hash__(self):
         assert not self.is_mutable, "Bipartition is mutable: hash is unstable"
-        return self._split_bitmask or 0
+        if self._split_bitmask is None:
+            return 0
+        # the hash of the bitmask itself is used if it is a ``Bitmask``, as this
+        # is cached
+        if type(self._split_bitmask) is int:
+            return bitprocessing.bitmask_hash(self._split_bitmask)
+        return hash(self._split_bitmask)
 
     def __eq__(self, other):
         # return self._split_bitmask == other._split_bitmask
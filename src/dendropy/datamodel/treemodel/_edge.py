@@ -120,9 +120,12 @@ class Edge(basemodel.DataObject, basemodel.Annotable):
             raise ValueError("collapse_self called with a terminal.")
         pos = parent.child_nodes().index(to_del)
         parent.remove_child(to_del)
+        # The children of ``to_del`` cannot already be children of ``parent``,
+        # so they are spliced in directly rather than through
+        # ``insert_child()``, which searches the child list for each one.
+        parent._child_nodes[pos:pos] = children
         for child in children:
-            parent.insert_child(pos, child)
-            pos += 1
+            child._parent_node = parent
             if adjust_collapsed_head_children_edge_lengths and self.length is not None:
                 # print id(child), child.edge.length, self.length
                 if child.edge.length is None:
@@ -133,6 +136,13 @@ class Edge(basemodel.DataObject, basemodel.Annotable):
     def invert(self, update_bipartitions=False):
         """
         Changes polarity of edge.
+
+        If ``update_bipartitions`` is |True|, then the bipartitions of the two
+        nodes of the edge are recalculated from the leafsets of their (new)
+        children; a node left without children gets an empty leafset. This
+        does not update the bipartition encoding or the bipartition lookups
+        of the tree: :meth:`Tree.reseed_at()` and the other rerooting methods
+        of |Tree| do this (along the whole path to the old root) if asked to.
         """
         # self.head_node, self.tail_node = self.tail_node, self.head_node
 
@@ -164,6 +174,23 @@ class Edge(basemodel.DataObject, basemodel.Annotable):
             old_head_node.edge.length,
             old_tail_node.edge_length,
         )
+        old_bipartition = old_tail_node.bipartition
+        if update_bipartitions and old_bipartition._leafset_bitmask is not None:
+            # the old tail node is now the child of the old head node
+            for nd in (old_tail_node, old_head_node):
+                leafset_bitmask = 0
+                for child in nd._child_nodes:
+                    leafset_bitmask |= child.bipartition._leafset_bitmask
+                bipartition = _bipartition.Bipartition(
+                    compile_bipartition=False, is_mutable=True
+                )
+                bipartition._leafset_bitmask = leafset_bitmask
+                bipartition._is_rooted = old_bipartition._is_rooted
+                bipartition.compile_split_bitmask(
+                    tree_leafset_bitmask=old_bipartition._tree_leafset_bitmask,
+                    is_mutable=old_bipartition.is_mutable,
+                )
+                nd.bipartition = bipartition
 
     def _get_bipartition(self):
         if self._bipartition is None:
@@ -255,3 +282,80 @@ class Edge(basemodel.DataObject, basemodel.Annotable):
         return str(self)
 
 
+
+class CompactEdge(Edge):
+    """
+    An :term:``edge`` on a tree of |CompactNode| objects.
+
+    The length and bipartition of the edge are stored on its head node (see
+    |CompactNode|), and the ``comments`` and ``annotations`` of the edge are
+    only created when first accessed. Instances otherwise behave as |Edge|
+    objects.
+    """
+
+    __slots__ = (
+        "_label",
+        "_head_node",
+        "rootedge",
+        "_comments",
+        "_annotations",
+    )
+
+    def __init__(self, **kwargs):
+        """
+        Keyword Arguments
+        -----------------
+        head_node : |CompactNode|
+            Node from to which this edge links, i.e., the child node of this
+            node ``tail_node``.
+        length : numerical, optional
+            A value representing the weight of the edge.
+        rootedge : boolean, optional
+            Is the child node of this edge the root or seed node of the tree?
+        label : string, optional
+            Label for this edge.
+
+        """
+        basemodel.DataObject.__init__(self, label=kwargs.pop("label", None))
+        self._head_node = kwargs.pop("head_node", None)
+        if self._head_node is None:
+            raise TypeError("'CompactEdge' requires a 'head_node'")
+        if "tail_node" in kwargs:
+            raise TypeError(
+                "Setting the tail node directly is no longer supported: instead, set"
+                " the parent node of the head node"
+            )
+        self.rootedge = kwargs.pop("rootedge", None)
+        if "length" in kwargs:
+            self.length = kwargs.pop("length")
+        if kwargs:
+            raise TypeError("Unsupported keyword arguments: {}".format(kwargs))
+        self._comments = None
+
+    def _get_length(self):
+        return self._head_node._edge_length
+
+    def _set_length(self, v):
+        self._head_node._edge_length = v
+
+    length = property(_get_length, _set_length)
+
+    def _get_bipartition_value(self):
+        return self._head_node._edge_bipartition
+
+    def _set_bipartition_value(self, v):
+        self._head_node._edge_bipartition = v
+
+    # read and written by ``Edge._get_bipartition()`` and
+    # ``Edge._set_bipartition()``
+    _bipartition = property(_get_bipartition_value, _set_bipartition_value)
+
+    def _get_comments(self):
+        if self._comments is None:
+            self._comments = []
+        return self._comments
+
+    def _set_comments(self, comments):
+        self._comments = comments
+
+    comments = property(_get_comments, _set_comments)
@@ -0,0 +1,589 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import math
+from array import array
+from dendropy.utility import constants
+from dendropy.utility import error
+from dendropy.datamodel.treemodel import _bipartition
+from dendropy.datamodel.treemodel import _tree
+
+
+class FlatTree(object):
+    """
+    An immutable, array-backed representation of the structure, edge lengths
+    and taxa of a tree, without any |Node| or |Edge| objects.
+
+    The nodes are identified by their index in preorder, so that the root is
+    node 0, and all the nodes descending from node ``i`` are the nodes indexed
+    from ``i`` up to (but not including) ``subtree_end(i)``. For each node,
+    the index of its parent, first child and next sibling (or -1 if none), the
+    length of its subtending edge (or NaN if none), and the accession index in
+    the |TaxonNamespace| of its taxon (or -1 if none) are stored in flat arrays
+    of machine types. Node and edge labels, annotations and any other
+    attributes are not stored.
+
+    A |FlatTree| uses a small fraction of the memory of a |Tree|, can be
+    pickled cheaply (e.g., to be passed to other processes), and calculates
+    node ages, bipartitions, tree length and the statistics of
+    :mod:`dendropy.calculate.treemeasure` without creating any objects for
+    the nodes.
+
+    Examples
+    --------
+
+    ::
+
+        import dendropy
+        from dendropy.calculate import treemeasure
+        tree = dendropy.Tree.get(path="tree.nex", schema="nexus")
+        flat_tree = tree.to_flat()
+        print(flat_tree.length())
+        print(treemeasure.colless_tree_imbalance(flat_tree))
+        tree2 = flat_tree.to_tree()
+
+    """
+
+    __slots__ = (
+        "taxon_namespace",
+        "is_rooted",
+        "_parent_indexes",
+        "_first_child_indexes",
+        "_next_sibling_indexes",
+        "_edge_lengths",
+        "_taxon_indexes",
+        "_subtree_ends",
+        "_leaf_offsets",
+        "_index_taxon_map",
+    )
+
+    @classmethod
+    def from_tree(cls, tree):
+        """
+        Creates and returns a |FlatTree| of ``tree`` (in its current state).
+
+        Note that syntactically you may prefer to use::
+
+            flat_tree = tree.to_flat()
+
+        Parameters
+        ----------
+        tree : |Tree|
+            The tree to represent. All of its taxa must be in its
+            |TaxonNamespace|.
+
+        Returns
+        -------
+        flat_tree : |FlatTree|
+            The |FlatTree| of ``tree``.
+        """
+        taxon_namespace = tree.taxon_namespace
+        accession_index = taxon_namespace.accession_index
+        parent_indexes = array("i")
+        first_child_indexes = array("i")
+        next_sibling_indexes = array("i")
+        edge_lengths = array("d")
+        taxon_indexes = array("i")
+        # index of the last child (so far) of each node
+        last_child_indexes = []
+        nan = math.nan
+        stack = [(tree.seed_node, -1)]
+        while stack:
+            node, parent_idx = stack.pop()
+            idx = len(parent_indexes)
+            parent_indexes.append(parent_idx)
+            first_child_indexes.append(-1)
+            next_sibling_indexes.append(-1)
+            last_child_indexes.append(-1)
+            if parent_idx >= 0:
+                if last_child_indexes[parent_idx] < 0:
+                    first_child_indexes[parent_idx] = idx
+                else:
+                    next_sibling_indexes[last_child_indexes[parent_idx]] = idx
+                last_child_indexes[parent_idx] = idx
+            edge_length = node.edge_length
+            edge_lengths.append(nan if edge_length is None else edge_length)
+            taxon_indexes.append(-1 if node.taxon is None else accession_index(node.taxon))
+            child_nodes = node._child_nodes
+            if child_nodes:
+                stack.extend((child, idx) for child in reversed(child_nodes))
+        return cls(
+            parent_indexes=parent_indexes,
+            first_child_indexes=first_child_indexes,
+            next_sibling_indexes=next_sibling_indexes,
+            edge_lengths=edge_lengths,
+            taxon_indexes=taxon_indexes,
+            taxon_namespace=taxon_namespace,
+            is_rooted=tree.is_rooted,
+        )
+
+    def __init__(
+        self,
+        parent_indexes,
+        first_child_indexes,
+        next_sibling_indexes,
+        edge_lengths,
+        taxon_indexes,
+        taxon_namespace,
+        is_rooted=None,
+    ):
+        """
+        Parameters
+        ----------
+        parent_indexes : array
+            The index of the parent of each node, in preorder (-1 for the
+            root).
+        first_child_indexes : array
+            The index of the first child of each node (-1 for leaves).
+        next_sibling_indexes : array
+            The index of the next sibling of each node (-1 for the last child).
+        edge_lengths : array
+            The length of the edge subtending each node (NaN if none).
+        taxon_indexes : array
+            The accession index in ``taxon_namespace`` of the taxon of each
+            node (-1 if none).
+        taxon_namespace : |TaxonNamespace|
+            The namespace of the taxa of the tree.
+        is_rooted : bool or None
+            The rooting state of the tree.
+        """
+        self.taxon_namespace = taxon_namespace
+        self.is_rooted = is_rooted
+        self._parent_indexes = parent_indexes
+        self._first_child_indexes = first_child_indexes
+        self._next_sibling_indexes = next_sibling_indexes
+        self._edge_lengths = edge_lengths
+        self._taxon_indexes = taxon_indexes
+        self._index_taxon_map = None
+        num_nodes = len(parent_indexes)
+        # each node is followed in preorder by the nodes descending from it,
+        # and so the sizes of the subtrees give the ranges of their nodes, and
+        # the number of leaves preceding each node those of their leaves
+        subtree_sizes = [1] * num_nodes
+        for idx in range(num_nodes - 1, 0, -1):
+            subtree_sizes[parent_indexes[idx]] += subtree_sizes[idx]
+        self._subtree_ends = array("i", [idx + size for idx, size in enumerate(subtree_sizes)])
+        leaf_offsets = array("i", [0])
+        num_leaves = 0
+        for first_child_idx in first_child_indexes:
+            if first_child_idx < 0:
+                num_leaves += 1
+            leaf_offsets.append(num_leaves)
+        self._leaf_offsets = leaf_offsets
+
+    def __getstate__(self):
+        return (
+            self.taxon_namespace,
+            self.is_rooted,
+            self._parent_indexes,
+            self._first_child_indexes,
+            self._next_sibling_indexes,
+            self._edge_lengths,
+            self._taxon_indexes,
+            self._subtree_ends,
+            self._leaf_offsets,
+        )
+
+    def __setstate__(self, state):
+        (
+            self.taxon_namespace,
+            self.is_rooted,
+            self._parent_indexes,
+            self._first_child_indexes,
+            self._next_sibling_indexes,
+            self._edge_lengths,
+            self._taxon_indexes,
+            self._subtree_ends,
+            self._leaf_offsets,
+        ) = state
+        self._index_taxon_map = None
+
+    def to_tree(self, tree_type=None):
+        """
+        Creates and returns a |Tree| with the structure, edge lengths, taxa and
+        rooting state of this tree.
+
+        Parameters
+        ----------
+        tree_type : type
+            The type of tree to create (|Tree| if not specified); e.g.,
+            |CompactTree|.
+
+        Returns
+        -------
+        tree : |Tree|
+            A new tree, referencing the same |TaxonNamespace| as this one.
+        """
+        if tree_type is None:
+            tree_type = _tree.Tree
+        tree = tree_type(taxon_namespace=self.taxon_namespace, is_rooted=self.is_rooted)
+        node_factory = tree.node_factory
+        parent_indexes = self._parent_indexes
+        nodes = [tree.seed_node]
+        tree.seed_node.taxon = self.taxon(0)
+        tree.seed_node.edge_length = self.edge_length(0)
+        for idx in range(1, len(parent_indexes)):
+            node = node_factory(taxon=self.taxon(idx), edge_length=self.edge_length(idx))
+            parent_node = nodes[parent_indexes[idx]]
+            node._parent_node = parent_node
+            parent_node._child_nodes.append(node)
+            nodes.append(node)
+        return tree
+
+    def __len__(self):
+        """
+        Returns the number of nodes of the tree.
+        """
+        return len(self._parent_indexes)
+
+    @property
+    def num_leaves(self):
+        """
+        The number of leaves of the tree.
+        """
+        return self._leaf_offsets[-1]
+
+    ###########################################################################
+    ### Arrays
+
+    @property
+    def parent_indexes(self):
+        """
+        Read-only view of the array of the index of the parent of each node
+        (-1 for the root).
+        """
+        return memoryview(self._parent_indexes).toreadonly()
+
+    @property
+    def first_child_indexes(self):
+        """
+        Read-only view of the array of the index of the first child of each
+        node (-1 for leaves).
+        """
+        return memoryview(self._first_child_indexes).toreadonly()
+
+    @property
+    def next_sibling_indexes(self):
+        """
+        Read-only view of the array of the index of the next sibling of each
+        node (-1 for the root and the last child of each node).
+        """
+        return memoryview(self._next_sibling_indexes).toreadonly()
+
+    @property
+    def edge_lengths(self):
+        """
+        Read-only view of the array of the length of the edge subtending
+        each node (NaN if none).
+        """
+        return memoryview(self._edge_lengths).toreadonly()
+
+    @property
+    def taxon_indexes(self):
+        """
+        Read-only view of the array of the accession index in the
+        |TaxonNamespace| of the taxon of each node (-1 if none).
+        """
+        return memoryview(self._taxon_indexes).toreadonly()
+
+    ###########################################################################
+    ### Nodes
+
+    def parent_index(self, idx):
+        """
+        Returns the index of the parent of node ``idx``, or -1 if it is the
+        root.
+        """
+        return self._parent_indexes[idx]
+
+    def child_indexes(self, idx):
+        """
+        Returns a list of the indexes of the children of node ``idx``.
+        """
+        return list(self.child_index_iter(idx))
+
+    def num_child_nodes(self, idx):
+        """
+        Returns the number of children of node ``idx``.
+        """
+        count = 0
+        next_sibling_indexes = self._next_sibling_indexes
+        child_idx = self._first_child_indexes[idx]
+        while child_idx >= 0:
+            count += 1
+            child_idx = next_sibling_indexes[child_idx]
+        return count
+
+    def is_leaf(self, idx):
+        """
+        Returns |True| if node ``idx`` has no children.
+        """
+        return self._first_child_indexes[idx] < 0
+
+    def edge_length(self, idx):
+        """
+        Returns the length of the edge subtending node ``idx``, or |None| if
+        it has none.
+        """
+        edge_length = self._edge_lengths[idx]
+        if edge_length != edge_length:
+            return None
+        return edge_length
+
+    def taxon(self, idx):
+        """
+        Returns the |Taxon| of node ``idx``, or |None| if it has none.
+        """
+        taxon_idx = self._taxon_indexes[idx]
+        if taxon_idx < 0:
+            return None
+        if self._index_taxon_map is None:
+            self._index_taxon_map = dict(
+                (i, taxon) for taxon, i in self.taxon_namespace._taxon_accession_index_map.items()
+            )
+        return self._index_taxon_map[taxon_idx]
+
+    def subtree_end(self, idx):
+        """
+        Returns the index following that of the last node descending from
+        node ``idx``, so that the nodes of the subtree of node ``idx`` are
+        those indexed ``range(idx, subtree_end(idx))``.
+        """
+        return self._subtree_ends[idx]
+
+    def leafset_range(self, idx):
+        """
+        Returns the range of the positions of the leaves descending from (or
+        including) node ``idx`` in the preorder sequence of all the leaves of
+        the tree, as given by ``leaf_index_iter()``.
+        """
+        leaf_offsets = self._leaf_offsets
+        return range(leaf_offsets[idx], leaf_offsets[self._subtree_ends[idx]])
+
+    def num_leaves_of(self, idx):
+        """
+        Returns the number of leaves descending from (or including) node
+        ``idx``.
+        """
+        return self._leaf_offsets[self._subtree_ends[idx]] - self._leaf_offsets[idx]
+
+    ###########################################################################
+    ### Traversals
+
+    def preorder_index_iter(self):
+        """
+        Iterates over the indexes of the nodes of the tree in preorder (i.e.,
+        in order).
+        """
+        return iter(range(len(self._parent_indexes)))
+
+    def postorder_index_iter(self):
+        """
+        Iterates over the indexes of the nodes of the tree in postorder, with
+        the children of each node visited in order.
+        """
+        if not self._parent_indexes:
+            return
+        parent_indexes = self._parent_indexes
+        first_child_indexes = self._first_child_indexes
+        next_sibling_indexes = self._next_sibling_indexes
+        idx = 0
+        while True:
+            while first_child_indexes[idx] >= 0:
+                idx = first_child_indexes[idx]
+            yield idx
+            while next_sibling_indexes[idx] < 0:
+                idx = parent_indexes[idx]
+                if idx < 0:
+                    return
+                yield idx
+            idx = next_sibling_indexes[idx]
+
+    def leaf_index_iter(self):
+        """
+        Iterates over the indexes of the leaves of the tree in preorder.
+        """
+        first_child_indexes = self._first_child_indexes
+        return (idx for idx in range(len(first_child_indexes)) if first_child_indexes[idx] < 0)
+
+    def child_index_iter(self, idx):
+        """
+        Iterates over the indexes of the children of node ``idx``.
+        """
+        next_sibling_indexes = self._next_sibling_indexes
+        child_idx = self._first_child_indexes[idx]
+        while child_idx >= 0:
+            yield child_idx
+            child_idx = next_sibling_indexes[child_idx]
+
+    def ancestor_index_iter(self, idx, inclusive=False):
+        """
+        Iterates over the indexes of the ancestors of node ``idx``, from its
+        parent (or itself, if ``inclusive`` is |True|) to the root.
+        """
+        parent_indexes = self._parent_indexes
+        if not inclusive:
+            idx = parent_indexes[idx]
+        while idx >= 0:
+            yield idx
+            idx = parent_indexes[idx]
+
+    ###########################################################################
+    ### Calculations
+
+    def length(self):
+        """
+        Returns the sum of the edge lengths of the tree. Edges with no lengths
+        are considered to have a length of 0.
+        """
+        return math.fsum(x for x in self._edge_lengths if x == x)
+
+    def calc_node_ages(
+        self,
+        ultrametricity_precision=constants.DEFAULT_ULTRAMETRICITY_PRECISION,
+        is_force_max_age=False,
+        is_force_min_age=False,
+    ):
+        """
+        Returns an array of the ages of the nodes (in preorder), each being
+        the sum of the edge lengths from the node to the tips, as calculated
+        by ``Tree.calc_node_ages()``. Edges with no lengths are considered to
+        have a length of 0.
+
+        Parameters
+        ----------
+        ultrametricity_precision : numeric or bool or None
+            As for ``Tree.calc_node_ages()``.
+        is_force_max_age : bool
+            As for ``Tree.calc_node_ages()``.
+        is_force_min_age : bool
+            As for ``Tree.calc_node_ages()``.
+
+        Returns
+        -------
+        a : array
+            The age of each node.
+        """
+        if is_force_max_age and is_force_min_age:
+            raise ValueError(
+                "Cannot specify both 'is_force_max_age' and 'is_force_min_age'"
+            )
+        is_check_ultrametricity = not (
+            is_force_max_age
+            or is_force_min_age
+            or ultrametricity_precision is None
+            or ultrametricity_precision is False
+            or ultrametricity_precision < 0
+        )
+        first_child_indexes = self._first_child_indexes
+        next_sibling_indexes = self._next_sibling_indexes
+        edge_lengths = self._edge_lengths
+        num_nodes = len(first_child_indexes)
+        ages = array("d", bytes(8 * num_nodes))
+        # children come after their parents in preorder
+        for idx in range(num_nodes - 1, -1, -1):
+            child_idx = first_child_indexes[idx]
+            if child_idx < 0:
+                continue
+            child_ages = []
+            while child_idx >= 0:
+                edge_length = edge_lengths[child_idx]
+                if edge_length != edge_length:
+                    edge_length = 0.0
+                child_ages.append(ages[child_idx] + edge_length)
+                child_idx = next_sibling_indexes[child_idx]
+            if is_force_max_age:
+                age = max(child_ages)
+            elif is_force_min_age:
+                age = min(child_ages)
+            else:
+                age = child_ages[0]
+                if is_check_ultrametricity:
+                    for ocnd in child_ages[1:]:
+                        d = abs(age - ocnd)
+                        if d > ultrametricity_precision:
+                            raise error.UltrametricityError(
+                                "Tree is not ultrametric within threshold of"
+                                " {threshold}: {deviance}".format(
+                                    threshold=ultrametricity_precision,
+                                    deviance=d,
+                                )
+                            )
+            ages[idx] = age
+        return ages
+
+    def encode_bipartitions(
+        self,
+        suppress_unifurcations=True,
+        collapse_unrooted_basal_bifurcation=True,
+        is_bipartitions_mutable=False,
+    ):
+        """
+        Returns a list of the bipartitions of the edges of the tree, in
+        postorder, as ``Tree.encode_bipartitions()`` would for the
+        corresponding |Tree|, but without modifying this tree.
+
+        Parameters
+        ----------
+        suppress_unifurcations : bool
+            If |True|, then nodes of outdegree 1 are skipped, as they would be
+            deleted by ``Tree.encode_bipartitions()``.
+        collapse_unrooted_basal_bifurcation: bool
+            If |True|, then the edge that would be collapsed by
+            ``Tree.encode_bipartitions()`` to make the basal bifurcation of an
+            unrooted tree a trifurcation is skipped.
+        is_bipartitions_mutable : bool
+            Whether or not the bipartitions are mutable.
+
+        Returns
+        -------
+        b : list[|Bipartition|]
+            The bipartitions of the tree.
+        """
+        num_nodes = len(self._parent_indexes)
+        if not num_nodes:
+            return []
+        parent_indexes = self._parent_indexes
+        first_child_indexes = self._first_child_indexes
+        next_sibling_indexes = self._next_sibling_indexes
+        taxon_indexes = self._taxon_indexes
+        is_rooted = self.is_rooted
+        skipped_idxs = set()
+        root_child_idxs = self.child_indexes(0)
+        if (
+            collapse_unrooted_basal_bifurcation
+            and not is_rooted
+            and len(root_child_idxs) == 2
+        ):
+            # as ``Tree.collapse_basal_bifurcation()``
+            c0, c1 = root_child_idxs
+            if self.num_child_nodes(c1) >= 2:
+                skipped_idxs.add(c1)
+                is_rooted = False
+            elif self.num_child_nodes(c0) >= 2:
+                skipped_idxs.add(c0)
+                is_rooted = False
+        if suppress_unifurcations:
+            for idx in range(num_nodes):
+                child_idx = first_child_indexes[idx]
+                if child_idx >= 0 and next_sibling_indexes[child_idx] < 0:
+                    skipped_idxs.add(idx)
+        one = self.taxon_namespace.bitmask_type(1)
+        leafset_bitmasks = [0] * num_nodes
+        for idx in range(num_nodes - 1, -1, -1):
+            if first_child_indexes[idx] < 0 and taxon_indexes[idx] >= 0:
+                leafset_bitmasks[idx] = one << taxon_indexes[idx]
+            if idx:
+                leafset_bitmasks[parent_indexes[idx]] |= leafset_bitmasks[idx]
+        tree_leafset_bitmask = leafset_bitmasks[0]
+        Bipartition = _bipartition.Bipartition
+        return [
+            Bipartition(
+                leafset_bitmask=leafset_bitmasks[idx],
+                tree_leafset_bitmask=tree_leafset_bitmask,
+                is_rooted=is_rooted,
+                is_mutable=is_bipartitions_mutable,
+            )
+            for idx in self.postorder_index_iter()
+            if idx not in skipped_idxs
+        ]
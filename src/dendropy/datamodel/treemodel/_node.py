@@ -5,6 +5,7 @@ from io import StringIO
 from dendropy.utility import deprecate
 from dendropy.utility import error
 from dendropy.datamodel import basemodel
+from dendropy.datamodel.treemodel import _bipartition
 from dendropy.datamodel.treemodel import _edge
 
 class Node(basemodel.DataObject, basemodel.Annotable):
@@ -12,6 +13,11 @@ class Node(basemodel.DataObject, basemodel.Annotable):
     A :term:|Node| on a :term:|Tree|.
     """
 
+    # Incremented whenever the child nodes or the taxon of any node are
+    # changed, so that a |Tree| can tell if it may have been restructured (or
+    # its leafsets changed) since its bipartitions were last calculated.
+    _structure_generation = 0
+
     @classmethod
     def edge_factory(cls, **kwargs):
         """
@@ -48,7 +54,9 @@ class Node(basemodel.DataObject, basemodel.Annotable):
 
         """
         basemodel.DataObject.__init__(self, label=kwargs.pop("label", None))
-        self.taxon = kwargs.pop("taxon", None)
+        # set directly, as a new node is not in any tree, and so cannot
+        # change any bipartitions
+        self._taxon = kwargs.pop("taxon", None)
         self.age = None
         self._edge = None
         self._child_nodes = []
@@ -88,6 +96,16 @@ class Node(basemodel.DataObject, basemodel.Annotable):
     def __hash__(self):
         return id(self)
 
+    def _get_taxon(self):
+        return self._taxon
+
+    def _set_taxon(self, taxon):
+        if taxon is not self._taxon:
+            Node._structure_generation += 1
+        self._taxon = taxon
+
+    taxon = property(_get_taxon, _set_taxon)
+
     def __eq__(self, other):
         # IMPORTANT LESSON LEARNED: if you define __hash__, you *must* define __eq__
         return self is other
@@ -675,6 +693,7 @@ class Node(basemodel.DataObject, basemodel.Annotable):
         node._parent_node = self
         if node not in self._child_nodes:
             self._child_nodes.append(node)
+            Node._structure_generation += 1
         return node
 
     def insert_child(self, index, node):
@@ -708,6 +727,7 @@ class Node(basemodel.DataObject, basemodel.Annotable):
                 return
             self._child_nodes.remove(node)
         self._child_nodes.insert(index, node)
+        Node._structure_generation += 1
         return node
 
     def new_child(self, **kwargs):
@@ -786,6 +806,7 @@ class Node(basemodel.DataObject, basemodel.Annotable):
             node.edge.tail_node = None
             index = children.index(node)
             children.remove(node)
+            Node._structure_generation += 1
             if suppress_unifurcations:
                 if self._parent_node:
                     if len(children) == 1:
@@ -830,6 +851,7 @@ class Node(basemodel.DataObject, basemodel.Annotable):
         Removes all child nodes.
         """
         self._child_nodes.clear()
+        Node._structure_generation += 1
 
     def reversible_remove_child(self, node, suppress_unifurcations=False):
         """
@@ -855,6 +877,7 @@ class Node(basemodel.DataObject, basemodel.Annotable):
         node._parent_node = None
         node.edge.tail_node = None
         children.remove(node)
+        Node._structure_generation += 1
         if suppress_unifurcations:
             p = self._parent_node
             if p:
@@ -984,6 +1007,7 @@ class Node(basemodel.DataObject, basemodel.Annotable):
                 self._parent_node._child_nodes.remove(self)
             except ValueError:
                 pass
+            Node._structure_generation += 1
 
         ## Minimal management
         self._edge = new_edge
@@ -1022,36 +1046,36 @@ class Node(basemodel.DataObject, basemodel.Annotable):
     bipartition = property(_get_bipartition, _set_bipartition)
 
     def _get_split_bitmask(self):
-        return self._edge.bipartition._split_bitmask
+        return self.bipartition._split_bitmask
 
     def _set_split_bitmask(self, h):
-        self._edge.bipartition._split_bitmask = h
+        self.bipartition._split_bitmask = h
 
     split_bitmask = property(_get_split_bitmask, _set_split_bitmask)
 
     def _get_leafset_bitmask(self):
-        return self._edge.bipartition._leafset_bitmask
+        return self.bipartition._leafset_bitmask
 
     def _set_leafset_bitmask(self, h):
-        self._edge.bipartition._leafset_bitmask = h
+        self.bipartition._leafset_bitmask = h
 
     leafset_bitmask = property(_get_leafset_bitmask, _set_leafset_bitmask)
 
     def _get_tree_leafset_bitmask(self):
-        return self._edge.bipartition._tree_leafset_bitmask
+        return self.bipartition._tree_leafset_bitmask
 
     def _set_tree_leafset_bitmask(self, h):
-        self._edge.bipartition._tree_leafset_bitmask = h
+        self.bipartition._tree_leafset_bitmask = h
 
     tree_leafset_bitmask = property(
         _get_tree_leafset_bitmask, _set_tree_leafset_bitmask
     )
 
     def split_as_bitstring(self):
-        return self._edge.bipartition.split_as_bitstring()
+        return self.bipartition.split_as_bitstring()
 
     def leafset_as_bitstring(self):
-        return self._edge.bipartition.leafset_as_bitstring()
+        return self.bipartition.leafset_as_bitstring()
 
     def _get_parent_node(self):
         """Returns the parent node of this node."""
@@ -1068,6 +1092,7 @@ class Node(basemodel.DataObject, basemodel.Annotable):
         if self._parent_node is not None:
             if self not in self._parent_node._child_nodes:
                 self._parent_node._child_nodes.append(self)
+        Node._structure_generation += 1
 
     parent_node = property(_get_parent_node, _set_parent_node)
 
@@ -1671,3 +1696,172 @@ class Node(basemodel.DataObject, basemodel.Annotable):
             ndl.extend(t)
             return tuple(ndl)
         return ()
+
+
+class CompactNode(Node):
+    """
+    A :term:|Node| on a :term:|Tree| that takes about half the memory of a
+    |Node|, for large trees or large numbers of trees (see |CompactTree|).
+
+    The attributes of the node are stored in slots rather than in the
+    ``__dict__`` of the object (though other attributes can still be set on
+    it). The length and bipartition of the edge subtending the node are
+    stored on the node itself, and the edge (a |CompactEdge|, as returned by
+    :meth:`CompactNode.edge_factory()`) is only created when first accessed
+    through :attr:`CompactNode.edge`: ``edge_length`` and ``bipartition``
+    do not create it. The ``comments`` and ``annotations`` of the node are
+    likewise only created when first accessed.
+
+    If :meth:`CompactNode.edge_factory()` is overridden to return an edge
+    that is not a |CompactEdge|, then the length and bipartition of the edge
+    are moved to it when it is created, and stored on it thereafter.
+    """
+
+    __slots__ = (
+        "_label",
+        "_taxon",
+        "age",
+        "_edge",
+        "_child_nodes",
+        "_parent_node",
+        "_comments",
+        "_annotations",
+        "_edge_length",
+        "_edge_bipartition",
+    )
+
+    @classmethod
+    def edge_factory(cls, **kwargs):
+        """
+        Creates and returns a |CompactEdge| object.
+
+        Derived classes can override this method to provide support for
+        specialized or different types of edges on the tree.
+
+        Parameters
+        ----------
+
+        kwargs : keyword arguments
+            Passed directly to constructor of |CompactEdge|.
+
+        Returns
+        -------
+        |CompactEdge|
+            A new |CompactEdge| object.
+
+        """
+        return _edge.CompactEdge(**kwargs)
+
+    def __init__(self, **kwargs):
+        """
+        Keyword Arguments
+        -----------------
+        taxon : |Taxon|, optional
+            The |Taxon| instance representing the operational taxonomic
+            unit concept associated with this Node.
+        label : string, optional
+            A label for this node.
+        edge_length : numeric, optional
+            Length or weight of the edge subtending this node.
+
+        """
+        basemodel.DataObject.__init__(self, label=kwargs.pop("label", None))
+        # set directly, as a new node is not in any tree, and so cannot
+        # change any bipartitions
+        self._taxon = kwargs.pop("taxon", None)
+        self.age = None
+        self._edge = None
+        self._child_nodes = []
+        self._parent_node = None
+        self._edge_length = kwargs.pop("edge_length", None)
+        self._edge_bipartition = None
+        if kwargs:
+            raise TypeError("Unsupported keyword arguments: {}".format(kwargs))
+        self._comments = None
+
+    def _get_edge(self):
+        """
+        Returns the edge subtending this node, creating it if needed.
+        """
+        edge = self._edge
+        if edge is None:
+            edge = self.edge_factory(head_node=self)
+            self._edge = edge
+            if not isinstance(edge, _edge.CompactEdge):
+                # custom edge: move the data of the edge to it
+                edge.length = self._edge_length
+                edge.bipartition = self._edge_bipartition
+                self._edge_length = None
+                self._edge_bipartition = None
+        return edge
+
+    def _set_edge(self, new_edge):
+        """
+        Sets the edge subtending this node, and sets head_node of
+        ``edge`` to point to self.
+        """
+        if new_edge is self._edge:
+            return
+        if (
+            isinstance(new_edge, _edge.CompactEdge)
+            and new_edge._head_node is not self
+        ):
+            # the data of the edge is stored on its head node, and moves
+            # with it
+            self._edge_length = new_edge.length
+            self._edge_bipartition = new_edge._bipartition
+        Node._set_edge(self, new_edge)
+
+    edge = property(_get_edge, _set_edge)
+
+    def _get_edge_length(self):
+        """
+        Returns the length of the edge subtending this node.
+        """
+        if self._edge is None:
+            return self._edge_length
+        return self._edge.length
+
+    def _set_edge_length(self, v=None):
+        """
+        Sets the length of the edge subtending this node.
+        """
+        if self._edge is None:
+            self._edge_length = v
+        else:
+            self._edge.length = v
+
+    edge_length = property(_get_edge_length, _set_edge_length)
+
+    def _get_bipartition(self):
+        """
+        Returns the bipartition for the edge subtending this node.
+        """
+        if self._edge is None:
+            if self._edge_bipartition is None:
+                self._edge_bipartition = _bipartition.Bipartition(
+                    is_mutable=True,
+                )
+            return self._edge_bipartition
+        return self._edge.bipartition
+
+    def _set_bipartition(self, v=None):
+        """
+        Sets the bipartition for the edge subtending this node.
+        """
+        if self._edge is None:
+            self._edge_bipartition = v
+        else:
+            self._edge.bipartition = v
+
+    bipartition = property(_get_bipartition, _set_bipartition)
+
+    def _get_comments(self):
+        if self._comments is None:
+            self._comments = []
+        return self._comments
+
+    def _set_comments(self, comments):
+        self._comments = comments
+
+    comments = property(_get_comments, _set_comments)
@@ -0,0 +1,364 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import collections
+import copy
+from dendropy.utility import constants
+from dendropy.utility import error
+
+
+class SplitRecord(
+    collections.namedtuple(
+        "SplitRecord",
+        [
+            "split_bitmasks",
+            "edge_lengths",
+            "node_ages",
+            "weight",
+            "leafset_bitmask",
+            "is_rooted",
+            "taxon_namespace",
+        ],
+    )
+):
+    """
+    The structure of a single tree, as required for counting and summarizing
+    splits, without the tree itself.
+
+    The split bitmasks are given in the order of the bipartitions of
+    ``Tree.bipartition_encoding``, with the corresponding edge lengths and (if
+    calculated, otherwise |None|) node ages. The record also holds the weight
+    of the tree (|None| if not stored), the leafset bitmask of the tree, the
+    rooting state of the tree, and the |TaxonNamespace| against which the
+    bitmasks are defined.
+
+    Records are accepted in place of |Tree| instances by
+    ``SplitDistribution.count_splits_on_tree()`` and
+    ``TreeArray.add_tree()``, and can be yielded directly from tree sources,
+    without constructing |Tree| instances, by
+    ``Tree.yield_split_records_from_files()``.
+    """
+
+    __slots__ = ()
+
+
+class SplitRecordEncoder(object):
+    """
+    Encodes the structure of trees as |SplitRecord| instances, either from
+    |Tree| instances or directly from a post-order sequence of node
+    descriptions as produced by a parser.
+
+    Both yield records identical to the splits, edge lengths and node ages
+    counted by |SplitDistribution| for the corresponding |Tree|.
+    """
+
+    def __init__(
+        self,
+        taxon_namespace,
+        is_calc_node_ages=False,
+        ultrametricity_precision=constants.DEFAULT_ULTRAMETRICITY_PRECISION,
+        is_force_max_age=False,
+        is_force_min_age=False,
+        taxon_label_age_map=None,
+        validate_rooting_fn=None,
+    ):
+        """
+        Parameters
+        ----------
+        taxon_namespace : |TaxonNamespace|
+            The operational taxonomic unit concept namespace against which
+            the bitmasks are defined.
+        is_calc_node_ages : bool
+            If |True|, then node ages will be calculated (see
+            ``Tree.calc_node_ages()``). Otherwise, the node ages of the records
+            will be |None|.
+        ultrametricity_precision : numeric or bool or None
+            As for ``Tree.calc_node_ages()``.
+        is_force_max_age : bool
+            As for ``Tree.calc_node_ages()``.
+        is_force_min_age : bool
+            As for ``Tree.calc_node_ages()``.
+        taxon_label_age_map : dict
+            If given, then the age of each leaf node will be set to the value
+            mapped to the label of its taxon (or 0.0 if the label is not
+            mapped).
+        validate_rooting_fn : function
+            If given, then this is called with the rooting state of each tree
+            before it is encoded (e.g., ``TreeArray.validate_rooting()``), so
+            that a tree with the wrong rooting is rejected before its node
+            ages are calculated.
+        """
+        self.taxon_namespace = taxon_namespace
+        self.is_calc_node_ages = is_calc_node_ages
+        self.ultrametricity_precision = ultrametricity_precision
+        self.is_force_max_age = is_force_max_age
+        self.is_force_min_age = is_force_min_age
+        self.taxon_label_age_map = taxon_label_age_map
+        self.validate_rooting_fn = validate_rooting_fn
+
+    def without_node_ages(self):
+        """
+        Returns a copy of this encoder that neither calculates node ages nor
+        validates rooting states, as for trees that are skipped (or this
+        encoder, if it does neither).
+        """
+        if not self.is_calc_node_ages and self.validate_rooting_fn is None:
+            return self
+        encoder = copy.copy(self)
+        encoder.is_calc_node_ages = False
+        encoder.validate_rooting_fn = None
+        return encoder
+
+    def _set_node_age(self, nd):
+        if nd.taxon is None or nd._child_nodes:
+            return None
+        else:
+            return self.taxon_label_age_map.get(nd.taxon.label, 0.0)
+
+    def encode_tree(self, tree, is_bipartitions_updated=False):
+        """
+        Returns a |SplitRecord| of ``tree``.
+
+        Parameters
+        ----------
+        tree : |Tree|
+            The tree to encode. Unless ``is_bipartitions_updated`` is |True|,
+            this will have its bipartitions encoded (which collapses any basal
+            bifurcation of an unrooted tree and suppresses unifurcations).
+        is_bipartitions_updated : bool
+            If |False| [default], then the tree will have its splits encoded or
+            updated. Otherwise, if |True|, then the tree is assumed to have its
+            splits already encoded and updated.
+
+        Returns
+        -------
+        r : |SplitRecord|
+            The record of ``tree``.
+        """
+        # rooting state as given, before any basal bifurcation is collapsed
+        is_rooted = tree.is_rooted
+        if self.validate_rooting_fn is not None:
+            self.validate_rooting_fn(is_rooted)
+        if self.is_calc_node_ages:
+            if self.taxon_label_age_map:
+                set_node_age_fn = self._set_node_age
+            else:
+                set_node_age_fn = None
+            tree.calc_node_ages(
+                ultrametricity_precision=self.ultrametricity_precision,
+                is_force_max_age=self.is_force_max_age,
+                is_force_min_age=self.is_force_min_age,
+                set_node_age_fn=set_node_age_fn,
+            )
+        if not is_bipartitions_updated:
+            tree.encode_bipartitions()
+        splits = []
+        edge_lengths = []
+        if self.is_calc_node_ages:
+            node_ages = []
+        else:
+            node_ages = None
+        for bipartition in tree.bipartition_encoding:
+            # we are just doing a lookup of bipartition, not storing it,
+            # so it is ok to override is_mutable here
+            was_mutable, bipartition.is_mutable = bipartition.is_mutable, False
+            edge = tree.bipartition_edge_map.get(bipartition)
+            bipartition.is_mutable = was_mutable
+            splits.append(bipartition.split_bitmask)
+            edge_lengths.append(edge.length)
+            if node_ages is not None:
+                if edge.head_node is not None:
+                    node_ages.append(edge.head_node.age)
+                else:
+                    node_ages.append(None)
+        return SplitRecord(
+            split_bitmasks=splits,
+            edge_lengths=edge_lengths,
+            node_ages=node_ages,
+            weight=tree.weight,
+            leafset_bitmask=tree.seed_node.edge.bipartition.leafset_bitmask,
+            is_rooted=is_rooted,
+            taxon_namespace=tree.taxon_namespace,
+        )
+
+    def encode_postorder_nodes(self, nodes, is_rooted, weight):
+        """
+        Returns a |SplitRecord| of the tree described by ``nodes``.
+
+        Node ages are calculated, the basal bifurcation of an unrooted tree is
+        collapsed, and unifurcations are suppressed exactly as by
+        ``Tree.calc_node_ages()`` and ``Tree.encode_bipartitions()``, so that
+        the record is identical to that of the corresponding |Tree|.
+
+        Parameters
+        ----------
+        nodes : list[list]
+            The nodes of the tree in post-order (so that the last node is the
+            root), each given as a list of: the number of child nodes, the
+            |Taxon| (or |None|), and the edge length (or |None|). The edge
+            lengths are modified in place.
+        is_rooted : bool or None
+            The rooting state of the tree.
+        weight : numeric or None
+            The weight of the tree.
+
+        Returns
+        -------
+        r : |SplitRecord|
+            The record of the tree.
+        """
+        if self.validate_rooting_fn is not None:
+            self.validate_rooting_fn(is_rooted)
+        # indexes of the child nodes of each node
+        children = []
+        stack = []
+        for idx, node in enumerate(nodes):
+            num_children = node[0]
+            if num_children:
+                children.append(stack[-num_children:])
+                del stack[-num_children:]
+            else:
+                children.append([])
+            stack.append(idx)
+        if self.is_calc_node_ages:
+            node_ages = self._calc_node_ages(nodes, children)
+        else:
+            node_ages = None
+        root_idx = len(nodes) - 1
+        root_children = children[root_idx]
+        collapsed_idx = None
+        if not is_rooted and len(root_children) == 2:
+            # as ``Tree.collapse_basal_bifurcation()``
+            c0, c1 = root_children
+            if len(children[c1]) >= 2:
+                kept_idx, collapsed_idx = c0, c1
+            elif len(children[c0]) >= 2:
+                collapsed_idx, kept_idx = c0, c1
+            if collapsed_idx is not None:
+                try:
+                    nodes[kept_idx][2] += nodes[collapsed_idx][2]
+                except TypeError:
+                    pass
+                pos = root_children.index(collapsed_idx)
+                root_children[pos : pos + 1] = children[collapsed_idx]
+        taxon_bitmask = self.taxon_namespace.taxon_bitmask
+        leafset_bitmasks = [0] * len(nodes)
+        # index of the node that takes the place of each node once
+        # unifurcations are suppressed
+        effective_idxs = list(range(len(nodes)))
+        encoded_idxs = []
+        for idx, node in enumerate(nodes):
+            if idx == collapsed_idx:
+                continue
+            child_idxs = children[idx]
+            if len(child_idxs) == 1:
+                child_idx = effective_idxs[child_idxs[0]]
+                if node[2] is not None:
+                    if nodes[child_idx][2] is None:
+                        nodes[child_idx][2] = node[2]
+                    else:
+                        nodes[child_idx][2] += node[2]
+                effective_idxs[idx] = child_idx
+                leafset_bitmasks[idx] = leafset_bitmasks[child_idx]
+                continue
+            encoded_idxs.append(idx)
+            if not child_idxs:
+                if node[1]:
+                    leafset_bitmasks[idx] = taxon_bitmask(node[1])
+            else:
+                leafset_bitmask = 0
+                for child_idx in child_idxs:
+                    leafset_bitmask |= leafset_bitmasks[child_idx]
+                leafset_bitmasks[idx] = leafset_bitmask
+        tree_leafset_bitmask = leafset_bitmasks[root_idx]
+        if not tree_leafset_bitmask:
+            splits = [None for idx in encoded_idxs]
+        elif is_rooted:
+            splits = [leafset_bitmasks[idx] for idx in encoded_idxs]
+        else:
+            # as ``Bipartition.normalize_bitmask()``
+            lowest_relevant_bit = tree_leafset_bitmask & -tree_leafset_bitmask
+            splits = []
+            for idx in encoded_idxs:
+                leafset_bitmask = leafset_bitmasks[idx]
+                if leafset_bitmask & lowest_relevant_bit:
+                    splits.append((~leafset_bitmask) & tree_leafset_bitmask)
+                else:
+                    splits.append(leafset_bitmask & tree_leafset_bitmask)
+        # as the look-up of edges in ``Tree.bipartition_edge_map``, which
+        # maps bipartitions with the same split to the last such edge
+        split_idxs = dict(zip(splits, encoded_idxs))
+        if len(split_idxs) < len(splits):
+            encoded_idxs = [split_idxs[split] for split in splits]
+        if node_ages is not None:
+            node_ages = [node_ages[idx] for idx in encoded_idxs]
+        return SplitRecord(
+            split_bitmasks=splits,
+            edge_lengths=[nodes[idx][2] for idx in encoded_idxs],
+            node_ages=node_ages,
+            weight=weight,
+            leafset_bitmask=tree_leafset_bitmask,
+            is_rooted=is_rooted,
+            taxon_namespace=self.taxon_namespace,
+        )
+
+    def _calc_node_ages(self, nodes, children):
+        # as ``Tree.calc_node_ages()``
+        is_force_max_age = self.is_force_max_age
+        is_force_min_age = self.is_force_min_age
+        ultrametricity_precision = self.ultrametricity_precision
+        if is_force_max_age and is_force_min_age:
+            raise ValueError(
+                "Cannot specify both 'is_force_max_age' and 'is_force_min_age'"
+            )
+        is_check_ultrametricity = not (
+            is_force_max_age
+            or is_force_min_age
+            or ultrametricity_precision is None
+            or ultrametricity_precision is False
+            or ultrametricity_precision < 0
+        )
+        taxon_label_age_map = self.taxon_label_age_map
+        ages = [None] * len(nodes)
+        for idx, node in enumerate(nodes):
+            child_idxs = children[idx]
+            if not child_idxs:
+                if taxon_label_age_map and node[1] is not None:
+                    ages[idx] = taxon_label_age_map.get(node[1].label, 0.0)
+                else:
+                    ages[idx] = 0.0
+                continue
+            if is_force_max_age:
+                age = max([(ages[c] + nodes[c][2]) for c in child_idxs])
+            elif is_force_min_age:
+                age = min([(ages[c] + nodes[c][2]) for c in child_idxs])
+            else:
+                first_idx = child_idxs[0]
+                if nodes[first_idx][2] is not None and ages[first_idx] is not None:
+                    age = ages[first_idx] + nodes[first_idx][2]
+                elif nodes[first_idx][2] is None:
+                    nodes[first_idx][2] = 0.0
+                    age = ages[first_idx]
+                elif ages[first_idx] is None:
+                    ages[first_idx] = 0.0
+                    age = nodes[first_idx][2]
+                else:
+                    age = 0.0
+            ages[idx] = age
+            if is_check_ultrametricity:
+                for child_idx in child_idxs[1:]:
+                    try:
+                        ocnd = ages[child_idx] + nodes[child_idx][2]
+                    except TypeError:
+                        nodes[child_idx][2] = 0.0
+                        ocnd = ages[child_idx]
+                    d = abs(age - ocnd)
+                    if d > ultrametricity_precision:
+                        raise error.UltrametricityError(
+                            "Tree is not ultrametric within threshold of"
+                            " {threshold}: {deviance}".format(
+                                threshold=ultrametricity_precision,
+                                deviance=d,
+                            )
+                        )
+        return ages
@@ -2,6 +2,7 @@
 # -*- coding: utf-8 -*-
 
 import copy
+import os
 import warnings
 from io import StringIO
 from dendropy.utility import terminal
@@ -11,15 +12,22 @@ from dendropy.utility import deprecate
 from dendropy.utility import constants
 from dendropy.utility import GLOBAL_RNG
 from dendropy.utility import messaging
+from dendropy.utility import metavar
 from dendropy.datamodel import basemodel
 from dendropy.datamodel import taxonmodel
 from dendropy.datamodel.treemodel import _bipartition
+from dendropy.datamodel.treemodel import _flat_tree
 from dendropy.datamodel.treemodel import _node
+from dendropy.datamodel.treemodel import _split_record
 from dendropy import dataio
 from dendropy import plot
 
 _LOG = messaging.get_logger(__name__)
 
+_CHECK_BIPARTITION_ENCODING = os.environ.get(
+    metavar.CHECK_BIPARTITION_ENCODING_ENVAR, "0"
+).lower() not in ("", "0", "false", "no")
+
 class Tree(
     taxonmodel.TaxonNamespaceAssociated,
     basemodel.Annotable,
@@ -323,6 +331,105 @@ class Tree(
         )
         return tree_yielder
 
+    @classmethod
+    def yield_split_records_from_files(
+        cls,
+        files,
+        schema,
+        taxon_namespace=None,
+        tree_offset=0,
+        split_record_encoder=None,
+        **kwargs
+    ):
+        r"""
+        Iterates over the structures of trees from files, returning them
+        one-by-one as |SplitRecord| instances (split bitmasks, edge lengths,
+        node ages, weight and rooting), instead of as |Tree| instances.
+
+        For NEWICK and NEXUS sources, each record is encoded directly from the
+        tree statement, without constructing a |Tree| at all. This makes this
+        far faster than ``yield_from_files()`` for operations that only
+        require the splits of each tree, such as counting them in a
+        |SplitDistribution| or |TreeArray|. For other schemas, trees are
+        read as usual and then encoded.
+
+        Parameters
+        ----------
+        files : iterable of file paths or file-like objects.
+            Iterable of sources, which can either be strings specifying file
+            paths or file-like objects open for reading. If a source element is
+            a string (``isinstance(i,str) == True``), then it is assumed to be
+            a path to a file. Otherwise, the source is assumed to be a file-like
+            object.
+        schema : string
+            The name of the data format (e.g., "newick" or "nexus").
+        taxon_namespace : |TaxonNamespace| instance
+            The operational taxonomic unit concept namespace to use to manage
+            taxon definitions.
+        tree_offset : integer
+            Trees before this offset in each source are skipped (i.e., they
+            are parsed, but not yielded, and their node ages are not
+            calculated).
+        split_record_encoder : |SplitRecordEncoder|
+            The encoder to use (e.g., to calculate node ages). If not given,
+            records will be encoded without node ages.
+        \*\*kwargs : keyword arguments
+            These will be passed directly to the schema-parser implementation.
+
+        Yields
+        ------
+        r : |SplitRecord|
+            Records of trees as read from the file.
+
+        Examples
+        --------
+
+        ::
+
+            taxon_namespace = dendropy.TaxonNamespace()
+            split_distribution = dendropy.SplitDistribution(
+                    taxon_namespace=taxon_namespace)
+            for split_record in dendropy.Tree.yield_split_records_from_files(
+                    files=["path/to/trees1.nex", "path/to/trees2.nex"],
+                    schema="nexus",
+                    taxon_namespace=taxon_namespace,
+                    tree_offset=100,
+                    store_tree_weights=True,
+                    ):
+                split_distribution.count_splits_on_tree(split_record)
+
+        """
+        if taxon_namespace is None:
+            if split_record_encoder is not None:
+                taxon_namespace = split_record_encoder.taxon_namespace
+            else:
+                taxon_namespace = taxonmodel.process_kwargs_dict_for_taxon_namespace(
+                    kwargs, None
+                )
+            if taxon_namespace is None:
+                taxon_namespace = taxonmodel.TaxonNamespace(
+                    is_case_sensitive=kwargs.get("case_sensitive_taxon_labels", False)
+                )
+        else:
+            assert "taxon_set" not in kwargs
+        if split_record_encoder is None:
+            split_record_encoder = _split_record.SplitRecordEncoder(
+                taxon_namespace=taxon_namespace
+            )
+        elif split_record_encoder.taxon_namespace is not taxon_namespace:
+            raise ValueError(
+                "TaxonNamespace of 'split_record_encoder' is not the same as"
+                " 'taxon_namespace'"
+            )
+        tree_yielder = dataio.get_tree_yielder(
+            files, schema, taxon_namespace=taxon_namespace, tree_type=cls, **kwargs
+        )
+        tree_yielder.set_split_record_encoder(
+            split_record_encoder=split_record_encoder,
+            tree_offset=tree_offset,
+        )
+        return tree_yielder
+
     @classmethod
     def from_bipartition_encoding(
         cls,
@@ -408,20 +515,26 @@ class Tree(
         |Tree|
             The tree reconstructed from the given bipartition encoding.
         """
-        leaf_to_root_search = True
         reconstructed_tree = cls(taxon_namespace=taxon_namespace)
         # reconstructed_tree.is_rooted = True
         reconstructed_tree.is_rooted = is_rooted
+        root = reconstructed_tree.seed_node
         for taxon in taxon_namespace:
-            reconstructed_tree.seed_node.new_child(taxon=taxon)
+            # as ``root.new_child(taxon=taxon)``, without the (linear) check
+            # for the new node already being a child
+            leaf = root.__class__(taxon=taxon)
+            leaf._parent_node = root
+            root._child_nodes.append(leaf)
         all_taxa_bitmask = taxon_namespace.all_taxa_bitmask()
         reconstructed_tree.encode_bipartitions()
         reconstructed_tree.bipartition_encoding = []
         leaves = reconstructed_tree.leaf_nodes()
-        if leaf_to_root_search:
-            to_leaf_dict = {}
-            for leaf in leaves:
-                to_leaf_dict[leaf.edge.bipartition.leafset_bitmask] = leaf
+        to_leaf_dict = {}
+        for leaf in leaves:
+            leaf_idx = bitprocessing.least_significant_set_bit_index(
+                leaf.edge.bipartition.leafset_bitmask
+            )
+            to_leaf_dict[leaf_idx] = leaf
         root = reconstructed_tree.seed_node
         root_edge = root.edge
 
@@ -440,60 +553,92 @@ class Tree(
                         # "denormalize" split_bitmasks
                         split_bitmasks_to_add.append(m)
 
+        # The children of each node are tracked in (insertion-ordered)
+        # dictionaries keyed by node id, rather than in the child node lists
+        # of the nodes, which are only set once all the splits have been
+        # added: removing a child from (or checking for a child in) a list is
+        # linear in the number of children, and so adding the splits of trees
+        # of thousands of taxa (to, initially, a star tree) would be
+        # quadratic. Nodes are numbered as they are added to the tree, so that
+        # the children moved to each new node keep their order.
+        nodes = []
+        node_children = {}
+        node_numbers = {}
+        for node in reconstructed_tree.preorder_node_iter():
+            node_children[id(node)] = dict((id(ch), ch) for ch in node._child_nodes)
+            node_numbers[id(node)] = len(nodes)
+            nodes.append(node)
+
         # Now when we add split_bitmasks in order, we will do a greedy, extended majority-rule consensus tree
         # for freq, split_to_add, split_in_dict in to_try_to_add:
-        _get_mask = lambda x: getattr(x.bipartition, "_leafset_bitmask")
         for split_to_add in split_bitmasks_to_add:
             if (split_to_add & root_edge.bipartition.leafset_bitmask) != split_to_add:
                 # incompatible
                 continue
-            elif leaf_to_root_search:
-                lb = bitprocessing.least_significant_set_bit(split_to_add)
-                one_leaf = to_leaf_dict[lb]
-                parent_node = one_leaf
-                while (
-                    split_to_add & parent_node.edge.bipartition.leafset_bitmask
-                ) != split_to_add:
-                    parent_node = parent_node.parent_node
-            else:
-                parent_node = reconstructed_tree.mrca(split_bitmask=split_to_add)
+            one_leaf = to_leaf_dict[
+                bitprocessing.least_significant_set_bit_index(split_to_add)
+            ]
+            parent_node = one_leaf
+            while (
+                split_to_add & parent_node.edge.bipartition.leafset_bitmask
+            ) != split_to_add:
+                parent_node = parent_node._parent_node
             if (
                 parent_node is None
                 or parent_node.edge.bipartition.leafset_bitmask == split_to_add
             ):
                 continue  # split is not in tree, or already in tree.
-            new_node = cls.node_factory()
-            # self.map_split_support_to_node(node=new_node, split_support=freq)
+            # The children of the parent node that the split includes, found
+            # by following each (as yet unaccounted for) leaf of the split to
+            # the parent node
             new_node_children = []
-            new_edge = new_node.edge
             new_mask = 0
-            for child in parent_node.child_nodes():
-                # might need to modify the following if rooted split_bitmasks
-                # are used
+            leaves_to_find = split_to_add
+            while leaves_to_find:
+                child = to_leaf_dict[
+                    bitprocessing.least_significant_set_bit_index(leaves_to_find)
+                ]
+                while child._parent_node is not parent_node:
+                    child = child._parent_node
                 cecm = child.edge.bipartition.leafset_bitmask
-                if cecm & split_to_add:
-                    assert cecm != split_to_add
-                    new_mask |= cecm
-                    new_node_children.append(child)
-                    new_edge.bipartition = _bipartition.Bipartition(
-                        leafset_bitmask=new_mask,
-                        tree_leafset_bitmask=all_taxa_bitmask,
-                        is_mutable=False,
-                        compile_bipartition=True,
-                    )
-                    reconstructed_tree.bipartition_encoding.append(new_edge.bipartition)
+                new_mask |= cecm
+                if (new_mask | split_to_add) != split_to_add:
+                    break  # incompatible
+                leaves_to_find &= ~cecm
+                new_node_children.append(child)
             # Check to see if we have accumulated all of the bits that we
             #   needed, but none that we don't need.
-            if new_edge.bipartition.leafset_bitmask == split_to_add:
-                if split_edge_lengths:
-                    new_edge.length = split_edge_lengths[split_to_add]
-                    # old_split = new_old_split_map[split_to_add]
-                    # new_edge.length = split_edge_lengths[old_split]
-                for child in new_node_children:
-                    parent_node.remove_child(child)
-                    new_node.add_child(child)
-                parent_node.add_child(new_node)
-                # reconstructed_tree.split_edge_map[split_to_add] = new_edge
+            if new_mask != split_to_add:
+                continue
+            new_node = cls.node_factory()
+            # self.map_split_support_to_node(node=new_node, split_support=freq)
+            new_edge = new_node.edge
+            new_edge.bipartition = _bipartition.Bipartition(
+                leafset_bitmask=new_mask,
+                tree_leafset_bitmask=all_taxa_bitmask,
+                is_mutable=False,
+                compile_bipartition=True,
+            )
+            reconstructed_tree.bipartition_encoding.append(new_edge.bipartition)
+            if split_edge_lengths:
+                new_edge.length = split_edge_lengths[split_to_add]
+                # old_split = new_old_split_map[split_to_add]
+                # new_edge.length = split_edge_lengths[old_split]
+            new_node_children.sort(key=lambda ch: node_numbers[id(ch)])
+            parent_children = node_children[id(parent_node)]
+            new_children = {}
+            for child in new_node_children:
+                del parent_children[id(child)]
+                new_children[id(child)] = child
+                child._parent_node = new_node
+            node_children[id(new_node)] = new_children
+            node_numbers[id(new_node)] = len(nodes)
+            nodes.append(new_node)
+            new_node._parent_node = parent_node
+            parent_children[id(new_node)] = new_node
+            # reconstructed_tree.split_edge_map[split_to_add] = new_edge
+        for node in nodes:
+            node._child_nodes = list(node_children[id(node)].values())
         return reconstructed_tree
 
     @classmethod
@@ -690,6 +835,7 @@ class Tree(
             self._seed_node = None
             self.seed_node = None
             self.bipartition_encoding = None
+            self._bipartition_encoding_state = None
             self._split_bitmask_edge_map = None
             self._bipartition_edge_map = None
             seed_node = kwargs.pop("seed_node", None)
@@ -1954,12 +2100,12 @@ class Tree(
         """
         # NOTE: from-scratch implementation here instead of wrapping
         # `preorder_node_iter()`for efficiency
-        stack = [self.seed_node._edge]
+        stack = [self.seed_node.edge]
         while stack:
             edge = stack.pop()
             if filter_fn is None or filter_fn(edge):
                 yield edge
-            stack.extend(n._edge for n in reversed(edge._head_node._child_nodes))
+            stack.extend(n.edge for n in reversed(edge._head_node._child_nodes))
 
     def preorder_internal_edge_iter(self, filter_fn=None, exclude_seed_edge=False):
         """
@@ -2044,7 +2190,7 @@ class Tree(
         ## Prefer `pop()` to `pop(0)`.
         ## Thanks to Mark T. Holder
         ## From peyotl commits: d1ffef2 + 19fdea1
-        stack = [(self.seed_node._edge, False)]
+        stack = [(self.seed_node.edge, False)]
         while stack:
             edge, state = stack.pop()
             if state:
@@ -2053,7 +2199,7 @@ class Tree(
             else:
                 stack.append((edge, True))
                 stack.extend(
-                    [(n._edge, False) for n in reversed(edge._head_node._child_nodes)]
+                    [(n.edge, False) for n in reversed(edge._head_node._child_nodes)]
                 )
 
     def postorder_internal_edge_iter(self, filter_fn=None, exclude_seed_edge=False):
@@ -2223,6 +2369,7 @@ class Tree(
                     # taxon to use is given by mapping
                     self.taxon_namespace.add_taxon(t)
                 node.taxon = t
+        self._bipartition_encoding_state = None
 
     def update_taxon_namespace(self):
         """
@@ -2291,6 +2438,7 @@ class Tree(
             t = node.taxon
             if t:
                 node.taxon = self.taxon_namespace.require_taxon(label=t.label)
+        self._bipartition_encoding_state = None
 
     def unassign_taxa(self, exclude_leaves=False, exclude_internal=False):
         """
@@ -2304,6 +2452,7 @@ class Tree(
                 nd.taxon = None
             elif (len(nd._child_nodes) > 0) and not exclude_internal:
                 nd.taxon = None
+        self._bipartition_encoding_state = None
 
     def randomly_assign_taxa(self, create_required_taxa=True, rng=None):
         """
@@ -2320,6 +2469,7 @@ class Tree(
         """
         if rng is None:
             rng = GLOBAL_RNG
+        self._bipartition_encoding_state = None
         if len(self.taxon_namespace) == 0:
             for i, nd in enumerate(self.leaf_nodes()):
                 nd.taxon = self.taxon_namespace.require_taxon(label="T%d" % (i + 1))
@@ -2376,6 +2526,7 @@ class Tree(
         """
         if self.seed_node is not None:
             self.seed_node._convert_node_to_root_polytomy()
+            self._bipartition_encoding_state = None
         if set_as_unrooted_tree:
             self.is_rooted = False
 
@@ -2396,11 +2547,12 @@ class Tree(
             return
         to_del_edge = to_del.edge
         try:
-            to_keep.edge.length += to_del_edge.length
+            to_keep.edge_length += to_del_edge.length
         except:
             pass
         # print to_keep.edge.length, to_del_edge.length, [id(c) for c in to_del_edge.head_node.child_nodes()]
         to_del_edge.collapse(adjust_collapsed_head_children_edge_lengths=False)
+        self._bipartition_encoding_state = None
         if set_as_unrooted_tree:
             self.is_rooted = False
         return self.seed_node
@@ -2475,52 +2627,39 @@ class Tree(
         #     debug_children = ", ".join(debug_children)
         #     print("    Children (Node Parent, Edge Tail Node Parent): {}".format(debug_children))
 
+        encoding_state = self._get_incremental_bipartition_encoding_state(
+            update_bipartitions=update_bipartitions,
+            suppress_unifurcations=suppress_unifurcations,
+        )
         if self.seed_node is new_seed_node:
             # do not just return: allow for updating of bipartitions,
             # collapsing of unifurcations, collapsing of unrooted basal
             # bifurcations
-            pass
+            changed_nodes = []
+            removed_nodes = []
         else:
-            old_seed_node = self.seed_node
             old_parent_node = new_seed_node._parent_node
             if old_parent_node is None:
                 return
+            changed_nodes, removed_nodes = self._reseed_at(
+                new_seed_node, suppress_unifurcations=suppress_unifurcations
+            )
 
-            if new_seed_node._child_nodes:
-                new_seed_node_is_leaf = False
-            else:
-                new_seed_node_is_leaf = True
-
-            edges_to_invert = []
-            current_node = new_seed_node
-            while current_node:
-                if current_node._parent_node is not None:
-                    edges_to_invert.append(current_node.edge)
-                current_node = current_node._parent_node
-            while edges_to_invert:
-                edge = edges_to_invert.pop()
-                edge.invert(update_bipartitions=update_bipartitions)
-
-            if new_seed_node_is_leaf and suppress_unifurcations:
-                ## Cannot just suppress_unifurcations, because wrong node will be deleted
-                ## need to remove child (i.e. new seed node's old parent, which is now its child, needs to be deleted)
-                # self.suppress_unifurcations(update_bipartitions=update_bipartitions)
-                if len(new_seed_node._child_nodes) == 1:
-                    nsn_ch = new_seed_node._child_nodes[0]
-                    new_seed_node.remove_child(nsn_ch)
-                    for ch in nsn_ch._child_nodes:
-                        new_seed_node.add_child(ch)
-            if new_seed_node is not None:
-                # uncouple before splicing
-                new_seed_node._parent_node = None
-            self.seed_node = new_seed_node
-
-        if update_bipartitions:
+        if encoding_state is not None:
+            self._update_bipartitions_incrementally(
+                encoding_state,
+                changed_nodes=changed_nodes,
+                removed_nodes=removed_nodes,
+                suppress_unifurcations=suppress_unifurcations,
+                collapse_unrooted_basal_bifurcation=collapse_unrooted_basal_bifurcation,
+            )
+        elif update_bipartitions:
             self.encode_bipartitions(
                 suppress_unifurcations=suppress_unifurcations,
                 collapse_unrooted_basal_bifurcation=collapse_unrooted_basal_bifurcation,
             )
         else:
+            self._bipartition_encoding_state = None
             if (
                 collapse_unrooted_basal_bifurcation
                 and not self._is_rooted
@@ -2532,6 +2671,53 @@ class Tree(
 
         return self.seed_node
 
+    def _reseed_at(self, new_seed_node, suppress_unifurcations=True):
+        """
+        Rotates the tree such that ``new_seed_node`` is the ``seed_node`` of the
+        tree (see :meth:`Tree.reseed_at()`), without updating bipartitions,
+        suppressing the unifurcation that may be left at the old seed node or
+        collapsing basal bifurcations. Nothing is done if ``new_seed_node`` is
+        already the ``seed_node`` or has no parent.
+
+        Returns the nodes whose children have changed and the nodes that have
+        been removed from the tree.
+        """
+        if new_seed_node is self.seed_node or new_seed_node._parent_node is None:
+            return [], []
+        if new_seed_node._child_nodes:
+            new_seed_node_is_leaf = False
+        else:
+            new_seed_node_is_leaf = True
+
+        changed_nodes = []
+        edges_to_invert = []
+        current_node = new_seed_node
+        while current_node:
+            changed_nodes.append(current_node)
+            if current_node._parent_node is not None:
+                edges_to_invert.append(current_node.edge)
+            current_node = current_node._parent_node
+        while edges_to_invert:
+            edge = edges_to_invert.pop()
+            edge.invert(update_bipartitions=False)
+
+        removed_nodes = []
+        if new_seed_node_is_leaf and suppress_unifurcations:
+            ## Cannot just suppress_unifurcations, because wrong node will be deleted
+            ## need to remove child (i.e. new seed node's old parent, which is now its child, needs to be deleted)
+            # self.suppress_unifurcations(update_bipartitions=update_bipartitions)
+            if len(new_seed_node._child_nodes) == 1:
+                nsn_ch = new_seed_node._child_nodes[0]
+                new_seed_node.remove_child(nsn_ch)
+                for ch in nsn_ch._child_nodes:
+                    new_seed_node.add_child(ch)
+                removed_nodes.append(nsn_ch)
+        if new_seed_node is not None:
+            # uncouple before splicing
+            new_seed_node._parent_node = None
+        self.seed_node = new_seed_node
+        return changed_nodes, removed_nodes
+
     def to_outgroup_position(
         self, outgroup_node, update_bipartitions=False, suppress_unifurcations=True
     ):
@@ -2579,6 +2765,55 @@ class Tree(
         ``suppress_unifurcations`` is False, then it will be
         removed from the tree.
         """
+        return self._reroot_at_node(
+            new_root_node,
+            encoding_state=self._get_rerooting_bipartition_encoding_state(
+                update_bipartitions=update_bipartitions,
+                suppress_unifurcations=suppress_unifurcations,
+            ),
+            update_bipartitions=update_bipartitions,
+            suppress_unifurcations=suppress_unifurcations,
+            collapse_unrooted_basal_bifurcation=collapse_unrooted_basal_bifurcation,
+        )
+
+    def _get_rerooting_bipartition_encoding_state(
+        self, update_bipartitions, suppress_unifurcations
+    ):
+        if self._is_rooted:
+            # the bipartitions of a tree that is already rooted can be
+            # updated in place
+            return self._get_incremental_bipartition_encoding_state(
+                update_bipartitions=update_bipartitions,
+                suppress_unifurcations=suppress_unifurcations,
+            )
+        return None
+
+    def _reroot_at_node(
+        self,
+        new_root_node,
+        encoding_state,
+        update_bipartitions,
+        suppress_unifurcations,
+        collapse_unrooted_basal_bifurcation,
+    ):
+        """
+        Implements :meth:`Tree.reroot_at_node()`, updating the bipartition
+        encoding described by ``encoding_state`` (as returned by
+        ``_get_rerooting_bipartition_encoding_state()`` before the tree was
+        edited) in place if it is not |None|.
+        """
+        if encoding_state is not None:
+            changed_nodes, removed_nodes = self._reseed_at(
+                new_root_node, suppress_unifurcations=suppress_unifurcations
+            )
+            self._update_bipartitions_incrementally(
+                encoding_state,
+                changed_nodes=changed_nodes,
+                removed_nodes=removed_nodes,
+                suppress_unifurcations=suppress_unifurcations,
+                collapse_unrooted_basal_bifurcation=collapse_unrooted_basal_bifurcation,
+            )
+            return self.seed_node
         self.reseed_at(
             new_seed_node=new_root_node,
             update_bipartitions=False,
@@ -2615,6 +2850,12 @@ class Tree(
         ``suppress_unifurcations`` is False, then it will be
         removed from the tree.
         """
+        # the encoding state is taken before the edge is split, as the split
+        # invalidates it
+        encoding_state = self._get_rerooting_bipartition_encoding_state(
+            update_bipartitions=update_bipartitions,
+            suppress_unifurcations=suppress_unifurcations,
+        )
         old_tail = edge.tail_node
         old_head = edge.head_node
         new_seed_node = old_tail.new_child(edge_length=length1)
@@ -2622,10 +2863,12 @@ class Tree(
         # new_seed_node.add_child(old_head, edge_length=length2)
         new_seed_node.add_child(old_head)
         old_head.edge.length = length2
-        self.reroot_at_node(
+        self._reroot_at_node(
             new_seed_node,
+            encoding_state=encoding_state,
             update_bipartitions=update_bipartitions,
             suppress_unifurcations=suppress_unifurcations,
+            collapse_unrooted_basal_bifurcation=True,
         )
         return self.seed_node
 
@@ -2698,13 +2941,23 @@ class Tree(
 
         assert break_on_node is not None or target_edge is not None
 
-        if break_on_node:
-            self.reseed_at(
-                break_on_node,
-                update_bipartitions=False,
+        if self._is_rooted:
+            # the bipartitions of a tree that is already rooted can be
+            # updated in place
+            encoding_state = self._get_incremental_bipartition_encoding_state(
+                update_bipartitions=update_bipartitions,
                 suppress_unifurcations=suppress_unifurcations,
             )
+        else:
+            encoding_state = None
+        if break_on_node:
             new_seed_node = break_on_node
+            if encoding_state is None:
+                self.reseed_at(
+                    break_on_node,
+                    update_bipartitions=False,
+                    suppress_unifurcations=suppress_unifurcations,
+                )
         else:
             tail_node_edge_len = target_edge.length - head_node_edge_len
             old_head_node = target_edge.head_node
@@ -2717,12 +2970,25 @@ class Tree(
             # old_tail_node.add_child(new_seed_node, edge_length=tail_node_edge_len)
             old_tail_node.add_child(new_seed_node)
             new_seed_node.edge.length = tail_node_edge_len
-            self.reseed_at(
-                new_seed_node,
-                update_bipartitions=False,
+            if encoding_state is None:
+                self.reseed_at(
+                    new_seed_node,
+                    update_bipartitions=False,
+                    suppress_unifurcations=suppress_unifurcations,
+                    collapse_unrooted_basal_bifurcation=False,
+                )
+        if encoding_state is not None:
+            changed_nodes, removed_nodes = self._reseed_at(
+                new_seed_node, suppress_unifurcations=suppress_unifurcations
+            )
+            self._update_bipartitions_incrementally(
+                encoding_state,
+                changed_nodes=changed_nodes,
+                removed_nodes=removed_nodes,
                 suppress_unifurcations=suppress_unifurcations,
-                collapse_unrooted_basal_bifurcation=False,
+                collapse_unrooted_basal_bifurcation=collapse_unrooted_basal_bifurcation,
             )
+            return self.seed_node
         self.is_rooted = True
         if update_bipartitions:
             self.update_bipartitions(
@@ -2771,6 +3037,8 @@ class Tree(
                     # assert nd is self.seed_node
                     children[0]._parent_node = None
                     self.seed_node = children[0]
+        if remapped_nodes:
+            self._bipartition_encoding_state = None
         if bipartitions_to_delete:
             old_encoding = self.bipartition_encoding
             self.bipartition_encoding = [
@@ -2793,11 +3061,25 @@ class Tree(
         Collapse all *internal* edges with edge lengths less than or equal to
         ``threshold`` (or with |None| for edge length).
         """
+        encoding_state = self._get_incremental_bipartition_encoding_state(
+            update_bipartitions=update_bipartitions
+        )
+        removed_nodes = []
         for e in self.postorder_edge_iter():
             if e.length is None or (e.length <= threshold) and e.is_internal():
+                if e.tail_node is not None:
+                    removed_nodes.append(e.head_node)
                 e.collapse()
-        if update_bipartitions:
+        if encoding_state is not None:
+            # collapsing an edge does not change any leafsets: the
+            # bipartitions of the collapsed edges only need to be dropped
+            self._update_bipartitions_incrementally(
+                encoding_state, removed_nodes=removed_nodes
+            )
+        elif update_bipartitions:
             self.update_bipartitions()
+        elif removed_nodes:
+            self._bipartition_encoding_state = None
 
     def resolve_polytomies(self, limit=2, update_bipartitions=False, rng=None):
         """
@@ -2818,6 +3100,10 @@ class Tree(
             If ``rng`` is |None|, then polytomy is broken deterministically by
             repeatedly joining pairs of children.
         """
+        encoding_state = self._get_incremental_bipartition_encoding_state(
+            update_bipartitions=update_bipartitions
+        )
+        new_nodes = []
         polytomies = []
         for node in self.postorder_node_iter():
             if len(node._child_nodes) > limit:
@@ -2849,6 +3135,7 @@ class Tree(
                         next_attachment.add_child(next_sib)
                         next_attachment.add_child(next_child)
                     next_attachment.edge.length = 0.0
+                    new_nodes.append(next_attachment)
                     attachment_points.append(next_attachment)
                     attachment_points.append(next_child)
             else:
@@ -2862,8 +3149,15 @@ class Tree(
                     nn1.add_child(c1)
                     nn1.add_child(c2)
                     node.add_child(nn1)
-        if update_bipartitions:
+                    new_nodes.append(nn1)
+        if encoding_state is not None:
+            self._update_bipartitions_incrementally(
+                encoding_state, changed_nodes=new_nodes
+            )
+        elif update_bipartitions:
             self.update_bipartitions()
+        elif new_nodes:
+            self._bipartition_encoding_state = None
 
     def prune_subtree(
         self, node, update_bipartitions=False, suppress_unifurcations=True
@@ -2875,7 +3169,43 @@ class Tree(
             raise ValueError("Tried to remove an non-existing or null node")
         if node._parent_node is None:
             raise TypeError("Node has no parent and is implicit root: cannot be pruned")
-        node._parent_node.remove_child(node)
+        encoding_state = self._get_incremental_bipartition_encoding_state(
+            update_bipartitions=update_bipartitions
+        )
+        parent_node = node._parent_node
+        parent_node.remove_child(node)
+        self._update_bipartitions_after_pruning(
+            encoding_state=encoding_state,
+            removed_nodes=[node],
+            changed_nodes=[parent_node],
+            update_bipartitions=update_bipartitions,
+            suppress_unifurcations=suppress_unifurcations,
+        )
+
+    def _update_bipartitions_after_pruning(
+        self,
+        encoding_state,
+        removed_nodes,
+        changed_nodes,
+        update_bipartitions,
+        suppress_unifurcations,
+    ):
+        """
+        Suppresses unifurcations and updates the bipartitions, as requested,
+        after ``removed_nodes`` have been pruned from ``changed_nodes``. The
+        bipartitions are updated in place if ``encoding_state`` is given (see
+        ``_update_bipartitions_incrementally()``), the unifurcations then only
+        being looked for among the changed nodes.
+        """
+        if encoding_state is not None:
+            self._update_bipartitions_incrementally(
+                encoding_state,
+                changed_nodes=changed_nodes,
+                removed_nodes=removed_nodes,
+            )
+            return
+        if removed_nodes:
+            self._bipartition_encoding_state = None
         if suppress_unifurcations:
             self.suppress_unifurcations()
         if update_bipartitions:
@@ -2917,7 +3247,11 @@ class Tree(
         nds : list[|Node|]
             List of nodes removed.
         """
+        encoding_state = self._get_incremental_bipartition_encoding_state(
+            update_bipartitions=update_bipartitions
+        )
         nodes_removed = []
+        changed_nodes = []
         while True:
             is_nodes_deleted = False
             nodes_to_remove = [nd for nd in self.leaf_node_iter() if not filter_fn(nd)]
@@ -2926,16 +3260,20 @@ class Tree(
                     raise error.SeedNodeDeletionException(
                         "Attempting to remove seed node or node without parent"
                     )
+                changed_nodes.append(nd.edge.tail_node)
                 nd.edge.tail_node.remove_child(nd)
             if nodes_to_remove:
                 nodes_removed += nodes_to_remove
                 is_nodes_deleted = True
             if not is_nodes_deleted or not recursive:
                 break
-        if suppress_unifurcations:
-            self.suppress_unifurcations()
-        if update_bipartitions:
-            self.update_bipartitions()
+        self._update_bipartitions_after_pruning(
+            encoding_state=encoding_state,
+            removed_nodes=nodes_removed,
+            changed_nodes=changed_nodes,
+            update_bipartitions=update_bipartitions,
+            suppress_unifurcations=suppress_unifurcations,
+        )
         return nodes_removed
 
     def prune_leaves_without_taxa(
@@ -2945,22 +3283,54 @@ class Tree(
         Removes all terminal nodes that have their ``taxon`` attribute set to
         |None|.
         """
+        encoding_state = self._get_incremental_bipartition_encoding_state(
+            update_bipartitions=update_bipartitions
+        )
+        nodes_removed, changed_nodes = self._prune_leaves_without_taxa(
+            recursive=recursive
+        )
+        self._update_bipartitions_after_pruning(
+            encoding_state=encoding_state,
+            removed_nodes=nodes_removed,
+            changed_nodes=changed_nodes,
+            update_bipartitions=update_bipartitions,
+            suppress_unifurcations=suppress_unifurcations,
+        )
+        return nodes_removed
+
+    def _prune_leaves_without_taxa(self, recursive=True):
+        """
+        Removes all terminal nodes that have their ``taxon`` attribute set to
+        |None|, without suppressing unifurcations or updating bipartitions.
+        After the first pass over the leaves of the tree, only the parents of
+        the nodes removed are checked for having become leaves without taxa.
+
+        Returns the nodes removed and the nodes they were removed from.
+        """
         nodes_removed = []
-        while True:
-            nodes_to_remove = []
-            for nd in self.leaf_node_iter():
-                if nd.taxon is None:
-                    nodes_to_remove.append(nd)
+        changed_nodes = []
+        nodes_to_remove = [nd for nd in self.leaf_node_iter() if nd.taxon is None]
+        while nodes_to_remove:
+            parent_nodes = []
             for nd in nodes_to_remove:
-                nd.edge.tail_node.remove_child(nd)
+                parent_node = nd.edge.tail_node
+                parent_node.remove_child(nd)
+                parent_nodes.append(parent_node)
             nodes_removed += nodes_to_remove
-            if not nodes_to_remove or not recursive:
+            changed_nodes += parent_nodes
+            if not recursive:
                 break
-        if suppress_unifurcations:
-            self.suppress_unifurcations()
-        if update_bipartitions:
-            self.update_bipartitions()
-        return nodes_removed
+            nodes_to_remove = []
+            seen_node_ids = set()
+            for nd in parent_nodes:
+                if (
+                    not nd._child_nodes
+                    and nd.taxon is None
+                    and id(nd) not in seen_node_ids
+                ):
+                    seen_node_ids.add(id(nd))
+                    nodes_to_remove.append(nd)
+        return nodes_removed, changed_nodes
 
     def prune_nodes(
         self,
@@ -2969,15 +3339,27 @@ class Tree(
         update_bipartitions=False,
         suppress_unifurcations=True,
     ):
+        encoding_state = self._get_incremental_bipartition_encoding_state(
+            update_bipartitions=update_bipartitions and prune_leaves_without_taxa
+        )
+        nodes_removed = []
+        changed_nodes = []
         for nd in nodes:
             if nd.edge.tail_node is None:
                 raise Exception("Attempting to remove root node or node without parent")
+            changed_nodes.append(nd.edge.tail_node)
             nd.edge.tail_node.remove_child(nd)
+            nodes_removed.append(nd)
         if prune_leaves_without_taxa:
-            self.prune_leaves_without_taxa(
+            self._prune_leaves_without_taxa_after_removal(
+                encoding_state=encoding_state,
+                nodes_removed=nodes_removed,
+                changed_nodes=changed_nodes,
                 update_bipartitions=update_bipartitions,
                 suppress_unifurcations=suppress_unifurcations,
             )
+        elif nodes_removed:
+            self._bipartition_encoding_state = None
 
     def prune_taxa(
         self,
@@ -2991,15 +3373,46 @@ class Tree(
         Removes terminal nodes associated with Taxon objects given by the container
         ``taxa`` (which can be any iterable, including a TaxonNamespace object) from ``self``.
         """
+        encoding_state = self._get_incremental_bipartition_encoding_state(
+            update_bipartitions=update_bipartitions
+        )
         taxa = set(taxa)
-        nodes_to_remove = []
+        nodes_removed = []
+        changed_nodes = []
         for nd in self.postorder_node_iter():
             if (
                 (is_apply_filter_to_internal_nodes and nd._child_nodes)
                 or (is_apply_filter_to_leaf_nodes and not nd._child_nodes)
             ) and (nd.taxon and nd.taxon in taxa):
+                changed_nodes.append(nd.edge.tail_node)
                 nd.edge.tail_node.remove_child(nd)
-        self.prune_leaves_without_taxa(
+                nodes_removed.append(nd)
+        self._prune_leaves_without_taxa_after_removal(
+            encoding_state=encoding_state,
+            nodes_removed=nodes_removed,
+            changed_nodes=changed_nodes,
+            update_bipartitions=update_bipartitions,
+            suppress_unifurcations=suppress_unifurcations,
+        )
+
+    def _prune_leaves_without_taxa_after_removal(
+        self,
+        encoding_state,
+        nodes_removed,
+        changed_nodes,
+        update_bipartitions,
+        suppress_unifurcations,
+    ):
+        """
+        As :meth:`Tree.prune_leaves_without_taxa()`, following the removal of
+        ``nodes_removed`` from ``changed_nodes``, the bipartitions being
+        updated in place if ``encoding_state`` is given.
+        """
+        leaves_removed, leaf_parent_nodes = self._prune_leaves_without_taxa()
+        self._update_bipartitions_after_pruning(
+            encoding_state=encoding_state,
+            removed_nodes=nodes_removed + leaves_removed,
+            changed_nodes=changed_nodes + leaf_parent_nodes,
             update_bipartitions=update_bipartitions,
             suppress_unifurcations=suppress_unifurcations,
         )
@@ -3031,6 +3444,7 @@ class Tree(
         of the Taxon objects given by ``taxa`` (which can be any iterable, including a
         TaxonNamespace object) from the ``self``.
         """
+        taxa = set(taxa)
         to_prune = [t for t in self.taxon_namespace if t not in taxa]
         self.prune_taxa(
             to_prune,
@@ -3087,6 +3501,7 @@ class Tree(
         """
         if rng is None:
             rng = GLOBAL_RNG  # use the global rng by default
+        self._bipartition_encoding_state = None
         if include_internal_nodes:
             nd_iterator = self.preorder_node_iter
         else:
@@ -3176,6 +3591,7 @@ class Tree(
         for nd in new_terminals:
             for ch in nd.child_nodes():
                 nd.remove_child(ch)
+        self._bipartition_encoding_state = None
 
     def scale_edges(self, edge_len_multiplier):
         """Multiplies every edge length in ``self`` by ``edge_len_multiplier``"""
@@ -3237,6 +3653,42 @@ class Tree(
 
         return NodeDistanceMatrix.from_tree(tree=self)
 
+    def lca_index(self):
+        """
+        Returns a |TreeDistanceOracle| instance based on the tree (in its
+        current state), which answers most-recent common ancestor, patristic
+        distance and path edge count queries between any two nodes or taxa
+        in constant time.
+
+        Unlike :meth:`Tree.phylogenetic_distance_matrix()`, the distances
+        between all pairs of taxa are not calculated, and so this scales to
+        trees of many more taxa when only some of the distances are needed.
+
+        Returns
+        -------
+        lca_index : a |TreeDistanceOracle| instance
+            A |TreeDistanceOracle| instance corresponding to the tree in its
+            current state.
+        """
+        from dendropy.calculate.phylogeneticdistance import TreeDistanceOracle
+
+        return TreeDistanceOracle.from_tree(tree=self)
+
+    def to_flat(self):
+        """
+        Returns a |FlatTree| instance based on the tree (in its current
+        state): an immutable, array-backed representation of its structure,
+        edge lengths and taxa, which uses a small fraction of the memory of
+        the tree and can be pickled cheaply.
+
+        Returns
+        -------
+        flat_tree : a |FlatTree| instance
+            A |FlatTree| instance corresponding to the tree in its current
+            state. ``flat_tree.to_tree()`` returns a copy of the tree.
+        """
+        return _flat_tree.FlatTree.from_tree(self)
+
     def resolve_node_depths(
         self,
         node_callback_fn=None,
@@ -3568,16 +4020,18 @@ class Tree(
                     num_lineages += 1
         return num_lineages
 
+    # ``edge`` may also be the head node of the edge, as nodes give access to
+    # the bipartitions of their edges
     def _compile_mutable_bipartition_for_edge(self, edge):
         edge.bipartition.compile_split_bitmask(
-            tree_leafset_bitmask=self.seed_node.edge.bipartition._leafset_bitmask,
+            tree_leafset_bitmask=self.seed_node.bipartition._leafset_bitmask,
             is_mutable=True,
         )
         return edge.bipartition
 
     def _compile_immutable_bipartition_for_edge(self, edge):
         edge.bipartition.compile_split_bitmask(
-            tree_leafset_bitmask=self.seed_node.edge.bipartition._leafset_bitmask,
+            tree_leafset_bitmask=self.seed_node.bipartition._leafset_bitmask,
             is_mutable=False,
         )
         return edge.bipartition
@@ -3621,6 +4075,7 @@ class Tree(
         """
         self._split_bitmask_edge_map = None
         self._bipartition_edge_map = None
+        self._bipartition_encoding_state = None
         taxon_namespace = self._taxon_namespace
         seed_node = self.seed_node
         if not seed_node:
@@ -3642,19 +4097,21 @@ class Tree(
             # exist in the graph -- it is not a true link connecting
             # two nodes).
             self.collapse_basal_bifurcation()
-        tree_edges = []
-        for edge in self.postorder_edge_iter():
+        # the bipartitions are set through the head nodes of the edges, so
+        # that the edges of a |CompactTree| are not created
+        head_nodes = []
+        has_empty_leafsets = False
+        for head_node in self.postorder_node_iter():
             leafset_bitmask = 0
-            head_node = edge._head_node
             child_nodes = head_node._child_nodes
             num_children = len(child_nodes)
             if num_children == 1 and suppress_unifurcations:
                 # collapsing node: remove, and do not process/add edge
-                if head_node.edge.length is not None:
-                    if child_nodes[0].edge.length is None:
-                        child_nodes[0].edge.length = head_node.edge.length
+                if head_node.edge_length is not None:
+                    if child_nodes[0].edge_length is None:
+                        child_nodes[0].edge_length = head_node.edge_length
                     else:
-                        child_nodes[0].edge.length += head_node.edge.length
+                        child_nodes[0].edge_length += head_node.edge_length
                 if head_node._parent_node is not None:
                     parent = head_node._parent_node
                     pos = parent._child_nodes.index(head_node)
@@ -3666,42 +4123,493 @@ class Tree(
                     self.seed_node = child_nodes[0]
             else:
                 if num_children == 0:
-                    tree_edges.append(edge)
-                    taxon = edge._head_node.taxon
+                    head_nodes.append(head_node)
+                    taxon = head_node.taxon
                     if taxon:
                         leafset_bitmask = taxon_namespace.taxon_bitmask(taxon)
+                    else:
+                        has_empty_leafsets = True
                 else:
-                    tree_edges.append(edge)
+                    head_nodes.append(head_node)
                     for child in child_nodes:
-                        leafset_bitmask |= child.edge.bipartition._leafset_bitmask
-                edge.bipartition = _bipartition.Bipartition(
+                        leafset_bitmask |= child.bipartition._leafset_bitmask
+                bipartition = _bipartition.Bipartition(
                     compile_bipartition=False, is_mutable=True
                 )
-                edge.bipartition._leafset_bitmask = leafset_bitmask
-                edge.bipartition._is_rooted = self._is_rooted
+                bipartition._leafset_bitmask = leafset_bitmask
+                bipartition._is_rooted = self._is_rooted
+                head_node.bipartition = bipartition
         # Create normalized bitmasks, where the full (self) bipartition mask is *not*
         # all the taxa, but only those found on the self; this is to handle
         # cases where we are dealing with selfs with incomplete leaf-sets.
-        tree_leafset_bitmask = self.seed_node.edge.bipartition._leafset_bitmask
+        tree_leafset_bitmask = self.seed_node.bipartition._leafset_bitmask
         if is_bipartitions_mutable:
             _compile_bipartition = self._compile_mutable_bipartition_for_edge
         else:
             _compile_bipartition = self._compile_immutable_bipartition_for_edge
         if suppress_storage:
             self.bipartition_encoding = None
-            for x in map(_compile_bipartition, tree_edges):
+            for x in map(_compile_bipartition, head_nodes):
                 pass
         else:
             # self.bipartition_encoding = dict(zip(map(self._compile_bipartition_for_edge, tree_edges), tree_edges))
-            self.bipartition_encoding = list(map(_compile_bipartition, tree_edges))
+            self.bipartition_encoding = list(map(_compile_bipartition, head_nodes))
+            self._bipartition_encoding_state = (
+                self.bipartition_encoding,
+                taxon_namespace,
+                self._is_rooted,
+                suppress_unifurcations,
+                is_bipartitions_mutable,
+                has_empty_leafsets,
+                _node.Node._structure_generation,
+            )
         return self.bipartition_encoding
 
     def update_bipartitions(self, *args, **kwargs):
         """
         Recalculates bipartition hashes for tree.
+
+        Note that the tree editing methods that take an ``update_bipartitions``
+        argument (e.g., :meth:`Tree.reroot_at_edge()`, :meth:`Tree.prune_taxa()`,
+        :meth:`Tree.collapse_unweighted_edges()` or
+        :meth:`Tree.resolve_polytomies()`) do not call this if the tree has
+        already been encoded, but update the existing bipartitions in place,
+        recalculating them only on the paths from the edited nodes to the
+        root. If the tree has been restructured by other means (e.g., by
+        adding or removing child nodes directly) since its bipartitions were
+        last calculated, they are recalculated in full instead.
         """
         self.encode_bipartitions(*args, **kwargs)
 
+    def _debug_check_bipartition_encoding(self):
+        """
+        Checks that the bipartitions of the nodes of this tree, the list in
+        ``bipartition_encoding`` and, if they have been built, the
+        ``bipartition_edge_map`` and ``split_bitmask_edge_map`` lookups,
+        match the current structure of the tree.
+
+        If the environmental variable ``DENDROPY_CHECK_BIPARTITION_ENCODING``
+        is set, this check is run after every in-place update of the
+        bipartitions by a tree editing method (see
+        :meth:`Tree.update_bipartitions()`).
+
+        Raises
+        ------
+        ValueError
+            If any of the bipartitions or lookups do not match the tree.
+        """
+        taxon_namespace = self._taxon_namespace
+        is_rooted = self._is_rooted
+        nodes = list(self.postorder_node_iter())
+        leafsets = {}
+        for nd in nodes:
+            if nd._child_nodes:
+                leafset_bitmask = 0
+                for child in nd._child_nodes:
+                    leafset_bitmask |= leafsets[id(child)]
+            elif nd.taxon:
+                leafset_bitmask = taxon_namespace.taxon_bitmask(nd.taxon)
+            else:
+                leafset_bitmask = 0
+            leafsets[id(nd)] = leafset_bitmask
+        tree_leafset_bitmask = leafsets[id(self.seed_node)]
+        for nd in nodes:
+            bipartition = nd.bipartition
+            leafset_bitmask = leafsets[id(nd)]
+            if bipartition._leafset_bitmask != leafset_bitmask:
+                raise ValueError(
+                    "Node {}: expecting leafset bitmask {}, but found {}".format(
+                        nd, leafset_bitmask, bipartition._leafset_bitmask
+                    )
+                )
+            if bipartition._is_rooted != is_rooted:
+                raise ValueError(
+                    "Node {}: expecting rooting state {}, but found {}".format(
+                        nd, is_rooted, bipartition._is_rooted
+                    )
+                )
+            if not tree_leafset_bitmask:
+                continue
+            if is_rooted:
+                split_bitmask = leafset_bitmask
+            else:
+                split_bitmask = _bipartition.Bipartition.normalize_bitmask(
+                    bitmask=leafset_bitmask,
+                    fill_bitmask=tree_leafset_bitmask,
+                    lowest_relevant_bit=bitprocessing.least_significant_set_bit(
+                        tree_leafset_bitmask
+                    ),
+                )
+            if (
+                bipartition._tree_leafset_bitmask != tree_leafset_bitmask
+                or bipartition._split_bitmask != split_bitmask
+            ):
+                raise ValueError(
+                    "Node {}: expecting split bitmask {} in tree leafset {}, but found"
+                    " {} in {}".format(
+                        nd,
+                        split_bitmask,
+                        tree_leafset_bitmask,
+                        bipartition._split_bitmask,
+                        bipartition._tree_leafset_bitmask,
+                    )
+                )
+        if self.bipartition_encoding is not None:
+            if len(self.bipartition_encoding) != len(nodes) or set(
+                id(b) for b in self.bipartition_encoding
+            ) != set(id(nd.bipartition) for nd in nodes):
+                raise ValueError(
+                    "Bipartition encoding does not match the bipartitions of the tree"
+                )
+        if self._bipartition_edge_map:
+            edges = dict((id(nd.edge), nd.edge) for nd in nodes)
+            for lookup, key_fn in (
+                (self._bipartition_edge_map, lambda edge: edge.bipartition),
+                (self._split_bitmask_edge_map, lambda edge: edge.bipartition._split_bitmask),
+            ):
+                keys = set(key_fn(edge) for edge in edges.values())
+                if len(lookup) != len(keys):
+                    raise ValueError(
+                        "Expecting {} entries in bipartition lookup, but found {}".format(
+                            len(keys), len(lookup)
+                        )
+                    )
+                for key in keys:
+                    edge = lookup.get(key, None)
+                    if (
+                        edge is None
+                        or id(edge) not in edges
+                        or key_fn(edge) != key
+                    ):
+                        raise ValueError(
+                            "Bipartition lookup for {} does not match the tree".format(
+                                key
+                            )
+                        )
+
+    def _get_incremental_bipartition_encoding_state(
+        self, update_bipartitions=True, suppress_unifurcations=True
+    ):
+        """
+        Returns the record of the current bipartition encoding if
+        ``update_bipartitions`` is |True| and the encoding can be updated in
+        place after the tree is edited (as opposed to being recalculated from
+        scratch), or |None| otherwise. This needs to be called *before* the
+        tree is edited.
+
+        Any change to the child nodes of any node since the encoding was
+        recorded (through the methods of |Node| rather than of the tree, or to
+        another tree altogether) results in |None|, as the encoding may no
+        longer match the tree.
+        """
+        if not update_bipartitions:
+            return None
+        encoding_state = self._bipartition_encoding_state
+        if (
+            encoding_state is None
+            or not self.bipartition_encoding
+            or encoding_state[0] is not self.bipartition_encoding
+            or encoding_state[1] is not self._taxon_namespace
+            or encoding_state[2] != self._is_rooted
+            or (suppress_unifurcations and not encoding_state[3])
+            or encoding_state[6] != _node.Node._structure_generation
+        ):
+            return None
+        return encoding_state
+
+    def _update_bipartitions_incrementally(
+        self,
+        encoding_state,
+        changed_nodes=(),
+        removed_nodes=(),
+        suppress_unifurcations=True,
+        collapse_unrooted_basal_bifurcation=True,
+    ):
+        """
+        Updates the bipartition encoding described by ``encoding_state`` (as
+        returned by ``_get_incremental_bipartition_encoding_state()`` before
+        the tree was edited) after an edit of the tree.
+
+        ``changed_nodes`` are the nodes (new, or still in the tree) whose
+        children were changed by the edit, and ``removed_nodes`` are the
+        nodes (and the subtrees descending from them) that were taken out of
+        the tree. Unifurcations resulting from the edit are suppressed, and a
+        resulting unrooted basal bifurcation collapsed, as with
+        :meth:`Tree.encode_bipartitions()`. The leafsets and splits are then
+        only recalculated for the changed nodes and their ancestors (and, on
+        unrooted trees that lose taxa, for the path to the new first taxon),
+        new |Bipartition| objects only being created for the nodes whose
+        splits have changed. The cached bipartition lookups, if built, are
+        patched rather than discarded.
+        """
+        (
+            old_encoding,
+            _,
+            old_is_rooted,
+            _,
+            is_bipartitions_mutable,
+            has_empty_leafsets,
+            _,
+        ) = encoding_state
+        old_tree_leafset_bitmask = old_encoding[-1]._tree_leafset_bitmask
+        changed_nodes = list(changed_nodes)
+        removed_nodes = list(removed_nodes)
+        is_in_tree_map = {}
+
+        def _is_in_tree(nd):
+            path = []
+            result = None
+            while nd is not None:
+                result = is_in_tree_map.get(id(nd), None)
+                if result is not None:
+                    break
+                path.append(nd)
+                nd = nd._parent_node
+            if result is None:
+                result = path[-1] is self.seed_node
+            for path_nd in path:
+                is_in_tree_map[id(path_nd)] = result
+            return result
+
+        if suppress_unifurcations:
+            idx = 0
+            while idx < len(changed_nodes):
+                nd = changed_nodes[idx]
+                idx += 1
+                if len(nd._child_nodes) != 1 or not _is_in_tree(nd):
+                    continue
+                child = nd._child_nodes[0]
+                if nd.edge_length is not None:
+                    if child.edge_length is None:
+                        child.edge_length = nd.edge_length
+                    else:
+                        child.edge_length += nd.edge_length
+                if nd._parent_node is not None:
+                    parent = nd._parent_node
+                    pos = parent._child_nodes.index(nd)
+                    parent.remove_child(nd)
+                    parent.insert_child(index=pos, node=child)
+                    nd._parent_node = None
+                    changed_nodes.append(parent)
+                else:
+                    child._parent_node = None
+                    self.seed_node = child
+                removed_nodes.append(nd)
+                is_in_tree_map[id(nd)] = False
+        seed_node = self.seed_node
+        if (
+            collapse_unrooted_basal_bifurcation
+            and not self._is_rooted
+            and len(seed_node._child_nodes) == 2
+        ):
+            basal_nodes = list(seed_node._child_nodes)
+            self.collapse_basal_bifurcation()
+            for nd in basal_nodes:
+                if nd._parent_node is None:
+                    removed_nodes.append(nd)
+                    is_in_tree_map[id(nd)] = False
+                    changed_nodes.append(seed_node)
+
+        # the changed nodes and their ancestors, i.e., the nodes with leafsets
+        # to recalculate
+        affected_nodes = {}
+        for nd in changed_nodes:
+            path = []
+            while nd is not None and id(nd) not in affected_nodes:
+                path.append(nd)
+                nd = nd._parent_node
+            if nd is None and path and path[-1] is not seed_node:
+                # detached from the tree
+                continue
+            for path_nd in path:
+                affected_nodes[id(path_nd)] = path_nd
+        leafsets = {}
+        updated_nodes = []
+        if affected_nodes:
+            stack = [seed_node]
+            while stack:
+                nd = stack.pop()
+                updated_nodes.append(nd)
+                for child in nd._child_nodes:
+                    if id(child) in affected_nodes:
+                        stack.append(child)
+            updated_nodes.reverse()
+            taxon_namespace = self._taxon_namespace
+            for nd in updated_nodes:
+                if nd._child_nodes:
+                    leafset_bitmask = 0
+                    for child in nd._child_nodes:
+                        child_leafset_bitmask = leafsets.get(id(child), None)
+                        if child_leafset_bitmask is None:
+                            child_leafset_bitmask = child.bipartition._leafset_bitmask
+                        leafset_bitmask |= child_leafset_bitmask
+                elif nd.taxon:
+                    leafset_bitmask = taxon_namespace.taxon_bitmask(nd.taxon)
+                else:
+                    leafset_bitmask = 0
+                    has_empty_leafsets = True
+                leafsets[id(nd)] = leafset_bitmask
+            tree_leafset_bitmask = leafsets[id(seed_node)]
+        else:
+            tree_leafset_bitmask = seed_node.bipartition._leafset_bitmask
+        is_rooted = self._is_rooted
+        is_tree_leafset_changed = tree_leafset_bitmask != old_tree_leafset_bitmask
+        if is_tree_leafset_changed and not is_rooted and tree_leafset_bitmask:
+            # unrooted splits are normalized with respect to the first taxon
+            # in the tree: those of the nodes on the path to it change with
+            # the tree leafset
+            lowest_relevant_bit = bitprocessing.least_significant_set_bit(
+                tree_leafset_bitmask
+            )
+            nd = seed_node
+            resplit_nodes = []
+            while nd is not None:
+                if id(nd) not in leafsets:
+                    leafsets[id(nd)] = nd.bipartition._leafset_bitmask
+                    resplit_nodes.append(nd)
+                next_nd = None
+                for child in nd._child_nodes:
+                    child_leafset_bitmask = leafsets.get(id(child), None)
+                    if child_leafset_bitmask is None:
+                        child_leafset_bitmask = child.bipartition._leafset_bitmask
+                    if child_leafset_bitmask & lowest_relevant_bit:
+                        next_nd = child
+                        break
+                nd = next_nd
+            resplit_nodes.reverse()
+            updated_nodes = resplit_nodes + updated_nodes
+        replaced_bipartitions = []
+        for nd in updated_nodes:
+            leafset_bitmask = leafsets[id(nd)]
+            old_bipartition = nd.bipartition
+            if (
+                old_bipartition._split_bitmask is not None
+                and old_bipartition._leafset_bitmask == leafset_bitmask
+                and old_bipartition._tree_leafset_bitmask == tree_leafset_bitmask
+            ):
+                continue
+            bipartition = _bipartition.Bipartition(
+                compile_bipartition=False, is_mutable=True
+            )
+            bipartition._leafset_bitmask = leafset_bitmask
+            bipartition._is_rooted = is_rooted
+            bipartition.compile_split_bitmask(
+                tree_leafset_bitmask=tree_leafset_bitmask,
+                is_mutable=is_bipartitions_mutable,
+            )
+            nd.bipartition = bipartition
+            replaced_bipartitions.append((old_bipartition, nd))
+
+        # the encoding is rebuilt in postorder without recalculating anything,
+        # the bipartitions that are not replaced being updated in place if the
+        # tree leafset or rooting state has changed (this does not affect
+        # their hashes)
+        is_patch_bipartitions = is_tree_leafset_changed or old_is_rooted != is_rooted
+        if is_patch_bipartitions and tree_leafset_bitmask:
+            lowest_relevant_bit = bitprocessing.least_significant_set_bit(
+                tree_leafset_bitmask
+            )
+        else:
+            lowest_relevant_bit = None
+        bipartition_encoding = []
+        stack = [seed_node]
+        while stack:
+            nd = stack.pop()
+            bipartition = nd.bipartition
+            if is_patch_bipartitions:
+                bipartition._tree_leafset_bitmask = tree_leafset_bitmask
+                bipartition._lowest_relevant_bit = lowest_relevant_bit
+                bipartition._is_rooted = is_rooted
+            bipartition_encoding.append(bipartition)
+            stack.extend(nd._child_nodes)
+        bipartition_encoding.reverse()
+        self.bipartition_encoding = bipartition_encoding
+        self._bipartition_encoding_state = (
+            bipartition_encoding,
+            self._taxon_namespace,
+            is_rooted,
+            suppress_unifurcations,
+            is_bipartitions_mutable,
+            has_empty_leafsets,
+            _node.Node._structure_generation,
+        )
+        if self._bipartition_edge_map:
+            self._update_bipartition_edge_maps(
+                replaced_bipartitions=replaced_bipartitions,
+                removed_nodes=[nd for nd in removed_nodes if not _is_in_tree(nd)],
+                updated_nodes=updated_nodes,
+                is_unifurcations_suppressed=suppress_unifurcations,
+                is_bipartitions_mutable=is_bipartitions_mutable,
+                has_empty_leafsets=has_empty_leafsets,
+            )
+        if _CHECK_BIPARTITION_ENCODING:
+            self._debug_check_bipartition_encoding()
+        return self.bipartition_encoding
+
+    def _update_bipartition_edge_maps(
+        self,
+        replaced_bipartitions,
+        removed_nodes,
+        updated_nodes,
+        is_unifurcations_suppressed,
+        is_bipartitions_mutable,
+        has_empty_leafsets,
+    ):
+        """
+        Patches ``bipartition_edge_map`` and ``split_bitmask_edge_map`` after
+        an incremental update of the bipartitions, or discards them (to be
+        rebuilt on demand) if they may have to map more than one edge to the
+        same split.
+        """
+        bipartition_edge_map = self._bipartition_edge_map
+        split_bitmask_edge_map = self._split_bitmask_edge_map
+        seed_node = self.seed_node
+        # if the tree has unifurcations, an unrooted basal bifurcation, or
+        # leaves without taxa, then more than one edge may have the same
+        # split, in which case they cannot be tracked here
+        if (
+            is_bipartitions_mutable
+            or has_empty_leafsets
+            or not is_unifurcations_suppressed
+            or (not self._is_rooted and len(seed_node._child_nodes) == 2)
+        ):
+            self._bipartition_edge_map = None
+            self._split_bitmask_edge_map = None
+            return
+        # the bipartitions to be unmapped: those replaced, and those of the
+        # nodes taken out of the tree (skipping bipartitions of new nodes,
+        # which were never encoded)
+        stale_bipartitions = []
+        for bipartition, nd in replaced_bipartitions:
+            if bipartition._split_bitmask is not None and not bipartition.is_mutable:
+                stale_bipartitions.append((bipartition, nd))
+        for nd in removed_nodes:
+            stack = [nd]
+            while stack:
+                removed_nd = stack.pop()
+                bipartition = removed_nd.bipartition
+                if bipartition._split_bitmask is not None and not bipartition.is_mutable:
+                    stale_bipartitions.append((bipartition, removed_nd))
+                for child in removed_nd._child_nodes:
+                    if child._parent_node is removed_nd:
+                        stack.append(child)
+        # the updated nodes, preceded by their children (which may have taken
+        # the place of a removed unifurcation with the same split)
+        nodes_to_map = []
+        for nd in updated_nodes:
+            nodes_to_map.extend(nd._child_nodes)
+            nodes_to_map.append(nd)
+        for bipartition, nd in stale_bipartitions:
+            edge = nd.edge
+            if bipartition_edge_map.get(bipartition, None) is edge:
+                del bipartition_edge_map[bipartition]
+            if split_bitmask_edge_map.get(bipartition._split_bitmask, None) is edge:
+                del split_bitmask_edge_map[bipartition._split_bitmask]
+        for nd in nodes_to_map:
+            edge = nd.edge
+            bipartition_edge_map[nd.bipartition] = edge
+            split_bitmask_edge_map[nd.bipartition._split_bitmask] = edge
+
     def encode_splits(self, *args, **kwargs):
         """
         Recalculates bipartition hashes for tree.
@@ -4385,3 +5293,36 @@ class Tree(
         Top-level display function. Delegation to other plotters possible in the future.
         """
         return self.display_tikz_plot(**kwargs)
+
+
+class CompactTree(Tree):
+    """
+    A |Tree| of |CompactNode| objects, which take about half the memory of
+    the |Node| and |Edge| objects of a |Tree|, for large trees or large
+    numbers of trees: e.g., ``CompactTree.get(path=..., schema=...)`` or
+    ``TreeList.get(path=..., schema=..., tree_type=CompactTree)``.
+
+    The edges of the nodes are only created when first accessed (e.g., by
+    the edge iterators), and, unlike the attributes of a |Node|, those of a
+    |CompactNode| are stored in slots: see |CompactNode| for details. The
+    tree otherwise behaves as a |Tree|.
+    """
+
+    @classmethod
+    def node_factory(cls, **kwargs):
+        r"""
+        Creates and returns a |CompactNode| object.
+
+        Parameters
+        ----------
+
+        \*\*kwargs : keyword arguments
+            Passed directly to constructor of |CompactNode|.
+
+        Returns
+        -------
+        |CompactNode|
+            A new |CompactNode| object.
+
+        """
+        return _node.CompactNode(**kwargs)
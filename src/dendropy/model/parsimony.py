@@ -21,7 +21,9 @@
 Models, modeling and model-fitting of parsimony.
 """
 
+from dendropy.datamodel.charmatrixmodel import SitePatterns
 from dendropy.utility.error import TaxonNamespaceIdentityError
+from dendropy.utility import bitprocessing
 from dendropy.utility import deprecate
 
 class _NodeStateSetMap(dict):
@@ -46,6 +48,353 @@ def _retrieve_state_sets_from_attr(n, state_sets_attr_name, taxon_state_sets_map
         setattr(n, state_sets_attr_name, v)
         return v
 
+class _StateSetCodes(dict):
+    # assigns consecutive codes to state sets as they are looked up
+    def __missing__(self, key):
+        v = len(self)
+        self[key] = v
+        return v
+
+def _set_bit_index_iter(bitmask):
+    # as ``bitprocessing.set_bit_index_iter()``, but for bitmasks of
+    # thousands of bits, only a few of which may be set
+    bits = format(bitmask, "b")[::-1]
+    idx = bits.find("1")
+    while idx >= 0:
+        yield idx
+        idx = bits.find("1", idx + 1)
+
+def _add_to_bit_counters(counters, bitmask):
+    # ``counters`` holds a counter for each bit position, bit-sliced, i.e.
+    # ``counters[k]`` holds the ``k``-th bits of all the counts, so that
+    # incrementing the counts of all the bits set in ``bitmask`` takes a
+    # few bitwise operations on average
+    idx = 0
+    while bitmask:
+        if idx == len(counters):
+            counters.append(bitmask)
+            return
+        c = counters[idx]
+        counters[idx] = c ^ bitmask
+        bitmask &= c
+        idx += 1
+
+def _bit_counter_values(counters, num_bits):
+    values = [0] * num_bits
+    for k, counter in enumerate(counters):
+        for idx in _set_bit_index_iter(counter):
+            values[idx] += 1 << k
+    return values
+
+class PackedStateSets(object):
+    """
+    The state sets of the characters of a set of taxa, packed into bitmasks
+    for bit-parallel scoring under Fitch's (1971) unordered parsimony
+    algorithm.
+
+    The state sets of the ``n`` characters of each taxon are represented by
+    an ``n``-bit integer for each state, in which bit ``j`` is set if the
+    state is in the state set of character ``j``. Single bitwise operations on
+    these integers thus operate on the state sets of all the characters at
+    once, and the scores of all the characters are accumulated by counting set
+    bits. Scoring a tree with the same |PackedStateSets| object repeatedly
+    avoids repacking the data each time.
+
+    Examples
+    --------
+
+    ::
+
+        packed_state_sets = PackedStateSets.from_char_matrix(
+                chars,
+                gaps_as_missing=True)
+        for tree in trees:
+            print(packed_state_sets.fitch_down_pass(tree.postorder_node_iter()))
+
+    """
+
+    @classmethod
+    def from_char_matrix(cls, char_matrix, gaps_as_missing=None):
+        """
+        Returns the packed state sets of the characters of ``char_matrix``,
+        as given by :meth:`DiscreteCharacterMatrix.taxon_state_sets_map()`,
+        but without creating the state sets.
+
+        Parameters
+        ----------
+        char_matrix : |DiscreteCharacterMatrix| or |SitePatterns|
+            The character data. If the unique site patterns of the characters
+            are given, then each pattern is packed once, and scores are
+            weighted by the number of characters with each pattern.
+        gaps_as_missing : bool
+            If |True|, then gaps will be treated as missing data. If |False|,
+            then gaps will be treated as a new/additional state. If |None|
+            [default], then as given when compressing site patterns, and
+            |True| otherwise.
+        """
+        if isinstance(char_matrix, SitePatterns):
+            site_patterns = char_matrix
+            if gaps_as_missing is None:
+                gaps_as_missing = site_patterns.gaps_as_missing
+            rows = ((taxon, site_patterns[taxon]) for taxon in site_patterns)
+        else:
+            site_patterns = None
+            if gaps_as_missing is None:
+                gaps_as_missing = True
+            rows = ((taxon, char_matrix[taxon].values()) for taxon in char_matrix)
+        if gaps_as_missing:
+            get_states = lambda state: state.fundamental_indexes_with_gaps_as_missing
+        else:
+            get_states = lambda state: state.fundamental_indexes
+        packed_state_sets = cls(site_patterns=site_patterns)
+        # states are identified by ``id()``, as it is much faster than their
+        # hash
+        packed_state_sets._pack(rows, id, get_states)
+        return packed_state_sets
+
+    def __init__(self, taxon_state_sets_map=None, site_patterns=None):
+        """
+        Parameters
+        ----------
+        taxon_state_sets_map : dict[taxon] = state sets
+            A dictionary that takes a taxon object as a key and returns a
+            state set list as a value, as given by
+            :meth:`DiscreteCharacterMatrix.taxon_state_sets_map()`. All the
+            lists must be of the same length.
+        site_patterns : |SitePatterns|
+            If given, the state set lists are those of the patterns of
+            ``site_patterns``, as given by
+            :meth:`SitePatterns.taxon_state_sets_map()`, and scores are
+            weighted by the number of characters with each pattern.
+        """
+        self.states = []
+        self.num_characters = 0
+        self.taxon_state_bitmasks = {}
+        self.site_patterns = site_patterns
+        if taxon_state_sets_map:
+            self._pack(
+                    taxon_state_sets_map.items(),
+                    frozenset,
+                    lambda state_set: state_set)
+
+    def _pack(self, rows, get_value_key, get_states):
+        # ``rows`` are (key, sequence of state set values) pairs, values are
+        # identified by ``get_value_key``, and ``get_states`` gives the states
+        # of a value
+        codes = _StateSetCodes()
+        code_values = []
+        code_rows = []
+        num_characters = None
+        for key, values in rows:
+            code_row = list(map(codes.__getitem__, map(get_value_key, values)))
+            for code in range(len(code_values), len(codes)):
+                code_values.append(values[code_row.index(code)])
+            if num_characters is None:
+                num_characters = len(code_row)
+            elif len(code_row) != num_characters:
+                raise ValueError("State set lists have different numbers of characters: {} and {}".format(
+                    num_characters, len(code_row)))
+            code_rows.append((key, code_row))
+        code_states = [frozenset(get_states(value)) for value in code_values]
+        states = set()
+        for state_set in code_states:
+            states.update(state_set)
+        try:
+            states = sorted(states)
+        except TypeError:
+            states = list(states)
+        self.states = states
+        self.num_characters = num_characters or 0
+        self.taxon_state_bitmasks = {}
+        if len(codes) <= 256:
+            # rows of codes as bytes are translated into a string of bits for
+            # each state, most-significant (i.e., last character) first
+            tables = [bytes(
+                        ord("1") if code < len(code_states) and state in code_states[code] else ord("0")
+                        for code in range(256))
+                    for state in states]
+            for key, code_row in code_rows:
+                code_row = bytes(reversed(code_row))
+                if code_row:
+                    bitmasks = tuple(int(code_row.translate(table), 2) for table in tables)
+                else:
+                    bitmasks = (0,) * len(states)
+                self.taxon_state_bitmasks[key] = bitmasks
+        else:
+            symbols = [["1" if state in state_set else "0" for state_set in code_states] for state in states]
+            for key, code_row in code_rows:
+                code_row.reverse()
+                self.taxon_state_bitmasks[key] = tuple(
+                        int("".join([state_symbols[code] for code in code_row]) or "0", 2)
+                        for state_symbols in symbols)
+
+    def state_sets(self, state_bitmasks):
+        """
+        Returns a list of the state sets of each character represented by
+        ``state_bitmasks``, i.e., the bitmasks of a taxon in
+        ``taxon_state_bitmasks``, or of a node as given by
+        :meth:`PackedStateSets.fitch_down_pass()`.
+        """
+        state_sets = [set() for idx in range(self.num_characters)]
+        for state, bitmask in zip(self.states, state_bitmasks):
+            for idx in _set_bit_index_iter(bitmask):
+                state_sets[idx].add(state)
+        return state_sets
+
+    def fitch_down_pass(self,
+            postorder_node_iter,
+            weights=None,
+            score_by_character_list=None,
+            node_state_bitmasks=None):
+        """
+        Returns the parsimony score given a list of nodes in postorder,
+        as :func:`fitch_down_pass()`.
+
+        Parameters
+        ----------
+        postorder_node_iter : iterable of/over |Node| objects
+            An iterable of |Node| objects in in order of post-order
+            traversal of the tree.
+        weights : iterable
+            A list of weights for each pattern (or, if packed from site
+            patterns, for each character). The weights of the characters are
+            summed in the same order as by scoring the unpacked state sets,
+            except if packed from site patterns, in which case the weights of
+            the characters of each pattern are summed first, and so a sum of
+            non-integer weights may differ in the last bits.
+        score_by_character_list : None or list
+            If not |None|, should be a reference to a list object.
+            This list will be populated by the scores on a character-by-character
+            basis.
+        node_state_bitmasks : None or dict
+            If not |None|, a dictionary that will be populated with the
+            state bitmasks of each node, as in ``taxon_state_bitmasks``. The
+            bitmasks of any leaves already in the dictionary are used instead
+            of those of their taxa.
+
+        Returns
+        -------
+        s : int
+            Parismony score of tree.
+        """
+        if score_by_character_list is not None:
+            assert len(score_by_character_list) == 0
+        taxon_state_bitmasks = self.taxon_state_bitmasks
+        all_characters = (1 << self.num_characters) - 1
+        site_patterns = self.site_patterns
+        # weights of characters are added up as the costs are found, in
+        # character order, so that non-integer weights give the same sums
+        # as when scoring character by character
+        is_weighted = weights is not None and site_patterns is None
+        is_count_by_character = not is_weighted and (
+                score_by_character_list is not None
+                or site_patterns is not None)
+        if is_weighted and score_by_character_list is not None:
+            score_by_character_list.extend([0] * self.num_characters)
+        is_keep_state_bitmasks = node_state_bitmasks is not None
+        if not is_keep_state_bitmasks:
+            node_state_bitmasks = {}
+        score = 0
+        cost_counters = []
+        for nd in postorder_node_iter:
+            c = nd.child_nodes()
+            if not c:
+                if nd not in node_state_bitmasks:
+                    node_state_bitmasks[nd] = taxon_state_bitmasks[nd.taxon]
+                continue
+            if is_keep_state_bitmasks:
+                get_state_bitmasks = node_state_bitmasks.__getitem__
+            else:
+                get_state_bitmasks = node_state_bitmasks.pop
+            result = get_state_bitmasks(c[0])
+            for ch in c[1:]:
+                ch_bitmasks = get_state_bitmasks(ch)
+                inter = [a & b for a, b in zip(result, ch_bitmasks)]
+                shared = 0
+                for x in inter:
+                    shared |= x
+                # characters with disjoint state sets take the union
+                cost = all_characters ^ shared
+                if cost:
+                    result = [x | (cost & (a | b)) for x, a, b in zip(inter, result, ch_bitmasks)]
+                    if is_weighted:
+                        for n in _set_bit_index_iter(cost):
+                            score += weights[n]
+                            if score_by_character_list is not None:
+                                score_by_character_list[n] += weights[n]
+                    elif is_count_by_character:
+                        _add_to_bit_counters(cost_counters, cost)
+                    else:
+                        score += bitprocessing.num_set_bits(cost)
+                else:
+                    result = inter
+            node_state_bitmasks[nd] = result
+        if is_count_by_character:
+            counts = _bit_counter_values(cost_counters, self.num_characters)
+            if site_patterns is None:
+                score = sum(counts)
+            else:
+                count_weights = site_patterns.pattern_weights(weights)
+                score = sum(count_weights[n] * count for n, count in enumerate(counts) if count)
+            if score_by_character_list is not None:
+                if site_patterns is not None:
+                    counts = site_patterns.expand(counts)
+                if weights is None:
+                    score_by_character_list.extend(counts)
+                else:
+                    score_by_character_list.extend([weights[n] * count if count else 0 for n, count in enumerate(counts)])
+        return score
+
+    def fitch_up_pass(self, preorder_node_iter, node_state_bitmasks):
+        """
+        Finalizes the state bitmasks of each node given by
+        :meth:`PackedStateSets.fitch_down_pass()` in ``node_state_bitmasks``,
+        as :func:`fitch_up_pass()`.
+
+        Parameters
+        ----------
+        preorder_node_iter : iterable of/over |Node| objects
+            An iterable of |Node| objects in in order of pre-order
+            traversal of the tree.
+        node_state_bitmasks : dict
+            The dictionary of state bitmasks of each node populated by
+            :meth:`PackedStateSets.fitch_down_pass()`.
+
+        Notes
+        -----
+        Currently this requires a bifurcating tree (even at the root).
+        """
+        all_characters = (1 << self.num_characters) - 1
+        for nd in preorder_node_iter:
+            c = nd.child_nodes()
+            p = nd.parent_node
+            if (not c) or (not p):
+                continue
+            if len(c) != 2:
+                raise ValueError("Tree is not bifurcating at node {}".format(nd))
+            left_bitmasks = node_state_bitmasks[c[0]]
+            right_bitmasks = node_state_bitmasks[c[1]]
+            par_bitmasks = node_state_bitmasks[p]
+            curr_bitmasks = node_state_bitmasks[nd]
+            not_in_curr = 0
+            rl_shared = 0
+            for par, curr, left, right in zip(par_bitmasks, curr_bitmasks, left_bitmasks, right_bitmasks):
+                not_in_curr |= par & ~curr
+                rl_shared |= left & right
+            if not not_in_curr:
+                node_state_bitmasks[nd] = par_bitmasks
+                continue
+            # characters of which the parent state set is in the current one
+            # take the parent state set, otherwise the union of the two if
+            # the state sets of the children are disjoint, and the union of
+            # the parent states in either child and the current states if not
+            in_curr = all_characters ^ not_in_curr
+            rl_disjoint = not_in_curr & ~rl_shared
+            rl_not_disjoint = not_in_curr & rl_shared
+            node_state_bitmasks[nd] = [
+                    (in_curr & par) | (rl_disjoint & (par | curr)) | (rl_not_disjoint & ((par & (left | right)) | curr))
+                    for par, curr, left, right in zip(par_bitmasks, curr_bitmasks, left_bitmasks, right_bitmasks)]
+
 def fitch_down_pass(
         postorder_node_iter,
         state_sets_attr_name="state_sets",
@@ -67,13 +416,17 @@ def fitch_down_pass(
         Name of attribute on |Node| objects in which state set lists
         will stored/accessed. If |None|, then state sets will not be stored on
         the tree.
-    taxon_state_sets_map : dict[taxon] = state sets
+    taxon_state_sets_map : dict[taxon] = state sets, or |SitePatterns|
         A dictionary that takes a taxon object as a key and returns a state set
         list as a value. This will be used to populate the state set of a node
         that has not yet had its state sets scored and recorded (typically,
-        leaves of a tree that has not yet been processed).
+        leaves of a tree that has not yet been processed). If the unique site
+        patterns of a character matrix are given instead, then the state set
+        lists are those of the patterns, and the scores of the patterns are
+        weighted by the number of characters with each pattern.
     weights : iterable
-        A list of weights for each pattern.
+        A list of weights for each pattern (or, if site patterns are given,
+        for each character).
     score_by_character_list : None or list
         If not |None|, should be a reference to a list object.
         This list will be populated by the scores on a character-by-character
@@ -86,7 +439,10 @@ def fitch_down_pass(
 
     Notes
     -----
-    Currently this requires a bifurcating tree (even at the root).
+    The children of a polytomy are scored in turn, each against the state sets
+    of those before it. The state sets are calculated on bitmasks packed by
+    |PackedStateSets|, and, if stored, unpacked to lists of sets; it is faster
+    to score many trees, or large data sets, using |PackedStateSets| directly.
 
     Examples
     --------
@@ -171,12 +527,12 @@ def fitch_down_pass(
         postorder_node_iter = kwargs.pop("postorder_nodes")
     if kwargs:
         raise ValueError(f"Unrecognized argument(s): {kwargs}")
-    
-    if score_by_character_list is not None:
-        assert len(score_by_character_list) == 0
-        for idx in range(len(list(taxon_state_sets_map.values())[0])): # this is unacceptable!
-            score_by_character_list.append(0)
-    score = 0
+
+    if isinstance(taxon_state_sets_map, SitePatterns):
+        site_patterns = taxon_state_sets_map
+        taxon_state_sets_map = site_patterns.taxon_state_sets_map()
+    else:
+        site_patterns = None
     if state_sets_attr_name is None:
         node_state_set_map = _NodeStateSetMap(taxon_state_sets_map)
         get_node_state_sets = lambda node : node_state_set_map[node]
@@ -184,42 +540,22 @@ def fitch_down_pass(
     else:
         get_node_state_sets = lambda node : _retrieve_state_sets_from_attr(node, state_sets_attr_name, taxon_state_sets_map)
         set_node_state_sets = lambda node, v : _store_sets_as_attr(node, state_sets_attr_name, v)
-    for nd in postorder_node_iter:
-        c = nd.child_nodes()
-        if not c:
-            ss = get_node_state_sets(nd)
-            continue
-        left_c, right_c = c[:2]
-        remaining = c[2:]
-        left_ssl = get_node_state_sets(left_c)
-        while True:
-            right_ssl = get_node_state_sets(right_c)
-            result = []
-            for n, ssp in enumerate(zip(left_ssl, right_ssl)):
-                left_ss, right_ss = ssp
-                inter = left_ss.intersection(right_ss)
-                if inter:
-                    result.append(inter)
-                else:
-                    if weights is None:
-                        wt = 1
-                    else:
-                        wt = weights[n]
-                    score += wt
-                    result.append(left_ss.union(left_ss, right_ss))
-                    if score_by_character_list is not None:
-                        # try:
-                        #     score_by_character_list[n] += wt
-                        # except IndexError:
-                        #     score_by_character_list.append(wt)
-                        score_by_character_list[n] += wt
-            if remaining:
-                right_c = remaining.pop(0)
-                left_ssl = result
-            else:
-                break
-        # setattr(nd, state_sets_attr_name, result)
-        set_node_state_sets(nd, result)
+    postorder_nodes = list(postorder_node_iter)
+    # leaves are keyed by node rather than by taxon, as they may already have
+    # state sets of their own
+    packed_state_sets = PackedStateSets(
+            dict((nd, get_node_state_sets(nd)) for nd in postorder_nodes if not nd.child_nodes()),
+            site_patterns=site_patterns)
+    node_state_bitmasks = dict(packed_state_sets.taxon_state_bitmasks)
+    score = packed_state_sets.fitch_down_pass(
+            postorder_nodes,
+            weights=weights,
+            score_by_character_list=score_by_character_list,
+            node_state_bitmasks=node_state_bitmasks)
+    if state_sets_attr_name is not None:
+        for nd in postorder_nodes:
+            if nd.child_nodes():
+                set_node_state_sets(nd, packed_state_sets.state_sets(node_state_bitmasks[nd]))
     return score
 
 def fitch_up_pass(
@@ -329,7 +665,7 @@ def fitch_up_pass(
 def parsimony_score(
         tree,
         chars,
-        gaps_as_missing=True,
+        gaps_as_missing=None,
         weights=None,
         score_by_character_list=None,
         ):
@@ -342,12 +678,17 @@ def parsimony_score(
     tree : a |Tree| instance
         A |Tree| to be scored. Must reference the same |TaxonNamespace| as
         ``chars``.
-    chars : a |CharacterMatrix| instance
-        A |CharacterMatrix|-derived object with data to be scored. Must have
-        the same |TaxonNamespace| as ``tree``.
+    chars : a |CharacterMatrix| or |SitePatterns| instance
+        A |CharacterMatrix|-derived object with data to be scored, or its
+        unique site patterns, as given by
+        :meth:`DiscreteCharacterMatrix.compressed_patterns()`, in which case
+        each pattern is scored once. Must have the same |TaxonNamespace| as
+        ``tree``.
     gap_as_missing : bool
-        If |True| [default], then gaps will be treated as missing data.
+        If |True|, then gaps will be treated as missing data.
         If |False|, then gaps will be treated as a new/additional state.
+        If |None| [default], then as given when compressing site patterns,
+        and |True| otherwise.
     weights : iterable
         A list of weights for each pattern/column in the matrix.
     score_by_character_list : None or list
@@ -411,17 +752,16 @@ def parsimony_score(
     -----
 
     If the same data is going to be used to score multiple trees or multiple times,
-    it is probably better to generate the 'taxon_state_sets_map' once and call
-    "fitch_down_pass" directly yourself, as this function generates a new map
-    each time.
+    it is probably better to pack the data once using
+    :meth:`PackedStateSets.from_char_matrix()` and call
+    :meth:`PackedStateSets.fitch_down_pass()` directly yourself, as this
+    function packs the data each time.
 
     """
     if tree.taxon_namespace is not chars.taxon_namespace:
         raise TaxonNamespaceIdentityError(tree, chars)
-    taxon_state_sets_map = chars.taxon_state_sets_map(gaps_as_missing=gaps_as_missing)
-    nodes = tree.postorder_node_iter()
-    pscore = fitch_down_pass(nodes,
-            taxon_state_sets_map=taxon_state_sets_map,
+    packed_state_sets = PackedStateSets.from_char_matrix(chars, gaps_as_missing=gaps_as_missing)
+    pscore = packed_state_sets.fitch_down_pass(tree.postorder_node_iter(),
             weights=weights,
             score_by_character_list=score_by_character_list)
     return pscore
@@ -21,6 +21,8 @@
 Various bitwise utilities.
 """
 
+import sys
+
 def bit_length(n):
     """
     Return the number of bits necessary to represent an integer in binary,
@@ -48,15 +50,111 @@ def int_as_bitstring(n, length=None, symbol0=None, symbol1=None, reverse=False):
     else:
         return s
 
-def num_set_bits(n):
-    return bin(n).count("1")
+if hasattr(int, "bit_count"):
+    def num_set_bits(n):
+        return n.bit_count()
+else:
+    def num_set_bits(n):
+        return bin(n).count("1")
 
 def least_significant_set_bit(n):
     """
     Returns least-significant bit in integer 'n' that is set.
     """
-    m = n & (n - 1)
-    return m ^ n
+    return n & -n
+
+def least_significant_set_bit_index(n):
+    """
+    Returns the index of the least-significant bit in integer 'n' that is set,
+    or -1 if no bits are set.
+    """
+    return (n & -n).bit_length() - 1
+
+# Integers of up to this many bits hash to themselves (the hash of an integer
+# is its value modulo ``sys.hash_info.modulus``).
+_INT_HASH_BITS = sys.hash_info.modulus.bit_length() - 1
+
+def bitmask_hash(n):
+    """
+    Returns a hash of the bitmask 'n' that is well-distributed for bitmasks of
+    any width. The hash of an integer is its value modulo a Mersenne prime (2**61
+    - 1 on 64-bit platforms), so that, e.g., the bitmasks of taxa 61 places
+    apart have the same hash, and dictionaries or sets of the split bitmasks
+    of trees of thousands of taxa degrade to sequential searches. Bitmasks
+    narrow enough to hash to themselves have the same hash as the integer.
+    Wider bitmasks are hashed by mixing their 32-bit words (as the hash of a
+    tuple of them, the words hashing to themselves), which, unlike the hash of
+    ``bytes``, is the same in every process, so that the iteration order of
+    sets and dictionaries of them is reproducible.
+    """
+    if n.bit_length() <= _INT_HASH_BITS:
+        return int.__hash__(n)
+    data = n.to_bytes((n.bit_length() // 32 + 1) * 4, sys.byteorder, signed=True)
+    return hash(tuple(memoryview(data).cast("I")))
+
+class Bitmask(int):
+    """
+    An integer bitmask, with a well-distributed (see :func:`bitmask_hash()`),
+    cached hash. The results of bitwise operations (and of addition and
+    subtraction, as used, e.g., to clear the lowest set bit) on instances are
+    instances, so that all the split and leafset bitmasks derived from the
+    bitmasks of the taxa of a |TaxonNamespace| with a ``bitmask_type`` of
+    :class:`Bitmask` are instances.
+
+    Bitmasks of more than 60 bits (see :func:`bitmask_hash()`) have a
+    different hash to integers of the same value, and so, unlike narrower
+    bitmasks, do not compare equal to them (``int(bitmask)`` does). Their
+    values can still be compared with those of integers with ``<``, ``<=``,
+    etc.
+    """
+
+    def __hash__(self):
+        try:
+            return self.__dict__["_hash"]
+        except KeyError:
+            h = bitmask_hash(self)
+            self.__dict__["_hash"] = h
+            return h
+
+    def __eq__(self, other):
+        if type(other) is int and other.bit_length() > _INT_HASH_BITS:
+            return False
+        return int.__eq__(self, other)
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        if result is NotImplemented:
+            return result
+        return not result
+
+    def __reduce__(self):
+        # the cached hash is not pickled
+        return (self.__class__, (int(self),))
+
+    def __repr__(self):
+        return "{}({})".format(self.__class__.__name__, int.__repr__(self))
+
+def _bitmask_operator(name):
+    int_operator = getattr(int, name)
+    def operator(self, *args):
+        result = int_operator(self, *args)
+        if result is NotImplemented:
+            return result
+        return Bitmask(result)
+    operator.__name__ = name
+    return operator
+
+for _name in (
+        "__and__", "__rand__",
+        "__or__", "__ror__",
+        "__xor__", "__rxor__",
+        "__add__", "__radd__",
+        "__sub__", "__rsub__",
+        "__lshift__", "__rshift__",
+        "__invert__", "__neg__",
+        ):
+    setattr(Bitmask, _name, _bitmask_operator(_name))
+del _name
 
 def indexes_of_set_bits(s, fill_bitmask=-1, one_based=False, ordination_in_mask=False):
     return [i for i in set_bit_index_iter(s, fill_bitmask, one_based, ordination_in_mask)]
@@ -28,6 +28,11 @@ LOGGING_FORMAT_ENVAR               = "DENDROPY_LOGGING_FORMAT"
 DENDROPY_PAUP_PATH_ENVAR           = "DENDROPY_PAUP_EXECUTABLE_PATH"
 DENDROPY_RSCRIPT_PATH_ENVAR        = "DENDROPY_RSCRIPT_EXECUTABLE_PATH"
 
+# If set (to anything other than "0", "false" or "no"), the bipartitions of
+# trees updated in place by tree edits are checked against the structure of
+# the tree after every update (see ``Tree._debug_check_bipartition_encoding()``).
+CHECK_BIPARTITION_ENCODING_ENVAR   = "DENDROPY_CHECK_BIPARTITION_ENCODING"
+
 # error: Turn the warning into an exception.
 # ignore: Discard the warning.
 # always: Always emit a warning.
@@ -0,0 +1,39 @@
+
+"""
+Performance benchmarks. These are not run as part of the test suite, but as
+scripts, e.g.::
+
+    $ python -m tests.benchmarks.bench_tokenizer
+
+"""
+
+import os
+import timeit
+
+TESTS_DATA_DIR = os.path.join(os.path.dirname(__file__), os.path.pardir, "unittests", "data")
+
+def tree_source_path(filename):
+    return os.path.join(TESTS_DATA_DIR, "trees", filename)
+
+def char_source_path(filename):
+    return os.path.join(TESTS_DATA_DIR, "chars", filename)
+
+def best_time(fn, repeat=3, number=1):
+    """
+    Returns the best (minimum) time, in seconds, taken over ``repeat``
+    repetitions to call ``fn`` ``number`` times, divided by ``number``.
+    """
+    return min(timeit.Timer(fn).repeat(repeat, number)) / number
+
+def report(title, rows, out=None):
+    """
+    Writes a table of ``(label, seconds)`` rows, with the speed-up of each
+    row relative to the first.
+    """
+    import sys
+    if out is None:
+        out = sys.stdout
+    out.write("{}\n".format(title))
+    baseline = rows[0][1]
+    for label, seconds in rows:
+        out.write("    {:<40} {:>10.4f} s {:>8.2f}x\n".format(label, seconds, baseline / seconds if seconds else float("inf")))
@@ -0,0 +1,78 @@
+
+"""
+Benchmarks computing a per-sequence statistic (the GC content) over a FASTA
+and a PHYLIP file by reading a |DnaCharacterMatrix| against iterating over its
+sequences with ``DnaCharacterMatrix.yield_sequences_from_files()``, with and
+without compact storage or a column window.
+
+Memory is measured as the peak memory allocated (as traced by
+``tracemalloc``) during the calculation. The data are random DNA sequences, as
+the test data sets are all small.
+"""
+
+import gc
+import os
+import random
+import argparse
+import tempfile
+import tracemalloc
+import dendropy
+from tests.benchmarks import best_time, report
+
+def measure_peak_memory(fn):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        size, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+def gc_content(sequence):
+    symbols = sequence.symbols_as_string(sep="")
+    return (symbols.count("G") + symbols.count("C")) / len(symbols)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--num-taxa", type=int, default=100,
+            help="Number of taxa (default: %(default)s).")
+    parser.add_argument("-c", "--num-characters", type=int, nargs="*",
+            default=[10000, 100000],
+            help="Numbers of characters (default: %(default)s).")
+    parser.add_argument("-r", "--repeat", type=int, default=3)
+    parser.add_argument("-s", "--seed", type=int, default=1)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+    for num_characters in args.num_characters:
+        char_matrix = dendropy.DnaCharacterMatrix.from_dict(
+                dict(("t{}".format(idx), "".join(rng.choice("ACGT") for c in range(num_characters)))
+                    for idx in range(args.num_taxa)))
+        for schema in ("fasta", "phylip"):
+            handle, path = tempfile.mkstemp()
+            os.close(handle)
+            try:
+                char_matrix.write(path=path, schema=schema)
+                def read_matrix():
+                    matrix = dendropy.DnaCharacterMatrix.get(path=path, schema=schema)
+                    return [gc_content(matrix[taxon]) for taxon in matrix]
+                def yield_sequences(**kwargs):
+                    return lambda: [gc_content(sequence) for taxon, sequence
+                            in dendropy.DnaCharacterMatrix.yield_sequences_from_files([path], schema=schema, **kwargs)]
+                rows = []
+                memory_rows = []
+                for label, fn in (
+                        ("get()", read_matrix),
+                        ("yield_sequences_from_files()", yield_sequences()),
+                        ("... compact=True", yield_sequences(compact=True)),
+                        ("... compact=True, 1000 columns", yield_sequences(compact=True, column_window=(0, 1000))),
+                        ):
+                    rows.append((label, best_time(fn, repeat=args.repeat)))
+                    memory_rows.append("{}: {:.1f} MB".format(label, measure_peak_memory(fn) / 1e6))
+                report("{} taxa, {} characters: GC content from {}".format(args.num_taxa, num_characters, schema), rows)
+                print("    peak memory: {}".format(", ".join(memory_rows)))
+            finally:
+                os.remove(path)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+
+"""
+Benchmarks the memory used by a |DnaCharacterMatrix| against that used by one
+with compact storage (``compact=True``), as well as the time taken to read and
+write each as FASTA, PHYLIP and NEXUS.
+
+Memory is measured as the memory allocated (as traced by ``tracemalloc``)
+while reading the matrix. The data are random DNA sequences, as the test data
+sets are all small.
+"""
+
+import random
+import argparse
+import dendropy
+from tests.benchmarks import best_time, report
+from tests.benchmarks.bench_compact_tree import measure_memory
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--num-taxa", type=int, default=100,
+            help="Number of taxa (default: %(default)s).")
+    parser.add_argument("-c", "--num-characters", type=int, nargs="*",
+            default=[10000, 100000],
+            help="Numbers of characters (default: %(default)s).")
+    parser.add_argument("-r", "--repeat", type=int, default=3)
+    parser.add_argument("-s", "--seed", type=int, default=1)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+    for num_characters in args.num_characters:
+        char_matrix = dendropy.DnaCharacterMatrix.from_dict(
+                dict(("t{}".format(idx), "".join(rng.choice("ACGT-N") for c in range(num_characters)))
+                    for idx in range(args.num_taxa)))
+        taxon_namespace = char_matrix.taxon_namespace
+        memory_rows = []
+        for schema in ("fasta", "phylip", "nexus"):
+            data = char_matrix.as_string(schema)
+            read_rows = []
+            write_rows = []
+            for label, compact in (("list of states", False), ("compact=True", True)):
+                read_matrix = lambda: dendropy.DnaCharacterMatrix.get(
+                        data=data,
+                        schema=schema,
+                        taxon_namespace=taxon_namespace,
+                        compact=compact)
+                if schema == "fasta":
+                    matrix, size = measure_memory(read_matrix)
+                    memory_rows.append("{}: {:.1f} MB ({:.1f} B/character)".format(
+                        label, size / 1e6, size / (args.num_taxa * num_characters)))
+                else:
+                    matrix = read_matrix()
+                read_rows.append((label, best_time(read_matrix, repeat=args.repeat)))
+                write_rows.append((label, best_time(lambda: matrix.as_string(schema), repeat=args.repeat)))
+                del matrix
+            report("{} taxa, {} characters: reading {}".format(args.num_taxa, num_characters, schema), read_rows)
+            report("{} taxa, {} characters: writing {}".format(args.num_taxa, num_characters, schema), write_rows)
+        print("    memory: {}".format(", ".join(memory_rows)))
+
+if __name__ == "__main__":
+    main()
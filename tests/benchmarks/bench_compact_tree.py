@@ -0,0 +1,66 @@
+
+"""
+Benchmarks the memory used by a |Tree| against that used by a |CompactTree|
+with the same topology, before and after encoding the bipartitions of each, as
+well as the time taken to read each.
+
+Memory is measured as the memory allocated (as traced by ``tracemalloc``)
+while reading the tree. The trees are random trees generated for each number of
+taxa, as the test data trees are all small.
+"""
+
+import gc
+import random
+import argparse
+import tracemalloc
+import dendropy
+from tests.benchmarks import best_time, report
+from tests.benchmarks.bench_phylogenetic_distance_matrix import random_newick
+
+def measure_memory(fn):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = fn()
+        gc.collect()
+        size, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, size
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--num-taxa", type=int, nargs="*",
+            default=[10000, 50000],
+            help="Numbers of taxa (default: %(default)s).")
+    parser.add_argument("-r", "--repeat", type=int, default=3)
+    parser.add_argument("-s", "--seed", type=int, default=1)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+    for num_taxa in args.num_taxa:
+        newick = random_newick(num_taxa, rng)
+        taxon_namespace = dendropy.TaxonNamespace()
+        # read once so that the taxa are not included in the measurements
+        dendropy.Tree.get(data=newick, schema="newick", taxon_namespace=taxon_namespace)
+        read_rows = []
+        memory_rows = []
+        for label, tree_type in (
+                ("Tree", dendropy.Tree),
+                ("CompactTree", dendropy.CompactTree),
+                ):
+            read_tree = lambda: tree_type.get(
+                    data=newick,
+                    schema="newick",
+                    taxon_namespace=taxon_namespace)
+            tree, size = measure_memory(read_tree)
+            num_nodes = len(tree.nodes())
+            _, encoded_size = measure_memory(tree.encode_bipartitions)
+            memory_rows.append("{}: {:.1f} MB ({:.0f} B/node; +{:.1f} MB bipartitions)".format(
+                label, size / 1e6, size / num_nodes, encoded_size / 1e6))
+            del tree
+            read_rows.append((label, best_time(read_tree, repeat=args.repeat)))
+        report("{} taxa: reading".format(num_taxa), read_rows)
+        print("    memory: {}".format(", ".join(memory_rows)))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+
+"""
+Benchmarks calculations on a |FlatTree| against the same calculations on the
+|Tree| it represents, as well as the memory used by each and the size and time
+taken to pickle each.
+
+The trees are random trees generated for each number of taxa, as the test data
+trees are all small.
+"""
+
+import gc
+import random
+import pickle
+import argparse
+import tracemalloc
+import dendropy
+from dendropy.calculate import treemeasure
+from tests.benchmarks import best_time, report
+
+def random_rooted_newick(num_taxa, rng):
+    # as ``random_newick()``, but strictly bifurcating, so that all the
+    # statistics apply
+    subtrees = ["T{}:{:.4f}".format(i, rng.random()) for i in range(num_taxa)]
+    while len(subtrees) > 2:
+        a = subtrees.pop(rng.randrange(len(subtrees)))
+        b = subtrees.pop(rng.randrange(len(subtrees)))
+        subtrees.append("({},{}):{:.4f}".format(a, b, rng.random()))
+    return "[&R] ({});".format(",".join(subtrees))
+
+def measure_memory(fn):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = fn()
+        gc.collect()
+        size, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, size
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--num-taxa", type=int, nargs="*",
+            default=[1000, 10000],
+            help="Numbers of taxa (default: %(default)s).")
+    parser.add_argument("-r", "--repeat", type=int, default=3)
+    parser.add_argument("-s", "--seed", type=int, default=1)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+    for num_taxa in args.num_taxa:
+        newick = random_rooted_newick(num_taxa, rng)
+        tree, tree_size = measure_memory(lambda: dendropy.Tree.get(data=newick, schema="newick"))
+        flat_tree, flat_tree_size = measure_memory(tree.to_flat)
+        for label, tree_fn, flat_tree_fn in (
+                ("postorder traversal",
+                    lambda: sum(1 for nd in tree.postorder_node_iter()),
+                    lambda: sum(1 for idx in flat_tree.postorder_index_iter())),
+                ("length()", tree.length, flat_tree.length),
+                ("calc_node_ages()",
+                    lambda: tree.calc_node_ages(is_force_max_age=True),
+                    lambda: flat_tree.calc_node_ages(is_force_max_age=True)),
+                ("encode_bipartitions()",
+                    lambda: tree.encode_bipartitions(),
+                    lambda: flat_tree.encode_bipartitions()),
+                ("B1", lambda: treemeasure.B1(tree), lambda: treemeasure.B1(flat_tree)),
+                ("colless_tree_imbalance",
+                    lambda: treemeasure.colless_tree_imbalance(tree),
+                    lambda: treemeasure.colless_tree_imbalance(flat_tree)),
+                ("sackin_index",
+                    lambda: treemeasure.sackin_index(tree),
+                    lambda: treemeasure.sackin_index(flat_tree)),
+                ("treeness",
+                    lambda: treemeasure.treeness(tree),
+                    lambda: treemeasure.treeness(flat_tree)),
+                ("pickle round-trip",
+                    lambda: pickle.loads(pickle.dumps(tree)),
+                    lambda: pickle.loads(pickle.dumps(flat_tree))),
+                ):
+            report("{} taxa: {}".format(num_taxa, label), [
+                ("Tree", best_time(tree_fn, repeat=args.repeat)),
+                ("FlatTree", best_time(flat_tree_fn, repeat=args.repeat)),
+                ])
+        report("{} taxa: conversion".format(num_taxa), [
+            ("Tree.to_flat()", best_time(tree.to_flat, repeat=args.repeat)),
+            ("FlatTree.to_tree()", best_time(flat_tree.to_tree, repeat=args.repeat)),
+            ])
+        print("    memory: Tree: {:.1f} MB, FlatTree: {:.2f} MB".format(tree_size / 1e6, flat_tree_size / 1e6))
+        print("    pickled: Tree: {:.1f} MB, FlatTree: {:.2f} MB (including the taxon namespace)".format(
+            len(pickle.dumps(tree)) / 1e6, len(pickle.dumps(flat_tree)) / 1e6))
+
+if __name__ == "__main__":
+    main()
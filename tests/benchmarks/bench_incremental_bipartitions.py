@@ -0,0 +1,64 @@
+
+"""
+Benchmarks tree edits that update the bipartitions of a tree in place
+(``update_bipartitions=True``) against the same edits followed by
+re-encoding all the bipartitions of the tree, as was needed before.
+
+The trees are random trees generated for each number of taxa, as the test data
+trees are all small.
+"""
+
+import random
+import argparse
+import dendropy
+from tests.benchmarks import best_time, report
+from tests.benchmarks.bench_flat_tree import random_rooted_newick
+
+def reroot_sweep(tree, leaves, update_bipartitions):
+    for nd in leaves:
+        tree.reroot_at_edge(nd.edge, length1=0.1, length2=0.1, update_bipartitions=update_bipartitions)
+        if not update_bipartitions:
+            tree.encode_bipartitions()
+        tree.bipartition_edge_map
+
+def prune_in_steps(trees, taxa, update_bipartitions, step):
+    tree = trees.pop()
+    for idx in range(0, len(taxa), step):
+        tree.prune_taxa(taxa[idx:idx+step], update_bipartitions=update_bipartitions)
+        if not update_bipartitions:
+            tree.encode_bipartitions()
+        tree.bipartition_edge_map
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--num-taxa", type=int, nargs="*",
+            default=[1000, 10000],
+            help="Numbers of taxa (default: %(default)s).")
+    parser.add_argument("-e", "--num-edits", type=int, default=50,
+            help="Number of edits of each kind (default: %(default)s).")
+    parser.add_argument("-r", "--repeat", type=int, default=3)
+    parser.add_argument("-s", "--seed", type=int, default=1)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+    for num_taxa in args.num_taxa:
+        tree = dendropy.Tree.get(data=random_rooted_newick(num_taxa, rng), schema="newick")
+        tree.encode_bipartitions()
+        leaves = rng.sample(tree.leaf_nodes(), args.num_edits)
+        report("{} taxa: {} x reroot_at_edge()".format(num_taxa, args.num_edits), [
+            ("re-encode", best_time(lambda: reroot_sweep(tree, leaves, False), repeat=args.repeat)),
+            ("update_bipartitions=True", best_time(lambda: reroot_sweep(tree, leaves, True), repeat=args.repeat)),
+            ])
+        taxa = [nd.taxon for nd in leaves]
+        results = []
+        for label, update_bipartitions in (("re-encode", False), ("update_bipartitions=True", True)):
+            trees = []
+            for idx in range(args.repeat):
+                trees.append(tree.clone(1))
+                trees[-1].encode_bipartitions()
+            results.append((label, best_time(
+                lambda: prune_in_steps(trees, taxa, update_bipartitions, step=1),
+                repeat=args.repeat)))
+        report("{} taxa: {} x prune_taxa()".format(num_taxa, args.num_edits), results)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+
+"""
+Benchmarks split operations on trees of thousands of taxa (encoding, counting
+splits, symmetric distances, building trees from splits and building
+consensus trees), with split bitmasks as plain integers against split
+bitmasks as |Bitmask| instances (i.e., read into a |TaxonNamespace| with a
+``bitmask_type`` of |Bitmask|).
+
+The trees are random trees generated for each number of taxa, as the test data
+trees are all small.
+"""
+
+import random
+import argparse
+import dendropy
+from dendropy.utility import bitprocessing
+from dendropy.calculate import treecompare
+from tests.benchmarks import best_time, report
+
+def random_newick(num_taxa, rng):
+    subtrees = ["T{}:{:.4f}".format(i, rng.random()) for i in range(num_taxa)]
+    while len(subtrees) > 3:
+        a = subtrees.pop(rng.randrange(len(subtrees)))
+        b = subtrees.pop(rng.randrange(len(subtrees)))
+        subtrees.append("({},{}):{:.4f}".format(a, b, rng.random()))
+    return "({});".format(",".join(subtrees))
+
+def read_trees(newick, bitmask_type):
+    taxon_namespace = dendropy.TaxonNamespace(bitmask_type=bitmask_type)
+    return dendropy.TreeList.get(
+            data=newick,
+            schema="newick",
+            taxon_namespace=taxon_namespace)
+
+def encode(trees):
+    for tree in trees:
+        tree.encode_bipartitions()
+
+def count_splits(trees):
+    sd = dendropy.SplitDistribution(taxon_namespace=trees.taxon_namespace)
+    for tree in trees:
+        sd.count_splits_on_tree(tree, is_bipartitions_updated=True)
+    return sd
+
+def symmetric_differences(trees):
+    for tree in trees[1:]:
+        treecompare.symmetric_difference(trees[0], tree, is_bipartitions_updated=True)
+
+def from_split_bitmasks(trees):
+    tree = trees[0]
+    dendropy.Tree.from_split_bitmasks(
+            split_bitmasks=[b.split_bitmask for b in tree.bipartition_encoding],
+            taxon_namespace=trees.taxon_namespace,
+            is_rooted=tree.is_rooted)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--num-taxa", type=int, nargs="*",
+            default=[1000, 5000, 10000, 20000],
+            help="Numbers of taxa (default: %(default)s).")
+    parser.add_argument("-t", "--num-trees", type=int, default=5)
+    parser.add_argument("-r", "--repeat", type=int, default=3)
+    parser.add_argument("-s", "--seed", type=int, default=1)
+    args = parser.parse_args()
+    bitmask_types = (
+            ("int", int),
+            ("Bitmask", bitprocessing.Bitmask),
+            )
+    for num_taxa in args.num_taxa:
+        rng = random.Random(args.seed)
+        newick = "\n".join(random_newick(num_taxa, rng) for i in range(args.num_trees))
+        tree_lists = [(label, read_trees(newick, bitmask_type)) for label, bitmask_type in bitmask_types]
+        title = "{} trees of {} taxa".format(args.num_trees, num_taxa)
+        for label, fn in (
+                ("encode_bipartitions", encode),
+                ("count_splits_on_tree", count_splits),
+                ("symmetric_difference", symmetric_differences),
+                ("from_split_bitmasks", from_split_bitmasks),
+                ):
+            report("{}: {}".format(title, label), [
+                (bitmask_label, best_time(lambda: fn(trees), repeat=args.repeat))
+                for bitmask_label, trees in tree_lists])
+        split_distributions = [(label, count_splits(trees)) for label, trees in tree_lists]
+        report("{}: consensus_tree".format(title), [
+            (label, best_time(lambda: sd.consensus_tree(), repeat=1))
+            for label, sd in split_distributions])
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+
+"""
+Benchmarks building Neighbor-Joining (NJ) and UPGMA trees from the
+|PhylogeneticDistanceMatrix| of trees of increasing numbers of taxa, with
+NumPy and (up to a given number of taxa, as it is much slower) without.
+
+The trees are random trees generated for each number of taxa, as the test data
+trees are all small.
+"""
+
+import random
+import argparse
+from unittest import mock
+import dendropy
+from dendropy.calculate import phylogeneticdistance
+from tests.benchmarks import best_time, report
+from tests.benchmarks.bench_phylogenetic_distance_matrix import random_newick
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--num-taxa", type=int, nargs="*",
+            default=[1000, 5000, 10000],
+            help="Numbers of taxa (default: %(default)s).")
+    parser.add_argument("-p", "--max-python-taxa", type=int, default=1000,
+            help="Largest number of taxa to build the trees for without NumPy (default: %(default)s).")
+    parser.add_argument("-r", "--repeat", type=int, default=1)
+    parser.add_argument("-s", "--seed", type=int, default=1)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+    for num_taxa in args.num_taxa:
+        tree = dendropy.Tree.get(data=random_newick(num_taxa, rng), schema="newick")
+        pdm = tree.phylogenetic_distance_matrix()
+        for method_name in ("nj_tree", "upgma_tree"):
+            method = getattr(pdm, method_name)
+            rows = []
+            if num_taxa <= args.max_python_taxa:
+                with mock.patch.object(phylogeneticdistance, "numpy", None):
+                    rows.append(("without NumPy", best_time(method, repeat=args.repeat)))
+            if phylogeneticdistance.numpy is not None:
+                rows.append(("with NumPy", best_time(method, repeat=args.repeat)))
+            report("{} taxa: {}".format(num_taxa, method_name), rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+
+"""
+Benchmarks calculating the distances between all pairs of a collection of
+trees by calling the pairwise distance functions of
+``dendropy.calculate.treecompare`` on each pair against
+``treecompare.pairwise_distance_matrix()``, serially and (if more than one
+process is requested) in parallel.
+"""
+
+import os
+import argparse
+import dendropy
+from dendropy.calculate import treecompare
+from tests.benchmarks import tree_source_path, best_time, report
+
+def all_pairs(trees, dist_fn):
+    for i, tree1 in enumerate(trees):
+        for tree2 in trees[i+1:]:
+            dist_fn(tree1, tree2, is_bipartitions_updated=True)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("paths", nargs="*",
+            help="Files to read (default: test data trees).")
+    parser.add_argument("-f", "--schema", default="nexus")
+    parser.add_argument("-n", "--max-trees", type=int, default=250,
+            help="Maximum number of trees to read from each file (default: %(default)s).")
+    parser.add_argument("-m", "--num-processes", type=int, default=1)
+    parser.add_argument("-r", "--repeat", type=int, default=3)
+    args = parser.parse_args()
+    paths = args.paths or [
+            tree_source_path("dendropy-test-trees-n33-unrooted-x100a.nexus"),
+            tree_source_path("cetaceans.mb.no-clock.mcmc.trees"),
+            ]
+    for path in paths:
+        schema = "newick" if "newick" in path else args.schema
+        trees = dendropy.TreeList.get(path=path, schema=schema)[:args.max_trees]
+        for tree in trees:
+            tree.encode_bipartitions()
+        title = "{} ({} trees, {} taxa)".format(
+                os.path.basename(path),
+                len(trees),
+                len(trees.taxon_namespace))
+        for metric, dist_fn in (
+                ("symmetric_difference", treecompare.symmetric_difference),
+                ("weighted_robinson_foulds", treecompare.weighted_robinson_foulds_distance),
+                ("euclidean", treecompare.euclidean_distance),
+                ):
+            rows = [
+                ("each pair", best_time(lambda: all_pairs(trees, dist_fn), repeat=1)),
+                ("pairwise_distance_matrix", best_time(
+                    lambda: treecompare.pairwise_distance_matrix(trees, metric=metric, is_bipartitions_updated=True),
+                    repeat=args.repeat)),
+                ]
+            if args.num_processes > 1:
+                rows.append(("pairwise_distance_matrix ({} processes)".format(args.num_processes), best_time(
+                    lambda: treecompare.pairwise_distance_matrix(trees, metric=metric, is_bipartitions_updated=True, num_processes=args.num_processes),
+                    repeat=args.repeat)))
+            report("{}: {}".format(title, metric), rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+
+"""
+Benchmarks scoring a tree under Fitch parsimony on bitmasks packed by
+|PackedStateSets| against the calculation on sets of states, one character
+at a time, as previously done by ``fitch_down_pass()``.
+
+The data are random DNA sequences on a random tree, as the test data sets are
+all small.
+"""
+
+import random
+import argparse
+import dendropy
+from dendropy.model import parsimony
+from tests.benchmarks import best_time, report
+from tests.benchmarks.bench_flat_tree import random_rooted_newick
+
+def set_fitch_down_pass(postorder_nodes, taxon_state_sets_map):
+    node_state_sets = {}
+    score = 0
+    for nd in postorder_nodes:
+        c = nd.child_nodes()
+        if not c:
+            node_state_sets[nd] = taxon_state_sets_map[nd.taxon]
+            continue
+        left_ssl, right_ssl = node_state_sets[c[0]], node_state_sets[c[1]]
+        result = []
+        for left_ss, right_ss in zip(left_ssl, right_ssl):
+            inter = left_ss.intersection(right_ss)
+            if inter:
+                result.append(inter)
+            else:
+                score += 1
+                result.append(left_ss.union(right_ss))
+        node_state_sets[nd] = result
+    return score
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--num-taxa", type=int, default=200,
+            help="Number of taxa (default: %(default)s).")
+    parser.add_argument("-c", "--num-characters", type=int, nargs="*",
+            default=[1000, 10000, 100000],
+            help="Numbers of characters (default: %(default)s).")
+    parser.add_argument("-m", "--max-set-characters", type=int, default=10000,
+            help="Largest number of characters to score on sets (default: %(default)s).")
+    parser.add_argument("-r", "--repeat", type=int, default=3)
+    parser.add_argument("-s", "--seed", type=int, default=1)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+    for num_characters in args.num_characters:
+        tree = dendropy.Tree.get(data=random_rooted_newick(args.num_taxa, rng), schema="newick")
+        chars = dendropy.DnaCharacterMatrix.from_dict(
+                dict((taxon.label, "".join(rng.choice("ACGT-N") for idx in range(num_characters)))
+                    for taxon in tree.taxon_namespace),
+                taxon_namespace=tree.taxon_namespace)
+        postorder_nodes = list(tree.postorder_node_iter())
+        rows = []
+        if num_characters <= args.max_set_characters:
+            taxon_state_sets_map = chars.taxon_state_sets_map()
+            rows.append(("on sets", best_time(
+                lambda: set_fitch_down_pass(postorder_nodes, taxon_state_sets_map),
+                repeat=args.repeat)))
+            rows.append(("fitch_down_pass(state_sets_attr_name=None)", best_time(
+                lambda: parsimony.fitch_down_pass(
+                    postorder_nodes,
+                    state_sets_attr_name=None,
+                    taxon_state_sets_map=taxon_state_sets_map),
+                repeat=args.repeat)))
+        rows.append(("parsimony_score()", best_time(
+            lambda: parsimony.parsimony_score(tree, chars),
+            repeat=args.repeat)))
+        packed_state_sets = parsimony.PackedStateSets.from_char_matrix(chars)
+        rows.append(("PackedStateSets.fitch_down_pass()", best_time(
+            lambda: packed_state_sets.fitch_down_pass(postorder_nodes),
+            repeat=args.repeat)))
+        rows.append(("  with score_by_character_list", best_time(
+            lambda: packed_state_sets.fitch_down_pass(postorder_nodes, score_by_character_list=[]),
+            repeat=args.repeat)))
+        report("{} taxa, {} characters".format(args.num_taxa, num_characters), rows)
+
+if __name__ == "__main__":
+    main()
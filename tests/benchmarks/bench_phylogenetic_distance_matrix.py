@@ -0,0 +1,70 @@
+
+"""
+Benchmarks building a |PhylogeneticDistanceMatrix| from trees of increasing
+numbers of taxa, and the memory it takes (as traced by ``tracemalloc``),
+as well as calculating the mean pairwise distance (MPD) over all the taxa
+and over half the taxa.
+
+The trees are random trees generated for each number of taxa, as the test data
+trees are all small.
+"""
+
+import gc
+import random
+import argparse
+import tracemalloc
+import dendropy
+from tests.benchmarks import best_time, report
+
+def random_newick(num_taxa, rng):
+    subtrees = ["T{}:{:.4f}".format(i, rng.random()) for i in range(num_taxa)]
+    while len(subtrees) > 3:
+        a = subtrees.pop(rng.randrange(len(subtrees)))
+        b = subtrees.pop(rng.randrange(len(subtrees)))
+        subtrees.append("({},{}):{:.4f}".format(a, b, rng.random()))
+    return "({});".format(",".join(subtrees))
+
+def measure_memory(tree):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        pdm = tree.phylogenetic_distance_matrix()
+        gc.collect()
+        size, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return pdm, size, peak
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--num-taxa", type=int, nargs="*",
+            default=[250, 500, 1000, 2000],
+            help="Numbers of taxa (default: %(default)s).")
+    parser.add_argument("-r", "--repeat", type=int, default=3)
+    parser.add_argument("-s", "--seed", type=int, default=1)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+    compile_rows = []
+    mpd_rows = []
+    filtered_mpd_rows = []
+    memory_rows = []
+    for num_taxa in args.num_taxa:
+        tree = dendropy.Tree.get(data=random_newick(num_taxa, rng), schema="newick")
+        label = "{} taxa".format(num_taxa)
+        pdm, size, peak = measure_memory(tree)
+        memory_rows.append("{}: {:.1f} MB (peak {:.1f} MB)".format(label, size / 1e6, peak / 1e6))
+        compile_rows.append((label, best_time(tree.phylogenetic_distance_matrix, repeat=args.repeat)))
+        mpd_rows.append((label, best_time(pdm.mean_pairwise_distance, repeat=args.repeat)))
+        filter_fn = lambda taxon: int(taxon.label[1:]) % 2 == 0
+        filtered_mpd_rows.append((label, best_time(
+            lambda: pdm.mean_pairwise_distance(filter_fn=filter_fn),
+            repeat=args.repeat)))
+    report("phylogenetic_distance_matrix", compile_rows)
+    report("mean_pairwise_distance", mpd_rows)
+    report("mean_pairwise_distance (half of the taxa)", filtered_mpd_rows)
+    print("memory:")
+    for row in memory_rows:
+        print("    {}".format(row))
+
+if __name__ == "__main__":
+    main()
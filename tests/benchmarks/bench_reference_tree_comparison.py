@@ -0,0 +1,59 @@
+
+"""
+Benchmarks comparing each tree of a collection against a reference tree (the
+first tree) by calling ``treecompare.false_positives_and_negatives()``,
+``weighted_robinson_foulds_distance()`` and ``euclidean_distance()`` on each
+tree, against a ``treecompare.ReferenceTreeComparator``, both on trees already
+read and on trees (as split records) read directly from the source.
+"""
+
+import os
+import argparse
+import dendropy
+from dendropy.calculate import treecompare
+from tests.benchmarks import tree_source_path, best_time, report
+
+def compare_pairwise(reference_tree, trees):
+    for tree in trees:
+        treecompare.false_positives_and_negatives(reference_tree, tree)
+        treecompare.weighted_robinson_foulds_distance(reference_tree, tree)
+        treecompare.euclidean_distance(reference_tree, tree)
+
+def read_and_compare_pairwise(reference_tree, path, schema):
+    trees = dendropy.Tree.yield_from_files(
+            files=[path],
+            schema=schema,
+            taxon_namespace=reference_tree.taxon_namespace)
+    compare_pairwise(reference_tree, trees)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("paths", nargs="*",
+            help="Files to read (default: test data trees).")
+    parser.add_argument("-f", "--schema", default="nexus")
+    parser.add_argument("-r", "--repeat", type=int, default=3)
+    args = parser.parse_args()
+    paths = args.paths or [
+            tree_source_path("dendropy-test-trees-n33-unrooted-x100a.nexus"),
+            tree_source_path("cetaceans.mb.no-clock.mcmc.trees"),
+            ]
+    for path in paths:
+        schema = "newick" if "newick" in path else args.schema
+        trees = dendropy.TreeList.get(path=path, schema=schema)
+        reference_tree = trees[0]
+        comparator = treecompare.ReferenceTreeComparator(reference_tree)
+        title = "{} ({} trees, {} taxa)".format(
+                os.path.basename(path),
+                len(trees),
+                len(trees.taxon_namespace))
+        report("{}: trees in memory".format(title), [
+            ("pairwise functions", best_time(lambda: compare_pairwise(reference_tree, trees), repeat=args.repeat)),
+            ("ReferenceTreeComparator", best_time(lambda: list(comparator.compare_stream(trees)), repeat=args.repeat)),
+            ])
+        report("{}: reading and comparing".format(title), [
+            ("pairwise functions", best_time(lambda: read_and_compare_pairwise(reference_tree, path, schema), repeat=args.repeat)),
+            ("ReferenceTreeComparator", best_time(lambda: list(comparator.compare_files([path], schema)), repeat=args.repeat)),
+            ])
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+
+"""
+Benchmarks calculating the standardized effect sizes of the MPD and MNTD of
+random assemblages of taxa under the "taxa.label" null model, with NumPy
+and without, and (if more than one process is requested) in parallel.
+
+The trees are random trees generated for each number of taxa, as the test data
+trees are all small.
+"""
+
+import random
+import argparse
+from unittest import mock
+import dendropy
+from dendropy.calculate import phylogeneticdistance
+from tests.benchmarks import best_time, report
+from tests.benchmarks.bench_phylogenetic_distance_matrix import random_newick
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--num-taxa", type=int, nargs="*",
+            default=[100, 500],
+            help="Numbers of taxa (default: %(default)s).")
+    parser.add_argument("-a", "--num-assemblages", type=int, default=100)
+    parser.add_argument("--min-assemblage-size", type=int, default=5)
+    parser.add_argument("--max-assemblage-size", type=int, default=50)
+    parser.add_argument("-x", "--num-replicates", type=int, default=1000)
+    parser.add_argument("-m", "--num-processes", type=int, default=1)
+    parser.add_argument("-r", "--repeat", type=int, default=1)
+    parser.add_argument("-s", "--seed", type=int, default=1)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+    for num_taxa in args.num_taxa:
+        tree = dendropy.Tree.get(data=random_newick(num_taxa, rng), schema="newick")
+        pdm = tree.phylogenetic_distance_matrix()
+        taxa = list(pdm.taxon_iter())
+        assemblages = [
+                rng.sample(taxa, rng.randint(args.min_assemblage_size, min(args.max_assemblage_size, num_taxa)))
+                for idx in range(args.num_assemblages)]
+        for method_name in (
+                "standardized_effect_size_mean_pairwise_distance",
+                "standardized_effect_size_mean_nearest_taxon_distance",
+                ):
+            method = getattr(pdm, method_name)
+            calculate = lambda num_processes=1: method(
+                    assemblage_memberships=assemblages,
+                    num_randomization_replicates=args.num_replicates,
+                    rng=random.Random(args.seed),
+                    num_processes=num_processes)
+            rows = []
+            with mock.patch.object(phylogeneticdistance, "numpy", None):
+                rows.append(("without NumPy", best_time(calculate, repeat=args.repeat)))
+            if phylogeneticdistance.numpy is not None:
+                rows.append(("with NumPy", best_time(calculate, repeat=args.repeat)))
+            if args.num_processes > 1:
+                rows.append(("{} processes".format(args.num_processes), best_time(
+                    lambda: calculate(num_processes=args.num_processes),
+                    repeat=args.repeat)))
+            report("{} taxa, {} assemblages, {} replicates: {}".format(
+                num_taxa, len(assemblages), args.num_replicates, method_name), rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+
+"""
+Benchmarks calculations over the unique site patterns of a character matrix,
+as given by ``DiscreteCharacterMatrix.compressed_patterns()``, against the
+same calculations over every character.
+
+The data are random DNA sequences in which each site is mostly invariant, so
+that many sites share a pattern, as the test data sets are all small.
+"""
+
+import random
+import argparse
+import dendropy
+from dendropy.calculate import popgenstat
+from dendropy.model import parsimony
+from tests.benchmarks import best_time, report
+from tests.benchmarks.bench_flat_tree import random_rooted_newick
+
+def random_char_matrix(taxon_namespace, num_characters, mutation_prob, rng):
+    sequences = dict((taxon.label, []) for taxon in taxon_namespace)
+    for idx in range(num_characters):
+        base = rng.choice("ACGT")
+        for sequence in sequences.values():
+            sequence.append(rng.choice("ACGT") if rng.random() < mutation_prob else base)
+    return dendropy.DnaCharacterMatrix.from_dict(
+            dict((label, "".join(sequence)) for label, sequence in sequences.items()),
+            taxon_namespace=taxon_namespace)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--num-taxa", type=int, default=50,
+            help="Number of taxa (default: %(default)s).")
+    parser.add_argument("-c", "--num-characters", type=int, nargs="*",
+            default=[10000, 100000],
+            help="Numbers of characters (default: %(default)s).")
+    parser.add_argument("-p", "--mutation-prob", type=float, default=0.005,
+            help="Probability of each state differing from that of the site (default: %(default)s).")
+    parser.add_argument("-r", "--repeat", type=int, default=3)
+    parser.add_argument("-s", "--seed", type=int, default=1)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+    for num_characters in args.num_characters:
+        tree = dendropy.Tree.get(data=random_rooted_newick(args.num_taxa, rng), schema="newick")
+        chars = random_char_matrix(tree.taxon_namespace, num_characters, args.mutation_prob, rng)
+        site_patterns = chars.compressed_patterns()
+        print("{} taxa, {} characters: {} site patterns".format(
+            args.num_taxa, num_characters, site_patterns.num_patterns))
+        report("    compressed_patterns()", [
+            ("compressing", best_time(chars.compressed_patterns, repeat=args.repeat)),
+            ])
+        for label, fn in (
+                ("parsimony_score()", lambda data: parsimony.parsimony_score(tree, data)),
+                ("fitch_down_pass()", lambda data: parsimony.fitch_down_pass(
+                    tree.postorder_node_iter(),
+                    state_sets_attr_name=None,
+                    taxon_state_sets_map=data if data is site_patterns else data.taxon_state_sets_map())),
+                ("num_segregating_sites()", popgenstat.num_segregating_sites),
+                ("nucleotide_diversity()", popgenstat.nucleotide_diversity),
+                ):
+            report("    {}".format(label), [
+                ("characters", best_time(lambda: fn(chars), repeat=args.repeat)),
+                ("site patterns", best_time(lambda: fn(site_patterns), repeat=args.repeat)),
+                ])
+
+if __name__ == "__main__":
+    main()
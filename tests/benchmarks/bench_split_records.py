@@ -0,0 +1,65 @@
+
+"""
+Benchmarks reading trees into a |TreeArray| by streaming split records
+directly from the tree statements against adding |Tree| objects one by one.
+
+Streaming split records skips the construction of the nodes, edges and
+bipartitions of each tree, which dominates the cost of reading trees once
+tree statements are tokenized and parsed on the fast path.
+"""
+
+import os
+import argparse
+import dendropy
+from tests.benchmarks import tree_source_path, best_time, report
+
+def read_trees_into_tree_array(path, schema, tree_offset, ignore_node_ages):
+    tree_array = dendropy.TreeArray(ignore_node_ages=ignore_node_ages)
+    tree_yielder = dendropy.Tree.yield_from_files(
+            files=[path],
+            schema=schema,
+            taxon_namespace=tree_array.taxon_namespace)
+    for tree_idx, tree in enumerate(tree_yielder):
+        if tree_idx >= tree_offset:
+            tree_array.add_tree(tree)
+    return tree_array
+
+def read_split_records_into_tree_array(path, schema, tree_offset, ignore_node_ages):
+    tree_array = dendropy.TreeArray(ignore_node_ages=ignore_node_ages)
+    tree_array.read_from_files(
+            files=[path],
+            schema=schema,
+            tree_offset=tree_offset)
+    return tree_array
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("paths", nargs="*",
+            help="Files to read (default: test data trees).")
+    parser.add_argument("-f", "--schema", default="nexus")
+    parser.add_argument("-b", "--burnin", type=int, default=0)
+    parser.add_argument("--node-ages", action="store_true", default=False,
+            help="Calculate and store node ages (requires ultrametric trees).")
+    parser.add_argument("-r", "--repeat", type=int, default=3)
+    args = parser.parse_args()
+    paths = args.paths or [
+            tree_source_path("pythonidae.mlboots.newick.tre"),
+            tree_source_path("dendropy-test-trees-n33-unrooted-x100a.nexus"),
+            tree_source_path("cetaceans.mb.no-clock.mcmc.trees"),
+            ]
+    ignore_node_ages = not args.node_ages
+    for path in paths:
+        schema = "newick" if "newick" in path else args.schema
+        rows = []
+        for label, fn in (
+                ("Tree objects", read_trees_into_tree_array),
+                ("split records", read_split_records_into_tree_array),
+                ):
+            rows.append((label, best_time(
+                lambda: fn(path, schema, args.burnin, ignore_node_ages),
+                repeat=args.repeat)))
+        ntrees = len(read_split_records_into_tree_array(path, schema, args.burnin, ignore_node_ages))
+        report("{} ({} trees)".format(os.path.basename(path), ntrees), rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+
+"""
+Benchmarks scoring all the trees of a |TreeArray| by the log product and the
+sum of their split supports (as done by SumTrees to find the maximum clade
+credibility tree) using the pure-Python calculation against the vectorized
+(NumPy) calculation, for trees stored as tuples and in compact storage.
+"""
+
+import os
+import argparse
+from unittest import mock
+import dendropy
+from dendropy.datamodel import treecollectionmodel
+from tests.benchmarks import tree_source_path, best_time, report
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("paths", nargs="*",
+            help="Files to read (default: test data trees).")
+    parser.add_argument("-f", "--schema", default="nexus")
+    parser.add_argument("-r", "--repeat", type=int, default=3)
+    args = parser.parse_args()
+    if treecollectionmodel.numpy is None:
+        parser.error("NumPy is not installed")
+    paths = args.paths or [
+            tree_source_path("dendropy-test-trees-n33-unrooted-x100a.nexus"),
+            tree_source_path("cetaceans.mb.no-clock.mcmc.trees"),
+            ]
+    for path in paths:
+        schema = "newick" if "newick" in path else args.schema
+        for use_compact_storage in (False, True):
+            tree_array = dendropy.TreeArray(use_compact_storage=use_compact_storage)
+            tree_array.read_from_files(files=[path], schema=schema)
+            title = "{} ({} trees, {} taxa, {} storage)".format(
+                    os.path.basename(path),
+                    len(tree_array),
+                    len(tree_array.taxon_namespace),
+                    "compact" if use_compact_storage else "tuple")
+            for method_name in (
+                    "calculate_log_product_of_split_supports",
+                    "calculate_sum_of_split_supports",
+                    ):
+                method = getattr(tree_array, method_name)
+                with mock.patch.object(treecollectionmodel, "numpy", None):
+                    python_time = best_time(method, repeat=args.repeat)
+                report("{}: {}".format(title, method_name), [
+                    ("pure Python", python_time),
+                    ("NumPy", best_time(method, repeat=args.repeat)),
+                    ])
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+
+"""
+Benchmarks looking up taxa by label in a |TaxonNamespace| (with
+``TaxonNamespace.require_taxon()``, as when reading a NEXUS or NEWICK source
+without a translate block, and ``TaxonNamespace.get_taxa()``, as when pruning
+or retaining taxa by label), for namespaces of increasing size.
+
+With the label index, the time per look-up should not depend on the size of
+the namespace.
+"""
+
+import argparse
+import dendropy
+from tests.benchmarks import best_time, report
+
+def require_taxa(labels):
+    taxon_namespace = dendropy.TaxonNamespace()
+    for label in labels:
+        taxon_namespace.require_taxon(label=label)
+    return taxon_namespace
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--num-taxa", type=int, nargs="*",
+            default=[1000, 5000, 10000, 20000],
+            help="Numbers of taxa (default: %(default)s).")
+    parser.add_argument("-l", "--num-lookups", type=int, default=1000)
+    parser.add_argument("-r", "--repeat", type=int, default=3)
+    args = parser.parse_args()
+    taxon_namespaces = []
+    for num_taxa in args.num_taxa:
+        labels = ["T{}".format(i) for i in range(num_taxa)]
+        step = max(1, num_taxa // args.num_lookups)
+        taxon_namespaces.append((require_taxa(labels), labels[::step][:args.num_lookups]))
+    for title, fn in (
+            ("get_taxon (case-sensitive)", lambda tns, labels: [tns.get_taxon(label, is_case_sensitive=True) for label in labels]),
+            ("get_taxon (case-insensitive)", lambda tns, labels: [tns.get_taxon(label) for label in labels]),
+            ("get_taxa", lambda tns, labels: tns.get_taxa(labels)),
+            ):
+        report("{}: {} look-ups".format(title, args.num_lookups), [
+            ("{} taxa".format(len(tns)), best_time(lambda: fn(tns, labels), repeat=args.repeat))
+            for tns, labels in taxon_namespaces])
+    report("require_taxon: building namespace", [
+        ("{} taxa".format(len(tns)), best_time(lambda: require_taxa(tns.labels()), repeat=args.repeat))
+        for tns, labels in taxon_namespaces])
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+
+"""
+Benchmarks the buffered NEXUS/NEWICK tokenizer against the per-character
+engine.
+"""
+
+import os
+import argparse
+from dendropy.dataio import nexusprocessing
+from tests.benchmarks import tree_source_path, best_time, report
+
+def count_tokens(tokenizer_type, path):
+    with open(path) as src:
+        tk = tokenizer_type(src)
+        n = 0
+        for token in tk:
+            tk.clear_captured_comments()
+            n += 1
+    return n
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("paths", nargs="*",
+            help="Files to tokenize (default: test data posteriors).")
+    parser.add_argument("-r", "--repeat", type=int, default=3)
+    args = parser.parse_args()
+    paths = args.paths or [
+            tree_source_path("cetaceans.mb.no-clock.mcmc.trees"),
+            tree_source_path("pythonidae.beast.mcmc.trees"),
+            ]
+    for path in paths:
+        ntokens = count_tokens(nexusprocessing.NexusTokenizer, path)
+        rows = [
+            ("per-character (UnbufferedNexusTokenizer)", best_time(
+                lambda: count_tokens(nexusprocessing.UnbufferedNexusTokenizer, path),
+                repeat=args.repeat)),
+            ("buffered (NexusTokenizer)", best_time(
+                lambda: count_tokens(nexusprocessing.NexusTokenizer, path),
+                repeat=args.repeat)),
+            ]
+        report("{} ({} tokens)".format(os.path.basename(path), ntokens), rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+
+"""
+Benchmarks the memory used by a |TreeArray| storing trees as tuples of split
+bitmasks and edge lengths against one using compact (columnar) storage, as
+well as the time taken to read trees into each and to score the trees
+stored in each.
+
+Memory is measured as the memory allocated (as traced by ``tracemalloc``)
+while reading the trees, and so includes that of the split distribution of
+the collection, which is the same for both.
+"""
+
+import os
+import gc
+import time
+import argparse
+import tracemalloc
+import dendropy
+from tests.benchmarks import tree_source_path, best_time, report
+
+def read_tree_array(path, schema, use_compact_storage):
+    tree_array = dendropy.TreeArray(use_compact_storage=use_compact_storage)
+    tree_array.read_from_files(files=[path], schema=schema)
+    return tree_array
+
+def measure_memory(path, schema, use_compact_storage):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        tree_array = read_tree_array(path, schema, use_compact_storage)
+        gc.collect()
+        size, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return tree_array, size
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("paths", nargs="*",
+            help="Files to read (default: test data trees).")
+    parser.add_argument("-f", "--schema", default="nexus")
+    parser.add_argument("-r", "--repeat", type=int, default=3)
+    args = parser.parse_args()
+    paths = args.paths or [
+            tree_source_path("dendropy-test-trees-n33-unrooted-x100a.nexus"),
+            tree_source_path("cetaceans.mb.no-clock.mcmc.trees"),
+            ]
+    for path in paths:
+        schema = "newick" if "newick" in path else args.schema
+        memory_rows = []
+        read_rows = []
+        score_rows = []
+        for label, use_compact_storage in (
+                ("tuples", False),
+                ("compact", True),
+                ):
+            tree_array, size = measure_memory(path, schema, use_compact_storage)
+            memory_rows.append("{}: {:.1f} MB".format(label, size / 1e6))
+            read_rows.append((label, best_time(
+                lambda: read_tree_array(path, schema, use_compact_storage),
+                repeat=args.repeat)))
+            score_rows.append((label, best_time(
+                lambda: tree_array.calculate_log_product_of_split_supports(),
+                repeat=args.repeat)))
+        title = "{} ({} trees, {} taxa)".format(
+                os.path.basename(path),
+                len(tree_array),
+                len(tree_array.taxon_namespace))
+        report("{}: reading".format(title), read_rows)
+        report("{}: calculate_log_product_of_split_supports".format(title), score_rows)
+        print("    memory: {}".format(", ".join(memory_rows)))
+
+if __name__ == "__main__":
+    main()
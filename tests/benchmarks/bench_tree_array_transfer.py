@@ -0,0 +1,76 @@
+
+"""
+Benchmarks transferring a |TreeArray| between processes, as done by SumTrees
+worker processes, by pickling it and merging it with ``TreeArray.update()``
+against writing and merging its compact form with
+``TreeArray.write_compact()`` and ``TreeArray.read_compact()``.
+
+The cost of serializing is paid in parallel by the worker processes, while the
+cost of deserializing and merging is paid serially by the master process. The
+advantage of the compact form grows with the number of taxa, as each distinct
+split bitmask is only stored once.
+"""
+
+import io
+import os
+import pickle
+import argparse
+import dendropy
+from tests.benchmarks import tree_source_path, best_time, report
+
+def new_master_tree_array(tree_array):
+    return dendropy.TreeArray(
+            taxon_namespace=tree_array.taxon_namespace,
+            ignore_node_ages=tree_array.ignore_node_ages)
+
+def pickle_tree_array(tree_array):
+    return pickle.dumps(tree_array, protocol=pickle.HIGHEST_PROTOCOL)
+
+def unpickle_and_update(tree_array, data):
+    master_tree_array = new_master_tree_array(tree_array)
+    master_tree_array.update(pickle.loads(data))
+
+def write_compact(tree_array):
+    dest = io.BytesIO()
+    tree_array.write_compact(dest)
+    return dest.getvalue()
+
+def read_compact(tree_array, data):
+    master_tree_array = new_master_tree_array(tree_array)
+    master_tree_array.read_compact(io.BytesIO(data))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("paths", nargs="*",
+            help="Files to read (default: test data trees).")
+    parser.add_argument("-f", "--schema", default="nexus")
+    parser.add_argument("--node-ages", action="store_true", default=False,
+            help="Calculate and store node ages (requires ultrametric trees).")
+    parser.add_argument("-r", "--repeat", type=int, default=3)
+    args = parser.parse_args()
+    paths = args.paths or [
+            tree_source_path("dendropy-test-trees-n33-unrooted-x100a.nexus"),
+            tree_source_path("cetaceans.mb.no-clock.mcmc.trees"),
+            ]
+    for path in paths:
+        schema = "newick" if "newick" in path else args.schema
+        tree_array = dendropy.TreeArray(ignore_node_ages=not args.node_ages)
+        tree_array.read_from_files(files=[path], schema=schema)
+        pickled_data = pickle_tree_array(tree_array)
+        compact_data = write_compact(tree_array)
+        title = "{} ({} trees, {} taxa)".format(
+                os.path.basename(path),
+                len(tree_array),
+                len(tree_array.taxon_namespace))
+        report("{}: serializing (worker)".format(title), [
+            ("pickle.dumps", best_time(lambda: pickle_tree_array(tree_array), repeat=args.repeat)),
+            ("write_compact", best_time(lambda: write_compact(tree_array), repeat=args.repeat)),
+            ])
+        report("{}: merging (master)".format(title), [
+            ("pickle.loads + update", best_time(lambda: unpickle_and_update(tree_array, pickled_data), repeat=args.repeat)),
+            ("read_compact", best_time(lambda: read_compact(tree_array, compact_data), repeat=args.repeat)),
+            ])
+        print("    size: {} bytes pickled, {} bytes compact".format(len(pickled_data), len(compact_data)))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+
+"""
+Benchmarks building a |TreeDistanceOracle| (``Tree.lca_index()``) for trees
+of increasing numbers of taxa, and answering random patristic distance and
+MRCA queries between pairs of taxa with it, one pair at a time and many
+pairs at a time, against ``treemeasure.patristic_distance()`` and
+``Tree.mrca()``, which walk the tree for each query.
+
+The trees are random trees generated for each number of taxa, as the test data
+trees are all small.
+"""
+
+import random
+import argparse
+import dendropy
+from dendropy.calculate import treemeasure
+from tests.benchmarks import best_time, report
+from tests.benchmarks.bench_phylogenetic_distance_matrix import random_newick
+
+def walk_distances(tree, pairs):
+    for taxon1, taxon2 in pairs:
+        treemeasure.patristic_distance(tree, taxon1, taxon2, is_bipartitions_updated=True)
+
+def walk_mrcas(tree, pairs):
+    for taxon1, taxon2 in pairs:
+        tree.mrca(taxa=[taxon1, taxon2], is_bipartitions_updated=True)
+
+def oracle_distances(lca_index, pairs):
+    for taxon1, taxon2 in pairs:
+        lca_index.patristic_distance(taxon1, taxon2)
+
+def oracle_mrcas(lca_index, pairs):
+    for taxon1, taxon2 in pairs:
+        lca_index.mrca(taxon1, taxon2)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--num-taxa", type=int, nargs="*",
+            default=[1000, 10000, 50000],
+            help="Numbers of taxa (default: %(default)s).")
+    parser.add_argument("-q", "--num-queries", type=int, default=100000)
+    parser.add_argument("-w", "--num-walk-queries", type=int, default=20,
+            help="Number of queries answered by walking the tree (default: %(default)s).")
+    parser.add_argument("-r", "--repeat", type=int, default=3)
+    parser.add_argument("-s", "--seed", type=int, default=1)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+    build_rows = []
+    for num_taxa in args.num_taxa:
+        tree = dendropy.Tree.get(data=random_newick(num_taxa, rng), schema="newick", rooting="force-rooted")
+        tree.encode_bipartitions()
+        taxa = list(tree.taxon_namespace)
+        pairs = [(rng.choice(taxa), rng.choice(taxa)) for i in range(args.num_queries)]
+        walk_pairs = pairs[:args.num_walk_queries]
+        build_rows.append(("{} taxa".format(num_taxa), best_time(tree.lca_index, repeat=args.repeat)))
+        lca_index = tree.lca_index()
+        report("{} taxa: patristic distance (per 1000 queries)".format(num_taxa), [
+            ("treemeasure.patristic_distance", best_time(lambda: walk_distances(tree, walk_pairs), repeat=1) / len(walk_pairs) * 1000),
+            ("patristic_distance", best_time(lambda: oracle_distances(lca_index, pairs), repeat=args.repeat) / len(pairs) * 1000),
+            ("patristic_distances", best_time(lambda: lca_index.patristic_distances(pairs), repeat=args.repeat) / len(pairs) * 1000),
+            ])
+        report("{} taxa: MRCA (per 1000 queries)".format(num_taxa), [
+            ("Tree.mrca", best_time(lambda: walk_mrcas(tree, walk_pairs), repeat=1) / len(walk_pairs) * 1000),
+            ("mrca", best_time(lambda: oracle_mrcas(lca_index, pairs), repeat=args.repeat) / len(pairs) * 1000),
+            ("mrcas", best_time(lambda: lca_index.mrcas(pairs), repeat=args.repeat) / len(pairs) * 1000),
+            ])
+    report("lca_index", build_rows)
+
+if __name__ == "__main__":
+    main()
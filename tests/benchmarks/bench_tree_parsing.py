@@ -0,0 +1,54 @@
+
+"""
+Benchmarks the fast-path tree statement parser against the general parser.
+
+The target for the fast path is a 5-10x reduction in the time spent
+tokenizing and parsing tree statements. Both parsers produce the same |Tree|
+objects, however, so the time spent constructing, annotating and linking the
+nodes is shared, and bounds the overall gain: expect about 2x end-to-end over
+the original (per-character tokenizer and general parser) configuration for
+plain trees, and less for files with extensive node metadata (e.g., BEAST
+posteriors), where parsing the metadata comments dominates.
+"""
+
+import os
+import argparse
+import dendropy
+from tests.benchmarks import tree_source_path, best_time, report
+
+def read_trees(path, schema, **kwargs):
+    return dendropy.TreeList.get(path=path, schema=schema, **kwargs)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("paths", nargs="*",
+            help="Files to parse (default: test data trees).")
+    parser.add_argument("-f", "--schema", default="nexus")
+    parser.add_argument("-r", "--repeat", type=int, default=3)
+    args = parser.parse_args()
+    paths = args.paths or [
+            tree_source_path("pythonidae.mlboots.newick.tre"),
+            tree_source_path("dendropy-test-trees-n33-unrooted-x100a.nexus"),
+            tree_source_path("cetaceans.mb.no-clock.mcmc.trees"),
+            tree_source_path("pythonidae.beast.mcmc.trees"),
+            ]
+    for path in paths:
+        schema = "newick" if "newick" in path else args.schema
+        configurations = (
+            ("per-character tokenizer, general parser",
+                dict(buffered_tokenizer=False, fast_tree_parsing=False)),
+            ("buffered tokenizer, general parser",
+                dict(fast_tree_parsing=False)),
+            ("buffered tokenizer, fast path parser",
+                dict()),
+            )
+        rows = []
+        for label, kwargs in configurations:
+            rows.append((label, best_time(
+                lambda: read_trees(path, schema, **kwargs),
+                repeat=args.repeat)))
+        ntrees = len(read_trees(path, schema))
+        report("{} ({} trees)".format(os.path.basename(path), ntrees), rows)
+
+if __name__ == "__main__":
+    main()
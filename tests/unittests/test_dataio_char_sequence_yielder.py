@@ -0,0 +1,167 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+##############################################################################
+##  DendroPy Phylogenetic Computing Library.
+##
+##  Copyright 2010-2015 Jeet Sukumaran and Mark T. Holder.
+##  All rights reserved.
+##
+##  See "LICENSE.rst" for terms and conditions of usage.
+##
+##  If you use this work or any portion thereof in published work,
+##  please cite it as:
+##
+##     Sukumaran, J. and M. T. Holder. 2010. DendroPy: a Python library
+##     for phylogenetic computing. Bioinformatics 26: 1569-1571.
+##
+##############################################################################
+
+"""
+Tests for iteration over the sequences of character data sources.
+"""
+
+import sys
+import unittest
+import dendropy
+import os
+from io import StringIO
+from dendropy.utility import error
+sys.path.insert(0, os.path.dirname(__file__))
+from support import dendropytest
+from support import pathmap
+
+class CharacterSequenceYielderTestCase(dendropytest.ExtendedTestCase):
+
+    sources = (
+        (dendropy.DnaCharacterMatrix, "standard-test-chars-dna.fasta", "fasta", {}),
+        (dendropy.DnaCharacterMatrix, "standard-test-chars-dna.relaxed.phylip", "phylip", {}),
+        (dendropy.DnaCharacterMatrix, "pythonidae.chars.phylip", "phylip", {}),
+        (dendropy.DnaCharacterMatrix, "standard-test-chars-dna.basic.nexus", "nexus", {}),
+        (dendropy.DnaCharacterMatrix, "standard-test-chars-dna.interleaved.nexus", "nexus", {}),
+        (dendropy.DnaCharacterMatrix, "standard-test-chars-dna.matchchar.nexus", "nexus", {}),
+        (dendropy.ProteinCharacterMatrix, "standard-test-chars-protein.fasta", "fasta", {}),
+        (dendropy.StandardCharacterMatrix, "standard-test-chars-generic.basic.nexus", "nexus", {}),
+        (dendropy.StandardCharacterMatrix, "standard-test-chars-generic.relaxed.phylip", "phylip", {}),
+        (dendropy.ContinuousCharacterMatrix, "standard-test-chars-continuous.interleaved.phylip", "phylip", {"interleaved": True}),
+        (dendropy.ContinuousCharacterMatrix, "standard-test-chars-continuous.mesquite.nexus", "nexus", {}),
+    )
+
+    def verify_sequences(self, matrix_type, src_filename, schema, kwargs, column_window=None, compact=None):
+        src_path = pathmap.char_source_path(src_filename)
+        expected = matrix_type.get(path=src_path, schema=schema, **kwargs)
+        if compact is not None:
+            kwargs = dict(kwargs, compact=compact)
+        tns = dendropy.TaxonNamespace()
+        sequences = matrix_type.yield_sequences_from_files(
+                files=[src_path, open(src_path, "r")],
+                schema=schema,
+                taxon_namespace=tns,
+                column_window=column_window,
+                **kwargs)
+        items = list(sequences)
+        self.assertEqual(len(items), 2 * len(expected))
+        self.assertEqual(len(tns), len(expected))
+        start, stop = column_window or (None, None)
+        for idx, (taxon, sequence) in enumerate(items):
+            self.assertIs(taxon, tns[idx % len(expected)])
+            expected_sequence = expected[taxon.label]
+            self.assertEqual(
+                    [str(v) for v in sequence],
+                    [str(v) for v in expected_sequence][start:stop])
+            if compact:
+                self.assertIsInstance(sequence, dendropy.CompactFixedAlphabetCharacterDataSequence)
+
+    def test_sequences(self):
+        for matrix_type, src_filename, schema, kwargs in self.sources:
+            with self.subTest(src_filename=src_filename):
+                self.verify_sequences(matrix_type, src_filename, schema, kwargs)
+
+    def test_column_window(self):
+        for matrix_type, src_filename, schema, kwargs in self.sources:
+            for column_window in ((0, 10), (5, 17), (30, None), (1000, 2000)):
+                with self.subTest(src_filename=src_filename, column_window=column_window):
+                    self.verify_sequences(matrix_type, src_filename, schema, kwargs,
+                            column_window=column_window)
+
+    def test_compact(self):
+        for matrix_type, src_filename, schema, kwargs in self.sources[:6]:
+            with self.subTest(src_filename=src_filename):
+                self.verify_sequences(matrix_type, src_filename, schema, kwargs,
+                        column_window=(5, 17),
+                        compact=True)
+
+    def test_interleaved_phylip(self):
+        src_path = pathmap.char_source_path("standard-test-chars-dna.relaxed.phylip")
+        expected = dendropy.DnaCharacterMatrix.get(path=src_path, schema="phylip")
+        ntax = len(expected)
+        nchar = expected.max_sequence_size
+        lines = []
+        for idx in range(0, nchar, 50):
+            for taxon in expected:
+                label = taxon.label.replace(" ", "_") if idx == 0 else ""
+                lines.append("{} {}".format(label, expected[taxon].symbols_as_string()[idx:idx+50]))
+        data = "{} {}\n{}\n".format(ntax, nchar, "\n".join(lines))
+        tns = dendropy.TaxonNamespace()
+        for compact in (False, True):
+            items = list(dendropy.DnaCharacterMatrix.yield_sequences_from_files(
+                    files=[StringIO(data), StringIO(data)],
+                    schema="phylip",
+                    taxon_namespace=tns,
+                    interleaved=True,
+                    underscores_to_spaces=True,
+                    compact=compact))
+            self.assertEqual(len(items), 2 * ntax)
+            self.assertEqual(len(tns), ntax)
+            for taxon, sequence in items:
+                self.assertIn(taxon, tns)
+                self.assertEqual(sequence.symbols_as_string(), expected[taxon.label].symbols_as_string())
+
+    def test_multiple_char_blocks(self):
+        src_path = pathmap.char_source_path("standard-test-chars-multiple-char-blocks.1.basic.nexus")
+        dataset = dendropy.DataSet.get(path=src_path, schema="nexus")
+        for char_matrix in dataset.char_matrices:
+            items = list(char_matrix.__class__.yield_sequences_from_files(
+                    files=[src_path],
+                    schema="nexus"))
+            self.assertEqual(len(items), len(char_matrix))
+            for taxon, sequence in items:
+                self.assertEqual(sequence.symbols_as_string(), char_matrix[taxon.label].symbols_as_string())
+
+    def test_data_type(self):
+        src_path = pathmap.char_source_path("standard-test-chars-protein.fasta")
+        expected = dendropy.ProteinCharacterMatrix.get(path=src_path, schema="fasta")
+        items = list(dendropy.CharacterMatrix.yield_sequences_from_files(
+                files=[src_path],
+                schema="fasta",
+                data_type="protein"))
+        self.assertEqual(len(items), len(expected))
+        for taxon, sequence in items:
+            self.assertIsInstance(sequence, dendropy.ProteinCharacterMatrix.character_sequence_type)
+            self.assertEqual(sequence.values(), expected[taxon.label].values())
+        with self.assertRaises(TypeError):
+            dendropy.CharacterMatrix.yield_sequences_from_files(files=[src_path], schema="fasta")
+        with self.assertRaises(ValueError):
+            dendropy.DnaCharacterMatrix.yield_sequences_from_files(files=[src_path], schema="fasta", data_type="protein")
+        with self.assertRaises(ValueError):
+            dendropy.ProteinCharacterMatrix.yield_sequences_from_files(files=[src_path], schema="fasta", column_window=(-10, None))
+        with self.assertRaises(ValueError):
+            dendropy.ProteinCharacterMatrix.yield_sequences_from_files(files=[src_path], schema="fasta", column_window=(5, 2))
+        with self.assertRaises(NotImplementedError):
+            dendropy.ProteinCharacterMatrix.yield_sequences_from_files(files=[src_path], schema="nexml")
+
+    def test_sequences_yielded_before_error(self):
+        data = ">t1\nACGT\n>t2\nAC%T\n"
+        sequences = iter(dendropy.DnaCharacterMatrix.yield_sequences_from_files(
+                files=[StringIO(data)],
+                schema="fasta"))
+        taxon, sequence = next(sequences)
+        self.assertEqual(taxon.label, "t1")
+        self.assertEqual(sequence.symbols_as_string(), "ACGT")
+        with self.assertRaises(error.DataParseError) as cm:
+            next(sequences)
+        self.assertEqual(cm.exception.line_num, 4)
+        self.assertEqual(cm.exception.col_num, 3)
+
+if __name__ == "__main__":
+    unittest.main()
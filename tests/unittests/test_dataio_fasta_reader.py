@@ -50,6 +50,27 @@ class FastaDnaReaderTestCase(
                 check_column_annotations=False,
                 check_cell_annotations=False)
 
+    def test_basic_fasta_compact(self):
+        src_path = pathmap.char_source_path("standard-test-chars-dna.fasta")
+        self.verify_get_from(
+                matrix_type=dendropy.DnaCharacterMatrix,
+                src_filepath=src_path,
+                schema="fasta",
+                factory_kwargs={"compact": True},
+                check_taxon_annotations=False,
+                check_matrix_annotations=False,
+                check_sequence_annotations=False,
+                check_column_annotations=False,
+                check_cell_annotations=False)
+
+    def test_unrecognized_symbol(self):
+        s = ">t1\nACGT\n>t2\nAC J\n"
+        for compact in (False, True):
+            with self.assertRaises(dendropy.utility.error.DataParseError) as cm:
+                dendropy.DnaCharacterMatrix.get(data=s, schema="fasta", compact=compact)
+            self.assertEqual(cm.exception.line_num, 4)
+            self.assertEqual(cm.exception.col_num, 4)
+
 class FastaRnaReaderTestCase(
         standard_file_test_chars.RnaTestChecker,
         dendropytest.ExtendedTestCase):
@@ -92,5 +113,18 @@ class FastaProteinReaderTestCase(
                 check_column_annotations=False,
                 check_cell_annotations=False)
 
+    def test_basic_fasta_compact(self):
+        src_path = pathmap.char_source_path("standard-test-chars-protein.fasta")
+        self.verify_get_from(
+                matrix_type=dendropy.ProteinCharacterMatrix,
+                src_filepath=src_path,
+                schema="fasta",
+                factory_kwargs={"compact": True},
+                check_taxon_annotations=False,
+                check_matrix_annotations=False,
+                check_sequence_annotations=False,
+                check_column_annotations=False,
+                check_cell_annotations=False)
+
 if __name__ == "__main__":
     unittest.main()
@@ -1068,5 +1068,89 @@ class NewickInternalLabelAssociationTest(unittest.TestCase):
                         self.assertEqual(nd.label, expected_label)
                         self.assertIs(nd.edge.label, None)
 
+class NewickTreeFastPathParsingTest(dendropytest.ExtendedTestCase):
+    """
+    Checks that the fast-path tree statement parser produces the same trees,
+    and raises the same errors, as the general parser.
+    """
+
+    tree_strings = (
+            "(a,b,c);",
+            "(a,(b,c)d)e;",
+            "(a:1,(b:2,c:3)d:4)e:5;",
+            "((a:1e-3,b:.2)[&x=1]:3[&y=2],c);",
+            "[&R] ((a,b),(c,d));[&U] ((a,c),(b,d));;",
+            "(a_b,'a_b c','x''y':2,(d,e)'f g':1);",
+            "([c1]a[c2]:[c3]1[c4],[c5](b,c)[c6]x[c7]:2[c8])[c9]r[c10];",
+            "([&a=1,b={1,2}]a,b[&&NHX:c=3:d=4])[&e=\"x\"];",
+            "(a ,\n b\t,\r\n(c, d) );",
+            "((a,b),c)[bad[nested]comment];",
+            "([c]'a',b);",
+            "(a[c]b,c);",
+            "(a,b)c d;",
+            "(a,b:x);",
+            "(a,b:1:2);",
+            "(a,,b);",
+            "(a,b,);",
+            "((),a);",
+            "((a,b),c));",
+            "(((a,b),c);",
+            "(a,b),c;",
+            "(a,b)",
+            "(a,b{1});",
+            )
+
+    def tree_description(self, trees, finished):
+        desc = []
+        for tree in trees:
+            desc.append((tree.is_rooted, tree.comments,
+                sorted((a.name, str(a.value)) for a in tree.annotations)))
+            for nd in tree.preorder_node_iter():
+                desc.append((
+                    nd.label,
+                    nd.taxon.label if nd.taxon is not None else None,
+                    nd.edge.length,
+                    nd.edge.label,
+                    nd.comments,
+                    sorted((a.name, str(a.value)) for a in nd.annotations),
+                    finished.index(nd),
+                    ))
+        return desc
+
+    def parse(self, tree_string, **kwargs):
+        finished = []
+        try:
+            trees = dendropy.TreeList.get(
+                    data=tree_string,
+                    schema="newick",
+                    finish_node_fn=finished.append,
+                    **kwargs)
+        except error.DataParseError as exc:
+            return exc.__class__
+        return self.tree_description(trees, finished)
+
+    def test_equivalence(self):
+        for tree_string in self.tree_strings:
+            for kwargs in (
+                    {},
+                    {"suppress_internal_node_taxa": False},
+                    {"suppress_leaf_node_taxa": True, "is_assign_internal_labels_to_edges": True},
+                    {"preserve_underscores": True, "suppress_edge_lengths": True},
+                    {"extract_comment_metadata": False, "terminating_semicolon_required": False},
+                    ):
+                expected = self.parse(tree_string, fast_tree_parsing=False, **kwargs)
+                observed = self.parse(tree_string, **kwargs)
+                self.assertEqual(observed, expected, tree_string)
+
+    def test_duplicate_taxa(self):
+        tree_string = "(a,(b,\n c),\n  (d, b));"
+        with self.assertRaises(newickreader.NewickReader.NewickReaderDuplicateTaxonError) as cm:
+            dendropy.Tree.get(data=tree_string, schema="newick",
+                    fast_tree_parsing=False)
+        expected = (cm.exception.line_num, cm.exception.col_num)
+        with self.assertRaises(newickreader.NewickReader.NewickReaderDuplicateTaxonError) as cm:
+            dendropy.Tree.get(data=tree_string, schema="newick")
+        self.assertEqual((cm.exception.line_num, cm.exception.col_num), expected)
+
 if __name__ == "__main__":
     unittest.main()
@@ -64,6 +64,27 @@ class NexusCharactersReaderDnaTestCase(
                     check_column_annotations=False,
                     check_cell_annotations=False)
 
+    def test_basic_nexus_compact(self):
+        src_filenames = [
+                "standard-test-chars-dna.simple.nexus",
+                "standard-test-chars-dna.basic.nexus",
+                "standard-test-chars-dna.interleaved.nexus",
+                "standard-test-chars-dna.matchchar.nexus",
+                "standard-test-chars-dna.multi.nexus",
+                ]
+        for src_idx, src_filename in enumerate(src_filenames):
+            src_path = pathmap.char_source_path(src_filename)
+            self.verify_get_from(
+                    matrix_type=dendropy.DnaCharacterMatrix,
+                    src_filepath=src_path,
+                    schema="nexus",
+                    factory_kwargs={"compact": True},
+                    check_taxon_annotations=False,
+                    check_matrix_annotations=False,
+                    check_sequence_annotations=False,
+                    check_column_annotations=False,
+                    check_cell_annotations=False)
+
 class NexusCharactersReaderRnaTestCase(
         standard_file_test_chars.RnaTestChecker,
         dendropytest.ExtendedTestCase):
@@ -61,6 +61,19 @@ class PhylipCharactersReaderDnaTestCase(
                     check_column_annotations=False,
                     check_cell_annotations=False)
 
+    def test_basic_phylip_compact(self):
+        src_path = pathmap.char_source_path("standard-test-chars-dna.relaxed.phylip")
+        self.verify_get_from(
+                matrix_type=dendropy.DnaCharacterMatrix,
+                src_filepath=src_path,
+                schema="phylip",
+                factory_kwargs={"compact": True},
+                check_taxon_annotations=False,
+                check_matrix_annotations=False,
+                check_sequence_annotations=False,
+                check_column_annotations=False,
+                check_cell_annotations=False)
+
 class PhylipCharactersReaderRnaTestCase(
         standard_file_test_chars.RnaTestChecker,
         dendropytest.ExtendedTestCase):
@@ -254,6 +267,35 @@ AAACCATTGC CGGTACGCTT AA
             self.assertEqual(taxon.label, expected_taxon)
             self.assertEqual(char_matrix[taxon].symbols_as_string(), self.expected_seqs[expected_taxon])
 
+    def test_strict_interleaved_with_bad_chars_compact(self):
+        s = """\
+5    42
+Turkey    AAGCTNGGGC ATTTCA3828GGGT
+Salmo gairAAGCCTTGGC AGTGCA3828GGGT
+H. SapiensACCGGTTGGC CGTTCA3828GGGT
+Chimp     AAACCCTTGC CGTTAC3828GCTT
+Gorilla   AAACCCTTGC CGGTAC3828GCTT
+
+GAGCCCGGGC AATACAGGGT AT
+GAGCCGTGGC CGGGCACGGT AT
+ACAGGTTGGC CGTTCAGGGT AA
+AAACCGAGGC CGGGACACTC AT
+AAACCATTGC CGGTACGCTT AA
+        """
+        char_matrix = dendropy.DnaCharacterMatrix.get_from_string(
+                s,
+                "phylip",
+                interleaved=True,
+                strict=True,
+                ignore_invalid_chars=True,
+                compact=True)
+        self.assertTrue(char_matrix.is_compact)
+        self.assertEqual(len(char_matrix), len(self.expected_seqs))
+        self.assertEqual(len(char_matrix.taxon_namespace), len(self.expected_seqs))
+        for taxon, expected_taxon in zip(char_matrix, self.expected_seqs):
+            self.assertEqual(taxon.label, expected_taxon)
+            self.assertEqual(char_matrix[taxon].symbols_as_string(), self.expected_seqs[expected_taxon])
+
 class PhylipContinuousVariantsTestCases(dendropytest.ExtendedTestCase):
 
     @classmethod
@@ -21,21 +21,28 @@
 Tests for tokenizers classes.
 """
 
+import os
+import sys
 from io import StringIO
 import unittest
 from dendropy.dataio import nexusprocessing
+from dendropy.dataio import tokenizer
+sys.path.insert(0, os.path.dirname(__file__))
+from support import pathmap
 
 class NexusTokenizerTestCase(unittest.TestCase):
     """
     Unit tests for NexusTokenizer.
     """
 
+    tokenizer_type = nexusprocessing.NexusTokenizer
+
     def check_tokenization(self,
             input_str,
             expected_tokens):
         src = StringIO(input_str)
         observed = []
-        for token in nexusprocessing.NexusTokenizer(src=src):
+        for token in self.tokenizer_type(src=src):
             observed.append(token)
         self.assertEqual(observed, expected_tokens)
 
@@ -146,7 +153,7 @@ class NexusTokenizerTestCase(unittest.TestCase):
                 ]
         src = StringIO(input_str)
         observed_tokens = []
-        tk = nexusprocessing.NexusTokenizer(src=src)
+        tk = self.tokenizer_type(src=src)
         for token in tk:
             if token in expected_comments:
                 expected_comment = expected_comments[token]
@@ -157,5 +164,74 @@ class NexusTokenizerTestCase(unittest.TestCase):
         self.assertEqual(expected_comments, {})
         self.assertEqual(observed_tokens, expected_tokens)
 
+class UnbufferedNexusTokenizerTestCase(NexusTokenizerTestCase):
+    """
+    Unit tests for UnbufferedNexusTokenizer.
+    """
+
+    tokenizer_type = nexusprocessing.UnbufferedNexusTokenizer
+
+class BufferedTokenizerEquivalenceTestCase(unittest.TestCase):
+    """
+    Checks that the buffered engine reproduces the tokens, comments and
+    position reporting of the per-character engine, including across buffer
+    boundaries.
+    """
+
+    def tokenize(self, tk):
+        results = []
+        count = 0
+        while True:
+            try:
+                token = tk.require_next_token()
+            except tokenizer.Tokenizer.TokenizerError as e:
+                results.append((e.__class__.__name__, e.line_num, e.col_num))
+                break
+            count += 1
+            if count % 40 == 0:
+                tk.set_capture_eol(count % 80 == 0)
+            results.append((
+                token,
+                tk.is_token_quoted,
+                tk.token_line_num,
+                tk.token_column_num,
+                tk.current_line_num,
+                tk.current_column_num,
+                tk.pull_captured_comments(),
+                tk.is_eof(),
+                ))
+        return results
+
+    def check_equivalence(self, input_str):
+        expected = self.tokenize(nexusprocessing.UnbufferedNexusTokenizer(StringIO(input_str)))
+        for buffer_size in (1, 2, 3, 7, 64, None):
+            tk = nexusprocessing.NexusTokenizer(StringIO(input_str), buffer_size=buffer_size)
+            self.assertEqual(self.tokenize(tk), expected)
+
+    def test_edge_cases(self):
+        for input_str in (
+                "",
+                "   \n ",
+                "a",
+                "'abc",
+                "[unterminated",
+                "abc[c]",
+                "[c];",
+                "[&R] (a:1[&x=1,y={1,2}],b_c:2)'x''y':3;\n",
+                "a''b 'x''y'z [a[b]c]d ]e",
+                "x_y 'x_y'\n\n",
+                "\n\n  abc\n  d-e:f\r\n",
+                ):
+            self.check_equivalence(input_str)
+
+    def test_data_files(self):
+        for filename in (
+                "pythonidae.reference-trees.nexus",
+                "pythonidae.reference-trees.newick",
+                "dendropy-test-trees-multifurcating-rooted-annotated.nexus",
+                ):
+            with open(pathmap.tree_source_path(filename)) as src:
+                self.check_equivalence(src.read())
+
 if __name__ == "__main__":
     unittest.main()
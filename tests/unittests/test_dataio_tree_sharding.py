@@ -0,0 +1,178 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+##############################################################################
+##  DendroPy Phylogenetic Computing Library.
+##
+##  Copyright 2010-2015 Jeet Sukumaran and Mark T. Holder.
+##  All rights reserved.
+##
+##  See "LICENSE.rst" for terms and conditions of usage.
+##
+##  If you use this work or any portion thereof in published work,
+##  please cite it as:
+##
+##     Sukumaran, J. and M. T. Holder. 2010. DendroPy: a Python library
+##     for phylogenetic computing. Bioinformatics 26: 1569-1571.
+##
+##############################################################################
+
+"""
+Tests for splitting tree files into shards that can be read independently.
+"""
+
+import unittest
+import os
+import sys
+import tempfile
+sys.path.insert(0, os.path.dirname(__file__))
+from support import pathmap
+import dendropy
+from dendropy.dataio import treesharding
+from dendropy.application import sumtrees
+
+class TreeStatementIndexTest(unittest.TestCase):
+
+    def write_source(self, text):
+        f = tempfile.NamedTemporaryFile(mode="w", suffix=".tre", delete=False)
+        f.write(text)
+        f.close()
+        self.addCleanup(os.remove, f.name)
+        return f.name
+
+    def read_shards(self, shards, schema, taxon_namespace):
+        trees = dendropy.TreeList(taxon_namespace=taxon_namespace)
+        for shard in shards:
+            with shard.open() as src:
+                trees.read(file=src, schema=schema)
+        return trees
+
+    def check_shards(self, path, schema, num_trees):
+        taxon_namespace = dendropy.TaxonNamespace()
+        expected = dendropy.TreeList.get(
+                path=path,
+                schema=schema,
+                taxon_namespace=taxon_namespace)
+        tree_statement_index = treesharding.TreeStatementIndex.build(path)
+        self.assertEqual(len(tree_statement_index), num_trees)
+        self.assertEqual(len(expected), num_trees)
+        for num_shards, tree_offset in ((1, 0), (3, 0), (4, 2), (num_trees + 2, 1)):
+            shards = tree_statement_index.shards(num_shards, tree_offset=tree_offset)
+            self.assertEqual(len(shards), min(num_shards, num_trees - tree_offset))
+            self.assertEqual([s.first_tree_offset for s in shards],
+                    [tree_offset] + [s.first_tree_offset + s.num_trees for s in shards[:-1]])
+            trees = self.read_shards(shards, schema, taxon_namespace)
+            self.assertEqual(len(trees), num_trees - tree_offset)
+            for t1, t2 in zip(trees, expected[tree_offset:]):
+                self.assertEqual(t1.label, t2.label)
+                self.assertEqual(t1.as_string("newick"), t2.as_string("newick"))
+
+    def test_nexus(self):
+        self.check_shards(
+                pathmap.tree_source_path("pythonidae.reference-trees.nexus"),
+                "nexus",
+                11)
+        self.check_shards(
+                pathmap.tree_source_path("cetaceans.mb.no-clock.mcmc.trees"),
+                "nexus",
+                251)
+
+    def test_newick(self):
+        self.check_shards(
+                pathmap.tree_source_path("dendropy-test-trees-n33-unrooted-x10a.newick"),
+                "newick",
+                10)
+
+    def test_quoted_and_commented_statements(self):
+        path = self.write_source(
+                "#NEXUS\n"
+                "[comment; with [nested; ] semi-colons]\n"
+                "begin taxa; dimensions ntax=3; taxlabels 'a;1' b c; end;\n"
+                "Begin Trees;\n"
+                "    Translate 1 'a;1', 2 b, 3 c;\n"
+                "    tree 'one;' = [&R] (1:1,(2:1,3:1)[&x=';']:1);\n"
+                "    tree two = [&U] ((1,2),3);\n"
+                "    TREE three = (1,(2,3));\n"
+                "End;\n"
+                "[trailing comment]\n")
+        self.check_shards(path, "nexus", 3)
+
+    def test_unsupported_sources(self):
+        for text in (
+                # multiple tree blocks
+                "#NEXUS\nbegin trees; tree t = (a,(b,c)); end;\nbegin trees; tree t = (a,(b,c)); end;\n",
+                # non-contiguous tree statements
+                "#NEXUS\nbegin trees; tree t = (a,(b,c)); title x; tree u = (a,(b,c)); end;\n",
+                # unterminated statement
+                "(a,(b,c));\n((a,b),c)\n",
+                # unbalanced comment
+                "(a,(b,c));\n[((a,b),c);\n",
+                "",
+                ):
+            path = self.write_source(text)
+            self.assertIs(treesharding.TreeStatementIndex.build(path), None)
+
+class SumTreesShardedAnalysisTest(unittest.TestCase):
+
+    def get_tree_processor(self, num_processes):
+        return sumtrees.TreeProcessor(
+                is_source_trees_rooted=None,
+                ignore_edge_lengths=False,
+                ignore_node_ages=False,
+                use_tree_weights=False,
+                ultrametricity_precision=0.0000001,
+                taxon_label_age_map=None,
+                num_processes=num_processes,
+                log_frequency=0,
+                messenger=None,
+                debug_mode=True)
+
+    def test_shard_tree_sources(self):
+        tree_processor = self.get_tree_processor(3)
+        path = pathmap.tree_source_path("cetaceans.mb.strict-clock.mcmc.trees")
+        shards = tree_processor.shard_tree_sources([path], "nexus/newick", tree_offset=10)
+        self.assertEqual(len(shards), 3)
+        self.assertEqual(shards[0].first_tree_offset, 10)
+        self.assertIs(tree_processor.shard_tree_sources([path, path], "nexus", tree_offset=10), None)
+        self.assertIs(tree_processor.shard_tree_sources([path], "nexml", tree_offset=10), None)
+
+    def test_parallel_analysis_of_single_source(self):
+        path = pathmap.tree_source_path("cetaceans.mb.strict-clock.mcmc.trees")
+        tree_arrays = []
+        for num_processes in (1, 3):
+            tree_arrays.append(self.get_tree_processor(num_processes).analyze_trees(
+                    tree_sources=[path],
+                    schema="nexus",
+                    tree_offset=20))
+        sd1 = tree_arrays[0].split_distribution
+        sd2 = tree_arrays[1].split_distribution
+        self.assertEqual(len(tree_arrays[0]), len(tree_arrays[1]))
+        self.assertEqual(sd1.total_trees_counted, sd2.total_trees_counted)
+        self.assertEqual(sd1.split_counts, sd2.split_counts)
+        for split in sd1.split_counts:
+            self.assertEqual(sorted(sd1.split_edge_lengths[split]), sorted(sd2.split_edge_lengths[split]))
+            self.assertEqual(sorted(sd1.split_node_ages[split]), sorted(sd2.split_node_ages[split]))
+        # the results of the shards are merged in the order of the trees
+        for idx in range(len(tree_arrays[0])):
+            self.assertEqual(
+                    tree_arrays[0].get_split_bitmask_and_edge_tuple(idx),
+                    tree_arrays[1].get_split_bitmask_and_edge_tuple(idx))
+
+    def test_parallel_analysis_of_multiple_sources(self):
+        paths = [pathmap.tree_source_path(f) for f in (
+            "cetaceans.mb.strict-clock.mcmc.trees",
+            "cetaceans.mb.strict-clock.mcmc.weighted-01.trees")]
+        tree_arrays = []
+        for num_processes in (1, 3):
+            tree_arrays.append(self.get_tree_processor(num_processes).analyze_trees(
+                    tree_sources=paths,
+                    schema="nexus",
+                    tree_offset=20))
+        self.assertEqual(len(tree_arrays[0]), len(tree_arrays[1]))
+        for idx in range(len(tree_arrays[0])):
+            self.assertEqual(
+                    tree_arrays[0].get_split_bitmask_and_edge_tuple(idx),
+                    tree_arrays[1].get_split_bitmask_and_edge_tuple(idx))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,208 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+##############################################################################
+##  DendroPy Phylogenetic Computing Library.
+##
+##  Copyright 2010-2015 Jeet Sukumaran and Mark T. Holder.
+##  All rights reserved.
+##
+##  See "LICENSE.rst" for terms and conditions of usage.
+##
+##  If you use this work or any portion thereof in published work,
+##  please cite it as:
+##
+##     Sukumaran, J. and M. T. Holder. 2010. DendroPy: a Python library
+##     for phylogenetic computing. Bioinformatics 26: 1569-1571.
+##
+##############################################################################
+
+"""
+Tests in-place updating of bipartitions by tree editing methods.
+"""
+
+import random
+import unittest
+import dendropy
+from support import pathmap
+
+class BipartitionUpdateTest(unittest.TestCase):
+
+    def setUp(self):
+        self.trees = dendropy.TreeList.get(
+                path=pathmap.tree_source_path("pythonidae.reference-trees.newick"),
+                schema="newick")
+        self.rng = random.Random(1)
+
+    def get_encoded_tree(self, tree, is_rooted):
+        tree = tree.clone(1)
+        tree.is_rooted = is_rooted
+        tree.encode_bipartitions()
+        # build the lookups, so that their patching is tested
+        tree.bipartition_edge_map
+        return tree
+
+    def assertBipartitionsUpToDate(self, tree):
+        tree._debug_check_bipartition_encoding()
+        expected = tree.clone(1)
+        expected.encode_bipartitions()
+        self.assertEqual(
+                sorted(b.split_bitmask for b in tree.bipartition_encoding),
+                sorted(b.split_bitmask for b in expected.bipartition_encoding))
+        self.assertEqual(set(tree.split_bitmask_edge_map), set(expected.split_bitmask_edge_map))
+
+    def test_reroot_at_edge(self):
+        for tree in self.trees:
+            tree = self.get_encoded_tree(tree, is_rooted=True)
+            bipartition_edge_map = tree._bipartition_edge_map
+            for idx in range(20):
+                old_bipartition_ids = set(id(b) for b in tree.bipartition_encoding)
+                edge = self.rng.choice([e for e in tree.postorder_edge_iter() if e.tail_node is not None])
+                tree.reroot_at_edge(edge, length1=0.1, length2=0.2, update_bipartitions=True)
+                self.assertBipartitionsUpToDate(tree)
+                # only the bipartitions on the path to the old root are replaced
+                self.assertGreater(
+                        len(old_bipartition_ids & set(id(b) for b in tree.bipartition_encoding)),
+                        len(tree.bipartition_encoding) // 2)
+                self.assertIs(tree._bipartition_edge_map, bipartition_edge_map)
+
+    def test_reroot_at_node_and_midpoint(self):
+        for tree in self.trees:
+            tree = self.get_encoded_tree(tree, is_rooted=True)
+            for idx in range(10):
+                nd = self.rng.choice([nd for nd in tree if nd.parent_node is not None])
+                tree.reroot_at_node(nd, update_bipartitions=True)
+                self.assertBipartitionsUpToDate(tree)
+            tree.reroot_at_midpoint(update_bipartitions=True)
+            self.assertBipartitionsUpToDate(tree)
+
+    def test_reseed_at(self):
+        for is_rooted in (True, False):
+            for tree in self.trees:
+                tree = self.get_encoded_tree(tree, is_rooted=is_rooted)
+                for idx in range(10):
+                    nd = self.rng.choice([nd for nd in tree if nd.parent_node is not None])
+                    tree.reseed_at(nd, update_bipartitions=True)
+                    self.assertBipartitionsUpToDate(tree)
+
+    def test_prune_taxa(self):
+        for is_rooted in (True, False):
+            for tree in self.trees:
+                tree = self.get_encoded_tree(tree, is_rooted=is_rooted)
+                taxa = [nd.taxon for nd in tree.leaf_node_iter()]
+                self.rng.shuffle(taxa)
+                while len(taxa) > 6:
+                    tree.prune_taxa(taxa[:2], update_bipartitions=True)
+                    taxa = taxa[2:]
+                    self.assertBipartitionsUpToDate(tree)
+                    self.assertEqual(
+                            set(nd.taxon for nd in tree.leaf_node_iter()),
+                            set(taxa))
+                tree.retain_taxa(taxa[:4], update_bipartitions=True)
+                self.assertBipartitionsUpToDate(tree)
+                tree.prune_subtree(tree.seed_node.child_nodes()[0].leaf_nodes()[0], update_bipartitions=True)
+                self.assertBipartitionsUpToDate(tree)
+
+    def test_prune_leaves_without_taxa(self):
+        tree = dendropy.Tree.get(data="[&R] ((a,(b,c)),(d,(e,f)));", schema="newick")
+        tree.encode_bipartitions()
+        tree.bipartition_edge_map
+        x = tree.find_node_with_taxon_label("c").parent_node.new_child()
+        x.new_child()
+        tree.find_node_with_taxon_label("d").taxon = None
+        tree.find_node_with_taxon_label("e").taxon = None
+        tree.find_node_with_taxon_label("f").taxon = None
+        tree.prune_leaves_without_taxa(update_bipartitions=True)
+        self.assertBipartitionsUpToDate(tree)
+        self.assertEqual(tree.as_string("newick").strip(), "[&R] (a,(b,c));")
+
+    def test_collapse_unweighted_edges(self):
+        for is_rooted in (True, False):
+            for tree in self.trees:
+                tree = self.get_encoded_tree(tree, is_rooted=is_rooted)
+                num_edges = len(tree.bipartition_encoding)
+                for edge in tree.postorder_internal_edge_iter():
+                    if edge.tail_node is not None and self.rng.random() < 0.3:
+                        edge.length = 0.0
+                tree.collapse_unweighted_edges(update_bipartitions=True)
+                self.assertLess(len(tree.bipartition_encoding), num_edges)
+                self.assertBipartitionsUpToDate(tree)
+
+    def test_resolve_polytomies(self):
+        for is_rooted in (True, False):
+            for tree in self.trees:
+                tree = self.get_encoded_tree(tree, is_rooted=is_rooted)
+                for edge in tree.postorder_internal_edge_iter():
+                    if edge.tail_node is not None and self.rng.random() < 0.3:
+                        edge.length = 0.0
+                tree.collapse_unweighted_edges(update_bipartitions=True)
+                for rng in (None, self.rng):
+                    tree.resolve_polytomies(update_bipartitions=True, rng=rng)
+                    self.assertBipartitionsUpToDate(tree)
+                    tree.collapse_unweighted_edges(threshold=0.0, update_bipartitions=True)
+
+    def test_stale_encoding(self):
+        tree = self.get_encoded_tree(self.trees[0], is_rooted=True)
+        # edits without updating bipartitions leave the encoding to be
+        # recalculated in full
+        tree.reroot_at_node(tree.leaf_nodes()[3].parent_node)
+        self.assertIsNone(tree._bipartition_encoding_state)
+        tree.prune_taxa([tree.leaf_nodes()[0].taxon], update_bipartitions=True)
+        self.assertBipartitionsUpToDate(tree)
+        tree.is_rooted = False
+        tree.reroot_at_edge(tree.leaf_nodes()[2].edge, update_bipartitions=True)
+        self.assertBipartitionsUpToDate(tree)
+
+    def test_encoding_stale_after_node_edits(self):
+        tree = dendropy.Tree.get(
+                data="[&R] (((A:1,B:1):1,(C:1,D:1):1):1,(E:1,(F:1,G:1):1):1);",
+                schema="newick")
+        tree.encode_bipartitions()
+        # restructured through the methods of the nodes, not of the tree
+        node_a = tree.find_node_with_taxon_label("A")
+        node_f = tree.find_node_with_taxon_label("F")
+        node_f.parent_node.remove_child(node_f)
+        node_a.parent_node.add_child(node_f)
+        tree.reroot_at_node(tree.find_node_with_taxon_label("C").parent_node, update_bipartitions=True)
+        self.assertBipartitionsUpToDate(tree)
+        self.assertEqual(
+                sorted(b.split_bitmask for b in tree.bipartition_encoding),
+                [1, 2, 4, 8, 16, 32, 35, 64, 80, 115, 127])
+
+    def test_encoding_stale_after_taxon_reassignment(self):
+        for tree in self.trees:
+            tree = self.get_encoded_tree(tree, is_rooted=True)
+            leaves = tree.leaf_nodes()
+            self.rng.shuffle(leaves)
+            leaves[0].taxon, leaves[1].taxon = leaves[1].taxon, leaves[0].taxon
+            leaves[2].taxon = None
+            leaves[2].taxon = tree.taxon_namespace.new_taxon("new")
+            nd = self.rng.choice([nd for nd in tree if nd.parent_node is not None])
+            tree.reroot_at_node(nd, update_bipartitions=True)
+            self.assertBipartitionsUpToDate(tree)
+            expected = tree.clone(1)
+            expected.encode_bipartitions()
+            self.assertEqual(
+                    sorted((nd.edge.bipartition.leafset_bitmask, nd.edge.bipartition.split_bitmask) for nd in tree),
+                    sorted((nd.edge.bipartition.leafset_bitmask, nd.edge.bipartition.split_bitmask) for nd in expected))
+
+    def test_edge_invert(self):
+        tree = dendropy.Tree.get(data="[&R] ((a,(b,c)i2)i1,(d,(e,f)i4)i3)i0;", schema="newick")
+        tree.encode_bipartitions()
+        i1 = tree.find_node_with_label("i1")
+        i2 = tree.find_node_with_label("i2")
+        i2.edge.invert(update_bipartitions=True)
+        self.assertIs(i1.parent_node, i2)
+        self.assertEqual(i2.bipartition.leafset_bitmask, 0b000111)
+        self.assertEqual(i1.bipartition.leafset_bitmask, 0b000001)
+        self.assertFalse(i1.bipartition.is_mutable)
+
+    def test_debug_check(self):
+        tree = self.get_encoded_tree(self.trees[0], is_rooted=True)
+        tree._debug_check_bipartition_encoding()
+        tree.seed_node.child_nodes()[0].new_child(taxon=tree.taxon_namespace[0])
+        with self.assertRaises(ValueError):
+            tree._debug_check_bipartition_encoding()
+
+if __name__ == "__main__":
+    unittest.main()
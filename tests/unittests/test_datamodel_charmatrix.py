@@ -1129,5 +1129,206 @@ class TestCharacterMatrixTaxa(dendropytest.ExtendedTestCase):
         self.char_matrix.purge_taxon_namespace()
         self.assertEqual(set(self.char_matrix.taxon_namespace), self.expected_taxa)
 
+class CharacterMatrixCompressedPatternsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.char_matrix = dendropy.DnaCharacterMatrix.from_dict({
+            "a": "AACGT-AN",
+            "b": "AATGT-AN",
+            "c": "CCTGC?C-",
+            })
+
+    def test_patterns(self):
+        site_patterns = self.char_matrix.compressed_patterns()
+        self.assertIs(site_patterns.taxon_namespace, self.char_matrix.taxon_namespace)
+        self.assertEqual(len(site_patterns), 3)
+        self.assertEqual(site_patterns.num_characters, 8)
+        self.assertEqual(site_patterns.num_patterns, 6)
+        self.assertEqual(site_patterns.weights, [3, 1, 1, 1, 1, 1])
+        self.assertEqual(site_patterns.pattern_indexes, [0, 0, 1, 2, 3, 4, 0, 5])
+        self.assertEqual(
+                ["".join(str(state) for state in site_patterns[taxon]) for taxon in site_patterns],
+                ["ACGT-N", "ATGT-N", "CTGC?-"])
+        self.assertEqual(
+                ["".join(str(state) for state in pattern) for pattern in site_patterns.patterns()],
+                ["AAC", "CTT", "GGG", "TTC", "--?", "NN-"])
+        for taxon in self.char_matrix:
+            self.assertEqual(
+                    site_patterns.expand(site_patterns[taxon]),
+                    self.char_matrix[taxon].values())
+        self.assertEqual(site_patterns.pattern_weights([1, 2, 3, 4, 5, 6, 7, 8]), [10, 3, 4, 5, 6, 8])
+
+    def test_taxon_state_sets_map(self):
+        for gaps_as_missing in (True, False):
+            site_patterns = self.char_matrix.compressed_patterns(gaps_as_missing=gaps_as_missing)
+            expected = self.char_matrix.taxon_state_sets_map(gaps_as_missing=gaps_as_missing)
+            state_sets_map = site_patterns.taxon_state_sets_map()
+            for taxon in self.char_matrix:
+                self.assertEqual(site_patterns.expand(state_sets_map[taxon]), expected[taxon])
+            state_sets_map = site_patterns.taxon_state_sets_map(gaps_as_missing=not gaps_as_missing)
+            expected = self.char_matrix.taxon_state_sets_map(gaps_as_missing=not gaps_as_missing)
+            for taxon in self.char_matrix:
+                self.assertEqual(site_patterns.expand(state_sets_map[taxon]), expected[taxon])
+
+    def test_unequal_lengths(self):
+        self.char_matrix["a"].append(self.char_matrix["a"][0])
+        with self.assertRaises(ValueError):
+            self.char_matrix.compressed_patterns()
+
+class CompactFixedAlphabetCharacterMatrixTest(unittest.TestCase):
+
+    def setUp(self):
+        self.sequences = collections.OrderedDict([
+            ("a", "AACGT-AN"),
+            ("b", "aatgt-an"),
+            ("c", "CCTGC?C-"),
+            ])
+        self.char_matrix = dendropy.DnaCharacterMatrix.from_dict(self.sequences)
+        self.compact_char_matrix = dendropy.DnaCharacterMatrix.from_dict(self.sequences, compact=True)
+        self.alphabet = dendropy.DNA_STATE_ALPHABET
+
+    def test_storage(self):
+        self.assertFalse(self.char_matrix.is_compact)
+        self.assertTrue(self.compact_char_matrix.is_compact)
+        for taxon in self.compact_char_matrix:
+            seq = self.compact_char_matrix[taxon]
+            self.assertIsInstance(seq, dendropy.CompactFixedAlphabetCharacterDataSequence)
+            self.assertIs(seq.state_alphabet, self.alphabet)
+            self.assertEqual(seq.state_indexes(), bytes(state.index for state in seq))
+            self.assertIsNone(seq._character_types)
+            self.assertIsNone(seq._character_annotations)
+
+    def test_values(self):
+        for t1, t2 in zip(self.char_matrix, self.compact_char_matrix):
+            s1 = self.char_matrix[t1]
+            s2 = self.compact_char_matrix[t2]
+            self.assertEqual(len(s1), len(s2))
+            self.assertEqual(s1.values(), s2.values())
+            self.assertEqual(list(s1), list(s2))
+            self.assertEqual(s1[2:5], s2[2:5])
+            for idx in range(len(s1)):
+                self.assertIs(s1[idx], s2[idx])
+                self.assertIs(s1.value_at(idx), s2.value_at(idx))
+            self.assertEqual(s1.symbols_as_list(), s2.symbols_as_list())
+            self.assertEqual(s1.symbols_as_string(), s2.symbols_as_string())
+            self.assertEqual(s1.symbols_as_string(sep=","), s2.symbols_as_string(sep=","))
+            self.assertEqual(list(s1.cell_iter()), list(s2.cell_iter()))
+
+    def test_edit(self):
+        seq = self.compact_char_matrix[0]
+        ref = list(seq)
+        a, c = self.alphabet["A"], self.alphabet["C"]
+        seq.append(c)
+        ref.append(c)
+        seq.insert(0, a)
+        ref.insert(0, a)
+        seq[3] = c
+        ref[3] = c
+        seq[4:6] = [a, a]
+        ref[4:6] = [a, a]
+        del seq[1]
+        del ref[1]
+        seq.extend([a, c])
+        ref.extend([a, c])
+        seq.extend_symbols("g t\t?")
+        ref.extend(self.alphabet.get_states_for_symbols("GT?"))
+        self.assertEqual(seq.values(), ref)
+        self.assertIsNone(seq._character_types)
+        self.assertIsNone(seq._character_annotations)
+        seq.set_at(len(ref) + 1, a)
+        ref.extend([self.alphabet.no_data_state, a])
+        self.assertEqual(seq.values(), ref)
+
+    def test_invalid_values(self):
+        seq = self.compact_char_matrix[0]
+        symbols = seq.symbols_as_string()
+        with self.assertRaises(ValueError):
+            seq.append(dendropy.RNA_STATE_ALPHABET["U"])
+        with self.assertRaises(ValueError):
+            seq.extend([self.alphabet["A"], None])
+        with self.assertRaises(KeyError):
+            seq.extend_symbols("ACJT")
+        with self.assertRaises(KeyError):
+            seq.extend_symbols("AC\u00e9T")
+        with self.assertRaises(ValueError):
+            seq[0] = "A"
+        self.assertEqual(seq.symbols_as_string(), symbols)
+
+    def test_character_types_and_annotations(self):
+        seq = self.compact_char_matrix[0]
+        character_type = charmatrixmodel.CharacterType(label="x")
+        seq.append(self.alphabet["A"], character_type=character_type)
+        self.assertEqual(len(seq._character_types), len(seq))
+        self.assertIs(seq.character_type_at(len(seq) - 1), character_type)
+        self.assertIsNone(seq.character_type_at(0))
+        self.assertFalse(seq.has_annotations_at(1))
+        seq.annotations_at(1).add_new("a", 1)
+        self.assertTrue(seq.has_annotations_at(1))
+        seq.insert(0, self.alphabet["C"])
+        del seq[3]
+        seq.extend_symbols("AC")
+        self.assertEqual(len(seq._character_types), len(seq))
+        self.assertEqual(len(seq._character_annotations), len(seq))
+        self.assertIs(seq.character_type_at(len(seq) - 3), character_type)
+        self.assertEqual(len(seq.annotations_at(2)), 1)
+        self.assertFalse(seq.has_annotations_at(1))
+        with self.assertRaises(IndexError):
+            self.compact_char_matrix[1].character_type_at(100)
+
+    def test_copy_and_clone(self):
+        for other in (
+                copy.copy(self.compact_char_matrix),
+                copy.deepcopy(self.compact_char_matrix),
+                self.compact_char_matrix.clone(1),
+                dendropy.DnaCharacterMatrix(self.compact_char_matrix),
+                ):
+            self.assertTrue(other.is_compact)
+            for taxon in other:
+                self.assertIsInstance(other[taxon], dendropy.CompactFixedAlphabetCharacterDataSequence)
+            self.assertEqual(other.as_string("fasta"), self.char_matrix.as_string("fasta"))
+        other = dendropy.DnaCharacterMatrix(self.compact_char_matrix, compact=False)
+        self.assertFalse(other.is_compact)
+        for taxon in other:
+            self.assertIs(type(other[taxon]), dendropy.DnaCharacterDataSequence)
+        other = dendropy.DnaCharacterMatrix(self.char_matrix, compact=True)
+        self.assertTrue(other.is_compact)
+        for taxon in other:
+            self.assertIsInstance(other[taxon], dendropy.CompactFixedAlphabetCharacterDataSequence)
+
+    def test_set_sequence(self):
+        taxon = self.compact_char_matrix.taxon_namespace[0]
+        self.compact_char_matrix[taxon] = self.char_matrix[0]
+        self.assertIsInstance(self.compact_char_matrix[taxon], dendropy.CompactFixedAlphabetCharacterDataSequence)
+        self.assertEqual(self.compact_char_matrix[taxon].values(), self.char_matrix[0].values())
+        self.char_matrix[0] = self.compact_char_matrix[1]
+        self.assertIs(type(self.char_matrix[0]), dendropy.DnaCharacterDataSequence)
+        self.assertEqual(self.char_matrix[0].values(), self.compact_char_matrix[1].values())
+
+    def test_write(self):
+        for schema in ("fasta", "nexus", "phylip"):
+            self.assertEqual(
+                    self.compact_char_matrix.as_string(schema),
+                    self.char_matrix.as_string(schema))
+        self.assertEqual(
+                self.compact_char_matrix.as_string("fasta", wrap_width=3),
+                self.char_matrix.as_string("fasta", wrap_width=3))
+
+    def test_read(self):
+        for schema in ("fasta", "nexus", "phylip"):
+            s = self.char_matrix.as_string(schema)
+            char_matrix = dendropy.DnaCharacterMatrix.get(data=s, schema=schema, compact=True)
+            self.assertTrue(char_matrix.is_compact)
+            self.assertEqual(char_matrix.as_string(schema), s)
+        with self.assertRaises(TypeError):
+            dendropy.StandardCharacterMatrix.get(data=">a\n0101\n", schema="fasta", compact=True)
+
+    def test_analyses(self):
+        self.assertEqual(
+                list(self.compact_char_matrix.taxon_state_sets_map().values()),
+                list(self.char_matrix.taxon_state_sets_map().values()))
+        self.assertEqual(
+                self.compact_char_matrix.compressed_patterns().weights,
+                self.char_matrix.compressed_patterns().weights)
+
 if __name__ == "__main__":
     unittest.main()
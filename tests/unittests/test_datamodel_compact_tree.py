@@ -0,0 +1,199 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+##############################################################################
+##  DendroPy Phylogenetic Computing Library.
+##
+##  Copyright 2010-2015 Jeet Sukumaran and Mark T. Holder.
+##  All rights reserved.
+##
+##  See "LICENSE.rst" for terms and conditions of usage.
+##
+##  If you use this work or any portion thereof in published work,
+##  please cite it as:
+##
+##     Sukumaran, J. and M. T. Holder. 2010. DendroPy: a Python library
+##     for phylogenetic computing. Bioinformatics 26: 1569-1571.
+##
+##############################################################################
+
+"""
+Tests CompactTree, CompactNode and CompactEdge.
+"""
+
+import copy
+import pickle
+import unittest
+import dendropy
+from dendropy.calculate import treecompare
+from support import pathmap
+
+class CompactNodeTest(unittest.TestCase):
+
+    def test_basic_construction(self):
+        taxon = dendropy.Taxon("z")
+        nd = dendropy.CompactNode(taxon=taxon, label="x", edge_length=1)
+        self.assertIsInstance(nd, dendropy.Node)
+        self.assertIs(nd.taxon, taxon)
+        self.assertEqual(nd.label, "x")
+        self.assertEqual(nd.edge_length, 1)
+        self.assertIsNone(nd._edge)
+        edge = nd.edge
+        self.assertIsInstance(edge, dendropy.CompactEdge)
+        self.assertIs(nd.edge, edge)
+        self.assertEqual(edge.length, 1)
+        self.assertIs(edge.head_node, nd)
+        self.assertIs(edge.tail_node, None)
+
+    def test_edge_data_shared_with_node(self):
+        nd = dendropy.CompactNode()
+        nd.edge_length = 2.0
+        bipartition = nd.bipartition
+        self.assertIsNone(nd._edge)
+        edge = nd.edge
+        self.assertEqual(edge.length, 2.0)
+        self.assertIs(edge.bipartition, bipartition)
+        edge.length = 3.0
+        self.assertEqual(nd.edge_length, 3.0)
+        nd.edge_length = 4.0
+        self.assertEqual(edge.length, 4.0)
+        edge.label = "e"
+        self.assertEqual(edge.label, "e")
+        self.assertIsNone(nd.label)
+
+    def test_lazy_comments_and_annotations(self):
+        nd = dendropy.CompactNode()
+        self.assertIsNone(nd._comments)
+        self.assertFalse(nd.has_annotations)
+        nd.comments.append("c")
+        nd.annotations.add_new("a", 1)
+        self.assertEqual(nd.comments, ["c"])
+        self.assertTrue(nd.has_annotations)
+        edge = nd.edge
+        self.assertIsNone(edge._comments)
+        self.assertFalse(edge.has_annotations)
+        edge.annotations.add_new("b", 2)
+        self.assertEqual([a.name for a in edge.annotations], ["b"])
+        self.assertEqual([a.name for a in nd.annotations], ["a"])
+
+    def test_other_attributes(self):
+        nd = dendropy.CompactNode()
+        nd.x = 1
+        self.assertEqual(nd.x, 1)
+
+    def test_move_edge(self):
+        nd1 = dendropy.CompactNode(edge_length=1.0)
+        nd2 = dendropy.CompactNode(edge_length=2.0)
+        edge = nd1.edge
+        nd2.edge = edge
+        self.assertIs(edge.head_node, nd2)
+        self.assertEqual(edge.length, 1.0)
+        self.assertEqual(nd2.edge_length, 1.0)
+
+    def test_custom_edge(self):
+        class CustomEdge(dendropy.Edge):
+            pass
+        class CustomNode(dendropy.CompactNode):
+            @classmethod
+            def edge_factory(cls, **kwargs):
+                return CustomEdge(**kwargs)
+        nd = CustomNode(edge_length=1.0)
+        nd.bipartition.leafset_bitmask = 3
+        edge = nd.edge
+        self.assertIsInstance(edge, CustomEdge)
+        self.assertEqual(edge.length, 1.0)
+        self.assertEqual(edge.bipartition.leafset_bitmask, 3)
+        nd.edge_length = 2.0
+        self.assertEqual(edge.length, 2.0)
+        self.assertIs(nd.bipartition, edge.bipartition)
+
+class CompactTreeTest(unittest.TestCase):
+
+    def setUp(self):
+        self.taxon_namespace = dendropy.TaxonNamespace()
+        self.tree_filepath = pathmap.tree_source_path("pythonidae.reference-trees.newick")
+        self.trees = dendropy.TreeList.get(
+                path=self.tree_filepath,
+                schema="newick",
+                taxon_namespace=self.taxon_namespace)
+        self.compact_trees = dendropy.TreeList.get(
+                path=self.tree_filepath,
+                schema="newick",
+                taxon_namespace=self.taxon_namespace,
+                tree_type=dendropy.CompactTree)
+
+    def assertSameTree(self, tree1, tree2):
+        self.assertEqual(
+                tree1.as_string("newick", suppress_rooting=True),
+                tree2.as_string("newick", suppress_rooting=True))
+
+    def test_read(self):
+        self.assertEqual(len(self.trees), len(self.compact_trees))
+        for tree, compact_tree in zip(self.trees, self.compact_trees):
+            self.assertIsInstance(compact_tree, dendropy.CompactTree)
+            for nd in compact_tree:
+                self.assertIsInstance(nd, dendropy.CompactNode)
+                self.assertIsNone(nd._edge)
+            self.assertSameTree(tree, compact_tree)
+
+    def test_read_with_offsets(self):
+        compact_trees = dendropy.TreeList(tree_type=dendropy.CompactTree)
+        compact_trees.read(path=self.tree_filepath, schema="newick", collection_offset=0, tree_offset=2)
+        self.assertEqual(len(compact_trees), len(self.trees) - 2)
+        for tree in compact_trees:
+            self.assertIsInstance(tree, dendropy.CompactTree)
+
+    def test_encode_bipartitions(self):
+        for tree, compact_tree in zip(self.trees, self.compact_trees):
+            bipartitions = tree.encode_bipartitions()
+            compact_bipartitions = compact_tree.encode_bipartitions()
+            for nd in compact_tree:
+                self.assertIsNone(nd._edge)
+            self.assertEqual(
+                    [b.split_bitmask for b in bipartitions],
+                    [b.split_bitmask for b in compact_bipartitions])
+            self.assertEqual(
+                    [edge.length for edge in tree.postorder_edge_iter()],
+                    [edge.length for edge in compact_tree.postorder_edge_iter()])
+            self.assertEqual(
+                    dict((b, e.length) for b, e in tree.bipartition_edge_map.items()),
+                    dict((b, e.length) for b, e in compact_tree.bipartition_edge_map.items()))
+
+    def test_compare(self):
+        for tree, compact_tree in zip(self.trees, self.compact_trees):
+            self.assertEqual(treecompare.symmetric_difference(tree, compact_tree), 0)
+            self.assertAlmostEqual(treecompare.weighted_robinson_foulds_distance(tree, compact_tree), 0.0)
+
+    def test_copy(self):
+        compact_tree = self.compact_trees[0]
+        compact_tree.seed_node.annotations.add_new("a", 1)
+        compact_tree.seed_node.edge.annotations.add_new("b", 2)
+        for tree in (
+                copy.deepcopy(compact_tree),
+                compact_tree.clone(1),
+                dendropy.CompactTree(compact_tree),
+                pickle.loads(pickle.dumps(compact_tree)),
+                ):
+            self.assertIsInstance(tree, dendropy.CompactTree)
+            self.assertSameTree(tree, compact_tree)
+            for nd1, nd2 in zip(tree, compact_tree):
+                self.assertIsNot(nd1, nd2)
+                self.assertIsInstance(nd1, dendropy.CompactNode)
+                self.assertEqual(nd1.edge_length, nd2.edge_length)
+            self.assertEqual([a.name for a in tree.seed_node.annotations], ["a"])
+            self.assertEqual([a.name for a in tree.seed_node.edge.annotations], ["b"])
+
+    def test_manipulation(self):
+        for tree, compact_tree in zip(self.trees, self.compact_trees):
+            for t in (tree, compact_tree):
+                t.is_rooted = True
+                t.reroot_at_midpoint()
+                t.ladderize()
+                t.calc_node_ages(is_force_max_age=True)
+            self.assertSameTree(tree, compact_tree)
+            self.assertEqual(
+                    [nd.age for nd in tree.postorder_node_iter()],
+                    [nd.age for nd in compact_tree.postorder_node_iter()])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,192 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+##############################################################################
+##  DendroPy Phylogenetic Computing Library.
+##
+##  Copyright 2010-2015 Jeet Sukumaran and Mark T. Holder.
+##  All rights reserved.
+##
+##  See "LICENSE.rst" for terms and conditions of usage.
+##
+##  If you use this work or any portion thereof in published work,
+##  please cite it as:
+##
+##     Sukumaran, J. and M. T. Holder. 2010. DendroPy: a Python library
+##     for phylogenetic computing. Bioinformatics 26: 1569-1571.
+##
+##############################################################################
+
+"""
+Tests FlatTree.
+"""
+
+import math
+import pickle
+import random
+import unittest
+import dendropy
+from dendropy.calculate import treemeasure
+from dendropy.simulate import treesim
+from dendropy.utility import error
+from support import pathmap
+
+class FlatTreeStructureTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tree = dendropy.Tree.get(
+                data="[&R] ((a:1,b:2)i1:3,(c:4,(d:5,e:6)i3:7)i2:8,f)i0:9;",
+                schema="newick")
+        self.flat_tree = self.tree.to_flat()
+
+    def test_arrays(self):
+        flat_tree = self.flat_tree
+        self.assertEqual(len(flat_tree), 10)
+        self.assertEqual(flat_tree.num_leaves, 6)
+        self.assertIs(flat_tree.taxon_namespace, self.tree.taxon_namespace)
+        self.assertTrue(flat_tree.is_rooted)
+        self.assertEqual(list(flat_tree.parent_indexes), [-1, 0, 1, 1, 0, 4, 4, 6, 6, 0])
+        self.assertEqual(list(flat_tree.first_child_indexes), [1, 2, -1, -1, 5, -1, 7, -1, -1, -1])
+        self.assertEqual(list(flat_tree.next_sibling_indexes), [-1, 4, 3, -1, 9, 6, -1, 8, -1, -1])
+        edge_lengths = list(flat_tree.edge_lengths)
+        self.assertEqual(edge_lengths[:9], [9, 3, 1, 2, 8, 4, 7, 5, 6])
+        self.assertTrue(math.isnan(edge_lengths[9]))
+        self.assertEqual(
+                list(flat_tree.taxon_indexes),
+                [-1, -1, 0, 1, -1, 2, -1, 3, 4, 5])
+        with self.assertRaises(TypeError):
+            flat_tree.parent_indexes[0] = 1
+
+    def test_nodes(self):
+        flat_tree = self.flat_tree
+        self.assertEqual(flat_tree.parent_index(0), -1)
+        self.assertEqual(flat_tree.parent_index(5), 4)
+        self.assertEqual(flat_tree.child_indexes(0), [1, 4, 9])
+        self.assertEqual(flat_tree.child_indexes(2), [])
+        self.assertEqual(flat_tree.num_child_nodes(0), 3)
+        self.assertTrue(flat_tree.is_leaf(9))
+        self.assertFalse(flat_tree.is_leaf(6))
+        self.assertEqual(flat_tree.edge_length(7), 5)
+        self.assertIs(flat_tree.edge_length(9), None)
+        self.assertIs(flat_tree.taxon(0), None)
+        self.assertIs(flat_tree.taxon(7), self.tree.taxon_namespace.get_taxon("d"))
+        self.assertEqual(flat_tree.subtree_end(4), 9)
+        self.assertEqual(flat_tree.leafset_range(0), range(0, 6))
+        self.assertEqual(flat_tree.leafset_range(4), range(2, 5))
+        self.assertEqual(flat_tree.leafset_range(8), range(4, 5))
+        self.assertEqual(flat_tree.num_leaves_of(6), 2)
+
+    def test_traversals(self):
+        flat_tree = self.flat_tree
+        taxa = lambda idxs: [flat_tree.taxon(idx).label for idx in idxs if flat_tree.taxon(idx)]
+        self.assertEqual(list(flat_tree.preorder_index_iter()), list(range(10)))
+        self.assertEqual(
+                [flat_tree.taxon(idx) for idx in flat_tree.postorder_index_iter()],
+                [nd.taxon for nd in self.tree.postorder_node_iter()])
+        self.assertEqual(list(flat_tree.postorder_index_iter()), [2, 3, 1, 5, 7, 8, 6, 4, 9, 0])
+        self.assertEqual(taxa(flat_tree.leaf_index_iter()), ["a", "b", "c", "d", "e", "f"])
+        self.assertEqual(list(flat_tree.child_index_iter(6)), [7, 8])
+        self.assertEqual(list(flat_tree.ancestor_index_iter(8)), [6, 4, 0])
+        self.assertEqual(list(flat_tree.ancestor_index_iter(8, inclusive=True)), [8, 6, 4, 0])
+        self.assertEqual(list(dendropy.FlatTree.from_tree(dendropy.Tree()).postorder_index_iter()), [0])
+
+    def test_to_tree(self):
+        for tree_type in (None, dendropy.Tree, dendropy.CompactTree):
+            tree = self.flat_tree.to_tree(tree_type=tree_type)
+            self.assertIsInstance(tree, tree_type or dendropy.Tree)
+            self.assertIs(tree.taxon_namespace, self.tree.taxon_namespace)
+            self.assertEqual(
+                    tree.as_string("newick", suppress_internal_node_labels=True),
+                    self.tree.as_string("newick", suppress_internal_node_labels=True))
+
+    def test_pickle(self):
+        flat_tree = pickle.loads(pickle.dumps(self.flat_tree))
+        for name in ("parent_indexes", "first_child_indexes", "next_sibling_indexes", "taxon_indexes"):
+            self.assertEqual(list(getattr(flat_tree, name)), list(getattr(self.flat_tree, name)))
+        self.assertEqual(flat_tree.taxon(7).label, "d")
+        self.assertEqual(flat_tree.leafset_range(4), range(2, 5))
+        self.assertEqual(flat_tree.length(), self.flat_tree.length())
+
+class FlatTreeCalculationsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.trees = dendropy.TreeList.get(
+                path=pathmap.tree_source_path("pythonidae.reference-trees.newick"),
+                schema="newick")
+        rng = random.Random(1)
+        self.ultrametric_trees = [
+                treesim.birth_death_tree(birth_rate=1.0, death_rate=0.0, num_extant_tips=40, rng=rng)
+                for idx in range(3)]
+
+    def test_length(self):
+        for tree in self.trees:
+            self.assertAlmostEqual(tree.to_flat().length(), tree.length())
+
+    def test_encode_bipartitions(self):
+        trees = list(self.trees) + [
+                dendropy.Tree.get(data="((a,b),(c,d));", schema="newick"),
+                dendropy.Tree.get(data="[&R] ((a,b),(c,d));", schema="newick"),
+                dendropy.Tree.get(data="((a,(b)),(c,d),e);", schema="newick"),
+                ]
+        for tree in trees:
+            flat_tree = tree.to_flat()
+            for is_bipartitions_mutable in (False, True):
+                bipartitions = flat_tree.encode_bipartitions(is_bipartitions_mutable=is_bipartitions_mutable)
+                expected = tree.clone(1).encode_bipartitions(is_bipartitions_mutable=is_bipartitions_mutable)
+                self.assertEqual(
+                        [(b.split_bitmask, b.leafset_bitmask, b.tree_leafset_bitmask, b.is_rooted, b.is_mutable) for b in bipartitions],
+                        [(b.split_bitmask, b.leafset_bitmask, b.tree_leafset_bitmask, b.is_rooted, b.is_mutable) for b in expected])
+        tree = dendropy.Tree.get(data="((a,(b)),(c,d),e);", schema="newick")
+        self.assertEqual(len(tree.to_flat().encode_bipartitions(suppress_unifurcations=False)), 9)
+
+    def test_calc_node_ages(self):
+        for tree in self.ultrametric_trees:
+            ages = tree.to_flat().calc_node_ages()
+            tree.calc_node_ages()
+            for age, nd in zip(ages, tree.preorder_node_iter()):
+                self.assertAlmostEqual(age, nd.age)
+        for tree in self.trees:
+            flat_tree = tree.to_flat()
+            for kwargs in ({"is_force_max_age": True}, {"is_force_min_age": True}):
+                ages = flat_tree.calc_node_ages(**kwargs)
+                tree.calc_node_ages(**kwargs)
+                for age, nd in zip(ages, tree.preorder_node_iter()):
+                    self.assertAlmostEqual(age, nd.age)
+            with self.assertRaises(ValueError):
+                flat_tree.calc_node_ages(is_force_max_age=True, is_force_min_age=True)
+        flat_tree = dendropy.Tree.get(data="((a:1,b:2):1,c:2);", schema="newick").to_flat()
+        with self.assertRaises(error.UltrametricityError):
+            flat_tree.calc_node_ages()
+        self.assertEqual(list(flat_tree.calc_node_ages(ultrametricity_precision=False)), [2, 1, 0, 0, 0])
+
+    def test_treemeasure(self):
+        for tree in self.ultrametric_trees:
+            flat_tree = tree.to_flat()
+            self.assertAlmostEqual(treemeasure.B1(flat_tree), treemeasure.B1(tree))
+            self.assertAlmostEqual(treemeasure.treeness(flat_tree), treemeasure.treeness(tree))
+            self.assertAlmostEqual(treemeasure.pybus_harvey_gamma(flat_tree), treemeasure.pybus_harvey_gamma(tree))
+            for normalize in ("max", "yule", "pda", None):
+                self.assertAlmostEqual(
+                        treemeasure.colless_tree_imbalance(flat_tree, normalize=normalize),
+                        treemeasure.colless_tree_imbalance(tree, normalize=normalize))
+            for normalize in (True, "yule", "pda", None):
+                self.assertAlmostEqual(
+                        treemeasure.sackin_index(flat_tree, normalize=normalize),
+                        treemeasure.sackin_index(tree, normalize=normalize))
+        flat_tree = dendropy.Tree.get(data="((a,b),(c,d),e);", schema="newick").to_flat()
+        with self.assertRaises(TypeError):
+            treemeasure.colless_tree_imbalance(flat_tree)
+
+    def test_treemeasure_errors(self):
+        # errors are as for the corresponding Tree
+        for data, measure_fn, error_type in (
+                ("((a,b),(c));", treemeasure.colless_tree_imbalance, IndexError),
+                ("((a:1,b),(c:1,d:1):1);", treemeasure.treeness, TypeError),
+                ):
+            tree = dendropy.Tree.get(data=data, schema="newick")
+            for t in (tree, tree.to_flat()):
+                with self.assertRaises(error_type):
+                    measure_fn(t)
+
+if __name__ == "__main__":
+    unittest.main()
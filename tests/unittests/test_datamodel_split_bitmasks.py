@@ -22,9 +22,11 @@ Testing of calculation of and operations with split bitmask hashes.
 """
 
 import warnings
+import pickle
 from io import StringIO
 import unittest
 import re
+import subprocess
 import sys
 import os
 sys.path.insert(0, os.path.dirname(__file__))
@@ -301,6 +303,103 @@ class IsTrivialTest(unittest.TestCase):
         for i, r in enumerate([y, y, y, n, y, n, n, y, y, y, y, n, y, n, n, y, y, n, n, y, n, y, y, y, y, n, n, y, n, y, y, y, ]):
             self.assertEqual(r, dendropy.Bipartition.is_trivial_bitmask(i, 0x17))
 
+class BitmaskHashTest(unittest.TestCase):
+
+    def test_wide_bitmasks_hash_distinctly(self):
+        modulus_bits = sys.hash_info.modulus.bit_length() - 1
+        bitmasks = [1 << i for i in range(modulus_bits * 4)]
+        self.assertLess(len(set(hash(b) for b in bitmasks)), len(bitmasks))
+        self.assertEqual(len(set(bitprocessing.bitmask_hash(b) for b in bitmasks)), len(bitmasks))
+        for b in range(100):
+            self.assertEqual(bitprocessing.bitmask_hash(b), hash(b))
+
+    def test_wide_bitmask_hashes_reproducible(self):
+        # the same in processes with different hash seeds
+        bitmask = (1 << 500) | (1 << 70) | 77
+        code = "from dendropy.utility import bitprocessing; print(bitprocessing.bitmask_hash({}))".format(bitmask)
+        src_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(bitprocessing.__file__))))
+        hashes = set()
+        for seed in ("1", "2"):
+            env = dict(os.environ, PYTHONHASHSEED=seed)
+            env["PYTHONPATH"] = os.pathsep.join(filter(None, [src_dir, env.get("PYTHONPATH")]))
+            hashes.add(subprocess.check_output([sys.executable, "-c", code], env=env).strip())
+        self.assertEqual(hashes, set([str(bitprocessing.bitmask_hash(bitmask)).encode("ascii")]))
+
+    def test_bitmask_equality(self):
+        narrow = bitprocessing.Bitmask(0b1100)
+        wide = bitprocessing.Bitmask(1) << 200
+        self.assertTrue(narrow == 0b1100)
+        self.assertFalse(narrow != 0b1100)
+        self.assertEqual(hash(narrow), hash(0b1100))
+        # equal values, but different hashes
+        self.assertFalse(wide == 1 << 200)
+        self.assertTrue(wide != 1 << 200)
+        self.assertNotIn(1 << 200, set([wide]))
+        self.assertEqual(int(wide), 1 << 200)
+        self.assertTrue(wide == bitprocessing.Bitmask(1 << 200))
+        self.assertFalse(wide != bitprocessing.Bitmask(1 << 200))
+        self.assertTrue(wide > 1 << 199)
+
+    def test_bitmask_operations(self):
+        a = bitprocessing.Bitmask(0b1100)
+        b = 0b1010
+        for result, expected in (
+                (a & b, 0b1000),
+                (b & a, 0b1000),
+                (a | b, 0b1110),
+                (b | a, 0b1110),
+                (a ^ b, 0b0110),
+                (b ^ a, 0b0110),
+                (a - 1, 0b1011),
+                (a + 1, 0b1101),
+                (a << 70, 0b1100 << 70),
+                (a >> 2, 0b11),
+                (~a, ~0b1100),
+                ):
+            self.assertIsInstance(result, bitprocessing.Bitmask)
+            self.assertEqual(int(result), expected)
+        wide = bitprocessing.Bitmask(1) << 200
+        self.assertEqual(hash(wide), bitprocessing.bitmask_hash(1 << 200))
+        self.assertEqual(pickle.loads(pickle.dumps(wide)), wide)
+        self.assertIsInstance(pickle.loads(pickle.dumps(wide)), bitprocessing.Bitmask)
+        self.assertEqual(bitprocessing.num_set_bits(wide | 5), 3)
+        self.assertEqual(bitprocessing.least_significant_set_bit_index(wide | 4), 2)
+        self.assertEqual(bitprocessing.least_significant_set_bit_index(wide), 200)
+        self.assertEqual(bitprocessing.least_significant_set_bit_index(0), -1)
+
+class BitmaskTypeTest(unittest.TestCase):
+
+    def get_trees(self, bitmask_type):
+        taxon_namespace = dendropy.TaxonNamespace(bitmask_type=bitmask_type)
+        trees = dendropy.TreeList.get(
+                path=pathmap.tree_source_path("dendropy-test-trees-n33-unrooted-x10a.newick"),
+                schema="newick",
+                taxon_namespace=taxon_namespace)
+        return trees
+
+    def test_bitmask_type(self):
+        results = []
+        for bitmask_type in (int, bitprocessing.Bitmask):
+            trees = self.get_trees(bitmask_type)
+            sd = dendropy.SplitDistribution(taxon_namespace=trees.taxon_namespace)
+            for tree in trees:
+                sd.count_splits_on_tree(tree)
+                for edge in tree.postorder_edge_iter():
+                    self.assertIs(type(edge.bipartition.split_bitmask), bitmask_type)
+            split_counts = dict((int(split), count) for split, count in sd.split_counts.items())
+            distances = [treecompare.symmetric_difference(trees[0], t) for t in trees[1:]]
+            splits = [int(b.split_bitmask) for b in trees[0].encode_bipartitions()]
+            tree = dendropy.Tree.from_split_bitmasks(
+                    split_bitmasks=splits,
+                    taxon_namespace=trees.taxon_namespace,
+                    is_rooted=trees[0].is_rooted)
+            results.append((
+                    split_counts,
+                    distances,
+                    tree.as_string("newick"),
+                    sd.consensus_tree().as_string("newick")))
+        self.assertEqual(results[0], results[1])
+
 class IncompleteLeafSetSplitTest(unittest.TestCase):
 
     def check(self, title, src_prefix):
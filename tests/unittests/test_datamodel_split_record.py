@@ -0,0 +1,260 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+##############################################################################
+##  DendroPy Phylogenetic Computing Library.
+##
+##  Copyright 2010-2015 Jeet Sukumaran and Mark T. Holder.
+##  All rights reserved.
+##
+##  See "LICENSE.rst" for terms and conditions of usage.
+##
+##  If you use this work or any portion thereof in published work,
+##  please cite it as:
+##
+##     Sukumaran, J. and M. T. Holder. 2010. DendroPy: a Python library
+##     for phylogenetic computing. Bioinformatics 26: 1569-1571.
+##
+##############################################################################
+
+"""
+Tests for encoding the splits of trees as split records, directly from tree
+sources or from Tree objects.
+"""
+
+import unittest
+import io
+import os
+import sys
+import shutil
+import tempfile
+sys.path.insert(0, os.path.dirname(__file__))
+from support import pathmap
+from dendropy.utility import error
+import dendropy
+
+class SplitRecordEncodingTest(unittest.TestCase):
+
+    tree_strings = (
+            "(a:1,b:2,c:3);",
+            "(a:1,(b:2,c:3):4);",
+            "((a:1,b:2):3,(c:4,d:5):6);",
+            "[&R] ((a:1,b:2):3,(c:4,d:5):6);",
+            "[&U] ((a:1,b:2):3,c:4);",
+            "((a:1,b:2):3,((c:4)x:5,d:6):7);",
+            "(((a:1,b:2):3):4,c:5);",
+            "((((a:1,b:2):3):4,c:5):6);",
+            "((a,b):1,(c:2,d));",
+            "((a:1,b:1):1,(c:1.5,d:1.5):0.5,e:2);",
+            "[&R] ((a:1,b:1):1,(c:1.5,d:1.5):0.5);",
+            "[&R] ((a:1,b:1):1,((c:1.5)u:0.25,d:1.75):0.25);",
+            "[&R] ((a:1,b:3):1,(c:1.5,d:1.5):0.5);",
+            "[&W 1/4] ((a:1,b:2):3,(c:4,d:5):6);",
+            "[&W 0.5] [&R] (a:1,(b:1,c:1)x:1);",
+            "[&R] ('a b':1,[&x=1](b_c:1,c[c]:1):1[&y=2]);",
+            "((a:1,b:2)'x y':3,c:4)z;",
+            )
+
+    def get_tree_source(self, tree_strings=None):
+        if tree_strings is None:
+            tree_strings = self.tree_strings
+        return "\n".join(tree_strings)
+
+    def get_trees(self, taxon_namespace, tree_strings=None, **kwargs):
+        return list(dendropy.Tree.yield_from_files(
+                files=[io.StringIO(self.get_tree_source(tree_strings))],
+                schema="newick",
+                taxon_namespace=taxon_namespace,
+                **kwargs))
+
+    def get_split_records(self, split_record_encoder, tree_strings=None, **kwargs):
+        return list(dendropy.Tree.yield_split_records_from_files(
+                files=[io.StringIO(self.get_tree_source(tree_strings))],
+                schema="newick",
+                taxon_namespace=split_record_encoder.taxon_namespace,
+                split_record_encoder=split_record_encoder,
+                **kwargs))
+
+    def encoders(self, taxon_namespace):
+        yield dendropy.SplitRecordEncoder(taxon_namespace)
+        yield dendropy.SplitRecordEncoder(taxon_namespace,
+                is_calc_node_ages=True,
+                ultrametricity_precision=False)
+        yield dendropy.SplitRecordEncoder(taxon_namespace,
+                is_calc_node_ages=True,
+                is_force_max_age=True)
+        yield dendropy.SplitRecordEncoder(taxon_namespace,
+                is_calc_node_ages=True,
+                ultrametricity_precision=False,
+                taxon_label_age_map={"a": 0.5, "c": 0.25})
+
+    def assertSplitRecordsEqual(self, split_records1, split_records2):
+        self.assertEqual(len(split_records1), len(split_records2))
+        for r1, r2 in zip(split_records1, split_records2):
+            self.assertEqual(r1, r2)
+
+    def test_direct_encoding_matches_tree_encoding(self):
+        for reader_kwargs in (
+                {},
+                {"rooting": "force-rooted"},
+                {"rooting": "default-unrooted", "store_tree_weights": True},
+                {"suppress_edge_lengths": True, "preserve_underscores": True},
+                {"suppress_internal_node_taxa": False},
+                ):
+            taxon_namespace = dendropy.TaxonNamespace()
+            for encoder in self.encoders(taxon_namespace):
+                if encoder.is_force_max_age:
+                    # requires all edge lengths
+                    if reader_kwargs.get("suppress_edge_lengths"):
+                        continue
+                    tree_strings = [t for t in self.tree_strings if "a,b)" not in t]
+                else:
+                    tree_strings = self.tree_strings
+                trees = self.get_trees(taxon_namespace, tree_strings, **reader_kwargs)
+                expected = [encoder.encode_tree(tree) for tree in trees]
+                split_records = self.get_split_records(encoder, tree_strings, **reader_kwargs)
+                self.assertSplitRecordsEqual(split_records, expected)
+                split_records = self.get_split_records(encoder, tree_strings,
+                        fast_tree_parsing=False,
+                        **reader_kwargs)
+                self.assertSplitRecordsEqual(split_records, expected)
+
+    def test_count_splits_on_split_records(self):
+        taxon_namespace = dendropy.TaxonNamespace()
+        sd1 = dendropy.SplitDistribution(taxon_namespace=taxon_namespace,
+                ignore_node_ages=False,
+                ultrametricity_precision=False)
+        sd2 = dendropy.SplitDistribution(taxon_namespace=taxon_namespace,
+                ignore_node_ages=False,
+                ultrametricity_precision=False)
+        for tree in self.get_trees(taxon_namespace, store_tree_weights=True):
+            sd1.count_splits_on_tree(tree)
+        for split_record in self.get_split_records(
+                sd2.new_split_record_encoder(),
+                store_tree_weights=True):
+            sd2.count_splits_on_tree(split_record)
+        self.assertEqual(sd1.total_trees_counted, sd2.total_trees_counted)
+        self.assertEqual(sd1.sum_of_tree_weights, sd2.sum_of_tree_weights)
+        self.assertEqual(sd1.tree_rooting_types_counted, sd2.tree_rooting_types_counted)
+        self.assertEqual(sd1.split_counts, sd2.split_counts)
+        self.assertEqual(sd1.split_edge_lengths, sd2.split_edge_lengths)
+        self.assertEqual(sd1.split_node_ages, sd2.split_node_ages)
+
+    def test_count_splits_on_split_record_without_node_ages(self):
+        taxon_namespace = dendropy.TaxonNamespace()
+        sd = dendropy.SplitDistribution(taxon_namespace=taxon_namespace,
+                ignore_node_ages=False)
+        split_records = self.get_split_records(
+                dendropy.SplitRecordEncoder(taxon_namespace),
+                tree_strings=["(a:1,b:1,c:1);"])
+        with self.assertRaises(ValueError):
+            sd.count_splits_on_tree(split_records[0])
+
+    def test_ultrametricity_error(self):
+        taxon_namespace = dendropy.TaxonNamespace()
+        encoder = dendropy.SplitRecordEncoder(taxon_namespace,
+                is_calc_node_ages=True)
+        with self.assertRaises(error.UltrametricityError):
+            self.get_split_records(encoder,
+                    tree_strings=["[&R] ((a:1,b:3):1,(c:1.5,d:1.5):0.5);"])
+
+    def test_tree_offset(self):
+        # node ages of skipped trees are not calculated, so these need not be
+        # ultrametric
+        tree_strings = [
+                "[&R] ((a:1,b:3):1,(c:1.5,d:1.5):0.5);",
+                "[&R] ((a:1,b:1):1,(c:1.5,d:1.5):0.5);",
+                "[&R] ((a:1,c:1):1,(b:1.5,d:1.5):0.5);",
+                ]
+        taxon_namespace = dendropy.TaxonNamespace()
+        encoder = dendropy.SplitRecordEncoder(taxon_namespace,
+                is_calc_node_ages=True)
+        sources = [self.get_tree_source(tree_strings)] * 2
+        split_records = list(dendropy.Tree.yield_split_records_from_files(
+                files=[io.StringIO(src) for src in sources],
+                schema="newick",
+                taxon_namespace=taxon_namespace,
+                tree_offset=1,
+                split_record_encoder=encoder))
+        trees = self.get_trees(taxon_namespace, tree_strings=tree_strings[1:])
+        expected = [encoder.encode_tree(tree) for tree in trees] * 2
+        self.assertSplitRecordsEqual(split_records, expected)
+
+class SplitRecordFileSourceTest(unittest.TestCase):
+
+    def check_source(self, filename, schema, tree_offset=0, **kwargs):
+        taxon_namespace = dendropy.TaxonNamespace()
+        trees = dendropy.TreeList.get_from_path(
+                pathmap.tree_source_path(filename),
+                schema,
+                taxon_namespace=taxon_namespace,
+                **kwargs)
+        encoder = dendropy.SplitRecordEncoder(taxon_namespace)
+        expected = [encoder.encode_tree(tree) for tree in trees[tree_offset:]]
+        split_records = list(dendropy.Tree.yield_split_records_from_files(
+                files=[pathmap.tree_source_path(filename)],
+                schema=schema,
+                taxon_namespace=taxon_namespace,
+                tree_offset=tree_offset,
+                **kwargs))
+        self.assertEqual(len(split_records), len(expected))
+        self.assertEqual(split_records, expected)
+
+    def test_nexus(self):
+        self.check_source("pythonidae.reference-trees.nexus", "nexus")
+        self.check_source("cetaceans.mb.no-clock.mcmc.weighted-01.trees", "nexus",
+                tree_offset=10,
+                store_tree_weights=True)
+        self.check_source("multitreeblocks.nex", "nexus")
+
+    def test_newick(self):
+        self.check_source("dendropy-test-trees-n33-unrooted-x10a.newick", "newick",
+                tree_offset=2)
+
+    def test_nexml(self):
+        self.check_source("dendropy-test-trees-n33-unrooted-x10a.nexml", "nexml")
+
+    def test_tree_array_read_from_files(self):
+        taxon_namespace = dendropy.TaxonNamespace()
+        trees = dendropy.TreeList.get_from_path(
+                pathmap.tree_source_path("cetaceans.mb.strict-clock.mcmc.trees"),
+                "nexus",
+                taxon_namespace=taxon_namespace)
+        ta1 = dendropy.TreeArray(taxon_namespace=taxon_namespace,
+                ignore_node_ages=False)
+        for tree in trees[5:]:
+            ta1.add_tree(tree)
+        ta2 = dendropy.TreeArray(taxon_namespace=taxon_namespace,
+                ignore_node_ages=False)
+        ta2.read_from_files(
+                files=[pathmap.tree_source_path("cetaceans.mb.strict-clock.mcmc.trees")],
+                schema="nexus",
+                tree_offset=5)
+        self.assertEqual(ta1._tree_split_bitmasks, ta2._tree_split_bitmasks)
+        self.assertEqual(ta1._tree_edge_lengths, ta2._tree_edge_lengths)
+        self.assertEqual(ta1._tree_leafset_bitmasks, ta2._tree_leafset_bitmasks)
+        self.assertEqual(ta1._tree_weights, ta2._tree_weights)
+        self.assertEqual(ta1.split_distribution.split_node_ages,
+                ta2.split_distribution.split_node_ages)
+
+    def test_mixed_rooting_with_node_ages(self):
+        # the second tree is rejected for its rooting before its node ages
+        # are calculated (which fail for lack of edge lengths)
+        source = "[&R] ((a:1,b:1):1,(c:1,d:1):1);\n[&U] ((a,b),(c,d));\n"
+        tree_array = dendropy.TreeArray(ignore_node_ages=False, is_force_max_age=True)
+        with self.assertRaises(error.MixedRootingError):
+            tree_array.read_from_files(files=[io.StringIO(source)], schema="newick")
+        self.assertEqual(len(tree_array), 1)
+        store_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, store_dir)
+        writer = dendropy.TreeArrayStoreWriter(
+                path=os.path.join(store_dir, "trees.store"),
+                ignore_node_ages=False,
+                is_force_max_age=True)
+        with self.assertRaises(error.MixedRootingError):
+            with writer:
+                writer.read_from_files(files=[io.StringIO(source)], schema="newick")
+        self.assertEqual(len(writer), 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -304,6 +304,27 @@ class StateAlphabetTester(object):
             obs_states = self.sa.get_states_for_symbols(selected_symbols)
             self.assertEqual(obs_states, selected_states, "random seed: {}".format(self.random_seed))
 
+    def test_get_states_for_symbol_string(self):
+        all_symbols = [s for s in self.sa.full_symbol_state_map.keys() if s is not None and len(s) == 1]
+        for rep in range(3):
+            n = random.randint(5, 100)
+            selected_symbols = [self.rng.choice(all_symbols) for _ in range(n)]
+            selected_states = [self.sa[s] for s in selected_symbols]
+            symbols = "".join(s + self.rng.choice(["", "", " ", "\t"]) for s in selected_symbols)
+            obs_states = self.sa.get_states_for_symbol_string(symbols)
+            self.assertEqual(obs_states, selected_states, "random seed: {}".format(self.random_seed))
+            state_indexes = self.sa.get_state_indexes_for_symbol_string(symbols)
+            self.assertEqual(state_indexes, bytes(s.index for s in selected_states))
+            self.assertEqual(
+                    self.sa.get_symbol_string_for_state_indexes(state_indexes),
+                    "".join(str(s) for s in selected_states))
+            self.assertEqual(
+                    self.sa.get_symbol_string_for_state_indexes(state_indexes, sep=","),
+                    ",".join(str(s) for s in selected_states))
+            for bad_symbol in ("%", "\u00e9", "\u2603"):
+                with self.assertRaises(KeyError):
+                    self.sa.get_states_for_symbol_string(symbols + bad_symbol)
+
     def test_states_property(self):
         check = list(self.sa.state_iter())
         self.assertEqual(len(check), len(self.sa.states))
@@ -24,6 +24,7 @@ Tests creation, reading, update, deletion of Taxon and TaxonNamespace objects.
 import collections
 import unittest
 import copy
+import pickle
 from dendropy import Taxon, TaxonNamespace
 import os
 import sys
@@ -699,6 +700,108 @@ class TaxonNamespaceTaxonManagement(unittest.TestCase):
             x.append(t)
         self.assertEqual(len(x), 0)
 
+class TaxonNamespaceLabelLookup(unittest.TestCase):
+
+    def check_lookups(self, tns):
+        # compare against a scan of the namespace
+        labels = set(t.label for t in tns) | set(["x", "A", "None"])
+        for label in labels:
+            for is_case_sensitive in (True, False):
+                if is_case_sensitive:
+                    expected = [t for t in tns if t.label == label]
+                else:
+                    expected = [t for t in tns if t.lower_cased_label == str(label).lower()]
+                found = tns.findall(label, is_case_sensitive=is_case_sensitive)
+                self.assertEqual(found, expected)
+                taxon = tns.get_taxon(label, is_case_sensitive=is_case_sensitive)
+                if expected:
+                    self.assertIs(taxon, expected[0])
+                else:
+                    self.assertIs(taxon, None)
+
+    def test_lookup_after_changes(self):
+        tns = TaxonNamespace(["a", "A", "b", "a", "c", None])
+        self.check_lookups(tns)
+        t = tns.new_taxon("B")
+        self.check_lookups(tns)
+        tns.remove_taxon(tns[0])
+        self.check_lookups(tns)
+        t.label = "a"
+        self.check_lookups(tns)
+        self.assertIs(tns.get_taxon("a", is_case_sensitive=True), tns[2])
+        tns.sort(key=lambda x: str(x.label))
+        self.check_lookups(tns)
+        tns.reverse()
+        self.check_lookups(tns)
+        tns.remove_taxon_label("A", is_case_sensitive=False)
+        self.assertEqual(tns.findall("a"), [])
+        self.check_lookups(tns)
+        tns.clear()
+        self.check_lookups(tns)
+        self.assertIs(tns.get_taxon("b"), None)
+
+    def test_shared_taxa(self):
+        tns1 = TaxonNamespace(["a", "b", "c"])
+        tns2 = TaxonNamespace(tns1)
+        self.assertIs(tns2.get_taxon("b"), tns1.get_taxon("b"))
+        tns1[1].label = "x"
+        self.assertIs(tns1.get_taxon("x"), tns1[1])
+        self.assertIs(tns2.get_taxon("x"), tns1[1])
+        self.assertIs(tns2.get_taxon("b"), None)
+
+    def test_copies(self):
+        tns1 = TaxonNamespace(["a", "b", "c"])
+        tns2 = copy.deepcopy(tns1)
+        self.assertIs(tns2.get_taxon("b"), tns2[1])
+        self.assertIsNot(tns2.get_taxon("b"), tns1[1])
+        tns2[1].label = "x"
+        self.assertIs(tns2.get_taxon("x"), tns2[1])
+        self.assertIs(tns1.get_taxon("x"), None)
+        self.check_lookups(tns1)
+        self.check_lookups(tns2)
+
+    def test_index_updated_in_place(self):
+        tns1 = TaxonNamespace(["a", "b", "c"])
+        tns2 = TaxonNamespace(["d", "e"])
+        tns3 = TaxonNamespace(["f"])
+        tns3.add_taxon(tns1[0])
+        for tns in (tns1, tns2, tns3):
+            tns.get_taxon("a")
+        label_taxa_map2 = tns2._label_taxa_map
+        tns1[0].label = "x"
+        tns2[0].label = "y"
+        # only the indexes of the namespaces of the renamed taxa are changed,
+        # and (as the new labels are unique) not rebuilt
+        self.assertIs(tns2._label_taxa_map, label_taxa_map2)
+        self.assertEqual(sorted(tns1._label_taxa_map), ["b", "c", "x"])
+        self.assertEqual(sorted(tns3._label_taxa_map), ["f", "x"])
+        self.check_lookups(tns1)
+        self.check_lookups(tns2)
+        self.check_lookups(tns3)
+        tns3.clear()
+        tns1[0].label = "f"
+        self.assertIs(tns3.get_taxon("f"), None)
+        self.check_lookups(tns1)
+        tns1[2].label = "b"
+        self.assertIs(tns1._label_taxa_map, None)
+        self.assertEqual(tns1.findall("b"), [tns1[1], tns1[2]])
+        self.check_lookups(tns1)
+
+    def test_pickled(self):
+        tns1 = TaxonNamespace(["a", "b", "c"])
+        tns1.get_taxon("a")
+        tns2 = pickle.loads(pickle.dumps(tns1))
+        tns2[1].label = "x"
+        self.assertIs(tns2.get_taxon("x"), tns2[1])
+        self.assertIs(tns1.get_taxon("x"), None)
+        self.check_lookups(tns1)
+        self.check_lookups(tns2)
+
+    def test_get_taxa(self):
+        tns = TaxonNamespace(["a", "b", "a", "c"])
+        self.assertEqual(tns.get_taxa(["a", "c", "a"]), [tns[0], tns[2], tns[3]])
+        self.assertEqual(tns.get_taxa(["a", "c", "a"], first_match_only=True), [tns[0], tns[3], tns[0]])
+
 class TaxonNamespaceIdentity(unittest.TestCase):
 
     def setUp(self):
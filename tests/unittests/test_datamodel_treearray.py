@@ -18,11 +18,17 @@
 ##############################################################################
 
 import unittest
+import array
+import io
 import os
+import shutil
 import sys
+import tempfile
+from unittest import mock
 sys.path.insert(0, os.path.dirname(__file__))
 from support import pathmap
 import dendropy
+from dendropy.datamodel import treecollectionmodel
 
 class TreeArrayBasicTreeAccession(unittest.TestCase):
 
@@ -58,6 +64,294 @@ class TreeArrayBasicTreeAccession(unittest.TestCase):
             tree_array.add_tree(tree)
         self.verify_tree_array(tree_array, trees)
 
+class TreeArrayCompactStorage(unittest.TestCase):
+
+    def get_tree_arrays(self, **kwargs):
+        trees = dendropy.TreeList.get_from_path(pathmap.tree_source_path(
+                "cetaceans.mb.strict-clock.mcmc.trees"),
+                "nexus")
+        tree_arrays = []
+        for use_compact_storage in (False, True):
+            tree_array = dendropy.TreeArray(
+                    taxon_namespace=trees.taxon_namespace,
+                    use_compact_storage=use_compact_storage,
+                    **kwargs)
+            tree_array.add_trees(trees[200:])
+            tree_arrays.append(tree_array)
+        return tree_arrays
+
+    def assertTreeArraysEqual(self, ta1, ta2):
+        self.assertEqual(len(ta1), len(ta2))
+        self.assertEqual(list(ta1), list(ta2))
+        for idx in range(len(ta1)):
+            self.assertEqual(ta1.get_split_bitmask_and_edge_tuple(idx),
+                    ta2.get_split_bitmask_and_edge_tuple(idx))
+        self.assertEqual(list(ta1._tree_leafset_bitmasks), list(ta2._tree_leafset_bitmasks))
+        self.assertEqual(list(ta1._tree_weights), list(ta2._tree_weights))
+
+    def test_api(self):
+        for kwargs in ({}, {"ignore_edge_lengths": True}):
+            ta1, ta2 = self.get_tree_arrays(**kwargs)
+            self.assertIsInstance(ta2._tree_weights, array.array)
+            self.assertTreeArraysEqual(ta1, ta2)
+            self.assertEqual(ta1.calculate_log_product_of_split_supports(),
+                    ta2.calculate_log_product_of_split_supports())
+            self.assertEqual(ta1.calculate_sum_of_split_supports(),
+                    ta2.calculate_sum_of_split_supports())
+            self.assertEqual(ta1.split_bitmask_set_frequencies(),
+                    ta2.split_bitmask_set_frequencies())
+            self.assertEqual(
+                    sorted((t.frequency, t.as_string("newick")) for t in ta1.topologies()),
+                    sorted((t.frequency, t.as_string("newick")) for t in ta2.topologies()))
+            for idx in (0, 7, -1):
+                self.assertEqual(ta1.restore_tree(idx).as_string("newick"),
+                        ta2.restore_tree(idx).as_string("newick"))
+            splits = ta1.get_split_bitmask_and_edge_tuple(3)[0]
+            self.assertIn(splits, ta2)
+
+    def test_insert(self):
+        ta1, ta2 = self.get_tree_arrays()
+        trees = dendropy.TreeList.get_from_path(pathmap.tree_source_path(
+                "cetaceans.mb.strict-clock.mcmc.trees"),
+                "nexus",
+                taxon_namespace=ta1.taxon_namespace)
+        for index, tree in ((0, trees[0]), (5, trees[1]), (len(ta1), trees[2]), (-2, trees[3])):
+            ta1.insert(index, tree)
+            ta2.insert(index, tree)
+        self.assertTreeArraysEqual(ta1, ta2)
+
+    def test_update(self):
+        ta1, ta2 = self.get_tree_arrays()
+        for use_compact_storage in (False, True):
+            ta = dendropy.TreeArray(
+                    taxon_namespace=ta1.taxon_namespace,
+                    use_compact_storage=use_compact_storage)
+            ta.update(ta2)
+            ta.update(ta1)
+            ta += ta2
+            expected = dendropy.TreeArray(taxon_namespace=ta1.taxon_namespace)
+            expected.update(ta1)
+            expected.update(ta1)
+            expected += ta1
+            self.assertTreeArraysEqual(ta, expected)
+            self.assertEqual(ta.split_distribution.split_counts,
+                    expected.split_distribution.split_counts)
+
+class TreeArraySplitSupportScores(unittest.TestCase):
+
+    def get_tree_arrays(self):
+        trees = dendropy.TreeList.get_from_path(pathmap.tree_source_path(
+                "cetaceans.mb.no-clock.mcmc.trees"),
+                "nexus")
+        # trees of different leaf sets
+        taxa = trees.taxon_namespace
+        for tree in trees[:20]:
+            tree.prune_taxa([taxa[0]] if tree.seed_node.child_nodes()[0].is_leaf() else taxa[1:3])
+        tree_arrays = []
+        for use_compact_storage in (False, True):
+            tree_array = dendropy.TreeArray(
+                    taxon_namespace=taxa,
+                    use_compact_storage=use_compact_storage)
+            tree_array.add_trees(trees[:150])
+            tree_arrays.append(tree_array)
+        store_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, store_dir)
+        path = os.path.join(store_dir, "trees.store")
+        tree_arrays[0].save(path)
+        tree_arrays.append(dendropy.TreeArray.open(path, taxon_namespace=taxa))
+        tree_arrays.append(dendropy.TreeArray(taxon_namespace=taxa))
+        return tree_arrays
+
+    @unittest.skipIf(treecollectionmodel.numpy is None, "NumPy is not installed")
+    def test_vectorized_scores(self):
+        for tree_array in self.get_tree_arrays():
+            for method_name in (
+                    "calculate_log_product_of_split_supports",
+                    "calculate_sum_of_split_supports",
+                    ):
+                method = getattr(tree_array, method_name)
+                for include_external_splits in (False, True):
+                    scores = method(include_external_splits=include_external_splits)
+                    with mock.patch.object(treecollectionmodel, "numpy", None):
+                        expected = method(include_external_splits=include_external_splits)
+                    self.assertEqual(scores, expected)
+
+class TreeArrayCompactSerialization(unittest.TestCase):
+
+    def get_tree_array(self, taxon_namespace, tree_offset, **kwargs):
+        tree_array = dendropy.TreeArray(taxon_namespace=taxon_namespace, **kwargs)
+        tree_array.read_from_files(
+                files=[pathmap.tree_source_path("cetaceans.mb.strict-clock.mcmc.trees")],
+                schema="nexus",
+                tree_offset=tree_offset)
+        return tree_array
+
+    def round_trip(self, source_tree_arrays, **kwargs):
+        tree_array = dendropy.TreeArray(
+                taxon_namespace=source_tree_arrays[0].taxon_namespace,
+                **kwargs)
+        for source_tree_array in source_tree_arrays:
+            dest = io.BytesIO()
+            source_tree_array.write_compact(dest)
+            tree_array.read_compact(io.BytesIO(dest.getvalue()))
+        return tree_array
+
+    def test_round_trip(self):
+        for kwargs, source_storage, dest_storage in (
+                ({"ignore_node_ages": False}, False, False),
+                ({"ignore_edge_lengths": True}, False, False),
+                ({"use_tree_weights": False}, False, False),
+                ({"ignore_node_ages": False}, True, True),
+                ({"ignore_edge_lengths": True}, True, False),
+                ({}, False, True),
+                ):
+            taxon_namespace = dendropy.TaxonNamespace()
+            ta1 = self.get_tree_array(taxon_namespace, 100,
+                    use_compact_storage=source_storage,
+                    **kwargs)
+            ta2 = self.get_tree_array(taxon_namespace, 150,
+                    use_compact_storage=source_storage,
+                    **kwargs)
+            expected = dendropy.TreeArray(taxon_namespace=taxon_namespace, **kwargs)
+            expected.update(ta1)
+            expected.update(ta2)
+            tree_array = self.round_trip([ta1, ta2],
+                    use_compact_storage=dest_storage,
+                    **kwargs)
+            self.assertEqual(tree_array.is_rooted_trees, expected.is_rooted_trees)
+            self.assertEqual(list(tree_array._tree_split_bitmasks), expected._tree_split_bitmasks)
+            self.assertEqual(list(tree_array._tree_edge_lengths), expected._tree_edge_lengths)
+            self.assertEqual(list(tree_array._tree_leafset_bitmasks), expected._tree_leafset_bitmasks)
+            self.assertEqual(list(tree_array._tree_weights), expected._tree_weights)
+            sd1 = tree_array.split_distribution
+            sd2 = expected.split_distribution
+            self.assertEqual(sd1.total_trees_counted, sd2.total_trees_counted)
+            self.assertEqual(sd1.sum_of_tree_weights, sd2.sum_of_tree_weights)
+            self.assertEqual(sd1.tree_rooting_types_counted, sd2.tree_rooting_types_counted)
+            self.assertEqual(list(sd1.split_counts.items()), list(sd2.split_counts.items()))
+            for split in sd2.split_counts:
+                self.assertEqual(sd1.split_edge_lengths[split], sd2.split_edge_lengths[split])
+                self.assertEqual(sd1.split_node_ages[split], sd2.split_node_ages[split])
+
+    def test_incompatible_update(self):
+        taxon_namespace = dendropy.TaxonNamespace()
+        ta1 = self.get_tree_array(taxon_namespace, 240, ignore_node_ages=False)
+        ta2 = self.get_tree_array(taxon_namespace, 240, ignore_node_ages=True)
+        with self.assertRaises(dendropy.TreeArray.IncompatibleNodeAgesTreeArrayUpdate):
+            self.round_trip([ta1, ta2])
+
+class TreeArrayStore(unittest.TestCase):
+
+    source_path = pathmap.tree_source_path("cetaceans.mb.strict-clock.mcmc.trees")
+
+    def get_store_path(self):
+        store_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, store_dir)
+        return os.path.join(store_dir, "trees.store")
+
+    def assertTreeArrayStoreEqual(self, tree_array, expected):
+        self.assertEqual(tree_array.is_rooted_trees, expected.is_rooted_trees)
+        self.assertEqual(tree_array.ignore_edge_lengths, expected.ignore_edge_lengths)
+        self.assertEqual(tree_array.ignore_node_ages, expected.ignore_node_ages)
+        self.assertEqual(tree_array.taxon_namespace.labels(), expected.taxon_namespace.labels())
+        self.assertEqual(list(tree_array), list(expected))
+        self.assertEqual(list(tree_array._tree_leafset_bitmasks), list(expected._tree_leafset_bitmasks))
+        self.assertEqual(list(tree_array._tree_weights), list(expected._tree_weights))
+        sd1 = tree_array.split_distribution
+        sd2 = expected.split_distribution
+        self.assertEqual(sd1.total_trees_counted, sd2.total_trees_counted)
+        self.assertEqual(sd1.sum_of_tree_weights, sd2.sum_of_tree_weights)
+        self.assertEqual(sd1.tree_rooting_types_counted, sd2.tree_rooting_types_counted)
+        self.assertEqual(list(sd1.split_counts.items()), list(sd2.split_counts.items()))
+        self.assertEqual(bool(sd1.split_edge_lengths), bool(sd2.split_edge_lengths))
+        self.assertEqual(bool(sd1.split_node_ages), bool(sd2.split_node_ages))
+        for split in sd2.split_counts:
+            self.assertEqual(split in sd1.split_edge_lengths, split in sd2.split_edge_lengths)
+            self.assertEqual(sd1.split_edge_lengths[split], sd2.split_edge_lengths[split])
+            self.assertEqual(sd1.split_node_ages[split], sd2.split_node_ages[split])
+        self.assertEqual(tree_array.calculate_log_product_of_split_supports(),
+                expected.calculate_log_product_of_split_supports())
+        kwargs = {"support_as_percentages": True}
+        if not expected.ignore_node_ages:
+            kwargs["edge_length_summarization"] = "median-age"
+        for method in ("consensus_tree", "maximum_product_of_split_support_tree"):
+            self.assertEqual(
+                    getattr(tree_array, method)(**kwargs).as_string("newick"),
+                    getattr(expected, method)(**kwargs).as_string("newick"))
+
+    def test_save_and_open(self):
+        for kwargs in (
+                {"ignore_node_ages": False},
+                {"ignore_edge_lengths": True},
+                {"use_compact_storage": True},
+                ):
+            expected = dendropy.TreeArray(**kwargs)
+            expected.read_from_files(files=[self.source_path], schema="nexus", tree_offset=150)
+            path = self.get_store_path()
+            expected.save(path)
+            for use_mmap in (True, False):
+                tree_array = dendropy.TreeArray.open(path, use_mmap=use_mmap)
+                self.assertTreeArrayStoreEqual(tree_array, expected)
+
+    def test_writer(self):
+        for kwargs in (
+                {"ignore_node_ages": False},
+                {"ignore_edge_lengths": True},
+                ):
+            expected = dendropy.TreeArray(**kwargs)
+            expected.read_from_files(files=[self.source_path], schema="nexus", tree_offset=100)
+            path = self.get_store_path()
+            with dendropy.TreeArrayStoreWriter(path=path, **kwargs) as writer:
+                writer.read_from_files(files=[self.source_path], schema="nexus", tree_offset=100)
+            self.assertEqual(len(writer), len(expected))
+            self.assertEqual(os.listdir(os.path.dirname(path)), [os.path.basename(path)])
+            tree_array = dendropy.TreeArray.open(path)
+            self.assertTreeArrayStoreEqual(tree_array, expected)
+            # memory-mappings of the temporary files closed with them
+            for spooled_array in writer._spooled_arrays:
+                self.assertEqual(spooled_array._file_mappings, [])
+                self.assertTrue(spooled_array._file.closed)
+
+    def test_spooled_array(self):
+        spooled_array = treecollectionmodel._SpooledArray("d", dir=os.path.dirname(self.get_store_path()))
+        spooled_array.CHUNK_SIZE = 4
+        spooled_array.extend([0.5, 1.5, 2.5, 3.5])
+        spooled_array.append(4.5)
+        view = spooled_array.view()
+        self.assertEqual(len(spooled_array), 5)
+        self.assertEqual(list(view), [0.5, 1.5, 2.5, 3.5, 4.5])
+        spooled_array.close()
+        with self.assertRaises(ValueError):
+            view[0]
+
+    def test_open_into_taxon_namespace(self):
+        expected = dendropy.TreeArray()
+        expected.read_from_files(files=[self.source_path], schema="nexus", tree_offset=200)
+        path = self.get_store_path()
+        expected.save(path)
+        tree_array = dendropy.TreeArray.open(path, taxon_namespace=expected.taxon_namespace)
+        self.assertIs(tree_array.taxon_namespace, expected.taxon_namespace)
+        tree = tree_array.restore_tree(0)
+        expected.summarize_splits_on_tree(tree)
+        tree_array.summarize_splits_on_tree(tree)
+        taxon_namespace = dendropy.TaxonNamespace(list(reversed(expected.taxon_namespace.labels())))
+        with self.assertRaises(ValueError):
+            dendropy.TreeArray.open(path, taxon_namespace=taxon_namespace)
+
+    def test_read_only(self):
+        source = dendropy.TreeArray()
+        source.read_from_files(files=[self.source_path], schema="nexus", tree_offset=200)
+        path = self.get_store_path()
+        source.save(path)
+        tree_array = dendropy.TreeArray.open(path)
+        with self.assertRaises(TypeError):
+            tree_array.update(source)
+        with self.assertRaises(TypeError):
+            tree_array.add_tree(tree_array.restore_tree(0))
+        self.assertEqual(len(tree_array), len(source))
+        tree_array = dendropy.TreeArray.open(path, use_mmap=False)
+        tree_array.update(source)
+        self.assertEqual(len(tree_array), 2 * len(source))
 
 if __name__ == "__main__":
     unittest.main()
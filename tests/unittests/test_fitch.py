@@ -29,6 +29,8 @@ import math
 import sys
 import dendropy
 from dendropy.calculate.treescore import fitch_down_pass
+from dendropy.calculate.treescore import fitch_up_pass
+from dendropy.model.parsimony import PackedStateSets
 sys.path.insert(0, os.path.dirname(__file__))
 from support import pathmap
 
@@ -84,6 +86,126 @@ class FitchTest(unittest.TestCase):
             # print("{} vs. {}".format(expected_scores[n], pscore))
             self.assertEqual(expected_scores[n], pscore)
 
+def reference_fitch_down_pass(postorder_nodes, taxon_state_sets_map, weights=None):
+    # straightforward calculation on sets, one character at a time
+    node_state_sets = {}
+    score = 0
+    score_by_character = [0] * len(list(taxon_state_sets_map.values())[0])
+    for nd in postorder_nodes:
+        c = nd.child_nodes()
+        if not c:
+            node_state_sets[nd] = taxon_state_sets_map[nd.taxon]
+            continue
+        result = node_state_sets[c[0]]
+        for ch in c[1:]:
+            ch_state_sets = node_state_sets[ch]
+            next_result = []
+            for n, (a, b) in enumerate(zip(result, ch_state_sets)):
+                if a & b:
+                    next_result.append(a & b)
+                else:
+                    wt = 1 if weights is None else weights[n]
+                    score += wt
+                    score_by_character[n] += wt
+                    next_result.append(a | b)
+            result = next_result
+        node_state_sets[nd] = result
+    return score, score_by_character, node_state_sets
+
+class PackedStateSetsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.rng = random.Random(1)
+        self.taxon_namespace = dendropy.TaxonNamespace(["T{}".format(i) for i in range(12)])
+        self.taxon_state_sets_map = {}
+        for taxon in self.taxon_namespace:
+            state_sets = []
+            for idx in range(150):
+                if self.rng.random() < 0.1:
+                    state_sets.append(set(self.rng.sample(range(4), self.rng.randint(2, 4))))
+                else:
+                    state_sets.append(set([self.rng.randrange(4)]))
+            self.taxon_state_sets_map[taxon] = state_sets
+
+    def random_tree(self, max_children):
+        nodes = [dendropy.Node(taxon=taxon) for taxon in self.taxon_namespace]
+        while len(nodes) > 1:
+            children = [nodes.pop(self.rng.randrange(len(nodes)))
+                    for idx in range(min(len(nodes), self.rng.randint(2, max_children)))]
+            nd = dendropy.Node()
+            nd.set_child_nodes(children)
+            nodes.append(nd)
+        return dendropy.Tree(seed_node=nodes[0], taxon_namespace=self.taxon_namespace)
+
+    def test_pack(self):
+        packed_state_sets = PackedStateSets(self.taxon_state_sets_map)
+        self.assertEqual(packed_state_sets.states, [0, 1, 2, 3])
+        self.assertEqual(packed_state_sets.num_characters, 150)
+        for taxon, state_sets in self.taxon_state_sets_map.items():
+            self.assertEqual(packed_state_sets.state_sets(packed_state_sets.taxon_state_bitmasks[taxon]), state_sets)
+        with self.assertRaises(ValueError):
+            PackedStateSets({"a": [set([1])], "b": [set([1]), set([2])]})
+        # more distinct state sets than fit in a byte
+        taxon_state_sets_map = {"a": [set(range(i)) for i in range(300)], "b": [set([i]) for i in range(300)]}
+        packed_state_sets = PackedStateSets(taxon_state_sets_map)
+        self.assertEqual(packed_state_sets.state_sets(packed_state_sets.taxon_state_bitmasks["a"]), taxon_state_sets_map["a"])
+        self.assertEqual(packed_state_sets.state_sets(packed_state_sets.taxon_state_bitmasks["b"]), taxon_state_sets_map["b"])
+
+    def test_fitch_down_pass(self):
+        packed_state_sets = PackedStateSets(self.taxon_state_sets_map)
+        weights = [self.rng.randint(0, 3) for idx in range(150)]
+        # summed in the same order as by the reference, so exactly equal
+        float_weights = [self.rng.random() for idx in range(150)]
+        for max_children in (2, 4):
+            for idx in range(5):
+                tree = self.random_tree(max_children)
+                postorder_nodes = list(tree.postorder_node_iter())
+                for wts in (None, weights, float_weights):
+                    expected_score, expected_score_by_character, expected_state_sets = reference_fitch_down_pass(
+                            postorder_nodes, self.taxon_state_sets_map, weights=wts)
+                    score_by_character_list = []
+                    node_state_bitmasks = {}
+                    score = packed_state_sets.fitch_down_pass(
+                            postorder_nodes,
+                            weights=wts,
+                            score_by_character_list=score_by_character_list,
+                            node_state_bitmasks=node_state_bitmasks)
+                    self.assertEqual(score, expected_score)
+                    self.assertEqual(score_by_character_list, expected_score_by_character)
+                    self.assertEqual(packed_state_sets.fitch_down_pass(postorder_nodes, weights=wts), expected_score)
+                    for nd in postorder_nodes:
+                        self.assertEqual(packed_state_sets.state_sets(node_state_bitmasks[nd]), expected_state_sets[nd])
+                    score_by_character_list = []
+                    self.assertEqual(fitch_down_pass(
+                            postorder_nodes,
+                            taxon_state_sets_map=self.taxon_state_sets_map,
+                            weights=wts,
+                            score_by_character_list=score_by_character_list), expected_score)
+                    self.assertEqual(score_by_character_list, expected_score_by_character)
+                    for nd in postorder_nodes:
+                        self.assertEqual(nd.state_sets, expected_state_sets[nd])
+                        del nd.state_sets
+
+    def test_fitch_up_pass(self):
+        packed_state_sets = PackedStateSets(self.taxon_state_sets_map)
+        for idx in range(5):
+            tree = self.random_tree(2)
+            node_state_bitmasks = {}
+            packed_state_sets.fitch_down_pass(tree.postorder_node_iter(), node_state_bitmasks=node_state_bitmasks)
+            packed_state_sets.fitch_up_pass(tree.preorder_node_iter(), node_state_bitmasks)
+            fitch_down_pass(tree.postorder_node_iter(), taxon_state_sets_map=self.taxon_state_sets_map)
+            fitch_up_pass(tree.preorder_node_iter())
+            for nd in tree:
+                self.assertEqual(packed_state_sets.state_sets(node_state_bitmasks[nd]), nd.state_sets)
+        tree = dendropy.Tree.get(
+                data="((T0,T1,T2),(T3,T4,T5,T6,T7,T8,T9,T10,T11));",
+                schema="newick",
+                taxon_namespace=self.taxon_namespace)
+        node_state_bitmasks = {}
+        packed_state_sets.fitch_down_pass(tree.postorder_node_iter(), node_state_bitmasks=node_state_bitmasks)
+        with self.assertRaises(ValueError):
+            packed_state_sets.fitch_up_pass(tree.preorder_node_iter(), node_state_bitmasks)
+
 if __name__ == "__main__":
     unittest.main()
 
@@ -492,6 +492,33 @@ class ParsimonyScoringTest(unittest.TestCase):
                     gaps_as_missing=gaps_as_missing)
             self.assertEqual(pscore, expected_scores[tree_idx])
 
+            # scoring each site pattern once
+            site_patterns = chars.compressed_patterns(gaps_as_missing=gaps_as_missing)
+            score_by_character_list = []
+            pscore = treescore.parsimony_score(
+                    tree,
+                    site_patterns,
+                    score_by_character_list=score_by_character_list)
+            self.assertEqual(pscore, expected_scores[tree_idx])
+            self.assertEqual(score_by_character_list, expected_per_site_scores[tree_idx])
+            score_by_character_list = []
+            pscore = treescore.fitch_down_pass(
+                    tree.postorder_node_iter(),
+                    state_sets_attr_name=None,
+                    taxon_state_sets_map=site_patterns,
+                    score_by_character_list=score_by_character_list)
+            self.assertEqual(pscore, expected_scores[tree_idx])
+            self.assertEqual(score_by_character_list, expected_per_site_scores[tree_idx])
+            weights = [(idx % 3) for idx in range(site_patterns.num_characters)]
+            self.assertEqual(
+                    treescore.parsimony_score(tree, site_patterns, weights=weights),
+                    sum(w * s for w, s in zip(weights, expected_per_site_scores[tree_idx])))
+            # the weights of the characters of each pattern are summed first
+            weights = [1.0 / (idx + 1) for idx in range(site_patterns.num_characters)]
+            self.assertAlmostEqual(
+                    treescore.parsimony_score(tree, site_patterns, weights=weights),
+                    treescore.parsimony_score(tree, chars, weights=weights, gaps_as_missing=gaps_as_missing))
+
 if __name__ == "__main__":
     unittest.main()
 
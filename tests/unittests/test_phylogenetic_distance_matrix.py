@@ -18,7 +18,9 @@
 ##############################################################################
 
 from io import StringIO
+import random
 import unittest
+from unittest import mock
 import dendropy
 import csv
 from dendropy.utility import container
@@ -29,6 +31,7 @@ from support import pathmap
 from dendropy.calculate import treemeasure
 from dendropy.calculate import probability
 from dendropy.calculate import combinatorics
+from dendropy.calculate import phylogeneticdistance
 
 class PhylogeneticDistanceMatrixCloneTest(unittest.TestCase):
 
@@ -43,14 +46,14 @@ class PhylogeneticDistanceMatrixCloneTest(unittest.TestCase):
         self.assertEqual(len(pdm0.taxon_namespace), len(pdm0._mapped_taxa))
         self.assertEqual(len(pdm1.taxon_namespace), len(pdm1._mapped_taxa))
         for src, dest in (
-                    (pdm0._taxon_phylogenetic_distances, pdm1._taxon_phylogenetic_distances,),
-                    (pdm0._taxon_phylogenetic_path_steps, pdm1._taxon_phylogenetic_path_steps,),
-                    (pdm0._mrca, pdm1._mrca,),
+                    (pdm0._mapped_taxa, pdm1._mapped_taxa,),
+                    (pdm0._phylogenetic_distances, pdm1._phylogenetic_distances,),
+                    (pdm0._phylogenetic_path_steps, pdm1._phylogenetic_path_steps,),
+                    (pdm0._mrca_node_indexes, pdm1._mrca_node_indexes,),
+                    (pdm0._mrca_nodes, pdm1._mrca_nodes,),
                 ):
             self.assertIsNot(src, dest)
-            for t1 in src:
-                self.assertIn(t1, dest)
-                self.assertIsNot(src[t1], dest[t1])
+            self.assertEqual(src, dest)
         for t1 in self.tree.taxon_namespace:
             for t2 in self.tree.taxon_namespace:
                 self.assertEqual(pdm0.patristic_distance(t1, t2), pdm1.patristic_distance(t1, t2))
@@ -76,6 +79,8 @@ class PhylogeneticDistanceMatrixCompileTest(unittest.TestCase):
                 schema="nexus",
                 preserve_underscores=True)
             self.pdm = self.tree.phylogenetic_distance_matrix()
+            self.pdm_weighted_table = self.pdm.as_data_table(is_weighted_edge_distances=True)
+            self.pdm_unweighted_table = self.pdm.as_data_table(is_weighted_edge_distances=False)
 
         def test_mapped_taxa(self):
             n1 = len(self.tree.taxon_namespace)
@@ -89,23 +94,20 @@ class PhylogeneticDistanceMatrixCompileTest(unittest.TestCase):
 
         def test_all_distinct_mapped_taxa_pairs(self):
             n1 = len(self.tree.taxon_namespace)
-            taxon_pair_iter1 = iter(self.pdm._all_distinct_mapped_taxa_pairs)
-            taxon_pair_iter2 = self.pdm.distinct_taxon_pair_iter()
-            for tpi in (taxon_pair_iter1, taxon_pair_iter2):
-                seen_pairs = set()
-                visited_taxa = set()
-                for taxon1, taxon2 in tpi:
-                    s = frozenset([taxon1, taxon2])
-                    self.assertIn(taxon1, self.pdm._mapped_taxa)
-                    self.assertIn(taxon1, self.tree.taxon_namespace)
-                    self.assertIn(taxon2, self.pdm._mapped_taxa)
-                    self.assertIn(taxon2, self.tree.taxon_namespace)
-                    self.assertNotIn(s, seen_pairs)
-                    seen_pairs.add(s)
-                    visited_taxa.add(taxon1)
-                    visited_taxa.add(taxon2)
-                self.assertEqual(len(visited_taxa), n1)
-                self.assertEqual(len(seen_pairs), combinatorics.choose(n1, 2))
+            seen_pairs = set()
+            visited_taxa = set()
+            for taxon1, taxon2 in self.pdm.distinct_taxon_pair_iter():
+                s = frozenset([taxon1, taxon2])
+                self.assertIn(taxon1, self.pdm._mapped_taxa)
+                self.assertIn(taxon1, self.tree.taxon_namespace)
+                self.assertIn(taxon2, self.pdm._mapped_taxa)
+                self.assertIn(taxon2, self.tree.taxon_namespace)
+                self.assertNotIn(s, seen_pairs)
+                seen_pairs.add(s)
+                visited_taxa.add(taxon1)
+                visited_taxa.add(taxon2)
+            self.assertEqual(len(visited_taxa), n1)
+            self.assertEqual(len(seen_pairs), combinatorics.choose(n1, 2))
 
         def test_tree_length(self):
             self.assertEqual(self.pdm._tree_length, self.tree.length())
@@ -118,7 +120,7 @@ class PhylogeneticDistanceMatrixCompileTest(unittest.TestCase):
             for taxon1 in self.tree.taxon_namespace:
                 for taxon2 in self.tree.taxon_namespace:
                     exp = self.reference_pdm_weighted_table[taxon1.label, taxon2.label]
-                    obs1 = self.pdm._taxon_phylogenetic_distances[taxon1][taxon2]
+                    obs1 = self.pdm_weighted_table[taxon1.label, taxon2.label]
                     self.assertAlmostEqual(obs1, exp, 6)
                     obs2 = self.pdm.patristic_distance(taxon1, taxon2)
                     self.assertAlmostEqual(obs2, exp, 6)
@@ -147,7 +149,7 @@ class PhylogeneticDistanceMatrixCompileTest(unittest.TestCase):
             for taxon1 in self.tree.taxon_namespace:
                 for taxon2 in self.tree.taxon_namespace:
                     exp = self.reference_pdm_unweighted_table[taxon1.label, taxon2.label]
-                    obs1 = self.pdm._taxon_phylogenetic_path_steps[taxon1][taxon2]
+                    obs1 = self.pdm_unweighted_table[taxon1.label, taxon2.label]
                     self.assertAlmostEqual(obs1, exp, 6)
                     obs2 = self.pdm.path_edge_count(taxon1, taxon2)
                     self.assertAlmostEqual(obs2, exp, 6)
@@ -296,6 +298,48 @@ class PhylogeneticDistanceMatrixCompileTest(unittest.TestCase):
             else:
                 self.fail()
 
+class PhylogeneticDistanceMatrixMultifurcatingTreeTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tree = dendropy.Tree.get_from_string(
+                "((a:1,b:2,(c:1,d,e:3):2):1,(f:2,(g:1,h:1)),i:4,j:2);",
+                schema="newick")
+        self.pdm = self.tree.phylogenetic_distance_matrix()
+        self.nodes = dict((nd.taxon, nd) for nd in self.tree.leaf_node_iter())
+
+    def path_to_root(self, taxon):
+        nodes = []
+        nd = self.nodes[taxon]
+        while nd is not None:
+            nodes.append(nd)
+            nd = nd.parent_node
+        return nodes
+
+    def test_distances(self):
+        for t1 in self.tree.taxon_namespace:
+            for t2 in self.tree.taxon_namespace:
+                path1 = self.path_to_root(t1)
+                path2 = self.path_to_root(t2)
+                mrca = [nd for nd in path1 if nd in path2][0]
+                edges = path1[:path1.index(mrca)] + path2[:path2.index(mrca)]
+                self.assertIs(self.pdm.mrca(t1, t2), mrca)
+                self.assertEqual(self.pdm.patristic_distance(t1, t2),
+                        sum(nd.edge.length for nd in edges if nd.edge.length is not None))
+                self.assertEqual(self.pdm.path_edge_count(t1, t2), len(edges))
+
+    def test_shuffle_and_compare(self):
+        pdm = self.pdm.clone()
+        current_to_shuffled_taxon_map = pdm.shuffle_taxa()
+        self.assertEqual(pdm == self.pdm,
+                all(t1 is t2 for t1, t2 in current_to_shuffled_taxon_map.items()))
+        for t1 in self.tree.taxon_namespace:
+            x1 = current_to_shuffled_taxon_map[t1]
+            for t2 in self.tree.taxon_namespace:
+                x2 = current_to_shuffled_taxon_map[t2]
+                self.assertEqual(pdm.patristic_distance(x1, x2), self.pdm.patristic_distance(t1, t2))
+                self.assertEqual(pdm.path_edge_count(x1, x2), self.pdm.path_edge_count(t1, t2))
+                self.assertIs(pdm.mrca(x1, x2), self.pdm.mrca(t1, t2))
+
 class PhylogeneticDistanceMatrixShuffleTest(unittest.TestCase):
 
     def test_shuffle(self):
@@ -515,6 +559,75 @@ class PhylogeneticEcologyStatsTests(unittest.TestCase):
                     expected_results_data_table[expected_result_row_name, "mntd.obs.p"],
                     ))
 
+    def _ses_results(self, **kwargs):
+        results = []
+        for method in (
+                self.pdm.standardized_effect_size_mean_pairwise_distance,
+                self.pdm.standardized_effect_size_mean_nearest_taxon_distance,
+                ):
+            results.extend(method(
+                    assemblage_memberships=self.assemblage_memberships,
+                    num_randomization_replicates=120,
+                    rng=random.Random(1),
+                    **kwargs))
+        return results
+
+    def assertSesResultsAlmostEqual(self, results1, results2):
+        self.assertEqual(len(results1), len(results2))
+        for result1, result2 in zip(results1, results2):
+            for v1, v2 in zip(result1, result2):
+                self.assertAlmostEqual(v1, v2)
+
+    def test_ses_reproducible_with_multiple_processes(self):
+        results = self._ses_results()
+        self.assertEqual(results, self._ses_results())
+        self.assertEqual(results, self._ses_results(num_processes=2))
+
+    def test_ses_without_numpy(self):
+        for is_weighted_edge_distances in (True, False):
+            results = self._ses_results(is_weighted_edge_distances=is_weighted_edge_distances)
+            with mock.patch.object(phylogeneticdistance, "numpy", None):
+                self.assertSesResultsAlmostEqual(results,
+                        self._ses_results(is_weighted_edge_distances=is_weighted_edge_distances))
+
+    def test_ses_unweighted_null_model(self):
+        for result in self._ses_results(is_weighted_edge_distances=False):
+            self.assertGreater(result.null_model_sd, 0)
+
+    def test_ses_null_model_values(self):
+        rng = random.Random(1)
+        mapped_taxa = list(self.pdm._mapped_taxa)
+        memberships = list(self.assemblage_memberships)
+        masks = [[taxon in set(membership) for taxon in mapped_taxa] for membership in memberships]
+        for statistic, method in (
+                ("mpd", self.pdm.mean_pairwise_distance),
+                ("mntd", self.pdm.mean_nearest_taxon_distance),
+                ):
+            calculator = phylogeneticdistance._AssemblageStatisticCalculator(
+                    self.pdm._phylogenetic_distances,
+                    len(mapped_taxa),
+                    masks,
+                    statistic,
+                    1.0)
+            seed = rng.getrandbits(32)
+            values = calculator.null_model_values(seed, 3)
+            # replay the shuffles of the taxa labels to get the randomized
+            # assemblages
+            replicate_rng = random.Random(seed)
+            permutation = list(range(len(mapped_taxa)))
+            permutations = []
+            for rep_idx in range(3):
+                replicate_rng.shuffle(permutation)
+                permutations.append(list(permutation))
+            for membership, assemblage_values in zip(memberships, values):
+                self.assertEqual(len(assemblage_values), 3)
+                membership = set(membership)
+                for permutation, value in zip(permutations, assemblage_values):
+                    permuted_taxa = set(mapped_taxa[permutation[idx]]
+                            for idx, taxon in enumerate(mapped_taxa) if taxon in membership)
+                    self.assertAlmostEqual(value,
+                            method(filter_fn=lambda taxon: taxon in permuted_taxa))
+
 class PhylogeneticDistanceMatrixReader(unittest.TestCase):
 
     def setUp(self):
@@ -800,6 +913,148 @@ class PdmUpgmaTree(PdmTreeChecker, unittest.TestCase):
             self.check_tree(obs_tree=obs_tree,
                     expected_tree=expected_tree)
 
+class PdmTreeJoinsTest(unittest.TestCase):
+    # Checks the joins made in building the NJ and UPGMA trees against plain
+    # O(n^3) versions of the algorithms, with the arithmetic done in the same
+    # order, on random distances with many ties.
+
+    def get_distances(self, num_taxa, rng):
+        distances = {}
+        for i in range(num_taxa):
+            for j in range(i + 1, num_taxa):
+                if rng.random() < 0.8:
+                    d = float(rng.randint(0, 4))
+                else:
+                    d = rng.random()
+                distances[i, j] = d
+                distances[j, i] = d
+        condensed = [distances[i, j] for i in range(num_taxa) for j in range(i + 1, num_taxa)]
+        return distances, condensed
+
+    def nj_joins(self, distances, num_taxa):
+        pool = list(range(num_taxa))
+        xsub = {}
+        for i in pool:
+            xsub[i] = 0.0
+            for j in pool:
+                if i != j:
+                    xsub[i] += distances[i, j]
+        joins = []
+        while len(pool) > 1:
+            n = len(pool)
+            min_q = None
+            for idx1, i in enumerate(pool[:-1]):
+                for j in pool[idx1+1:]:
+                    q = (n - 2) * distances[i, j] - xsub[i] - xsub[j]
+                    if min_q is None or q < min_q:
+                        min_q = q
+                        a, b = i, j
+            dab = distances[a, b]
+            if n > 2:
+                length1 = 0.5 * dab + 1.0/(2*(n-2)) * (xsub[a] - xsub[b])
+                length2 = dab - length1
+            else:
+                length1 = dab / 2
+                length2 = dab / 2
+            new_node = num_taxa + len(joins)
+            joins.append((a, b, length1, length2))
+            pool.remove(a)
+            pool.remove(b)
+            xsub[new_node] = 0.0
+            for i in pool:
+                d = 0.5 * (0.0 + distances[i, a] + distances[i, b] - dab)
+                distances[i, new_node] = d
+                distances[new_node, i] = d
+                xsub[new_node] += d
+                xsub[i] = xsub[i] + d - distances[i, a] - distances[i, b]
+            pool.append(new_node)
+        return joins
+
+    def upgma_joins(self, distances, num_taxa):
+        pool = list(range(num_taxa))
+        sizes = dict((i, 1) for i in pool)
+        heights = dict((i, 0.0) for i in pool)
+        joins = []
+        while len(pool) > 1:
+            min_d = None
+            for idx1, i in enumerate(pool[:-1]):
+                for j in pool[idx1+1:]:
+                    if min_d is None or distances[i, j] < min_d:
+                        min_d = distances[i, j]
+                        a, b = i, j
+            length1 = min_d / 2.0 - heights[a]
+            length2 = min_d / 2.0 - heights[b]
+            new_node = num_taxa + len(joins)
+            joins.append((a, b, length1, length2))
+            pool.remove(a)
+            pool.remove(b)
+            for i in pool:
+                d = (0.0 + distances[a, i] * sizes[a] + distances[b, i] * sizes[b]) / (0.0 + sizes[a] + sizes[b])
+                distances[i, new_node] = d
+                distances[new_node, i] = d
+            sizes[new_node] = sizes[a] + sizes[b]
+            heights[new_node] = length1 + heights[a]
+            pool.append(new_node)
+        return joins
+
+    def get_tree_distances(self, num_taxa, rng):
+        # numbers of edges between the taxa of a random tree
+        subtrees = ["t{}".format(i) for i in range(num_taxa)]
+        while len(subtrees) > 3:
+            subtree1 = subtrees.pop(rng.randrange(len(subtrees)))
+            subtree2 = subtrees.pop(rng.randrange(len(subtrees)))
+            subtrees.append("({},{})".format(subtree1, subtree2))
+        tree = dendropy.Tree.get(data="({});".format(",".join(subtrees)), schema="newick")
+        pdm = tree.phylogenetic_distance_matrix()
+        taxa = list(pdm.taxon_iter())
+        distances = {}
+        for i, taxon1 in enumerate(taxa):
+            for j, taxon2 in enumerate(taxa):
+                distances[i, j] = float(pdm.path_edge_count(taxon1, taxon2))
+        condensed = [distances[i, j] for i in range(num_taxa) for j in range(i + 1, num_taxa)]
+        return distances, condensed
+
+    def check_joins(self, expected_fn, fn_names):
+        rng = random.Random(1)
+        for num_taxa in (1, 2, 3, 4, 5, 8, 13, 21, 34, 55, 89):
+            for get_distances in (self.get_distances, self.get_tree_distances):
+                for rep in range(3):
+                    distances, condensed = get_distances(num_taxa, rng)
+                    expected = expected_fn(distances, num_taxa)
+                    for fn_name in fn_names:
+                        joins = getattr(phylogeneticdistance, fn_name)(condensed, num_taxa)
+                        self.assertEqual(joins, expected, fn_name)
+
+    def test_nj_joins(self):
+        fn_names = ["_nj_joins"]
+        if phylogeneticdistance.numpy is not None:
+            fn_names.append("_nj_joins_numpy")
+        self.check_joins(self.nj_joins, fn_names)
+
+    def test_upgma_joins(self):
+        fn_names = ["_upgma_joins"]
+        if phylogeneticdistance.numpy is not None:
+            fn_names.append("_upgma_joins_numpy")
+        self.check_joins(self.upgma_joins, fn_names)
+
+    @unittest.skipIf(phylogeneticdistance.numpy is None, "NumPy is not installed")
+    def test_trees_without_numpy(self):
+        tree = dendropy.Tree.get(path=pathmap.tree_source_path(
+            "pythonidae.mle.nex"),
+            schema="nexus",
+            preserve_underscores=True)
+        pdm = tree.phylogenetic_distance_matrix()
+        for method_name in ("nj_tree", "upgma_tree"):
+            method = getattr(pdm, method_name)
+            for is_weighted_edge_distances in (True, False):
+                obs_tree = method(is_weighted_edge_distances=is_weighted_edge_distances)
+                with mock.patch.object(phylogeneticdistance, "numpy", None):
+                    expected_tree = method(is_weighted_edge_distances=is_weighted_edge_distances)
+                self.assertEqual(obs_tree.is_rooted, expected_tree.is_rooted)
+                self.assertEqual(
+                        [(nd.taxon, nd.edge.length) for nd in obs_tree.postorder_node_iter()],
+                        [(nd.taxon, nd.edge.length) for nd in expected_tree.postorder_node_iter()])
+
 class NodeToNodeDistancesTest(unittest.TestCase):
 
     def test_distances(self):
@@ -912,6 +1167,67 @@ class PhylogeneticPathTest(unittest.TestCase):
                 # print("{}, {}: {}".format(t1.label, t2.label, obs_edges1_labels))
                 self.assertEqual(expected[(t1.label, t2.label)], obs_edges1_labels)
 
+class TreeDistanceOracleTest(unittest.TestCase):
+
+    def setUp(self):
+        with open(pathmap.other_source_path("pythonidae.mle.weighted.pdm.csv")) as src:
+            self.reference_pdm_weighted_table = container.DataTable.from_csv(src, default_data_type=float, delimiter=",")
+        with open(pathmap.other_source_path("pythonidae.mle.unweighted.pdm.csv")) as src:
+            self.reference_pdm_unweighted_table = container.DataTable.from_csv(src, default_data_type=float, delimiter=",")
+        self.tree = dendropy.Tree.get(path=pathmap.tree_source_path(
+            "pythonidae.mle.nex"),
+            schema="nexus",
+            preserve_underscores=True)
+        self.lca_index = self.tree.lca_index()
+
+    def test_taxon_queries(self):
+        pdm = self.tree.phylogenetic_distance_matrix()
+        for taxon1 in self.tree.taxon_namespace:
+            for taxon2 in self.tree.taxon_namespace:
+                exp = self.reference_pdm_weighted_table[taxon1.label, taxon2.label]
+                self.assertAlmostEqual(self.lca_index.patristic_distance(taxon1, taxon2), exp, 6)
+                self.assertAlmostEqual(self.lca_index.distance(taxon1, taxon2,
+                    is_weighted_edge_distances=True,
+                    is_normalize_by_tree_size=True), exp / self.tree.length(), 6)
+                exp = self.reference_pdm_unweighted_table[taxon1.label, taxon2.label]
+                self.assertEqual(self.lca_index.path_edge_count(taxon1, taxon2), exp)
+                self.assertIs(self.lca_index.mrca(taxon1, taxon2), pdm.mrca(taxon1, taxon2))
+
+    def test_node_queries(self):
+        ndm = self.tree.node_distance_matrix()
+        nodes = list(self.tree)
+        self.assertEqual(len(self.lca_index), len(nodes))
+        for node1 in nodes:
+            for node2 in nodes:
+                self.assertIs(self.lca_index.mrca(node1, node2), ndm.mrca(node1, node2))
+                self.assertAlmostEqual(self.lca_index.patristic_distance(node1, node2),
+                        ndm.patristic_distance(node1, node2))
+                self.assertEqual(self.lca_index.path_edge_count(node1, node2),
+                        ndm.path_edge_count(node1, node2))
+
+    def test_batch_queries(self):
+        taxa = list(self.tree.taxon_namespace)
+        nodes = list(self.tree)
+        pairs = [(t1, t2) for t1 in taxa for t2 in taxa] + list(zip(nodes, reversed(nodes)))
+        distances = self.lca_index.patristic_distances(pairs)
+        normalized_distances = self.lca_index.patristic_distances(pairs, is_normalize_by_tree_size=True)
+        path_edge_counts = self.lca_index.path_edge_counts(pairs)
+        mrcas = self.lca_index.mrcas(pairs)
+        for idx, (x1, x2) in enumerate(pairs):
+            self.assertEqual(distances[idx], self.lca_index.patristic_distance(x1, x2))
+            self.assertEqual(normalized_distances[idx], self.lca_index.patristic_distance(x1, x2,
+                is_normalize_by_tree_size=True))
+            self.assertEqual(path_edge_counts[idx], self.lca_index.path_edge_count(x1, x2))
+            self.assertIs(mrcas[idx], self.lca_index.mrca(x1, x2))
+
+    def test_single_node_tree(self):
+        tree = dendropy.Tree.get(data="A;", schema="newick")
+        lca_index = tree.lca_index()
+        taxon = tree.taxon_namespace[0]
+        self.assertIs(lca_index.mrca(taxon, taxon), tree.seed_node)
+        self.assertEqual(lca_index.patristic_distance(taxon, taxon), 0.0)
+        self.assertEqual(lca_index.path_edge_count(taxon, taxon), 0)
+
 if __name__ == "__main__":
     unittest.main()
 
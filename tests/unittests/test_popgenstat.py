@@ -107,6 +107,39 @@ class SinglePopTest(dendropytest.ExtendedTestCase):
     def test_wattersons_theta(self):
         self.assertAlmostEqual(popgenstat.wattersons_theta(self.data, ignore_uncertain=True), 49.00528, 4)
 
+class SitePatternsTest(dendropytest.ExtendedTestCase):
+
+    data = dendropy.DnaCharacterMatrix.get_from_path(pathmap.char_source_path('COII_Apes.nex'), schema="nexus")
+
+    def test_statistics(self):
+        site_patterns = self.data.compressed_patterns()
+        self.assertLess(site_patterns.num_patterns, site_patterns.num_characters)
+        for ignore_uncertain in (True, False):
+            for f in (
+                    popgenstat.num_segregating_sites,
+                    popgenstat.average_number_of_pairwise_differences,
+                    popgenstat.nucleotide_diversity,
+                    popgenstat.tajimas_d,
+                    popgenstat.wattersons_theta,
+                    ):
+                self.assertAlmostEqual(
+                        f(site_patterns, ignore_uncertain=ignore_uncertain),
+                        f(self.data, ignore_uncertain=ignore_uncertain),
+                        8)
+
+    def test_unfolded_site_frequency_spectrum(self):
+        site_patterns = self.data.compressed_patterns()
+        for ignore_uncertain in (True, False):
+            self.assertEqual(
+                    popgenstat.unfolded_site_frequency_spectrum(site_patterns, ignore_uncertain=ignore_uncertain),
+                    popgenstat.unfolded_site_frequency_spectrum(self.data, ignore_uncertain=ignore_uncertain))
+        taxon = self.data.taxon_namespace[2]
+        self.assertEqual(
+                popgenstat.unfolded_site_frequency_spectrum(site_patterns, ancestral_sequence=site_patterns[taxon]),
+                popgenstat.unfolded_site_frequency_spectrum(self.data, ancestral_sequence=self.data[taxon]))
+        with self.assertRaises(ValueError):
+            popgenstat.unfolded_site_frequency_spectrum(site_patterns, ancestral_sequence=self.data[taxon])
+
 class PopulationPairSummaryStatisticsTests(dendropytest.ExtendedTestCase):
 
     def testPopulationPairSummaryStatistics(self):
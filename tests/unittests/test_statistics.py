@@ -23,6 +23,7 @@ Tests statistical routines.
 
 import unittest
 import os
+import random
 import sys
 sys.path.insert(0, os.path.dirname(__file__))
 from support import dendropytest
@@ -643,6 +644,57 @@ class FishersExactTests(dendropytest.ExtendedTestCase):
         p = ft.two_tail_p()
         self.assertAlmostEqual(p, 0.08026855207410688)
 
+class StreamingSummaryTest(unittest.TestCase):
+
+    def get_values(self, num_values, seed=1):
+        rng = random.Random(seed)
+        return [rng.expovariate(0.2) for i in range(num_values)]
+
+    def accumulate(self, values, num_parts):
+        parts = [statistics.StreamingSummary() for i in range(num_parts)]
+        for idx, value in enumerate(values):
+            parts[idx % num_parts].add(value)
+        accumulator = statistics.StreamingSummary()
+        for part in parts:
+            accumulator.update(statistics.StreamingSummary.from_state(part.get_state()))
+        return accumulator
+
+    def test_exact(self):
+        values = self.get_values(300)
+        for num_parts in (1, 3):
+            accumulator = self.accumulate(values, num_parts)
+            self.assertTrue(accumulator.is_exact)
+            self.assertEqual(len(accumulator), len(values))
+            expected = statistics.summarize(sorted(values, key=values.index))
+            summary = accumulator.summarize()
+            for field in ("median", "hpd95", "quant_5_95", "range"):
+                self.assertEqual(summary[field], expected[field])
+            for field in ("mean", "var", "sd"):
+                self.assertAlmostEqual(summary[field], expected[field])
+
+    def test_approximate(self):
+        values = self.get_values(20000)
+        expected = statistics.summarize(values)
+        for num_parts in (1, 4):
+            accumulator = self.accumulate(values, num_parts)
+            self.assertFalse(accumulator.is_exact)
+            self.assertLessEqual(len(accumulator.get_state()), 2000)
+            summary = accumulator.summarize()
+            self.assertEqual(summary["range"], expected["range"])
+            self.assertAlmostEqual(summary["mean"], expected["mean"])
+            self.assertAlmostEqual(summary["sd"], expected["sd"])
+            self.assertAlmostEqual(summary["median"], expected["median"], delta=0.01 * expected["median"])
+            for field in ("hpd95", "quant_5_95"):
+                for observed_value, expected_value in zip(summary[field], expected[field]):
+                    self.assertAlmostEqual(observed_value, expected_value, delta=0.01 * expected["range"][1])
+
+    def test_missing_values(self):
+        accumulator = statistics.StreamingSummary()
+        accumulator.extend([1.0, None, 2.0])
+        self.assertEqual(len(accumulator), 3)
+        with self.assertRaises(TypeError):
+            accumulator.summarize()
+
 if __name__ == "__main__":
     unittest.main()
 
@@ -1065,6 +1065,120 @@ class TreeCompareTests(dendropytest.ExtendedTestCase):
 #                if (i * i+j+1) % 6 == 0:
 #                    print
 
+class PairwiseDistanceMatrixTests(unittest.TestCase):
+
+    def setUp(self):
+        self.tree_list = _get_reference_tree_list()
+
+    def check_distances(self, dm, dist_fn):
+        self.assertEqual(len(dm), len(self.tree_list))
+        for i, t1 in enumerate(self.tree_list):
+            self.assertEqual(dm(i, i), 0)
+            for j, t2 in enumerate(self.tree_list[i+1:], i+1):
+                expected = dist_fn(t1, t2)
+                self.assertAlmostEqual(dm(i, j), expected)
+                self.assertAlmostEqual(dm(j, i), expected)
+
+    def test_metrics(self):
+        for metric, dist_fn in (
+                ("symmetric_difference", treecompare.symmetric_difference),
+                ("weighted_robinson_foulds", treecompare.weighted_robinson_foulds_distance),
+                ("euclidean", treecompare.euclidean_distance),
+                ):
+            dm = treecompare.pairwise_distance_matrix(self.tree_list, metric=metric)
+            self.check_distances(dm, dist_fn)
+            dm2 = treecompare.pairwise_distance_matrix(self.tree_list, metric=metric, num_processes=2)
+            self.assertEqual(list(dm.distances), list(dm2.distances))
+
+    def test_tree_array(self):
+        tree_array = dendropy.TreeArray(
+                taxon_namespace=self.tree_list.taxon_namespace,
+                is_rooted_trees=self.tree_list[0].is_rooted)
+        tree_array.add_trees(self.tree_list)
+        for metric, dist_fn in (
+                ("symmetric_difference", treecompare.symmetric_difference),
+                ("euclidean", treecompare.euclidean_distance),
+                ):
+            dm = treecompare.pairwise_distance_matrix(tree_array, metric=metric)
+            self.check_distances(dm, dist_fn)
+
+    def test_output(self):
+        dm = treecompare.pairwise_distance_matrix(self.tree_list[:3])
+        self.assertEqual(list(dm), [[0, 60, 60], [60, 0, 14], [60, 14, 0]])
+        dest = StringIO()
+        dm.write_csv(dest)
+        self.assertEqual(dest.getvalue().splitlines(), [
+            ",Tree01,Tree02,Tree03",
+            "Tree01,0,60,60",
+            "Tree02,60,0,14",
+            "Tree03,60,14,0"])
+        pdm = dm.as_phylogenetic_distance_matrix()
+        taxa = list(pdm.taxon_namespace)
+        self.assertEqual([t.label for t in taxa], ["Tree01", "Tree02", "Tree03"])
+        self.assertEqual(pdm.patristic_distance(taxa[1], taxa[2]), 14)
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            treecompare.pairwise_distance_matrix(self.tree_list, metric="x")
+        other = _get_reference_tree_list()
+        with self.assertRaises(dendropy.utility.error.TaxonNamespaceIdentityError):
+            treecompare.pairwise_distance_matrix([self.tree_list[0], other[1]])
+
+class ReferenceTreeComparatorTests(unittest.TestCase):
+
+    def check_comparisons(self, reference_tree, comparisons, trees):
+        self.assertEqual(len(comparisons), len(trees))
+        for comparison, tree in zip(comparisons, trees):
+            fp, fn = treecompare.false_positives_and_negatives(reference_tree, tree)
+            self.assertEqual(comparison.false_positives, fp)
+            self.assertEqual(comparison.false_negatives, fn)
+            self.assertEqual(comparison.symmetric_difference,
+                    treecompare.symmetric_difference(reference_tree, tree))
+            self.assertAlmostEqual(comparison.weighted_robinson_foulds_distance,
+                    treecompare.weighted_robinson_foulds_distance(reference_tree, tree))
+            self.assertAlmostEqual(comparison.euclidean_distance,
+                    treecompare.euclidean_distance(reference_tree, tree))
+
+    def test_compare(self):
+        for filename, reference_idx in (
+                ("pythonidae.reference-trees.nexus", 3),
+                ("dendropy-test-trees-multifurcating-rooted.nexus", 0),
+                ):
+            path = pathmap.tree_source_path(filename)
+            trees = dendropy.TreeList.get(path=path, schema="nexus")
+            reference_tree = trees[reference_idx]
+            comparator = treecompare.ReferenceTreeComparator(reference_tree)
+            comparisons = list(comparator.compare_stream(trees))
+            self.assertEqual(comparisons[reference_idx].symmetric_difference, 0)
+            self.assertEqual(comparisons[reference_idx].euclidean_distance, 0.0)
+            self.assertEqual(list(comparator.compare_files([path], "nexus")), comparisons)
+            self.assertEqual(list(comparator.compare_files([path], "nexus", tree_offset=2)), comparisons[2:])
+            for tree in trees:
+                self.assertEqual(comparator.find_missing_bipartitions(tree),
+                        treecompare.find_missing_bipartitions(reference_tree, tree))
+            # comparison does not encode the bipartitions of the trees, so
+            # this compares against the trees as read
+            self.check_comparisons(reference_tree, comparisons, trees)
+
+    def test_edge_weight_attr(self):
+        path = pathmap.tree_source_path("pythonidae.reference-trees.nexus")
+        trees = dendropy.TreeList.get(path=path, schema="nexus")
+        for tree in trees:
+            for edge in tree.postorder_edge_iter():
+                edge.weight = 1.0
+        comparator = treecompare.ReferenceTreeComparator(trees[0], edge_weight_attr="weight")
+        for tree, comparison in zip(trees, comparator.compare_stream(trees)):
+            self.assertEqual(comparison.weighted_robinson_foulds_distance,
+                    comparison.symmetric_difference)
+
+    def test_taxon_namespace_identity(self):
+        path = pathmap.tree_source_path("pythonidae.reference-trees.nexus")
+        trees1 = dendropy.TreeList.get(path=path, schema="nexus")
+        trees2 = dendropy.TreeList.get(path=path, schema="nexus")
+        comparator = treecompare.ReferenceTreeComparator(trees1[0])
+        with self.assertRaises(dendropy.utility.error.TaxonNamespaceIdentityError):
+            comparator.compare(trees2[0])
+
 class FrequencyOfBipartitionsTests(unittest.TestCase):
 
     def testCount1(self):
@@ -218,6 +218,68 @@ class TestTreeEdgeSummarization(unittest.TestCase):
             obs_edge = target_tree.bipartition_edge_map[exp_bipartition]
             self.assertAlmostEqual(obs_edge.head_node.age, exp_edge.head_node.age)
 
+class TestStreamingSummarization(unittest.TestCase):
+
+    def setUp(self):
+        self.support_trees_path = pathmap.tree_source_path("cetaceans.mb.strict-clock.mcmc.trees")
+        self.burnin = 100
+
+    def get_tree_array(self, taxon_namespace, tree_offset, use_streaming_summaries):
+        tree_array = dendropy.TreeArray(
+                taxon_namespace=taxon_namespace,
+                ignore_node_ages=False,
+                use_streaming_summaries=use_streaming_summaries)
+        tree_array.read_from_path(
+                self.support_trees_path,
+                "nexus",
+                tree_offset=tree_offset)
+        return tree_array
+
+    def assertSummariesAlmostEqual(self, summaries1, summaries2):
+        self.assertEqual(set(summaries1), set(summaries2))
+        for split in summaries1:
+            for field in ("mean", "median", "sd", "hpd95", "quant_5_95", "range"):
+                v1 = summaries1[split][field]
+                v2 = summaries2[split][field]
+                if isinstance(v1, tuple):
+                    for x1, x2 in zip(v1, v2):
+                        self.assertAlmostEqual(x1, x2)
+                else:
+                    self.assertAlmostEqual(v1, v2)
+
+    def test_summaries(self):
+        taxon_namespace = dendropy.TaxonNamespace()
+        expected = self.get_tree_array(taxon_namespace, self.burnin, False)
+        # accumulated by separate collections (e.g., by worker processes)
+        tree_array = dendropy.TreeArray(
+                taxon_namespace=taxon_namespace,
+                ignore_node_ages=False,
+                use_streaming_summaries=True)
+        for tree_offset in (self.burnin, self.burnin + 100):
+            tree_array.update(self.get_tree_array(taxon_namespace, tree_offset, True))
+        expected.update(self.get_tree_array(taxon_namespace, self.burnin + 100, False))
+        sd = tree_array.split_distribution
+        self.assertFalse(sd.split_edge_lengths)
+        self.assertFalse(sd.split_node_ages)
+        self.assertEqual(set(sd.split_edge_length_accumulators), set(expected.split_distribution.split_edge_lengths))
+        self.assertSummariesAlmostEqual(sd.split_edge_length_summaries,
+                expected.split_distribution.split_edge_length_summaries)
+        self.assertSummariesAlmostEqual(sd.split_node_age_summaries,
+                expected.split_distribution.split_node_age_summaries)
+        for set_edge_lengths in ("mean-length", "median-age"):
+            kwargs = {"set_edge_lengths": set_edge_lengths}
+            self.assertEqual(
+                    tree_array.maximum_product_of_split_support_tree(**kwargs).as_string("newick"),
+                    expected.maximum_product_of_split_support_tree(**kwargs).as_string("newick"))
+
+    def test_incompatible_update(self):
+        taxon_namespace = dendropy.TaxonNamespace()
+        tree_array = self.get_tree_array(taxon_namespace, self.burnin, True)
+        with self.assertRaises(dendropy.TreeArray.IncompatibleStreamingSummariesTreeArrayUpdate):
+            tree_array.update(self.get_tree_array(taxon_namespace, self.burnin, False))
+        with self.assertRaises(ValueError):
+            tree_array.split_distribution.update(dendropy.SplitDistribution(taxon_namespace=taxon_namespace))
+
 class TestTopologyCounter(dendropytest.ExtendedTestCase):
 
     def get_regime(self,